@@ -0,0 +1,892 @@
+#!/usr/bin/env python3
+"""
+SmartCity Tizimi uchun Benchmarklar
+Ishlash ko'rsatkichlarini o'lchaydi va natijalarni jadval ko'rinishida chiqaradi
+
+Ishga tushirish:
+    python bench.py            # barcha benchmarklar
+    python bench.py import     # faqat tanlanganlari
+"""
+
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# Loyiha ildizini path ga qo'shish
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+
+def print_section(title):
+    """Print a formatted section header"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70)
+
+
+# ==================== IMPORT TIME ====================
+
+IMPORT_TARGETS = [
+    'core',
+    'modules',
+    'modules.lighting.lighting_devices',
+    'core.factories.factories',
+    'core.controller',
+]
+
+_IMPORT_PROBE = (
+    "import sys, time\n"
+    "before = set(sys.modules)\n"
+    "t0 = time.perf_counter()\n"
+    "import {target}\n"
+    "elapsed = time.perf_counter() - t0\n"
+    "loaded = [m for m in set(sys.modules) - before "
+    "if m.split('.')[0] in ('core', 'modules')]\n"
+    "print(elapsed, len(loaded))\n"
+)
+
+
+def measure_import(target: str, repeat: int = 7):
+    """Import a module in fresh interpreters; return (median seconds, project modules loaded)"""
+    timings = []
+    loaded = 0
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, '-c', _IMPORT_PROBE.format(target=target)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.split()
+        timings.append(float(out[0]))
+        loaded = int(out[1])
+    return statistics.median(timings), loaded
+
+
+def bench_import():
+    """Cold import time of the public packages"""
+    print_section("IMPORT TIME (fresh interpreter, median of 7)")
+    print(f"  {'target':<40}{'ms':>10}{'modules':>10}")
+    for target in IMPORT_TARGETS:
+        seconds, loaded = measure_import(target)
+        print(f"  {target:<40}{seconds * 1000:>10.2f}{loaded:>10}")
+
+
+# ==================== FACTORY THROUGHPUT ====================
+
+def _rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:>14,.0f}/s"
+
+
+def bench_factories(count: int = 200_000):
+    """Per-device create_device calls versus prototype-based create_many"""
+    from core.factories.factories import (
+        LightingDeviceFactory, SecurityDeviceFactory,
+        TransportDeviceFactory, EnergyDeviceFactory
+    )
+    print_section(f"FACTORY THROUGHPUT ({count:,} devices)")
+    ids = [f"DEV-{i}" for i in range(count)]
+    locations = [f"Street-{i % 500}" for i in range(count)]
+    print(f"  {'factory':<28}{'create_device':>18}{'create_many':>18}")
+    for factory in (LightingDeviceFactory(), SecurityDeviceFactory(),
+                    TransportDeviceFactory(), EnergyDeviceFactory()):
+        create = factory.create_device
+        t0 = time.perf_counter()
+        devices = [create(device_id, location) for device_id, location in zip(ids, locations)]
+        single = time.perf_counter() - t0
+        del devices
+        t0 = time.perf_counter()
+        factory.create_many(ids, locations)
+        bulk = time.perf_counter() - t0
+        print(f"  {type(factory).__name__:<28}{_rate(count, single):>18}{_rate(count, bulk):>18}")
+
+
+# ==================== MEMORY PER DEVICE ====================
+
+def measure_device_memory(factory, count: int) -> float:
+    """Bytes allocated per device when `count` devices are created (ids excluded)"""
+    ids = [f"DEV-{i}" for i in range(count)]
+    locations = [f"Street-{i % 500}" for i in range(count)]
+    device_list = [None] * count
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for index, device_id in enumerate(ids):
+            device_list[index] = factory.create_device(device_id, locations[index])
+        allocated = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    return allocated / count
+
+
+def bench_memory(count: int = 100_000):
+    """Memory footprint of each device type"""
+    from core.factories.factories import (
+        LightingDeviceFactory, SecurityDeviceFactory,
+        TransportDeviceFactory, EnergyDeviceFactory
+    )
+    print_section(f"MEMORY PER DEVICE ({count:,} devices, tracemalloc)")
+    print(f"  {'device':<20}{'bytes/device':>16}{'MB per 1M':>14}")
+    for factory in (LightingDeviceFactory(), SecurityDeviceFactory(),
+                    TransportDeviceFactory(), EnergyDeviceFactory()):
+        per_device = measure_device_memory(factory, count)
+        name = factory._qurilma_klassi().__name__
+        print(f"  {name:<20}{per_device:>16.1f}{per_device * 1e6 / 2**20:>14.1f}")
+
+
+# ==================== FLYWEIGHT STATUS SIZE ====================
+
+_BENCH_CITIES = None
+
+
+def fresh_city(shards: int = 0):
+    """A new registry city for one benchmark (the previous benchmark's city is shut down)"""
+    from core.registry.registry import CityRegistry
+    global _BENCH_CITIES
+    if _BENCH_CITIES is None:
+        _BENCH_CITIES = CityRegistry()
+    _BENCH_CITIES.shutdown_all()
+    return _BENCH_CITIES.create("Bench", shards=shards)
+
+
+def build_controller(devices_per_subsystem: int, distinct_locations: int = 100, shards: int = 0):
+    """Initialize a fresh city with a bulk-provisioned fleet (console output suppressed)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        controller = fresh_city(shards)
+        for name in ('lighting', 'security', 'transport', 'energy'):
+            ids = [f"{name.upper()}-{i}" for i in range(devices_per_subsystem)]
+            locations = [f"{name} area {i % distinct_locations}" for i in range(devices_per_subsystem)]
+            devices = controller.create_devices(name, ids, locations)
+            controller.add_devices_to_subsystem(name, dict(zip(ids, devices)))
+        controller.get_all_status()  # proksilarni kechiktirilgan initsializatsiya
+    return controller
+
+
+def bench_flyweight(devices_per_subsystem: int = 25_000):
+    """Serialized status size: full strings versus flyweight handles"""
+    controller = build_controller(devices_per_subsystem)
+    print_section(f"STATUS PAYLOAD ({devices_per_subsystem * 4:,} devices)")
+    print(f"  {'mode':<12}{'build ms':>12}{'JSON bytes':>16}")
+    for compact in (False, True):
+        t0 = time.perf_counter()
+        status = controller.get_all_status(compact=compact)
+        elapsed = time.perf_counter() - t0
+        size = len(json.dumps(status, separators=(',', ':')))
+        print(f"  {'compact' if compact else 'full':<12}{elapsed * 1000:>12.1f}{size:>16,}")
+
+
+# ==================== SHARDING ====================
+
+def bench_sharding(devices_per_subsystem: int = 25_000):
+    """Bulk start/stop/status: single process versus shard worker processes"""
+    print_section(f"SHARDED BULK OPERATIONS ({devices_per_subsystem * 4:,} devices, "
+                  f"{os.cpu_count()} CPU)")
+    print(f"  {'shards':<10}{'start_all ms':>14}{'stop_all ms':>14}{'status ms':>14}")
+    for shards in (0, 2, 4):
+        controller = build_controller(devices_per_subsystem, shards=shards)
+        timings = []
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for operation in (controller.start_all_subsystems, controller.stop_all_subsystems,
+                              controller.get_all_status):
+                t0 = time.perf_counter()
+                operation()
+                timings.append((time.perf_counter() - t0) * 1000)
+            controller.shutdown()
+        label = str(shards) if shards > 1 else 'local'
+        print(f"  {label:<10}" + ''.join(f"{ms:>14.1f}" for ms in timings))
+
+
+# ==================== STATUS BOARD ====================
+
+def bench_statusboard(devices_per_subsystem: int = 25_000):
+    """Shared-memory board: writer publish cost and lock-free reader scan"""
+    from core.statusboard.statusboard import StatusBoard, StatusBoardReader
+    total = devices_per_subsystem * 4
+    controller = build_controller(devices_per_subsystem)
+    board = StatusBoard(capacity=total)
+    print_section(f"STATUS BOARD ({total:,} devices)")
+    try:
+        t0 = time.perf_counter()
+        controller.attach_status_board(board)
+        publish = time.perf_counter() - t0
+        reader = StatusBoardReader(board.name)
+        t0 = time.perf_counter()
+        scanned = sum(1 for _ in reader.scan())
+        scan = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for _ in range(1000):
+            reader.read(0)
+        single = (time.perf_counter() - t0) / 1000
+        print(f"  full publish      {publish * 1000:>10.1f} ms  ({_rate(total, publish).strip()})")
+        print(f"  reader scan       {scan * 1000:>10.1f} ms  ({scanned:,} records)")
+        print(f"  single slot read  {single * 1e6:>10.2f} us")
+        reader.close()
+    finally:
+        controller.attach_status_board(None)
+        board.close()
+
+
+# ==================== TELEMETRY ====================
+
+def bench_telemetry(devices_per_subsystem: int = 25_000, readings: int = 400_000):
+    """Streaming ingestion: generator -> pipe -> batched parse/validate/apply"""
+    import random
+    import threading
+    from core.telemetry.telemetry import TelemetryPipeline, encode_readings
+    controller = build_controller(devices_per_subsystem)
+    rng = random.Random(7)
+    samples = [('energy', f"ENERGY-{rng.randrange(devices_per_subsystem)}", 'kwh', round(rng.random() * 50, 2))
+               if i % 2 else
+               ('lighting', f"LIGHTING-{rng.randrange(devices_per_subsystem)}", 'brightness', rng.randrange(101))
+               for i in range(readings)]
+    print_section(f"TELEMETRY INGESTION ({readings:,} readings over a pipe)")
+    print(f"  {'framing':<10}{'seconds':>10}{'readings/s':>16}{'applied':>12}{'invalid':>10}")
+    for framing in ('ndjson', 'length'):
+        payload = encode_readings(samples, framing)
+        read_fd, write_fd = os.pipe()
+
+        def produce():
+            with os.fdopen(write_fd, 'wb') as stream:
+                stream.write(payload)
+
+        pipeline = TelemetryPipeline(controller).start()
+        producer = threading.Thread(target=produce)
+        t0 = time.perf_counter()
+        producer.start()
+        with os.fdopen(read_fd, 'rb') as stream:
+            pipeline.feed_stream(stream, framing)
+        pipeline.stop()
+        elapsed = time.perf_counter() - t0
+        producer.join()
+        stats = pipeline.stats()
+        print(f"  {framing:<10}{elapsed:>10.2f}{_rate(readings, elapsed)}{stats['applied']:>12,}"
+              f"{stats['invalid']:>10,}")
+
+
+# ==================== HTTP API ====================
+
+def bench_http(devices_per_subsystem: int = 5_000, clients: int = 100, requests_per_client: int = 20):
+    """Polling clients against the status API: cached body, 304 revalidation, rebuild cost"""
+    import http.client
+    import threading
+    from core.api.api import StatusServer
+    controller = build_controller(devices_per_subsystem)
+    server = StatusServer(controller, port=0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        server.start_in_thread()
+    print_section(f"HTTP STATUS API ({devices_per_subsystem * 4:,} devices, {clients} keep-alive clients)")
+
+    def poll(headers):
+        connection = http.client.HTTPConnection('127.0.0.1', server.port)
+        for _ in range(requests_per_client):
+            connection.request('GET', '/status', headers=headers)
+            connection.getresponse().read()
+        connection.close()
+
+    try:
+        t0 = time.perf_counter()
+        body = json.dumps(controller.get_all_status(), separators=(',', ':')).encode()
+        rebuild = time.perf_counter() - t0
+        probe = http.client.HTTPConnection('127.0.0.1', server.port)
+        probe.request('GET', '/status')
+        response = probe.getresponse()
+        response.read()
+        etag = response.getheader('ETag')
+        probe.close()
+        print(f"  status rebuild + encode   {rebuild * 1000:>10.1f} ms  ({len(body):,} bytes)")
+        for label, headers in (('cached 200', {}), ('cached 200 gzip', {'Accept-Encoding': 'gzip'}),
+                               ('304 revalidate', {'If-None-Match': etag})):
+            threads = [threading.Thread(target=poll, args=(headers,)) for _ in range(clients)]
+            t0 = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - t0
+            print(f"  {label:<24}{_rate(clients * requests_per_client, elapsed)}")
+        stats = server.stats()
+        print(f"  cache hits {stats['cache_hits']:,} / requests {stats['requests']:,}")
+    finally:
+        server.stop()
+
+
+# ==================== ADMISSION CONTROL ====================
+
+def bench_admission(calls: int = 500_000):
+    """Cost of one proxy admission check (admit + release) per limit configuration"""
+    from core.proxy.proxy import SubsystemProxy, ConcurrencyLimit
+    from modules.lighting.lighting_system import LightingSystem
+    proxy = SubsystemProxy(LightingSystem())
+    print_section("PROXY ADMISSION CHECK")
+    print(f"  {'limits':<28}{'us/check':>12}")
+    for label, limits in (('none', {}),
+                          ('client bucket', {'client_rate': 1e9}),
+                          ('client + subsystem', {'client_rate': 1e9, 'subsystem_rate': 1e9}),
+                          ('buckets + concurrency cap', {'client_rate': 1e9, 'subsystem_rate': 1e9,
+                                                         'concurrency': ConcurrencyLimit(64)})):
+        proxy.set_limits(**limits)
+        admit, release = proxy.admit, proxy.release
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            admit('client-1')
+            release()
+        elapsed = time.perf_counter() - t0
+        print(f"  {label:<28}{elapsed / calls * 1e6:>12.3f}")
+
+
+# ==================== STATUS QUERIES ====================
+
+def bench_query(devices_per_subsystem: int = 100_000, active_every: int = 100):
+    """Selective status query: full status + Python filter versus pushdown"""
+    controller = build_controller(devices_per_subsystem)
+    lights = controller._haqiqiy_subsistema('lighting').devices
+    for index, light in enumerate(lights.values()):
+        if index % active_every == 0:
+            light.is_on, light.brightness = True, 100
+    print_section(f"STATUS QUERY ({devices_per_subsystem:,} lights, 1 in {active_every} on)")
+    print(f"  {'method':<34}{'ms':>10}{'matches':>10}")
+    cases = (
+        ('get_status + filter', lambda: {device_id: status for device_id, status
+                                         in controller.get_subsystem_status('lighting')['devices'].items()
+                                         if status['is_on']}),
+        ('query is_on', lambda: controller.query('lighting', {'is_on': True})),
+        ('query is_on, 2 fields', lambda: controller.query('lighting', {'is_on': True},
+                                                           ['device_id', 'location'])),
+        ('query location + is_on', lambda: controller.query('lighting', {'location': 'lighting area 0',
+                                                                         'is_on': True})),
+        ('query unknown location', lambda: controller.query('lighting', {'location': 'nowhere'})),
+    )
+    for label, run in cases:
+        run()
+        t0 = time.perf_counter()
+        matches = run()
+        print(f"  {label:<34}{(time.perf_counter() - t0) * 1000:>10.2f}{len(matches):>10,}")
+
+
+# ==================== CAMERA EVENTS ====================
+
+def bench_camera_events(cameras: int = 5_000, events: int = 500_000, hot_cameras: int = 50):
+    """Bursty detections from many cameras through the bounded event pipeline"""
+    import random
+    from core.factories.factories import SecurityDeviceFactory
+    from modules.security.security_system import SecuritySystem
+    system = SecuritySystem()
+    ids = [f"CAM-{i}" for i in range(cameras)]
+    system.devices = dict(zip(ids, SecurityDeviceFactory().create_many(ids, "Harbor")))
+    rng = random.Random(3)
+    # Half the traffic comes from a few hot cameras - their queues overflow
+    stream = [ids[rng.randrange(hot_cameras)] if i % 2 else ids[rng.randrange(cameras)] for i in range(events)]
+    kinds = ('motion', 'motion', 'motion', 'tamper', 'offline')
+    print_section(f"CAMERA EVENT PIPELINE ({events:,} events, {cameras:,} cameras)")
+    print(f"  {'workers':<10}{'push/s':>16}{'end-to-end/s':>16}{'dropped':>10}{'peak queued':>13}  alert")
+    for workers in (1, 4):
+        with contextlib.redirect_stdout(io.StringIO()):
+            system.alert_level = 'normal'
+            pipeline = system.start_event_pipeline(workers=workers, queue_size=64)
+            t0 = time.perf_counter()
+            for i, camera_id in enumerate(stream):
+                system.report_event(camera_id, kinds[i % 5])
+            pushed = time.perf_counter() - t0
+            pipeline.drain()
+            elapsed = time.perf_counter() - t0
+            stats = pipeline.stats()
+            system.stop_event_pipeline()
+        print(f"  {workers:<10}{_rate(events, pushed)}{_rate(events, elapsed)}{stats['dropped']:>10,}"
+              f"{stats['peak_pending']:>13,}  {system.alert_level}")
+    print(f"  queue bound: {cameras:,} cameras x 64 = {cameras * 64:,} events")
+
+
+# ==================== ESCALATION RULES ====================
+
+def bench_rules(events: int = 200_000, batch_size: int = 32):
+    """Rule evaluation throughput as the rule set grows"""
+    import random
+    from modules.security.security_rules import RuleEngine
+    rng = random.Random(11)
+    kinds = ('motion', 'tamper', 'offline')
+    stream = [(kinds[rng.randrange(3)], f"CAM-{camera}", camera % 100)
+              for camera in (rng.randrange(5_000) for _ in range(events))]
+    batches = [stream[i:i + batch_size] for i in range(0, events, batch_size)]
+    print_section(f"ESCALATION RULES ({events:,} events, 5,000 cameras, 100 locations)")
+    print(f"  {'rules':<10}{'groups':>8}{'events/s':>16}")
+    for count in (10, 100, 1_000, 5_000):
+        rules = [f"{rng.choice(kinds)} > {rng.randint(1, 50)} in {rng.choice((10, 30, 60))}s "
+                 f"{rng.choice(('per location', 'per camera', 'citywide'))} -> {rng.choice(('elevated', 'high'))}"
+                 for _ in range(count)]
+        engine = RuleEngine(rules)
+        t0 = time.perf_counter()
+        for index, batch in enumerate(batches):
+            engine.observe(batch, now=index * 0.01)
+        elapsed = time.perf_counter() - t0
+        print(f"  {count:<10,}{len(engine._groups):>8}{_rate(events, elapsed)}")
+
+
+# ==================== DEMAND FORECAST ====================
+
+def bench_forecast(meters: int = 50_000, days: int = 14, zones: int = 200):
+    """Seasonal demand forecast for every meter (NumPy) vs a per-meter Python update"""
+    import numpy as np
+    from core.factories.factories import EnergyDeviceFactory
+    from modules.energy.energy_system import EnergySystem
+    system = EnergySystem()
+    ids = [f"METER-{i}" for i in range(meters)]
+    system.devices = dict(zip(ids, EnergyDeviceFactory().create_many(ids, [f"Zone-{i % zones}" for i in range(meters)])))
+    rng = np.random.default_rng(5)
+    hours = np.arange(days * 24)
+    base = rng.uniform(1.0, 20.0, (meters, 1))
+    history = base * (1.0 + 0.4 * np.sin(2 * np.pi * hours / 24)) + rng.normal(0.0, 0.5, (meters, hours.size))
+    print_section(f"DEMAND FORECAST ({meters:,} meters, {days} days hourly, {zones} zones)")
+    with contextlib.redirect_stdout(io.StringIO()):
+        forecast = system.start_forecasting(enable_above=float(base.sum()) * 1.2, horizon=24)
+        t0 = time.perf_counter()
+        forecast.fit(history)
+        fitted = time.perf_counter() - t0
+        for device, value in zip(system.devices.values(), history[:, -1]):
+            device.power_consumption = float(value) * 1.5
+        t0 = time.perf_counter()
+        summary = system.record_interval()
+        interval = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        forecast.zone_forecast(24)
+        by_zone = time.perf_counter() - t0
+    # The same smoothing as a per-meter Python loop (every interval of the history)
+    level = history[:, 0].tolist()
+    seasonal = [[0.0] * 24 for _ in range(meters)]
+    rows = history.tolist()
+    t0 = time.perf_counter()
+    for step in range(hours.size):
+        slot = step % 24
+        for row in range(meters):
+            reading, season = rows[row][step], seasonal[row][slot]
+            level[row] = 0.3 * (reading - season) + 0.7 * level[row]
+            seasonal[row][slot] = 0.1 * (reading - level[row]) + 0.9 * season
+    looped = time.perf_counter() - t0
+    for label, seconds in ((f"fit, numpy ({hours.size} intervals)", fitted),
+                           ("fit, per-meter python loop", looped),
+                           ("record one interval", interval),
+                           ("24h forecast per zone", by_zone)):
+        print(f"  {label:<34}{seconds * 1000:>10.1f} ms")
+    print(f"  peak forecast {summary['peak_forecast_kwh']:,.0f} kWh -> efficiency mode "
+          f"{'ON' if system.efficiency_mode else 'OFF'}")
+
+
+# ==================== LIGHTING SCHEDULE ====================
+
+def bench_schedule(lights: int = 100_000, actions_per_light: int = 10):
+    """Millions of per-light actions in the timer wheel: add, cancel, fire in batches"""
+    from core.factories.factories import LightingDeviceFactory
+    from modules.lighting.lighting_system import LightingSystem
+    from modules.lighting.lighting_schedule import LightingScheduler
+    system = LightingSystem()
+    ids = [f"LIGHT-{i}" for i in range(lights)]
+    system.devices = dict(zip(ids, LightingDeviceFactory().create_many(ids, [f"Street-{i % 1000}" for i in range(lights)])))
+    total = lights * actions_per_light
+    start = 1_000_000.0
+    scheduler = LightingScheduler(system, clock=lambda: start)
+    print_section(f"LIGHTING SCHEDULE ({total:,} actions, {lights:,} lights)")
+    t0 = time.perf_counter()
+    action_ids = [scheduler.at(start + 1 + (n * 7919) % 86_400, 'on' if n % 2 else 'off', device=ids[n % lights])
+                  for n in range(total)]
+    added = time.perf_counter() - t0
+    sample = LightingScheduler(system, clock=lambda: start)
+    tracemalloc.start()
+    for n in range(lights):
+        sample.at(start + 1 + (n * 7919) % 86_400, 'on', device=ids[n])
+    memory = tracemalloc.get_traced_memory()[0] / lights
+    tracemalloc.stop()
+    del sample
+    t0 = time.perf_counter()
+    for action_id in action_ids[::10]:
+        scheduler.cancel(action_id)
+    cancelled = time.perf_counter() - t0
+    del action_ids
+    fired = 0
+    t0 = time.perf_counter()
+    for minute in range(1, 24 * 60 + 2):
+        fired += scheduler.run_due(start + minute * 60)
+    firing = time.perf_counter() - t0
+    print(f"  {'schedule':<24}{_rate(total, added)}")
+    print(f"  {'cancel':<24}{_rate(total // 10, cancelled)}")
+    print(f"  {'fire (1-minute batches)':<24}{_rate(fired, firing)}   {fired:,} switches")
+    print(f"  memory per action       {memory:>14.0f} B")
+    city = LightingScheduler(system, clock=lambda: start)
+    city.define_zone("City", [f"Street-{i}" for i in range(1000)])
+    city.at(start + 1, 'on', zone="City")
+    t0 = time.perf_counter()
+    switched = city.run_due(start + 2)
+    print(f"  one zone-wide action    {(time.perf_counter() - t0) * 1000:>12.1f} ms   {switched:,} lights")
+
+
+# ==================== LIVENESS ====================
+
+def bench_liveness(devices: int = 1_000_000):
+    """Heartbeat tracking: sweep cost follows the expiring devices, not the fleet"""
+    from core.liveness.liveness import LivenessTracker
+    now = [0.0]
+    tracker = LivenessTracker(timeout=60.0, clock=lambda: now[0])
+    ids = [f"DEV-{i}" for i in range(devices)]
+    print_section(f"DEVICE LIVENESS ({devices:,} tracked devices)")
+    t0 = time.perf_counter()
+    # Heartbeats spread over one timeout period
+    for second in range(60):
+        now[0] = float(second)
+        tracker.heartbeats('lighting', ids[second::60])
+    armed = time.perf_counter() - t0
+    print(f"  {'heartbeats':<28}{_rate(devices, armed)}")
+    import gc
+    print(f"  {'expiring':>12}{'sweep ms':>14}{'summary us':>14}")
+    for expiring in (0, 100, 10_000, devices // 60):
+        now[0] = 59.0
+        tracker.heartbeats('lighting', ids)
+        now[0] = 60.0
+        # Exactly `expiring` devices miss their next heartbeat
+        tracker.heartbeats('lighting', ids[expiring:])
+        # The tracked fleet is long-lived - keep the cyclic GC from rescanning it inside the timing
+        gc.freeze()
+        t0 = time.perf_counter()
+        expired = tracker.sweep(now[0] + 59.5)
+        swept = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        tracker.summary()
+        summary = time.perf_counter() - t0
+        assert len(expired.get('lighting', ())) == expiring
+        print(f"  {expiring:>12,}{swept * 1000:>14.3f}{summary * 1e6:>14.1f}")
+    gc.unfreeze()
+
+
+# ==================== INVENTORY LOADING ====================
+
+def _write_inventory(path: str, rows: int):
+    kinds = ('lighting', 'security', 'transport', 'energy')
+    with open(path, 'w', encoding='utf-8') as stream:
+        stream.write("subsystem,device_id,location\n")
+        for i in range(rows):
+            stream.write(f"{kinds[i % 4]},INV-{i},Street-{i % 997}\n")
+
+
+def bench_inventory(sizes=(100_000, 500_000), chunk_size: int = 10_000):
+    """Streaming CSV inventory into the controller: speed and loader memory by inventory size"""
+    import tempfile
+    from core.builders.builders import SmartCityBuilder
+    print_section(f"INVENTORY LOADING (CSV, chunks of {chunk_size:,})")
+    print(f"  {'rows':<12}{'rows/s':>16}{'loader peak MB':>18}{'devices MB':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in sizes:
+            path = os.path.join(directory, f"inventory-{rows}.csv")
+            _write_inventory(path, rows)
+            controller = build_controller(0)
+            with contextlib.redirect_stdout(io.StringIO()):
+                report = SmartCityBuilder.from_inventory(path, chunk_size=chunk_size).provision(controller)
+            assert report.total_loaded == rows
+            # Second pass under tracemalloc: what stays (devices) vs the loader's extra peak
+            controller = build_controller(0)
+            tracemalloc.start()
+            with contextlib.redirect_stdout(io.StringIO()):
+                SmartCityBuilder.from_inventory(path, chunk_size=chunk_size).provision(controller)
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"  {rows:<12,}{_rate(rows, report.seconds)}{(peak - retained) / 2**20:>18.1f}"
+                  f"{retained / 2**20:>14.1f}")
+            with contextlib.redirect_stdout(io.StringIO()):
+                controller.shutdown()
+
+
+# ==================== RECONFIGURATION ====================
+
+def bench_reconfigure(lights: int = 500_000, changes=(10, 1_000, 100_000)):
+    """apply_config on a large city: time follows the size of the change, not the city"""
+    from core.builders.builders import SmartCityBuilder
+    print_section(f"INCREMENTAL RECONFIGURATION ({lights:,} lights)")
+    streets = [f"Street {i % 2_000}" for i in range(lights)]
+    controller = build_controller(0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        initial = controller.apply_config(SmartCityBuilder().add_lighting_system(lights, streets).build())
+        unchanged = controller.apply_config(SmartCityBuilder().add_lighting_system(lights, streets).build())
+    print(f"  initial provisioning: {initial['seconds'] * 1000:10.1f} ms")
+    print(f"  unchanged config:     {unchanged['seconds'] * 1000:10.1f} ms")
+    print(f"  {'changed':<12}{'relocate ms':>14}{'grow ms':>12}{'shrink ms':>12}")
+    for changed in changes:
+        moved = list(streets)
+        for index in range(0, lights, lights // changed):
+            moved[index] = "Detour"
+        timings = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for count, locations in ((lights, moved), (lights + changed, moved + streets[:changed]),
+                                     (lights, streets)):
+                result = controller.apply_config(SmartCityBuilder().add_lighting_system(count, locations).build())
+                timings.append(result['seconds'] * 1000)
+        assert result['totals']['removed'] == changed
+        print(f"  {changed:<12,}" + "".join(f"{ms:>{width}.1f}" for ms, width in zip(timings, (14, 12, 12))))
+    with contextlib.redirect_stdout(io.StringIO()):
+        controller.shutdown()
+
+
+# ==================== MULTI-CITY REGISTRY ====================
+
+def bench_cities(cities: int = 200, devices_per_subsystem: int = 100):
+    """Many small cities in one process: startup time and memory per city"""
+    from core.registry.registry import CityRegistry
+    print_section(f"MULTI-CITY REGISTRY ({cities} cities x {devices_per_subsystem * 4} devices)")
+    registry = CityRegistry()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for index in range(cities):
+            controller = registry.create(f"City-{index}")
+            for name in ('lighting', 'security', 'transport', 'energy'):
+                ids = [f"{name.upper()}-{i}" for i in range(devices_per_subsystem)]
+                devices = controller.create_devices(name, ids, [f"{name} area {i % 10}" for i in range(devices_per_subsystem)])
+                controller.add_devices_to_subsystem(name, dict(zip(ids, devices)))
+    elapsed = time.perf_counter() - t0
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"  startup per city:  {elapsed / cities * 1000:10.2f} ms")
+    print(f"  memory per city:   {retained / cities / 1024:10.1f} KB")
+    print(f"  (a separate process per city pays the interpreter and import cost each time;"
+          f" see 'import')")
+    with contextlib.redirect_stdout(io.StringIO()):
+        registry.shutdown_all()
+
+
+# ==================== TRACING ====================
+
+def bench_tracing(devices_per_subsystem: int = 100, calls: int = 20_000):
+    """Per-call cost of span instrumentation: disabled, sampled and always on"""
+    import tempfile
+    from core.tracing import tracing
+    controller = build_controller(devices_per_subsystem)
+    print_section(f"TRACING OVERHEAD (get_subsystem_status, {devices_per_subsystem} cameras)")
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        tracing.span('noop')
+    print(f"  disabled span():      {(time.perf_counter() - t0) / calls * 1e9:10.0f} ns")
+    print(f"  {'mode':<20}{'us/call':>12}{'spans':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for label, rate in (('disabled', None), ('sampled 1%', 0.01), ('always', 1.0)):
+            if rate is not None:
+                tracing.enable(os.path.join(directory, 'trace.json'), rate, max_spans=1_000_000)
+            t0 = time.perf_counter()
+            for _ in range(calls):
+                controller.get_subsystem_status('security')
+            elapsed = time.perf_counter() - t0
+            tracer = tracing.disable()
+            spans = tracer.export() if tracer is not None else 0
+            print(f"  {label:<20}{elapsed / calls * 1e6:>12.1f}{spans:>10,}")
+
+
+# ==================== HEADLESS BATCH MODE ====================
+
+def bench_headless(operations: int = 100_000):
+    """main.py --headless end to end: a scripted mix of adds, telemetry and removals"""
+    third = operations // 3
+    script = [f"add lighting L-{i} Street {i % 500}" for i in range(third)]
+    script += [f"set lighting L-{i} brightness {i % 100}" for i in range(third)]
+    script += [f"remove lighting L-{i}" for i in range(operations - 2 * third)]
+    print_section(f"HEADLESS BATCH MODE ({operations:,} scripted operations)")
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, 'main.py', '--headless'], input="\n".join(script) + "\n",
+                         cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    elapsed = time.perf_counter() - t0
+    summary = json.loads(out.splitlines()[-1])['summary']
+    assert summary['operations'] == operations and not summary['errors']
+    print(f"  process wall time:   {elapsed * 1000:10.1f} ms")
+    print(f"  script execution:    {summary['seconds'] * 1000:10.1f} ms  ({summary['batches']} bulk calls)")
+    print(f"  throughput:        {_rate(operations, summary['seconds'])}")
+
+
+# ==================== LOAD TEST ====================
+
+def bench_loadtest(devices_per_subsystem: int = 25_000, duration: float = 2.0):
+    """Default operation mix (80% status, 15% commands, 5% provisioning) by thread count and target rate"""
+    from core.loadtest.loadtest import WorkloadGenerator
+    controller = build_controller(devices_per_subsystem)
+    print_section(f"LOAD TEST (status=80, command=15, provision=5; {devices_per_subsystem * 4:,} devices)")
+    print(f"  {'threads':<9}{'target':>10}{'achieved':>16}{'p50 ms':>10}{'p99 ms':>10}{'p999 ms':>10}{'errors':>9}")
+    for threads, rate in ((1, None), (4, None), (16, None), (4, 20_000), (16, 20_000)):
+        data = WorkloadGenerator(controller, threads=threads, rate=rate, duration=duration, seed=1).run().as_dict()
+        latency = data['latency_ms']
+        print(f"  {threads:<9}{(f'{rate:,}/s' if rate else 'max'):>10}{_rate(data['operations'], data['seconds'])}"
+              f"{latency['p50']:>10.3f}{latency['p99']:>10.3f}{latency['p999']:>10.3f}{data['error_rate']:>9.2%}")
+
+
+# ==================== DISTRICT HIERARCHY ====================
+
+def bench_districts(devices_per_subsystem: int = 125_000, districts: int = 10, updates: int = 20_000):
+    """District summary: full scan versus incrementally maintained aggregates"""
+    controller = build_controller(devices_per_subsystem)
+    print_section(f"DISTRICT HIERARCHY ({devices_per_subsystem * 4:,} devices, {districts} districts)")
+    streets = {f"District-{d}": [f"{name} area {i}" for name in ('lighting', 'security', 'transport', 'energy')
+                                 for i in range(d, 100, districts)] for d in range(districts)}
+    readings = [(f"LIGHTING-{i % devices_per_subsystem}", 'is_on', bool(i % 2)) for i in range(updates)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        controller.start_subsystem('lighting')
+    t0 = time.perf_counter()
+    controller.apply_telemetry('lighting', readings)
+    print(f"  telemetry, no hierarchy:  {_rate(updates, time.perf_counter() - t0)}")
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        controller.enable_districts(streets)
+    print(f"  build (once):             {(time.perf_counter() - t0) * 1000:10.1f} ms")
+    wanted = set(streets['District-0'])
+    lights = controller._haqiqiy_subsistema('lighting').devices
+    t0 = time.perf_counter()
+    on = sum(1 for device in lights.values() if device.is_on and device.location in wanted)
+    print(f"  scan summary (lighting):  {(time.perf_counter() - t0) * 1000:10.3f} ms")
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        summary = controller.district_summary('District-0')
+    print(f"  O(1) summary (all subs):  {(time.perf_counter() - t0) * 1000:10.3f} us "
+          f"(on={summary['lighting']['on']:,}, scan={on:,})")
+    readings = [(device_id, attribute, not value) for device_id, attribute, value in readings]
+    t0 = time.perf_counter()
+    controller.apply_telemetry('lighting', readings)
+    print(f"  telemetry + aggregates:   {_rate(updates, time.perf_counter() - t0)}")
+
+
+# ==================== SIGNAL TIMING ====================
+
+def bench_signals(intersections: int = 50_000, approaches: int = 4, corridor_length: int = 20):
+    """Whole-city Webster re-optimization and plan push, compared with one signal cycle"""
+    import random
+    with contextlib.redirect_stdout(io.StringIO()):
+        controller = fresh_city()
+        ids = [f"TRAFFIC-{i}" for i in range(intersections * approaches)]
+        names = [f"Junction {i // approaches}" for i in range(len(ids))]
+        lights = controller.create_devices('transport', ids, names)
+        controller.add_devices_to_subsystem('transport', dict(zip(ids, lights)))
+        controller.start_subsystem('transport')
+    rng = random.Random(1)
+    flows = {device_id: rng.uniform(50, 450) for device_id in ids}
+    corridors = {f"Corridor {c}": [(f"Junction {j}", 250.0 + 10 * (j % 7))
+                                   for j in range(c * corridor_length, (c + 1) * corridor_length)]
+                 for c in range(intersections // corridor_length // 2)}
+    print_section(f"SIGNAL TIMING ({intersections:,} intersections, {len(ids):,} lights, "
+                  f"{len(corridors):,} corridors)")
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        plan = controller.optimize_traffic(flows, corridors)
+        optimize = time.perf_counter() - t0
+    summary = plan.summary()
+    print(f"  re-optimize city:     {optimize * 1000:10.1f} ms "
+          f"(shortest cycle {summary['cycle_min']:.0f} s, {optimize / summary['cycle_min']:.2%} of it)")
+    t0 = time.perf_counter()
+    changed = controller.update_traffic_signals(now=0.0)
+    print(f"  first push:           {(time.perf_counter() - t0) * 1000:10.1f} ms ({changed:,} lights)")
+    t0 = time.perf_counter()
+    changed = controller.update_traffic_signals(now=1.0)
+    print(f"  1 s later:            {(time.perf_counter() - t0) * 1000:10.1f} ms ({changed:,} lights changed)")
+
+
+# ==================== TRAFFIC SIMULATION ====================
+
+def bench_traffic_sim(columns: int = 100, ticks: int = 300, density: float = 0.2):
+    """Nagel-Schreckenberg ticks over a grid of about a million road cells, with and without a signal plan"""
+    from modules.transport.traffic_simulation import grid_roads
+    names = [f"Junction {i}" for i in range(columns * columns)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        controller = fresh_city()
+        ids = [f"TRAFFIC-{i}" for i in range(len(names) * 4)]
+        lights = controller.create_devices('transport', ids, [names[i // 4] for i in range(len(ids))])
+        controller.add_devices_to_subsystem('transport', dict(zip(ids, lights)))
+        controller.start_subsystem('transport')
+        t0 = time.perf_counter()
+        controller.simulate_traffic(1, grid_roads(names, columns), density=density, seed=1)
+        build = time.perf_counter() - t0
+    simulation = controller._haqiqiy_subsistema('transport').simulation
+    print_section(f"TRAFFIC SIMULATION ({simulation.cells:,} cells, {simulation.vehicles:,} vehicles)")
+    print(f"  build network:        {build * 1000:10.1f} ms")
+    print(f"  {'signals':<22}{'ms/tick':>10}{'x real time':>14}{'km/h':>8}")
+    for label in ('uncontrolled', 'optimized plan'):
+        with contextlib.redirect_stdout(io.StringIO()):
+            if label != 'uncontrolled':
+                controller.optimize_traffic()
+            summary = controller.simulate_traffic(ticks)
+        print(f"  {label:<22}{summary['wall_seconds'] / ticks * 1000:>10.2f}{summary['speedup']:>14.0f}"
+              f"{summary['mean_speed_kmh']:>8.1f}")
+
+
+# ==================== ADAPTIVE LIGHTING ====================
+
+def bench_adaptive(lights: int = 500_000, streets: int = 5_000, ticks: int = 20):
+    """Adaptive lighting tick over the whole city: steady state, sensor noise and a dusk transition"""
+    import gc
+    import random
+    controller = build_controller(0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ids = [f"LIGHTING-{i}" for i in range(lights)]
+        devices = controller.create_devices('lighting', ids, [f"Street {i % streets}" for i in range(lights)])
+        controller.add_devices_to_subsystem('lighting', dict(zip(ids, devices)))
+        controller.start_subsystem('lighting')
+        t0 = time.perf_counter()
+        engine = controller.start_adaptive_lighting()
+        build = time.perf_counter() - t0
+    names = [f"Street {i}" for i in range(streets)]
+    rng = random.Random(1)
+    dusk = {name: rng.uniform(0.0, 20.0) for name in names}
+    phases = (('dusk transition', lambda: dusk),
+              ('sensor noise (deadband)', lambda: {name: lux + rng.uniform(-0.3, 0.3) for name, lux in dusk.items()}),
+              ('steady night', lambda: None))
+    gc.freeze()
+    print_section(f"ADAPTIVE LIGHTING ({lights:,} lights, {streets:,} streets, "
+                  f"budget {engine.max_updates:,} writes/tick)")
+    print(f"  map lights to rows:   {build * 1000:10.1f} ms")
+    print(f"  {'phase':<26}{'ms/tick avg':>12}{'ms/tick max':>12}{'lights/tick':>13}")
+    now = 0.0
+    for label, readings in phases:
+        times, changed = [], 0
+        for _ in range(ticks):
+            controller.report_light_sensors(readings())
+            now += 1.0
+            t0 = time.perf_counter()
+            changed += controller.adaptive_lighting_tick(now)
+            times.append(time.perf_counter() - t0)
+        print(f"  {label:<26}{sum(times) / ticks * 1000:>12.2f}{max(times) * 1000:>12.2f}{changed // ticks:>13,}")
+    gc.unfreeze()
+
+
+BENCHMARKS = {
+    'import': bench_import,
+    'factories': bench_factories,
+    'memory': bench_memory,
+    'flyweight': bench_flyweight,
+    'sharding': bench_sharding,
+    'statusboard': bench_statusboard,
+    'telemetry': bench_telemetry,
+    'http': bench_http,
+    'admission': bench_admission,
+    'query': bench_query,
+    'camera_events': bench_camera_events,
+    'rules': bench_rules,
+    'forecast': bench_forecast,
+    'schedule': bench_schedule,
+    'liveness': bench_liveness,
+    'inventory': bench_inventory,
+    'reconfigure': bench_reconfigure,
+    'cities': bench_cities,
+    'tracing': bench_tracing,
+    'headless': bench_headless,
+    'loadtest': bench_loadtest,
+    'districts': bench_districts,
+    'signals': bench_signals,
+    'traffic_sim': bench_traffic_sim,
+    'adaptive': bench_adaptive,
+}
+
+
+def main(argv):
+    names = argv or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(unknown)}")
+        print(f"Available: {', '.join(BENCHMARKS)}")
+        return 2
+    for name in names:
+        BENCHMARKS[name]()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
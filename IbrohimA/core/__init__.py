@@ -1,34 +1,45 @@
 """
 SmartCity Asosiy Paket
 Dizayn naqshlari implementatsiyalari va tizim boshqaruvi
+
+Eksportlar kechiktirilgan holda yuklanadi: ``import core`` hech qaysi
+submodulni import qilmaydi, har bir nom birinchi murojaatda o'z modulidan
+olinadi va keyingi murojaatlar uchun paket lug'atida saqlanadi.
 """
 
-from core.singelton.singleton import Singleton
-from core.factories.factories import (
-    AqliQurilmaFabriki,
-    YoritishQurilmaFabriki,
-    XavfsizlikQurilmaFabriki,
-    TransportQurilmaFabriki,
-    EnergiyaQurilmaFabriki,
-    SmartDeviceFactory,
-    LightingDeviceFactory,
-    SecurityDeviceFactory,
-    TransportDeviceFactory,
-    EnergyDeviceFactory
-)
-from core.builders.builders import SmartCityBiluvchi, SmartCityBuilder, SmartCityKonfiguratsiya, SmartCityConfig
-from core.proxy.proxy import SubsistemProxy, SubsystemProxy, ISubsistemProxy, ISubsystemProxy
-from core.adapters.adapters import (
-    MonitoringDekorator,
-    SecurityDekorator,
-    LoggingDekorator,
-    SubsistemDekorator,
-    MonitoringDecorator,
-    SecurityDecorator,
-    LoggingDecorator,
-    SubsystemDecorator
-)
-from core.controller import SmartCityController
+from core._lazy import lazy_exports
+
+# Eksport nomi -> uni e'lon qiluvchi modul
+_EKSPORTLAR = {
+    'Singleton': 'core.singelton.singleton',
+    'AqliQurilmaFabriki': 'core.factories.factories',
+    'YoritishQurilmaFabriki': 'core.factories.factories',
+    'XavfsizlikQurilmaFabriki': 'core.factories.factories',
+    'TransportQurilmaFabriki': 'core.factories.factories',
+    'EnergiyaQurilmaFabriki': 'core.factories.factories',
+    'SmartDeviceFactory': 'core.factories.factories',
+    'LightingDeviceFactory': 'core.factories.factories',
+    'SecurityDeviceFactory': 'core.factories.factories',
+    'TransportDeviceFactory': 'core.factories.factories',
+    'EnergyDeviceFactory': 'core.factories.factories',
+    'SmartCityBiluvchi': 'core.builders.builders',
+    'SmartCityBuilder': 'core.builders.builders',
+    'SmartCityKonfiguratsiya': 'core.builders.builders',
+    'SmartCityConfig': 'core.builders.builders',
+    'SubsistemProxy': 'core.proxy.proxy',
+    'SubsystemProxy': 'core.proxy.proxy',
+    'ISubsistemProxy': 'core.proxy.proxy',
+    'ISubsystemProxy': 'core.proxy.proxy',
+    'MonitoringDekorator': 'core.adapters.adapters',
+    'SecurityDekorator': 'core.adapters.adapters',
+    'LoggingDekorator': 'core.adapters.adapters',
+    'SubsistemDekorator': 'core.adapters.adapters',
+    'MonitoringDecorator': 'core.adapters.adapters',
+    'SecurityDecorator': 'core.adapters.adapters',
+    'LoggingDecorator': 'core.adapters.adapters',
+    'SubsystemDecorator': 'core.adapters.adapters',
+    'SmartCityController': 'core.controller',
+}
 
 __all__ = [
     'Singleton',
@@ -56,3 +67,5 @@ __all__ = [
     'SubsistemDekorator',
     'SmartCityController'
 ]
+
+lazy_exports(globals(), _EKSPORTLAR)
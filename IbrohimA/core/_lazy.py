@@ -0,0 +1,32 @@
+"""
+Kechiktirilgan eksportlar
+Paket ``__init__`` lari uchun umumiy ``__getattr__``/``__dir__``: har bir nom
+birinchi murojaatda o'z modulidan olinadi va paket lug'atida saqlanadi.
+"""
+
+import importlib
+from typing import Dict
+
+
+def lazy_exports(namespace: dict, mapping: Dict[str, str]):
+    """
+    Paketga kechiktirilgan eksportlarni o'rnatish
+    namespace: paketning globals() lug'ati
+    mapping: eksport nomi -> uni e'lon qiluvchi modul
+    """
+    package = namespace['__name__']
+
+    def __getattr__(name: str):
+        """Eksport qilingan nomni birinchi murojaatda yuklash"""
+        module_path = mapping.get(name)
+        if module_path is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_path), name)
+        namespace[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(namespace) | set(mapping))
+
+    namespace['__getattr__'] = __getattr__
+    namespace['__dir__'] = __dir__
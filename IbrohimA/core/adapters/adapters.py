@@ -5,12 +5,14 @@ Foydalanish: Subsistemalar funksionalligini dinamik qo'shish
 
 from abc import ABC, abstractmethod
 
+from core.tracing.tracing import oraliq
+
 
 class ISubsistemDekorator(ABC):
     """Subsistema dekoratorlari uchun interfeys"""
     
     @abstractmethod
-    def get_status(self) -> dict:
+    def get_status(self, compact: bool = False, client_id: str = None) -> dict:
         pass
 
 
@@ -23,9 +25,12 @@ class SubsistemDekorator(ISubsistemDekorator):
     def __init__(self, subsystem):
         self._subsystem = subsystem
     
-    def get_status(self) -> dict:
-        """O'rab olingan subsistemadan statusni olish"""
-        return self._subsystem.get_status()
+    def get_status(self, compact: bool = False, client_id: str = None) -> dict:
+        """O'rab olingan subsistemadan statusni olish (client_id - proksi yuklama cheklovi uchun)"""
+        with oraliq('get_status', type(self).__name__):
+            if client_id is not None:
+                return self._subsystem.get_status(compact, client_id=client_id)
+            return self._subsystem.get_status(compact=True) if compact else self._subsystem.get_status()
 
 
 class MonitoringDekorator(SubsistemDekorator):
@@ -38,9 +43,9 @@ class MonitoringDekorator(SubsistemDekorator):
         self._monitoring_enabled = True
         self._event_count = 0
     
-    def get_status(self) -> dict:
+    def get_status(self, compact: bool = False, client_id: str = None) -> dict:
         """Statusga monitoring metrikalarini qo'shish"""
-        status = self._subsystem.get_status()
+        status = super().get_status(compact, client_id)
         status['monitoring_enabled'] = self._monitoring_enabled
         status['event_count'] = self._event_count
         return status
@@ -63,9 +68,9 @@ class SecurityDekorator(SubsistemDekorator):
         self._auth_level = auth_level
         self._is_locked = False
     
-    def get_status(self) -> dict:
+    def get_status(self, compact: bool = False, client_id: str = None) -> dict:
         """Statusga xavfsizlik ma'lumotlarini qo'shish"""
-        status = self._subsystem.get_status()
+        status = super().get_status(compact, client_id)
         status['security_auth_level'] = self._auth_level
         status['is_locked'] = self._is_locked
         return status
@@ -95,9 +100,9 @@ class LoggingDekorator(SubsistemDekorator):
         super().__init__(subsystem)
         self._logs = []
     
-    def get_status(self) -> dict:
+    def get_status(self, compact: bool = False, client_id: str = None) -> dict:
         """Statusga jurnallash ma'lumotlarini qo'shish"""
-        status = self._subsystem.get_status()
+        status = super().get_status(compact, client_id)
         status['log_count'] = len(self._logs)
         status['logs'] = self._logs[-5:] if self._logs else []  # Oxirgi 5 ta jurnal
         return status
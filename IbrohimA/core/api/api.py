@@ -0,0 +1,312 @@
+"""
+HTTP API - Kontroler statusi va qurilma buyruqlari uchun o'rnatilgan server
+Foydalanish: `input()` menyusisiz tizimni tarmoq orqali kuzatish va boshqarish
+
+Marshrutlar:
+    GET  /status[?compact=1]                    barcha subsistemalar
+    GET  /status/<subsistema>[?compact=1]       bitta subsistema
+    GET  /status/<subsistema>/<device_id>       bitta qurilma
+    POST /command/<subsistema>/<device_id>      {"command": "set_brightness", "args": [50]}
+
+Ko'p so'rov yuboruvchi mijozlar uchun javoblar keshlanadi: kodlangan JSON
+(va kerak bo'lsa gzip) kontrolerning holat versiyasi o'zgarmaguncha qayta
+ishlatiladi, status lug'ati qayta qurilmaydi. ETag shu versiyadan olinadi,
+shuning uchun If-None-Match bilan kelgan so'rovga tanasiz 304 qaytariladi.
+Ulanishlar HTTP/1.1 keep-alive rejimida ochiq qoladi. Proksi yuklama
+cheklovi so'rovni rad etsa, 429 va Retry-After sarlavhasi qaytariladi.
+
+Keshda ko'pi bilan MAX_CACHED_ROUTES marshrut saqlanadi (eng uzoq
+ishlatilmagani chiqariladi). Kontroler chaqiruvlari `controller.lock` ostida
+bajariladi - menyu yoki boshqa ip o'zgartirayotgan holat o'qilmaydi.
+"""
+
+import asyncio
+import gzip
+import json
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from core.proxy.proxy import YuklamaRadEtildi
+
+# Shundan katta javoblar (mijoz qabul qilsa) gzip bilan yuboriladi
+GZIP_MIN_BYTES = 1024
+
+# Keshdagi marshrutlar (route, compact) soni chegarasi
+MAX_CACHED_ROUTES = 1024
+
+_MAX_HEADER_BYTES = 16 * 1024
+_MAX_BODY_BYTES = 64 * 1024
+
+_REASONS = {
+    200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 413: 'Payload Too Large', 429: 'Too Many Requests',
+    500: 'Internal Server Error',
+}
+
+
+class _KeshYozuvi:
+    """Bitta marshrut uchun kodlangan javob (gzip varianti kerak bo'lganda tayyorlanadi)"""
+
+    __slots__ = ('version', 'etag', 'body', '_gzip_body')
+
+    def __init__(self, version: int, etag: str, body: bytes):
+        self.version = version
+        self.etag = etag
+        self.body = body
+        self._gzip_body = None
+
+    def gzip_body(self) -> bytes:
+        if self._gzip_body is None:
+            self._gzip_body = gzip.compress(self.body, compresslevel=5)
+        return self._gzip_body
+
+
+class _HttpXatosi(Exception):
+    def __init__(self, status: int, message: str, headers: Dict[str, str] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class HolatServeri:
+    """
+    Kontroler ustidagi asyncio HTTP serveri.
+    Barcha kontroler chaqiruvlari server event loop ida bajariladi;
+    `start_in_thread` rejimida bu loop alohida ipda ishlaydi.
+    """
+
+    def __init__(self, controller, host: str = '127.0.0.1', port: int = 8080):
+        self._controller = controller
+        self.host = host
+        self.port = port
+        self._server = None
+        self._cache: 'OrderedDict[tuple, _KeshYozuvi]' = OrderedDict()
+        self._stats = {'requests': 0, 'cache_hits': 0, 'not_modified': 0, 'connections': 0}
+        self._loop = None
+        self._thread = None
+
+    # ---------- ishga tushirish ----------
+
+    async def start(self):
+        """Joriy event loop da tinglashni boshlash (port=0 - bo'sh port tanlanadi)"""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                  limit=_MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def start_in_thread(self):
+        """Serverni alohida ipdagi o'z event loop ida ishga tushirish"""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.close())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name='status-http', daemon=True)
+        self._thread.start()
+        ready.wait()
+        print(f"[HTTP] Status API: http://{self.host}:{self.port}/status")
+        return self
+
+    def stop(self):
+        """`start_in_thread` bilan ishga tushirilgan serverni to'xtatish"""
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+            self._loop = None
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats, cached_routes=len(self._cache))
+
+    # ---------- HTTP ----------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._stats['connections'] += 1
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._write(writer, 400, b'{"error":"headers too large"}', {}, False)
+                    break
+                try:
+                    keep_alive = await self._handle_request(head, reader, writer)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def _handle_request(self, head: bytes, reader, writer) -> bool:
+        peer = writer.get_extra_info('peername')
+        client_id = peer[0] if peer else 'unknown'
+        self._stats['requests'] += 1
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ', 2)
+        except ValueError:
+            await self._write(writer, 400, b'{"error":"malformed request line"}', {}, False)
+            return False
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.0':
+            keep_alive = connection == 'keep-alive'
+        else:
+            keep_alive = connection != 'close'
+
+        body = b''
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            await self._write(writer, 400, b'{"error":"bad content-length"}', {}, False)
+            return False
+        if length > _MAX_BODY_BYTES:
+            await self._write(writer, 413, b'{"error":"body too large"}', {}, False)
+            return False
+        if length:
+            body = await reader.readexactly(length)
+
+        try:
+            with self._controller.lock:
+                status, payload, extra = self._dispatch(method, target, headers, body, client_id)
+        except _HttpXatosi as error:
+            status, payload, extra = error.status, _encode({'error': str(error)}), error.headers
+        except YuklamaRadEtildi as error:
+            status, payload = 429, _encode({'error': str(error), 'retry_after': error.retry_after})
+            extra = {'Retry-After': str(max(1, math.ceil(error.retry_after)))}
+        except Exception as error:
+            status, payload, extra = 500, _encode({'error': f"{type(error).__name__}: {error}"}), {}
+        await self._write(writer, status, payload, extra, keep_alive, method == 'HEAD')
+        return keep_alive
+
+    @staticmethod
+    async def _write(writer, status: int, body: bytes, extra: Dict[str, str], keep_alive: bool,
+                     head_only: bool = False):
+        lines = [f"HTTP/1.1 {status} {_REASONS[status]}",
+                 f"Content-Length: {len(body)}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if status != 304:
+            lines.append("Content-Type: application/json")
+        lines.extend(f"{name}: {value}" for name, value in extra.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (b'' if head_only else body))
+        await writer.drain()
+
+    # ---------- marshrutlash ----------
+
+    def _dispatch(self, method: str, target: str, headers: Dict[str, str], body: bytes, client_id: str):
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.split('/') if part]
+        query = parse_qs(url.query)
+        compact = query.get('compact', ['0'])[0] in ('1', 'true')
+
+        if parts and parts[0] == 'status' and len(parts) <= 3:
+            if method not in ('GET', 'HEAD'):
+                raise _HttpXatosi(405, f"{method} qo'llab-quvvatlanmaydi")
+            entry = self._cached(tuple(parts), compact, client_id)
+            return self._conditional(entry, headers)
+
+        if parts and parts[0] == 'command' and len(parts) == 3:
+            if method != 'POST':
+                raise _HttpXatosi(405, f"{method} qo'llab-quvvatlanmaydi")
+            return 200, self._command(parts[1], parts[2], body, client_id), {}
+
+        raise _HttpXatosi(404, f"Marshrut topilmadi: {url.path}")
+
+    def _cached(self, route: Tuple[str, ...], compact: bool, client_id: str = 'local') -> _KeshYozuvi:
+        """Versiya o'zgarmagan bo'lsa - keshdagi kodlangan javob, aks holda qayta qurish"""
+        controller = self._controller
+        subsystem = route[1] if len(route) > 1 else None
+        version = controller.state_version(subsystem)
+        key = (route, compact)
+        entry = self._cache.get(key)
+        if entry is not None and entry.version == version:
+            self._stats['cache_hits'] += 1
+            self._cache.move_to_end(key)
+            return entry
+
+        if subsystem is None:
+            status = controller.get_all_status(compact, client_id=client_id)
+        elif subsystem not in controller._subsystems:
+            raise _HttpXatosi(404, f"Noma'lum subsistema: {subsystem}")
+        elif len(route) == 2:
+            status = controller.get_subsystem_status(subsystem, compact, client_id=client_id)
+        else:
+            status = controller.get_device_status(subsystem, route[2], compact)
+            if status is None:
+                raise _HttpXatosi(404, f"Qurilma topilmadi: {route[2]}")
+
+        entry = _KeshYozuvi(version, f'W/"{version}-{"c" if compact else "f"}"', _encode(status))
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        if len(self._cache) > MAX_CACHED_ROUTES:
+            self._cache.popitem(last=False)
+        return entry
+
+    def _conditional(self, entry: _KeshYozuvi, headers: Dict[str, str]):
+        extra = {'ETag': entry.etag, 'Vary': 'Accept-Encoding', 'Cache-Control': 'no-cache'}
+        if_none_match = headers.get('if-none-match')
+        if if_none_match and entry.etag in (tag.strip() for tag in if_none_match.split(',')):
+            self._stats['not_modified'] += 1
+            return 304, b'', extra
+        if len(entry.body) >= GZIP_MIN_BYTES and 'gzip' in headers.get('accept-encoding', ''):
+            extra['Content-Encoding'] = 'gzip'
+            return 200, entry.gzip_body(), extra
+        return 200, entry.body, extra
+
+    def _command(self, subsystem: str, device_id: str, body: bytes, client_id: str) -> bytes:
+        try:
+            request = json.loads(body or b'{}')
+            command = request['command']
+            args = request.get('args', [])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            raise _HttpXatosi(400, 'Tana {"command": ..., "args": [...]} bo\'lishi kerak')
+        if not isinstance(command, str) or not isinstance(args, list) or command.startswith('_'):
+            raise _HttpXatosi(400, f"Noto'g'ri buyruq: {command!r}")
+        if subsystem not in self._controller._subsystems:
+            raise _HttpXatosi(404, f"Noma'lum subsistema: {subsystem}")
+        if self._controller.get_device_status(subsystem, device_id) is None:
+            raise _HttpXatosi(404, f"Qurilma topilmadi: {device_id}")
+        try:
+            result = self._controller.device_command(subsystem, device_id, command, *args,
+                                                     client_id=client_id)
+        except (AttributeError, TypeError, ValueError) as error:
+            raise _HttpXatosi(400, f"{type(error).__name__}: {error}")
+        return _encode({'result': result, 'version': self._controller.state_version(subsystem)})
+
+
+def _encode(payload) -> bytes:
+    return json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def serve_in_background(controller, host: str = '127.0.0.1', port: int = 8080) -> HolatServeri:
+    """Status API ni fon ipida ishga tushirish (to'xtatish: `server.stop()`)"""
+    return HolatServeri(controller, host, port).start_in_thread()
+
+
+# Eski kod uchun - English aliases
+StatusServer = HolatServeri
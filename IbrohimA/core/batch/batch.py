@@ -0,0 +1,237 @@
+"""
+Paketli Rejim - Buyruqlar skriptini kontrolerga partiyalab bajarish
+Foydalanish: python main.py --headless --script city.txt (yoki stdin)
+
+Har bir qator - bitta buyruq (bo'sh qatorlar va # izohlar o'tkaziladi):
+    add <subsistema> <device_id> <joy...>
+    remove <subsistema> <device_id>
+    set <subsistema> <device_id> <atribut> <qiymat>     qiymat JSON bo'lsa - o'qiladi
+    heartbeat <subsistema> <device_id>
+    command <subsistema> <device_id> <metod> [argumentlar JSON]
+    start <subsistema|all> / stop <subsistema|all>
+    status [subsistema [device_id]]
+    query <subsistema> <where JSON> [maydon,maydon]
+Ketma-ket keladigan bir xil (buyruq, subsistema) juftlari - add, remove, set,
+heartbeat - bitta ommaviy chaqiruvga yig'iladi (`batch_size` tagacha), shuning
+uchun bajarilish tartibi saqlanadi, chaqiruvlar soni esa partiyalar soniga teng.
+`set` atributi telemetriya METRIKALAR jadvali bo'yicha tekshiriladi (metrika
+nomi - brightness, on, kwh - yoki qurilma atributi - is_on, power_consumption):
+noma'lum atribut yoki chegaradan tashqari qiymat o'sha qatorning xatosi bo'ladi.
+Natijalar JSON qatorlar (JSONL): har bir partiya yoki buyruq uchun bitta qator,
+oxirida umumiy xulosa (amallar, xatolar, vaqt).
+"""
+
+import json
+import time
+from typing import Iterable, List, Optional, TextIO, Tuple
+
+from core.telemetry.telemetry import METRIKALAR
+
+SUBSISTEMALAR = ('lighting', 'security', 'transport', 'energy')
+# Partiyalarga yig'iladigan buyruqlar
+PARTIYALI_BUYRUQLAR = ('add', 'remove', 'set', 'heartbeat')
+BUYRUQLAR = PARTIYALI_BUYRUQLAR + ('command', 'start', 'stop', 'status', 'query')
+_JSON = json.JSONDecoder()
+# (subsistema, metrika yoki atribut nomi) -> (qurilma atributi, tekshiruvchi)
+_SET_ATRIBUTLARI = {}
+for (_subsistema, _metrika), (_atribut, _tekshiruv) in METRIKALAR.items():
+    _SET_ATRIBUTLARI[(_subsistema, _metrika)] = _SET_ATRIBUTLARI[(_subsistema, _atribut)] = (_atribut, _tekshiruv)
+
+
+class BuyruqXatosi(ValueError):
+    """Skript qatorini tahlil qilib bo'lmadi"""
+
+
+def _qiymat(text: str):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def buyruqni_tahlil(line: str) -> Optional[Tuple[str, str, tuple]]:
+    """Qatorni (buyruq, subsistema, argumentlar) ga ajratish; bo'sh/izoh qator - None"""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    op, _, rest = line.partition(' ')
+    op = op.lower()
+    if op not in BUYRUQLAR:
+        raise BuyruqXatosi(f"noma'lum buyruq: {op}")
+    if op == 'status':
+        parts = rest.split()
+        if len(parts) > 2:
+            raise BuyruqXatosi("status [subsistema [device_id]]")
+        subsystem = parts[0] if parts else 'all'
+        if subsystem not in SUBSISTEMALAR + ('all',):
+            raise BuyruqXatosi(f"noma'lum subsistema: {subsystem}")
+        return op, subsystem, tuple(parts[1:])
+    subsystem, _, rest = rest.strip().partition(' ')
+    if subsystem not in SUBSISTEMALAR and not (op in ('start', 'stop') and subsystem == 'all'):
+        raise BuyruqXatosi(f"noma'lum subsistema: {subsystem or '-'}")
+    rest = rest.strip()
+    if op in ('start', 'stop'):
+        return op, subsystem, ()
+    if op == 'query':
+        where, end = None, 0
+        if rest:
+            try:
+                where, end = _JSON.raw_decode(rest)
+            except ValueError:
+                raise BuyruqXatosi("query: where JSON bo'lishi kerak") from None
+        fields = [field.strip() for field in rest[end:].split(',') if field.strip()] or None
+        return op, subsystem, (where, fields)
+    device_id, _, rest = rest.partition(' ')
+    if not device_id:
+        raise BuyruqXatosi(f"{op}: device_id yo'q")
+    rest = rest.strip()
+    if op == 'add':
+        if not rest:
+            raise BuyruqXatosi(f"add: {device_id} uchun joy yo'q")
+        return op, subsystem, (device_id, rest)
+    if op == 'set':
+        attribute, _, value = rest.partition(' ')
+        if not attribute or not value:
+            raise BuyruqXatosi("set <subsistema> <device_id> <atribut> <qiymat>")
+        known = _SET_ATRIBUTLARI.get((subsystem, attribute))
+        if known is None:
+            raise BuyruqXatosi(f"set: {subsystem} uchun noma'lum atribut: {attribute}")
+        attribute, check = known
+        value = value.strip()
+        try:
+            return op, subsystem, (device_id, attribute, check(_qiymat(value)))
+        except ValueError:
+            raise BuyruqXatosi(f"set: {attribute} uchun noto'g'ri qiymat: {value}") from None
+    if op == 'command':
+        method, _, args = rest.partition(' ')
+        if not method:
+            raise BuyruqXatosi("command: metod yo'q")
+        args = _qiymat(args.strip()) if args.strip() else []
+        return op, subsystem, (device_id, method, tuple(args) if isinstance(args, list) else (args,))
+    return op, subsystem, (device_id,)
+
+
+class PaketliBajaruvchi:
+    """Tahlil qilingan buyruqlarni partiyalab kontrolerga yuborish va JSONL natija yozish"""
+
+    def __init__(self, controller, output: TextIO, batch_size: int = 10_000, include_results: bool = True):
+        if batch_size < 1:
+            raise ValueError("batch_size kamida 1 bo'lishi kerak")
+        self.controller = controller
+        self.output = output
+        self.batch_size = batch_size
+        self.include_results = include_results
+        self.operations = 0
+        self.errors = 0
+        self.batches = 0
+
+    def _yozish(self, record: dict):
+        self.output.write(json.dumps(record, separators=(',', ':'), default=str) + '\n')
+
+    def run(self, lines: Iterable[str]) -> dict:
+        """Skript qatorlarini bajarish; xulosa lug'ati qaytariladi (u ham oxirgi qator bo'lib yoziladi)"""
+        started = time.perf_counter()
+        pending: List[tuple] = []
+        key = None
+        first_line = 0
+        for line_number, line in enumerate(lines, 1):
+            try:
+                parsed = buyruqni_tahlil(line)
+            except BuyruqXatosi as error:
+                # Natijalar skript tartibida qolishi uchun kutilayotgan partiya avval bajariladi
+                if pending:
+                    self._partiya(key, pending, first_line)
+                    pending = []
+                self.errors += 1
+                self._yozish({'line': line_number, 'ok': False, 'error': str(error)})
+                continue
+            if parsed is None:
+                continue
+            op, subsystem, args = parsed
+            if pending and ((op, subsystem) != key or len(pending) >= self.batch_size):
+                self._partiya(key, pending, first_line)
+                pending = []
+            if op in PARTIYALI_BUYRUQLAR:
+                if not pending:
+                    key, first_line = (op, subsystem), line_number
+                pending.append(args)
+            else:
+                self._bittasi(op, subsystem, args, line_number)
+        if pending:
+            self._partiya(key, pending, first_line)
+        seconds = time.perf_counter() - started
+        summary = {'operations': self.operations, 'batches': self.batches, 'errors': self.errors,
+                   'seconds': round(seconds, 6),
+                   'operations_per_second': round(self.operations / seconds) if seconds else 0}
+        self._yozish({'summary': summary})
+        return summary
+
+    def _partiya(self, key: Tuple[str, str], items: List[tuple], first_line: int):
+        op, subsystem = key
+        controller = self.controller
+        started = time.perf_counter()
+        record = {'line': first_line, 'op': op, 'subsystem': subsystem, 'count': len(items)}
+        try:
+            if op == 'add':
+                chunk = dict(items)
+                devices = controller.create_devices(subsystem, chunk.keys(), chunk.values())
+                controller.add_devices_to_subsystem(subsystem, dict(zip(chunk, devices)))
+                record['applied'] = len(chunk)
+            elif op == 'remove':
+                record['applied'] = controller.remove_devices_from_subsystem(
+                    subsystem, [device_id for device_id, in items])
+            elif op == 'set':
+                record['applied'] = controller.apply_telemetry(subsystem, items)
+            else:
+                record['revived'] = controller.heartbeat(subsystem, *(device_id for device_id, in items))
+            record['ok'] = True
+        except Exception as error:
+            self.errors += 1
+            record.update(ok=False, error=f"{type(error).__name__}: {error}")
+        self.operations += len(items)
+        self.batches += 1
+        record['ms'] = round((time.perf_counter() - started) * 1000, 3)
+        self._yozish(record)
+
+    def _bittasi(self, op: str, subsystem: str, args: tuple, line_number: int):
+        controller = self.controller
+        started = time.perf_counter()
+        record = {'line': line_number, 'op': op, 'subsystem': subsystem}
+        try:
+            names = SUBSISTEMALAR if subsystem == 'all' else (subsystem,)
+            if op == 'start':
+                for name in names:
+                    controller.start_subsystem(name)
+                result = None
+            elif op == 'stop':
+                for name in names:
+                    controller.stop_subsystem(name)
+                result = None
+            elif op == 'command':
+                device_id, method, method_args = args
+                result = controller.device_command(subsystem, device_id, method, *method_args)
+            elif op == 'query':
+                result = controller.query(subsystem, *args)
+                record['count'] = len(result)
+            elif args:
+                result = controller.get_device_status(subsystem, args[0])
+            elif subsystem == 'all':
+                result = controller.get_all_status()
+            else:
+                result = controller.get_subsystem_status(subsystem)
+            if self.include_results and result is not None:
+                record['result'] = result
+            record['ok'] = True
+        except Exception as error:
+            self.errors += 1
+            record.update(ok=False, error=f"{type(error).__name__}: {error}")
+        self.operations += 1
+        self.batches += 1
+        record['ms'] = round((time.perf_counter() - started) * 1000, 3)
+        self._yozish(record)
+
+
+# Eski kod uchun - English aliases
+CommandError = BuyruqXatosi
+BatchRunner = PaketliBajaruvchi
+parse_command = buyruqni_tahlil
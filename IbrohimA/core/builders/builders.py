@@ -18,6 +18,7 @@ class SmartCityKonfiguratsiya:
     avtomatik_ishga_tushirish: bool = False
     jurnallash_yoqilgan: bool = True
     qurilma_konfigurasiyalari: Dict[str, dict] = field(default_factory=dict)
+    inventar: Optional[dict] = None
     
     # English property aliases for backward compatibility
     @property
@@ -56,6 +57,10 @@ class SmartCityKonfiguratsiya:
     @property
     def device_configs(self) -> Dict[str, dict]:
         return self.qurilma_konfigurasiyalari
+    
+    @property
+    def inventory(self) -> Optional[dict]:
+        return self.inventar
 
 
 class SmartCityBiluvchi:
@@ -99,6 +104,45 @@ class SmartCityBiluvchi:
         self.config.qurilma_konfigurasiyalari['energy'] = {'zones': zones}
         return self
     
+    def with_devices(self, subsystem: str, devices: Dict[str, str]) -> 'SmartCityBiluvchi':
+        """
+        Subsistema qurilmalarini aniq {device_id: joy} lug'ati bilan berish
+        (soni va joylar ro'yxati o'rniga; apply_config aynan shu id larni yuritadi)
+        """
+        from core.builders.config_diff import HOSILA_TAVSIFLARI
+        if subsystem not in HOSILA_TAVSIFLARI:
+            raise ValueError(f"Noma'lum subsistema: {subsystem}")
+        setattr(self.config, HOSILA_TAVSIFLARI[subsystem][1], len(devices))
+        self.config.qurilma_konfigurasiyalari[subsystem] = {'devices': dict(devices)}
+        return self
+
+    @classmethod
+    def from_inventory(cls, path: str, shahar_nomi: str = "AqliShahar", chunk_size: int = 10_000,
+                       format: str = None) -> 'SmartCityBiluvchi':
+        """
+        CSV/JSONL inventar fayliga asoslangan konfiguratsiya.
+        Fayl shu yerda o'qilmaydi: provision(controller) uni oqim bilan o'qib,
+        qurilmalarni bo'laklab qo'shadi va qurilmalar sonini to'ldiradi.
+        """
+        builder = cls(shahar_nomi)
+        builder.config.inventar = {'path': path, 'chunk_size': chunk_size, 'format': format}
+        return builder
+    
+    def provision(self, controller):
+        """Inventardagi qurilmalarni kontrolerga yuklash; InventarHisoboti qaytaradi"""
+        from core.builders.inventory import inventarni_yuklash
+        inventar = self.config.inventar
+        if inventar is None:
+            raise ValueError("Konfiguratsiya inventar faylidan yaratilmagan (from_inventory)")
+        report = inventarni_yuklash(inventar['path'], controller, inventar['chunk_size'], inventar['format'])
+        config = self.config
+        config.yoritish_qurilmalari += report.loaded['lighting']
+        config.xavfsizlik_kameralari += report.loaded['security']
+        config.harakat_chiroqlari += report.loaded['transport']
+        config.energiya_monitorlari += report.loaded['energy']
+        print(f"[BUILDER] Inventar yuklandi: {report}")
+        return report
+    
     def set_auto_start(self, auto_start: bool = True) -> 'SmartCityBiluvchi':
         """Initsializatsiyada avtomatik ishga tushirish yoq/yoq"""
         self.config.avtomatik_ishga_tushirish = auto_start
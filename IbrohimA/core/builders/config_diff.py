@@ -0,0 +1,144 @@
+"""
+Konfiguratsiya Farqi - ishlayotgan va kerakli qurilmalar to'plami orasidagi farq
+Foydalanish: controller.apply_config(new_config) faqat o'zgargan qurilmalarga tegadi
+
+Subsistema qurilmalari ikki ko'rinishda tavsiflanadi:
+    hosila     soni + joylar ro'yxati; id lar PREFIKS-001, PREFIKS-002, ...
+               (add_lighting_system(5, [...]) kabi builder chaqiruvlari)
+    aniq       {device_id: joy} lug'ati (with_devices yoki ishlayotgan qurilmalar)
+Ikki hosila tavsif solishtirilganda id lar faqat o'zgargan indekslar uchun
+yasaladi, joylar ro'yxati esa C darajasida kesim bo'yicha solishtiriladi;
+aniq tavsiflar lug'at ko'rinishlari (items) ayirmasi bilan solishtiriladi.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+# Subsistema -> (id prefiksi, soni maydoni, joylar kaliti)
+HOSILA_TAVSIFLARI = {
+    'lighting': ('LIGHT', 'yoritish_qurilmalari', 'locations'),
+    'security': ('CAM', 'xavfsizlik_kameralari', 'locations'),
+    'transport': ('TRAFFIC', 'harakat_chiroqlari', 'intersections'),
+    'energy': ('ENERGY', 'energiya_monitorlari', 'zones'),
+}
+
+# Qurilmaning joyi yoziladigan atribut (status lug'atidagi kalit ham shu)
+JOY_ATRIBUTLARI = {
+    'lighting': 'location',
+    'security': 'location',
+    'transport': 'intersection',
+    'energy': 'zone',
+}
+# avtomatik_ishga_tushirish: qurilmaning start() dagi holati, apply_readings orqali qo'llanadi
+ISHGA_TUSHIRISH_BAYROQLARI = {
+    'lighting': (('is_on', True), ('brightness', 100)),
+    'security': (('is_recording', True),),
+    'transport': (('is_operational', True), ('current_signal', 'red')),
+    'energy': (('is_monitoring', True),),
+}
+
+
+def hosila_id(prefix: str, index: int) -> str:
+    """0 dan boshlanadigan indeks uchun qurilma id si (PREFIKS-001 ko'rinishida)"""
+    return f"{prefix}-{index + 1:03d}"
+
+
+class QurilmalarTavsifi:
+    """Bitta subsistemaning kerakli qurilmalari: hosila (soni, joylar) yoki aniq lug'at"""
+
+    __slots__ = ('prefix', 'count', 'locations', 'devices')
+
+    def __init__(self, prefix: str = '', count: int = 0, locations: List[str] = None,
+                 devices: Dict[str, str] = None):
+        self.prefix = prefix
+        self.count = count
+        self.locations = locations or []
+        self.devices = devices
+
+    @classmethod
+    def konfiguratsiyadan(cls, config, subsystem: str) -> 'QurilmalarTavsifi':
+        prefix, count_field, locations_key = HOSILA_TAVSIFLARI[subsystem]
+        entry = config.qurilma_konfigurasiyalari.get(subsystem, {})
+        if entry.get('devices') is not None:
+            return cls(devices=dict(entry['devices']))
+        count = getattr(config, count_field)
+        # Ro'yxat nusxalanadi - builder keyinroq o'zgartirsa ham tavsif o'zgarmaydi
+        return cls(prefix, count, list(entry.get(locations_key) or []))
+
+    def location(self, index: int) -> str:
+        if not self.locations:
+            return f"Hudud-{index + 1}"
+        return self.locations[index % len(self.locations)]
+
+    def as_dict(self) -> Dict[str, str]:
+        """Aniq ko'rinish (hosila tavsif uchun id lar yasaladi)"""
+        if self.devices is not None:
+            return self.devices
+        return {hosila_id(self.prefix, index): self.location(index) for index in range(self.count)}
+
+    def __len__(self) -> int:
+        return len(self.devices) if self.devices is not None else self.count
+
+
+class Farq:
+    """Qo'shiladigan, olib tashlanadigan va ko'chiriladigan qurilmalar"""
+
+    __slots__ = ('added', 'removed', 'relocated')
+
+    def __init__(self):
+        self.added: List[Tuple[str, str]] = []
+        self.removed: List[str] = []
+        self.relocated: List[Tuple[str, str]] = []
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.relocated)
+
+
+def _hosila_farqi(old: QurilmalarTavsifi, new: QurilmalarTavsifi) -> Farq:
+    diff = Farq()
+    common = min(old.count, new.count)
+    prefix = new.prefix
+    if len(old.locations) >= common and len(new.locations) >= common and old.locations and new.locations:
+        # Tez yo'l: teng kesimlar C darajasida solishtiriladi, faqat farqli bloklar ko'riladi
+        step = 4096
+        for start in range(0, common, step):
+            stop = min(start + step, common)
+            if old.locations[start:stop] != new.locations[start:stop]:
+                for index in range(start, stop):
+                    if old.locations[index] != new.locations[index]:
+                        diff.relocated.append((hosila_id(prefix, index), new.locations[index]))
+    else:
+        for index in range(common):
+            location = new.location(index)
+            if old.location(index) != location:
+                diff.relocated.append((hosila_id(prefix, index), location))
+    diff.added = [(hosila_id(prefix, index), new.location(index)) for index in range(common, new.count)]
+    diff.removed = [hosila_id(old.prefix, index) for index in range(common, old.count)]
+    return diff
+
+
+def farqni_hisoblash(old: Optional[QurilmalarTavsifi], new: QurilmalarTavsifi) -> Farq:
+    """Eski tavsifdan yangisiga o'tish uchun minimal o'zgarishlar"""
+    if old is None:
+        old = QurilmalarTavsifi()
+    if old.devices is None and new.devices is None and old.prefix in ('', new.prefix):
+        if not old.prefix:
+            old.prefix = new.prefix
+        return _hosila_farqi(old, new)
+    old_devices, new_devices = old.as_dict(), new.as_dict()
+    diff = Farq()
+    # Lug'at ko'rinishlari ayirmasi - o'zgarmagan qurilmalar Python tsiklidan o'tmaydi
+    for device_id, location in new_devices.items() - old_devices.items():
+        if device_id in old_devices:
+            diff.relocated.append((device_id, location))
+        else:
+            diff.added.append((device_id, location))
+    diff.removed = list(old_devices.keys() - new_devices.keys())
+    return diff
+
+
+# Eski kod uchun - English aliases
+LOCATION_ATTRIBUTES = JOY_ATRIBUTLARI
+START_FLAGS = ISHGA_TUSHIRISH_BAYROQLARI
+DeviceSpec = QurilmalarTavsifi
+ConfigDiff = Farq
+compute_diff = farqni_hisoblash
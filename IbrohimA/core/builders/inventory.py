@@ -0,0 +1,175 @@
+"""
+Inventar Yuklovchi - CSV/JSONL qurilmalar ro'yxatini oqim sifatida o'qish
+Foydalanish: million qurilmali inventarni xotiraga to'liq yuklamasdan
+tekshirish, takrorlarni tashlash va kontrolerga bo'laklab qo'shish
+
+Generatorlar zanjiri (har bosqich bittadan qator o'tkazadi):
+    o'qish      fayl qatorma-qator: CSV (sarlavhali) yoki JSONL
+    tekshirish  subsistema ma'lum, device_id va joylashuv bo'sh emas
+    takrorlash  device_id subsistemada yoki kutilayotgan bo'lakda bor - tashlanadi
+    bo'laklash  subsistema bo'yicha `chunk_size` tadan yig'iladi
+Qo'shimcha xotira bo'laklar hajmi bilan chegaralangan: takrorlar kontrolerdagi
+qurilmalar lug'atidan tekshiriladi (alohida to'plam faqat quruq tekshiruvda).
+
+Qator maydonlari:
+    subsystem  lighting / security / transport / energy
+    device_id  noyob identifikator
+    location   joy (zone yoki intersection nomi bilan ham berilishi mumkin)
+"""
+
+import csv
+import json
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+SUBSISTEMALAR = ('lighting', 'security', 'transport', 'energy')
+_JOY_MAYDONLARI = ('location', 'zone', 'intersection')
+# Hisobotda saqlanadigan xato namunalari soni
+MAX_XATO_NAMUNALARI = 20
+
+
+class InventarHisoboti:
+    """Yuklash natijasi: qatorlar, qo'shilgan qurilmalar, takrorlar, xatolar, tezlik"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        self.loaded: Dict[str, int] = {name: 0 for name in SUBSISTEMALAR}
+        self.duplicates = 0
+        self.invalid = 0
+        self.chunks = 0
+        self.errors: List[str] = []
+        self.seconds = 0.0
+
+    @property
+    def total_loaded(self) -> int:
+        return sum(self.loaded.values())
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def xato(self, line: int, message: str):
+        self.invalid += 1
+        if len(self.errors) < MAX_XATO_NAMUNALARI:
+            self.errors.append(f"{line}-qator: {message}")
+
+    def as_dict(self) -> dict:
+        return {'path': self.path, 'rows': self.rows, 'loaded': dict(self.loaded),
+                'duplicates': self.duplicates, 'invalid': self.invalid, 'chunks': self.chunks,
+                'errors': list(self.errors), 'seconds': self.seconds,
+                'rows_per_second': self.rows_per_second}
+
+    def __str__(self):
+        return (f"{self.rows:,} qator: {self.total_loaded:,} qurilma, {self.duplicates:,} takroriy, "
+                f"{self.invalid:,} xato - {self.rows_per_second:,.0f} qator/s")
+
+
+def _format(path: str, format: Optional[str]) -> str:
+    if format is None:
+        format = os.path.splitext(path)[1].lstrip('.').lower()
+        format = {'ndjson': 'jsonl', 'json': 'jsonl'}.get(format, format)
+    if format not in ('csv', 'jsonl'):
+        raise ValueError(f"Noma'lum inventar formati: {format} (csv, jsonl)")
+    return format
+
+
+def inventarni_oqish(path: str, format: str = None,
+                     report: InventarHisoboti = None) -> Iterator[Tuple[dict, int]]:
+    """Fayl qatorlarini (lug'at, qator raqami) sifatida bittadan berish"""
+    format = _format(path, format)
+    with open(path, newline='' if format == 'csv' else None, encoding='utf-8') as stream:
+        if format == 'csv':
+            reader = csv.DictReader(stream)
+            for row in reader:
+                yield row, reader.line_num
+            return
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            if not isinstance(row, dict):
+                if report is not None:
+                    report.rows += 1
+                    report.xato(line_number, "JSON ob'ekt emas")
+                continue
+            yield row, line_number
+
+
+def _tekshirish(rows: Iterable[Tuple[dict, int]],
+                report: InventarHisoboti) -> Iterator[Tuple[str, str, str]]:
+    """To'g'ri qatorlarni (subsistema, device_id, joy) ko'rinishida o'tkazish"""
+    for row, line in rows:
+        report.rows += 1
+        subsystem = str(row.get('subsystem') or '').strip().lower()
+        device_id = str(row.get('device_id') or '').strip()
+        location = next((str(row[name]).strip() for name in _JOY_MAYDONLARI if row.get(name)), '')
+        if subsystem not in SUBSISTEMALAR:
+            report.xato(line, f"noma'lum subsistema {subsystem!r}")
+        elif not device_id:
+            report.xato(line, "device_id yo'q")
+        elif not location:
+            report.xato(line, f"{device_id}: joylashuv yo'q")
+        else:
+            yield subsystem, device_id, location
+
+
+def _bolaklash(rows: Iterable[Tuple[str, str, str]], report: InventarHisoboti, chunk_size: int,
+               existing: Dict[str, object]) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """
+    Takrorlarni tashlab, subsistema bo'yicha bo'laklar (subsistema, {device_id: joy}).
+    existing: subsistema -> allaqachon qo'shilgan id lar to'plami yoki lug'ati
+    """
+    pending: Dict[str, Dict[str, str]] = {name: {} for name in SUBSISTEMALAR}
+    for subsystem, device_id, location in rows:
+        chunk = pending[subsystem]
+        if device_id in chunk or device_id in existing[subsystem]:
+            report.duplicates += 1
+            continue
+        chunk[device_id] = location
+        if len(chunk) >= chunk_size:
+            pending[subsystem] = {}
+            yield subsystem, chunk
+    for subsystem, chunk in pending.items():
+        if chunk:
+            yield subsystem, chunk
+
+
+def inventarni_yuklash(path: str, controller=None, chunk_size: int = 10_000,
+                       format: str = None) -> InventarHisoboti:
+    """
+    Inventarni oqim bilan o'qib, kontrolerga bo'laklab qo'shish.
+    controller berilmasa - faqat tekshiruv (takrorlar uchun id to'plami yuritiladi).
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size kamida 1 bo'lishi kerak")
+    report = InventarHisoboti(path)
+    existing: Dict[str, object] = {}
+    for name in SUBSISTEMALAR:
+        devices = None
+        if controller is not None:
+            devices = getattr(controller._haqiqiy_subsistema(name), 'devices', None)
+        # Shardlangan rejimda qurilmalar boshqa jarayonda - qo'shilganlar to'plamda yuritiladi
+        existing[name] = devices if isinstance(devices, dict) else set()
+    started = time.perf_counter()
+    rows = _tekshirish(inventarni_oqish(path, format, report), report)
+    for subsystem, chunk in _bolaklash(rows, report, chunk_size, existing):
+        if controller is not None:
+            devices = controller.create_devices(subsystem, chunk.keys(), chunk.values())
+            controller.add_devices_to_subsystem(subsystem, dict(zip(chunk, devices)))
+        if isinstance(existing[subsystem], set):
+            existing[subsystem].update(chunk)
+        report.loaded[subsystem] += len(chunk)
+        report.chunks += 1
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+# Eski kod uchun - English aliases
+InventoryReport = InventarHisoboti
+read_inventory = inventarni_oqish
+load_inventory = inventarni_yuklash
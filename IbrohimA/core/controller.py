@@ -3,7 +3,9 @@ Asosiy Kontroler - Singleton va Facade naqshlarini birlashtiradi
 """
 
 from core.singelton.singleton import Singleton
-from core.proxy.proxy import SubsistemProxy, SubsystemProxy
+from core.flyweight.flyweight import FLYWEIGHT_MAYDONLAR, attribute_registry
+from core.tracing.tracing import oraliq
+from core.proxy.proxy import SubsistemProxy, SubsystemProxy, ParallellikChegarasi
 from core.adapters.adapters import MonitoringDekorator, SecurityDekorator, LoggingDekorator
 from core.adapters.adapters import MonitoringDecorator, SecurityDecorator, LoggingDecorator
 from core.factories.factories import (
@@ -13,10 +15,29 @@ from core.factories.factories import (
     EnergiyaQurilmaFabriki as EnergyDeviceFactory
 )
 from modules.lighting.lighting_system import LightingSystem
-from modules.security import SecuritySystem
-from modules.transport import TransportSystem
-from modules.energy import EnergySystem
+from modules.security.security_system import SecuritySystem
+from modules.transport.transport_system import TransportSystem
+from modules.energy.energy_system import EnergySystem
 from typing import Dict, Any
+import threading
+import time
+
+# Asosiy (singleton) shahar nomi - SmartCityController() shu shaharni qaytaradi
+ASOSIY_SHAHAR = "default"
+
+# Fabrikalar faqat o'qiladi (prototip bir marta yaratiladi) - barcha shaharlar uchun umumiy
+_umumiy_fabrikalar: Dict[str, Any] = {}
+
+
+def _fabrikalar() -> Dict[str, Any]:
+    if not _umumiy_fabrikalar:
+        _umumiy_fabrikalar.update({
+            'lighting': LightingDeviceFactory(),
+            'security': SecurityDeviceFactory(),
+            'transport': TransportDeviceFactory(),
+            'energy': EnergyDeviceFactory()
+        })
+    return _umumiy_fabrikalar
 
 
 class SmartCityController(Singleton):
@@ -28,18 +49,59 @@ class SmartCityController(Singleton):
     - Facade: Barcha subsistemalar uchun yagona interfeys taqdim etadi
     - Proxy: Subsistemalar kirish huquqini boshqaradi
     - Decorator: Monitoring/xavfsizlik/jurnallash qo'shimchasini qo'shadi
+
+    SmartCityController() - asosiy shahar (singleton). Bir jarayonda bir nechta
+    shahar uchun core.registry.registry.CityRegistry dan foydalaning: har bir
+    shahar o'z subsistemalariga ega, fabrikalar esa umumiy.
+
+    Kontroler metodlari o'zi qulf olmaydi: bir nechta ipdan (menyu va HTTP
+    server kabi) chaqiruvchilar har bir chaqiruvni `lock` ostida bajaradi.
     """
     
     def __init__(self):
         super().__init__()
         if not hasattr(self, '_initialized'):
+            self.shahar_nomi = ASOSIY_SHAHAR
             self._initialized = False
             self._subsystems: Dict[str, Any] = {}
             self._factories = {}
             self._is_running = False
+            self._shard_pool = None
+            self._status_board = None
+            self._state_version = 0
+            self._subsystem_versions: Dict[str, int] = {}
+            self._versions_base = 0
+            self._jonlilik = None
+            self._joriy_konfiguratsiya = None
+            self._ierarxiya = None
+            self._qulf = threading.RLock()
     
-    def initialize(self):
-        """SmartCity Kontrolerini initsializatsiya qilish"""
+    @classmethod
+    def new_city(cls, city_name: str) -> 'SmartCityController':
+        """
+        Singleton dan tashqari, alohida shahar kontroleri (initsializatsiya qilinmagan).
+        Odatda to'g'ridan-to'g'ri emas, CityRegistry orqali chaqiriladi.
+        """
+        controller = object.__new__(cls)
+        controller.__init__()
+        controller.shahar_nomi = city_name
+        return controller
+
+    @property
+    def city_name(self) -> str:
+        return self.shahar_nomi
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Kontroler holatini ipdan-ipga o'zgartirish/o'qish uchun umumiy qulf"""
+        return self._qulf
+
+    def initialize(self, shards: int = 0):
+        """
+        SmartCity Kontrolerini initsializatsiya qilish
+        shards > 1 bo'lsa, har bir subsistema qurilmalari `device_id` xeshi bo'yicha
+        shuncha ishchi jarayonga taqsimlanadi (shardlangan rejim)
+        """
         if self._initialized:
             print("[KONTROLER] Allaqachon initsializatsiya qilingan")
             return
@@ -49,10 +111,19 @@ class SmartCityController(Singleton):
         print("="*60)
         
         # Subsistemalarni initsializatsiya qilish
-        lighting_system = LightingSystem()
-        security_system = SecuritySystem()
-        transport_system = TransportSystem()
-        energy_system = EnergySystem()
+        if shards > 1:
+            from core.sharding.sharding import ShardPool, ShardedSubsystem
+            self._shard_pool = ShardPool(shards)
+            lighting_system = ShardedSubsystem('lighting', self._shard_pool)
+            security_system = ShardedSubsystem('security', self._shard_pool)
+            transport_system = ShardedSubsystem('transport', self._shard_pool)
+            energy_system = ShardedSubsystem('energy', self._shard_pool)
+            print(f"[KONTROLER] Shardlangan rejim: {shards} ta ishchi jarayon")
+        else:
+            lighting_system = LightingSystem()
+            security_system = SecuritySystem()
+            transport_system = TransportSystem()
+            energy_system = EnergySystem()
         
         # Subsistemalarni Proxy bilan o'ra berish kirish nazorati uchun
         self._subsystems = {
@@ -74,13 +145,8 @@ class SmartCityController(Singleton):
             self._subsystems['energy']
         )
         
-        # Fabrikalarni initsializatsiya qilish
-        self._factories = {
-            'lighting': LightingDeviceFactory(),
-            'security': SecurityDeviceFactory(),
-            'transport': TransportDeviceFactory(),
-            'energy': EnergyDeviceFactory()
-        }
+        # Fabrikalar (barcha shaharlar uchun umumiy)
+        self._factories = _fabrikalar()
         
         # Barcha subsistemalarni initsializatsiya qilish
         for subsystem_name, subsystem in self._subsystems.items():
@@ -89,6 +155,10 @@ class SmartCityController(Singleton):
         
         self._initialized = True
         self._is_running = True
+        self._jonlilik = None
+        self._joriy_konfiguratsiya = None
+        self._ierarxiya = None
+        self._ozgarishni_qayd_etish()
         print("[KONTROLER] ✓ SmartCity Kontroleri muvaffaqiyatli initsializatsiya qilindi\n")
     
     def create_device(self, subsystem_type: str, device_id: str, location: str):
@@ -104,46 +174,661 @@ class SmartCityController(Singleton):
         device = factory.create_device(device_id, location)
         print(f"[KONTROLER] Qurilma yaratildi: {device_id} - {factory.get_factory_name()}")
         return device
-    
-    def add_device_to_subsystem(self, subsystem_name: str, device_id: str, device):
-        """Subsistemaga qurilma qo'shish"""
+
+    def create_devices(self, subsystem_type: str, device_ids, locations) -> list:
+        """
+        Ko'p qurilmani bir chaqiruvda yaratish (prototipdan nusxalash)
+        Ommaviy ta'minlash uchun - har bir qurilma uchun xabar chiqarilmaydi
+        """
+        if subsystem_type not in self._factories:
+            print(f"[KONTROLER] XATO: Noma'lum subsistema turi: {subsystem_type}")
+            return []
+
+        factory = self._factories[subsystem_type]
+        devices = factory.create_many(device_ids, locations)
+        print(f"[KONTROLER] {len(devices)} ta qurilma yaratildi - {factory.get_factory_name()}")
+        return devices
+
+    def _haqiqiy_subsistema(self, subsystem_name: str):
+        """Haqiqiy subsistemani olish (dekorator va proksilardan chiqarish)"""
         if subsystem_name not in self._subsystems:
             print(f"[KONTROLER] XATO: Noma'lum subsistema: {subsystem_name}")
-            return False
+            return None
         
-        # Haqiqiy subsistemani olish (dekoratorlardan chiqarish)
         subsystem = self._subsystems[subsystem_name]
         while hasattr(subsystem, '_subsystem'):
             subsystem = subsystem._subsystem
         while hasattr(subsystem, '_real_subsystem'):
             subsystem = subsystem._real_subsystem
+        return subsystem
+    
+    def add_device_to_subsystem(self, subsystem_name: str, device_id: str, device):
+        """Subsistemaga qurilma qo'shish"""
+        subsystem = self._haqiqiy_subsistema(subsystem_name)
+        if subsystem is None:
+            return False
         
         if hasattr(subsystem, 'add_device'):
             subsystem.add_device(device_id, device)
+            self._yurak_urishi(subsystem_name, [device_id])
+            self._ozgarishni_qayd_etish(subsystem_name)
+            self._taxtaga_elon(subsystem_name, [device_id])
             return True
         return False
     
-    def get_subsystem_status(self, subsystem_name: str) -> Dict[str, Any]:
-        """Muayyan subsistemaning statusini olish"""
+    def add_devices_to_subsystem(self, subsystem_name: str, devices: Dict[str, Any]) -> bool:
+        """Subsistemaga ko'p qurilmani bitta partiyada qo'shish"""
+        subsystem = self._haqiqiy_subsistema(subsystem_name)
+        if subsystem is None:
+            return False
+        
+        if hasattr(subsystem, 'add_devices'):
+            subsystem.add_devices(devices)
+            self._yurak_urishi(subsystem_name, devices)
+            self._ozgarishni_qayd_etish(subsystem_name)
+            self._taxtaga_elon(subsystem_name, list(devices))
+            return True
+        return False
+    
+    def remove_devices_from_subsystem(self, subsystem_name: str, device_ids) -> int:
+        """Subsistemadan ko'p qurilmani bitta partiyada olib tashlash; olib tashlanganlar soni"""
+        subsystem = self._haqiqiy_subsistema(subsystem_name)
+        if subsystem is None or not hasattr(subsystem, 'remove_devices'):
+            return 0
+        device_ids = list(device_ids)
+        removed = subsystem.remove_devices(device_ids)
+        if self._jonlilik is not None:
+            for device_id in device_ids:
+                self._jonlilik.forget(subsystem_name, device_id)
+        if self._ierarxiya is not None:
+            self._ierarxiya.forget(subsystem_name, device_ids)
+        if self._status_board is not None:
+            self._status_board.unpublish(subsystem_name, device_ids)
+        if removed:
+            self._ozgarishni_qayd_etish(subsystem_name)
+        return removed
+
+    def apply_config(self, config, batch_size: int = 10_000) -> Dict[str, Any]:
+        """
+        Yangi SmartCityKonfiguratsiya ni ishlayotgan shaharga qo'llash.
+        Kerakli qurilmalar oldingi qo'llangan konfiguratsiya bilan solishtiriladi
+        (birinchi marta - ishlayotgan qurilmalar bilan) va faqat farq bajariladi:
+        qo'shish, olib tashlash, ko'chirish va avtomatik ishga tushirish -
+        `batch_size` tadan partiyalarda. Ish o'zgarishlar soniga mutanosib.
+        """
+        from core.builders.config_diff import (HOSILA_TAVSIFLARI, JOY_ATRIBUTLARI,
+                                               ISHGA_TUSHIRISH_BAYROQLARI, QurilmalarTavsifi,
+                                               farqni_hisoblash)
+        if not self._initialized:
+            print("[KONTROLER] XATO: Kontroler initsializatsiya qilinmagan")
+            return {}
+        if batch_size < 1:
+            raise ValueError("batch_size kamida 1 bo'lishi kerak")
+        started = time.perf_counter()
+        previous = self._joriy_konfiguratsiya
+        auto_start = config.avtomatik_ishga_tushirish
+        # Bayroq endi yoqilgan bo'lsa - butun park ishga tushiriladi, aks holda faqat yangilari
+        start_everything = auto_start and not (previous is not None and previous['auto_start'])
+        specs, report = {}, {}
+        for name in HOSILA_TAVSIFLARI:
+            spec = specs[name] = QurilmalarTavsifi.konfiguratsiyadan(config, name)
+            old = previous['specs'][name] if previous is not None else self._ishlayotgan_tavsif(name)
+            diff = farqni_hisoblash(old, spec)
+            counts = report[name] = {'added': 0, 'removed': 0, 'relocated': 0, 'started': 0}
+            for start in range(0, len(diff.removed), batch_size):
+                counts['removed'] += self.remove_devices_from_subsystem(
+                    name, diff.removed[start:start + batch_size])
+            for start in range(0, len(diff.added), batch_size):
+                chunk = dict(diff.added[start:start + batch_size])
+                devices = self.create_devices(name, chunk.keys(), chunk.values())
+                self.add_devices_to_subsystem(name, dict(zip(chunk, devices)))
+                counts['added'] += len(chunk)
+            attribute = JOY_ATRIBUTLARI[name]
+            counts['relocated'] = self._partiyalab_qollash(
+                name, [(device_id, attribute, location) for device_id, location in diff.relocated], batch_size)
+            if auto_start:
+                device_ids = spec.as_dict() if start_everything else (device_id for device_id, _ in diff.added)
+                flags = ISHGA_TUSHIRISH_BAYROQLARI[name]
+                updates = [(device_id, flag, value) for device_id in device_ids for flag, value in flags]
+                counts['started'] = self._partiyalab_qollash(name, updates, batch_size) // len(flags)
+        self._joriy_konfiguratsiya = {'auto_start': auto_start, 'specs': specs}
+        seconds = time.perf_counter() - started
+        totals = {key: sum(counts[key] for counts in report.values())
+                  for key in ('added', 'removed', 'relocated', 'started')}
+        print(f"[KONTROLER] Konfiguratsiya qo'llandi: +{totals['added']} qo'shildi, -{totals['removed']} "
+              f"olib tashlandi, {totals['relocated']} ko'chirildi, {totals['started']} ishga tushirildi "
+              f"({seconds:.3f}s)")
+        return {'subsystems': report, 'totals': totals, 'seconds': seconds}
+
+    def _ishlayotgan_tavsif(self, subsystem_name: str):
+        """Ishlayotgan qurilmalarning {device_id: joy} tavsifi (birinchi apply_config uchun)"""
+        from core.builders.config_diff import JOY_ATRIBUTLARI, QurilmalarTavsifi
+        attribute = JOY_ATRIBUTLARI[subsystem_name]
+        subsystem = self._haqiqiy_subsistema(subsystem_name)
+        devices = getattr(subsystem, 'devices', None)
+        if isinstance(devices, dict):
+            return QurilmalarTavsifi(devices={device_id: getattr(device, attribute)
+                                              for device_id, device in devices.items()})
+        statuses = subsystem.get_status()['devices']
+        return QurilmalarTavsifi(devices={device_id: status[attribute] for device_id, status in statuses.items()})
+
+    def _partiyalab_qollash(self, subsystem_name: str, updates: list, batch_size: int) -> int:
+        """(device_id, atribut, qiymat) larni partiyalab qo'llash (yurak urishi hisoblanmaydi)"""
+        if not updates:
+            return 0
+        subsystem = self._haqiqiy_subsistema(subsystem_name)
+        applied = 0
+        for start in range(0, len(updates), batch_size):
+            chunk = updates[start:start + batch_size]
+            applied += subsystem.apply_readings(chunk)
+            self._taxtaga_elon(subsystem_name, list(dict.fromkeys(update[0] for update in chunk)))
+        self._ozgarishni_qayd_etish(subsystem_name)
+        return applied
+
+    def _subsistema_proksisi(self, subsystem_name: str):
+        """Dekoratorlar ostidagi subsistema proksisini olish"""
+        subsystem = self._subsystems.get(subsystem_name)
+        while subsystem is not None and not hasattr(subsystem, '_real_subsystem'):
+            subsystem = getattr(subsystem, '_subsystem', None)
+        return subsystem
+    
+    def configure_admission(self, client_rate: float = None, client_burst: float = None,
+                            subsystem_rate: float = None, subsystem_burst: float = None,
+                            max_concurrent: int = None):
+        """
+        Barcha subsistema proksilarida yuklama cheklovlarini sozlash
+        Tezliklar - soniyasiga chaqiruvlar; parallellik chegarasi barcha subsistemalar uchun umumiy.
+        Argumentlarsiz chaqirilsa cheklovlar o'chiriladi.
+        """
+        concurrency = ParallellikChegarasi(max_concurrent) if max_concurrent else None
+        for subsystem_name in self._subsystems:
+            proxy = self._subsistema_proksisi(subsystem_name)
+            if proxy is not None:
+                proxy.set_limits(client_rate, client_burst, subsystem_rate, subsystem_burst, concurrency)
+    
+    def get_admission_stats(self) -> Dict[str, Dict[str, int]]:
+        """Subsistemalar bo'yicha yuklama cheklovi hisoblagichlari"""
+        stats = {}
+        for subsystem_name in self._subsystems:
+            proxy = self._subsistema_proksisi(subsystem_name)
+            if proxy is not None:
+                stats[subsystem_name] = proxy.admission_stats()
+        return stats
+    
+    def device_command(self, subsystem_name: str, device_id: str, command: str, *args,
+                       client_id: str = 'local'):
+        """
+        Qurilma metodini chaqirish (masalan, 'set_brightness', 50)
+        Shardlangan rejimda chaqiruv qurilma egasi bo'lgan shardga yo'naltiriladi.
+        Chaqiruv subsistema proksisining yuklama cheklovidan o'tadi -
+        rad etilsa YuklamaRadEtildi (retry_after bilan) ko'tariladi.
+        """
+        subsystem = self._haqiqiy_subsistema(subsystem_name)
+        if subsystem is None:
+            return None
+        if command.startswith('_'):
+            print(f"[KONTROLER] XATO: Ruxsat etilmagan buyruq: {command}")
+            return None
+        
+        proxy = self._subsistema_proksisi(subsystem_name)
+        proxy.admit(client_id)
+        try:
+            device_call = getattr(subsystem, 'device_call', None)
+            if device_call is not None:
+                result = device_call(device_id, command, *args)
+            else:
+                device = subsystem.devices.get(device_id)
+                if device is None:
+                    print(f"[KONTROLER] XATO: Qurilma topilmadi: {device_id}")
+                    return None
+                result = getattr(device, command)(*args)
+        finally:
+            proxy.release()
+        self._ozgarishni_qayd_etish(subsystem_name)
+        self._taxtaga_elon(subsystem_name, [device_id])
+        return result
+    
+    def apply_telemetry(self, subsystem_name: str, updates) -> int:
+        """
+        Tekshirilgan telemetriya (device_id, atribut, qiymat) partiyasini qo'llash
+        Qurilma bo'yicha xabar chiqarilmaydi; qo'llangan yangilanishlar sonini qaytaradi
+        """
+        subsystem = self._haqiqiy_subsistema(subsystem_name)
+        if subsystem is None or not hasattr(subsystem, 'apply_readings'):
+            return 0
+        applied = subsystem.apply_readings(updates)
+        if applied:
+            self._ozgarishni_qayd_etish(subsystem_name)
+        if self._status_board is not None or self._jonlilik is not None or self._ierarxiya is not None:
+            device_ids = list({update[0] for update in updates})
+            # O'qish yuborgan qurilma tirik
+            self._yurak_urishi(subsystem_name, device_ids)
+            self._taxtaga_elon(subsystem_name, device_ids)
+        return applied
+    
+    def _ozgarishni_qayd_etish(self, subsystem_name: str = None):
+        """
+        Holat versiyasini oshirish (keshlangan status javoblari shu orqali eskiradi)
+        subsystem_name berilmasa - butun kontroler o'zgargan (initialize/shutdown)
+        """
+        self._state_version += 1
+        if subsystem_name is None:
+            self._subsystem_versions = {}
+            self._versions_base = self._state_version
+        else:
+            self._subsystem_versions[subsystem_name] = self._state_version
+    
+    def state_version(self, subsystem_name: str = None) -> int:
+        """
+        Holat versiyasi: kontroler orqali bajarilgan har bir o'zgarishda oshadi.
+        subsystem_name berilsa - shu subsistemaning oxirgi o'zgarishi versiyasi
+        (qurilmalar eskirishi ham o'zgarish hisoblanadi)
+        """
+        self._eskirganlarni_yigish()
+        if subsystem_name is None:
+            return self._state_version
+        return self._subsystem_versions.get(subsystem_name, self._versions_base)
+    
+    def enable_liveness(self, timeout: float = 60.0, timeouts: Dict[str, float] = None, **options):
+        """
+        Qurilmalar jonliligini kuzatishni yoqish: `timeout` soniya (yoki timeouts
+        dagi subsistema chegarasi) ichida yurak urishi bo'lmagan qurilma eskirgan
+        hisoblanadi. Mavjud qurilmalar hozirgi vaqtdan boshlab kuzatiladi.
+        """
+        from core.liveness.liveness import JonlilikKuzatuvchisi
+        self._jonlilik = JonlilikKuzatuvchisi(timeout, timeouts, **options)
+        for subsystem_name in self._subsystems:
+            subsystem = self._haqiqiy_subsistema(subsystem_name)
+            devices = getattr(subsystem, 'devices', None)
+            if not isinstance(devices, dict):
+                devices = subsystem.get_status().get('devices', {})
+            self._jonlilik.heartbeats(subsystem_name, devices)
+        print(f"[KONTROLER] Jonlilik kuzatuvi yoqildi ({self._jonlilik.summary()['tracked']} ta qurilma, "
+              f"chegara: {timeout}s)")
+        return self._jonlilik
+    
+    def heartbeat(self, subsystem_name: str, *device_ids: str) -> int:
+        """Qurilmalardan yurak urishi; eskirgan holatdan qaytganlar soni"""
+        return len(self._yurak_urishi(subsystem_name, device_ids))
+    
+    def _yurak_urishi(self, subsystem_name: str, device_ids) -> list:
+        tracker = self._jonlilik
+        if tracker is None:
+            return []
+        revived = tracker.heartbeats(subsystem_name, device_ids)
+        if revived:
+            self._ozgarishni_qayd_etish(subsystem_name)
+        return revived
+    
+    def _eskirganlarni_yigish(self):
+        """Muddati o'tgan qurilmalarni eskirgan deb belgilash - ish faqat ular soniga bog'liq"""
+        tracker = self._jonlilik
+        if tracker is None:
+            return
+        for subsystem_name in tracker.sweep():
+            self._ozgarishni_qayd_etish(subsystem_name)
+    
+    def health_summary(self) -> Dict[str, Any]:
+        """Kuzatilayotgan, tirik va eskirgan qurilmalar soni (qurilmalar bo'yicha yurilmaydi)"""
+        if self._jonlilik is None:
+            return {}
+        self._eskirganlarni_yigish()
+        return self._jonlilik.summary()
+
+    def enable_districts(self, districts: Dict[str, Any] = None):
+        """
+        Shahar -> tuman -> ko'cha -> qurilma ierarxiyasini yoqish. `districts` -
+        {tuman: [ko'cha/zona/chorraha, ...]}. Yig'indilar bir marta barcha
+        qurilmalardan quriladi, keyin har bir o'zgarishda qisman yangilanadi.
+        """
+        if self._shard_pool is not None:
+            print("[KONTROLER] XATO: Tuman ierarxiyasi shardlangan rejimda qo'llab-quvvatlanmaydi")
+            return None
+        from core.hierarchy.hierarchy import ShaharIerarxiyasi
+        self._ierarxiya = ShaharIerarxiyasi(self.shahar_nomi)
+        for district_name, streets in (districts or {}).items():
+            self._ierarxiya.assign(district_name, streets)
+        for subsystem_name in self._subsystems:
+            self._ierarxiyani_yangilash(subsystem_name)
+        print(f"[KONTROLER] Tuman ierarxiyasi yoqildi ({len(self._ierarxiya)} ta qurilma, "
+              f"{len(self._ierarxiya.root.children)} ta tuman)")
+        return self._ierarxiya
+
+    def define_district(self, district_name: str, streets) -> bool:
+        """Ko'chalarni tumanga biriktirish (ierarxiya yoqilgan bo'lishi kerak)"""
+        if self._ierarxiya is None:
+            return False
+        self._ierarxiya.assign(district_name, streets)
+        return True
+
+    def district_summary(self, name: str = None) -> Dict[str, Any]:
+        """Shahar, tuman yoki ko'cha xulosasi - qurilmalar bo'yicha yurilmaydi"""
+        if self._ierarxiya is None:
+            return {}
+        return self._ierarxiya.summary(name)
+
+    def _ierarxiyani_yangilash(self, subsystem_name: str, device_ids=None):
+        devices = getattr(self._haqiqiy_subsistema(subsystem_name), 'devices', None)
+        if not isinstance(devices, dict):
+            return
+        if device_ids is None:
+            items = devices.items()
+        else:
+            items = [(device_id, devices[device_id]) for device_id in device_ids if device_id in devices]
+        self._ierarxiya.refresh(subsystem_name, items)
+
+    def enable_tracing(self, path: str, sample_rate: float = 1.0, **options):
+        """
+        Kontroler -> dekorator -> proksi -> subsistema -> qurilmalar qatlamlari
+        bo'ylab oraliqlarni (span) yozishni yoqish; `sample_rate` - yoziladigan
+        chaqiruvlar ulushi. Kuzatuv jarayon bo'yicha (barcha shaharlar uchun).
+        """
+        from core.tracing.tracing import yoqish
+        tracer = yoqish(path, sample_rate, **options)
+        print(f"[KONTROLER] Iz yozish yoqildi: {path} (tanlash: {sample_rate:.0%})")
+        return tracer
+
+    def disable_tracing(self) -> int:
+        """Kuzatuvni o'chirish va oraliqlarni Chrome trace JSON ga yozish; yozilganlar soni"""
+        from core.tracing.tracing import ochirish
+        tracer = ochirish()
+        if tracer is None:
+            return 0
+        written = tracer.export()
+        print(f"[KONTROLER] {written} ta oraliq yozildi: {tracer.path}")
+        return written
+
+    def start_camera_events(self, **options) -> bool:
+        """
+        Xavfsizlik kameralari hodisalar quvurini ishga tushirish (faqat mahalliy rejimda)
+        Ogohlantirish darajasi o'zgarsa, holat versiyasi oshadi
+        """
+        security = self._haqiqiy_subsistema('security')
+        if security is None or self._shard_pool is not None:
+            print("[KONTROLER] XATO: Hodisalar quvuri shardlangan rejimda mavjud emas")
+            return False
+        options.setdefault('on_alert_change', lambda level: self._ozgarishni_qayd_etish('security'))
+        security.start_event_pipeline(**options)
+        return True
+    
+    def report_camera_event(self, camera_id: str, kind: str, timestamp: float = None,
+                            metadata: dict = None) -> bool:
+        """Kamera hodisasini (motion/tamper/offline) quvurga yuborish"""
+        security = self._haqiqiy_subsistema('security')
+        if security is None or getattr(security, 'event_pipeline', None) is None:
+            return False
+        return security.report_event(camera_id, kind, timestamp, metadata)
+    
+    def start_lighting_schedule(self, **options):
+        """
+        Yoritish jadvallarini ishga tushirish (faqat mahalliy rejimda).
+        Jadval chiroqlarni almashtirsa, holat versiyasi oshadi va taxta yangilanadi;
+        jadval ipi buni kontroler qulfi ostida bajaradi
+        """
+        lighting = self._haqiqiy_subsistema('lighting')
+        if lighting is None or self._shard_pool is not None:
+            print("[KONTROLER] XATO: Yoritish jadvali shardlangan rejimda mavjud emas")
+            return None
+        
+        def almashtirildi(device_ids):
+            self._ozgarishni_qayd_etish('lighting')
+            self._taxtaga_elon('lighting', device_ids)
+        
+        options.setdefault('on_fire', almashtirildi)
+        options.setdefault('lock', self._qulf)
+        return lighting.start_scheduler(**options)
+    
+    def start_adaptive_lighting(self, **options):
+        """
+        Yorug'lik va harakat sensorlari bo'yicha moslashuvchan yoritishni yoqish
+        (faqat mahalliy rejimda, NumPy kerak); dvigatel yoki None qaytariladi
+        """
+        lighting = self._haqiqiy_subsistema('lighting')
+        if lighting is None or self._shard_pool is not None:
+            print("[KONTROLER] XATO: Moslashuvchan yoritish shardlangan rejimda mavjud emas")
+            return None
+        return lighting.start_adaptive(**options)
+    
+    def report_light_sensors(self, ambient: Dict[str, float] = None, motion=None, now: float = None) -> bool:
+        """Ko'chalar bo'yicha yorug'lik (lux) va harakat o'lchovlarini qabul qilish"""
+        engine = getattr(self._haqiqiy_subsistema('lighting'), 'adaptive', None)
+        if engine is None:
+            return False
+        if ambient:
+            engine.ambient(ambient)
+        if motion:
+            engine.motion(motion, now)
+        return True
+    
+    def adaptive_lighting_tick(self, now: float = None) -> int:
+        """Moslashuvchan yoritishning bitta qadami; yorqinligi o'zgargan chiroqlar soni"""
+        engine = getattr(self._haqiqiy_subsistema('lighting'), 'adaptive', None)
+        if engine is None:
+            return 0
+        changed = engine.tick(now)
+        if changed:
+            self._ozgarishni_qayd_etish('lighting')
+            self._taxtaga_elon('lighting', changed)
+        return len(changed)
+    
+    def start_energy_forecast(self, enable_above: float, **options) -> bool:
+        """
+        Energiya talabini prognoz qilish va tejash rejimini avtomatik boshqarish
+        (faqat mahalliy rejimda, NumPy kerak). Rejim o'zgarsa, holat versiyasi oshadi
+        """
+        energy = self._haqiqiy_subsistema('energy')
+        if energy is None or self._shard_pool is not None:
+            print("[KONTROLER] XATO: Talab prognozi shardlangan rejimda mavjud emas")
+            return False
+        options.setdefault('on_mode_change', lambda enabled: self._ozgarishni_qayd_etish('energy'))
+        energy.start_forecasting(enable_above, **options)
+        return True
+    
+    def record_energy_interval(self, readings=None):
+        """Bir o'lchov oralig'ini prognozga qo'shish; prognoz xulosasi (yoki None)"""
+        energy = self._haqiqiy_subsistema('energy')
+        if energy is None or getattr(energy, 'forecast', None) is None:
+            return None
+        return energy.record_interval(readings)
+    
+    def optimize_traffic(self, flows: Dict[str, float] = None, corridors: Dict[str, Any] = None, **options):
+        """
+        Svetoforlar uchun signal rejasini hisoblash (Webster sikli va yashil
+        ulushlari, koridorlar bo'ylab "yashil to'lqin"; faqat mahalliy rejimda,
+        NumPy kerak). Reja yoki None qaytariladi
+        """
+        transport = self._haqiqiy_subsistema('transport')
+        if transport is None or self._shard_pool is not None:
+            print("[KONTROLER] XATO: Signal rejasi shardlangan rejimda mavjud emas")
+            return None
+        plan = transport.optimize_traffic_flow(flows, corridors, **options)
+        self._ozgarishni_qayd_etish('transport')
+        return plan
+    
+    def simulate_traffic(self, seconds: int = 3600, roads=None, **options):
+        """
+        Svetofor chorrahalari orasidagi yo'llarda transport oqimini modellashtirish
+        (Nagel-Schreckenberg; faqat mahalliy rejimda, NumPy kerak). O'lchangan
+        oqimlar optimize_traffic() uchun kuzatuv sifatida saqlanadi
+        """
+        transport = self._haqiqiy_subsistema('transport')
+        if transport is None or self._shard_pool is not None:
+            print("[KONTROLER] XATO: Transport modellashtirish shardlangan rejimda mavjud emas")
+            return None
+        summary = transport.simulate_traffic(seconds, roads, **options)
+        self._ozgarishni_qayd_etish('transport')
+        return summary
+    
+    def update_traffic_signals(self, now: float = None) -> int:
+        """Svetoforlarni signal rejasiga moslash; o'zgargan svetoforlar soni"""
+        transport = self._haqiqiy_subsistema('transport')
+        if transport is None or not hasattr(transport, 'update_signals'):
+            return 0
+        changed = transport.update_signals(now)
+        if changed:
+            self._ozgarishni_qayd_etish('transport')
+            self._taxtaga_elon('transport', changed)
+        return len(changed)
+    
+    def attach_status_board(self, board):
+        """
+        Holat taxtasini (umumiy xotira) ulash: barcha qurilmalar darhol e'lon
+        qilinadi, keyin har bir boshqaruv operatsiyasidan so'ng yangilanadi.
+        None berilsa, taxta uziladi. Dastlabki e'lon muvaffaqiyatsiz bo'lsa,
+        oldingi taxta qoladi va xato ko'tariladi.
+        """
+        if board is not None:
+            for subsystem_name in self._subsystems:
+                self._taxtaga_yozish(board, subsystem_name)
+        self._status_board = board
+    
+    def publish_status_board(self):
+        """Barcha qurilmalarni holat taxtasiga qayta e'lon qilish"""
+        for subsystem_name in self._subsystems:
+            self._taxtaga_elon(subsystem_name)
+    
+    def _taxtaga_elon(self, subsystem_name: str, device_ids=None):
+        """
+        Ulangan holat taxtasiga qurilmalar holatini yozish (taxta bo'lmasa - hech narsa);
+        tuman ierarxiyasi yoqilgan bo'lsa, shu qurilmalar hissasi ham yangilanadi
+        """
+        if self._ierarxiya is not None:
+            self._ierarxiyani_yangilash(subsystem_name, device_ids)
+        if self._status_board is not None:
+            self._taxtaga_yozish(self._status_board, subsystem_name, device_ids)
+    
+    def _taxtaga_yozish(self, board, subsystem_name: str, device_ids=None):
+        """Subsistema qurilmalarini (yoki faqat device_ids ni) berilgan taxtaga yozish"""
+        subsystem = self._haqiqiy_subsistema(subsystem_name)
+        devices = getattr(subsystem, 'devices', None)
+        if isinstance(devices, dict):
+            if device_ids is not None:
+                devices = {device_id: devices[device_id] for device_id in device_ids if device_id in devices}
+            board.publish_devices(subsystem_name, devices)
+            return
+        # Shardlangan rejim: qurilmalar boshqa jarayonda, status lug'atlaridan e'lon qilinadi
+        if device_ids is None:
+            statuses = subsystem.get_status()['devices'].values()
+        else:
+            statuses = subsystem.statuses(device_ids)
+        for device_status in statuses:
+            board.publish_status(subsystem_name, device_status)
+        board.publish_strings()
+    
+    def get_subsystem_status(self, subsystem_name: str, compact: bool = False,
+                             client_id: str = 'local') -> Dict[str, Any]:
+        """
+        Muayyan subsistemaning statusini olish
+        compact=True: satr maydonlari Flyweight handle lari bo'ladi,
+        ularni ochish uchun 'satrlar_jadvali' qo'shiladi
+        client_id: proksi yuklama cheklovi qaysi mijoz chelagidan olinadi
+        """
+        status = self._subsystem_status(subsystem_name, compact, client_id)
+        if compact and status:
+            status['satrlar_jadvali'] = self._satrlar_jadvali(status.get('devices', {}).values())
+        return status
+    
+    def get_device_status(self, subsystem_name: str, device_id: str, compact: bool = False):
+        """Bitta qurilma statusi (topilmasa - None)"""
+        subsystem = self._haqiqiy_subsistema(subsystem_name)
+        if subsystem is None:
+            return None
+        device_call = getattr(subsystem, 'device_call', None)
+        if device_call is not None:
+            try:
+                status = device_call(device_id, 'status')
+            except RuntimeError:
+                return None
+            if compact:
+                status = {key: attribute_registry.intern(value) if key in FLYWEIGHT_MAYDONLAR else value
+                          for key, value in status.items()}
+                status['satrlar_jadvali'] = self._satrlar_jadvali([status])
+            return status
+        device = subsystem.devices.get(device_id)
+        if device is None:
+            return None
+        status = device.status(compact)
+        if compact:
+            status['satrlar_jadvali'] = self._satrlar_jadvali([status])
+        if self._jonlilik is not None:
+            self._eskirganlarni_yigish()
+            if self._jonlilik.is_alive(subsystem_name, device_id) is False:
+                status['stale'] = True
+        return status
+    
+    @staticmethod
+    def _satrlar_jadvali(device_statuses) -> Dict[int, str]:
+        """Ixcham qurilma statuslarida ishlatilgan handle lar uchun satrlar jadvali"""
+        return attribute_registry.subtable(
+            device_status[field] for device_status in device_statuses
+            for field in FLYWEIGHT_MAYDONLAR if field in device_status
+        )
+    
+    def _subsystem_status(self, subsystem_name: str, compact: bool, client_id: str = 'local') -> Dict[str, Any]:
         if subsystem_name not in self._subsystems:
             print(f"[KONTROLER] XATO: Noma'lum subsistema: {subsystem_name}")
             return {}
         
         subsystem = self._subsystems[subsystem_name]
-        if hasattr(subsystem, 'get_status'):
-            return subsystem.get_status()
-        return {}
+        if not hasattr(subsystem, 'get_status'):
+            return {}
+        with oraliq('subsystem_status', 'SmartCityController', subsystem=subsystem_name):
+            status = subsystem.get_status(compact, client_id=client_id)
+            if self._jonlilik is not None:
+                # Oxirgi o'rnatilgan qiymatlar eskirgan qurilmalarda belgilanadi
+                with oraliq('mark_stale', 'SmartCityController'):
+                    self._eskirganlarni_yigish()
+                    devices = status.get('devices', {})
+                    for device_id in self._jonlilik.stale(subsystem_name):
+                        device_status = devices.get(device_id)
+                        if device_status is not None:
+                            device_status['stale'] = True
+        return status
+    
+    def query(self, subsystem_name: str, where: dict = None, fields=None,
+              client_id: str = 'local') -> Dict[str, dict]:
+        """
+        Subsistema ichida filtrlangan status: faqat `where` ga mos qurilmalar,
+        faqat `fields` maydonlari bilan (masalan, where={'is_on': False},
+        fields=['device_id', 'location']). Natija: device_id -> lug'at
+        """
+        subsystem = self._haqiqiy_subsistema(subsystem_name)
+        if subsystem is None or not hasattr(subsystem, 'query'):
+            return {}
+        proxy = self._subsistema_proksisi(subsystem_name)
+        with oraliq('query', 'SmartCityController', subsystem=subsystem_name):
+            proxy.admit(client_id)
+            try:
+                with oraliq('query', type(subsystem).__name__):
+                    return subsystem.query(where, fields)
+            finally:
+                proxy.release()
     
-    def get_all_status(self) -> Dict[str, Dict[str, Any]]:
-        """Barcha subsistemalarning statusini olish"""
+    def get_all_status(self, compact: bool = False, client_id: str = 'local') -> Dict[str, Dict[str, Any]]:
+        """
+        Barcha subsistemalarning statusini olish
+        compact=True: javobda ishlatilgan satrlar jadvali bir marta, yuqori darajada beriladi
+        client_id: har bir subsistema proksisida yuklama cheklovi uchun mijoz
+        """
         status = {
             'kontroler_ishlamoqda': self._is_running,
             'subsistemalar': {}
         }
         
-        for name in self._subsystems:
-            status['subsistemalar'][name] = self.get_subsystem_status(name)
+        if self._jonlilik is not None:
+            summary = self.health_summary()
+            status['eskirgan_qurilmalar_soni'] = summary['stale']
+            status['jonlilik'] = summary
         
+        with oraliq('get_all_status', 'SmartCityController'):
+            for name in self._subsystems:
+                status['subsistemalar'][name] = self._subsystem_status(name, compact, client_id)
+        
+        if compact:
+            status['satrlar_jadvali'] = self._satrlar_jadvali(
+                device_status for subsystem_status in status['subsistemalar'].values()
+                for device_status in subsystem_status.get('devices', {}).values()
+            )
         return status
     
     def start_subsystem(self, subsystem_name: str):
@@ -152,16 +837,13 @@ class SmartCityController(Singleton):
             print(f"[KONTROLER] XATO: Noma'lum subsistema: {subsystem_name}")
             return
         
-        subsystem = self._subsystems[subsystem_name]
         # Haqiqiy subsistemani start_all chaqirish uchun olish
-        real_sys = subsystem
-        while hasattr(real_sys, '_subsystem'):
-            real_sys = real_sys._subsystem
-        while hasattr(real_sys, '_real_subsystem'):
-            real_sys = real_sys._real_subsystem
+        real_sys = self._haqiqiy_subsistema(subsystem_name)
         
         if hasattr(real_sys, 'start_all'):
             real_sys.start_all()
+            self._ozgarishni_qayd_etish(subsystem_name)
+            self._taxtaga_elon(subsystem_name)
     
     def stop_subsystem(self, subsystem_name: str):
         """Muayyan subsistemani to'xtatish"""
@@ -169,16 +851,13 @@ class SmartCityController(Singleton):
             print(f"[KONTROLER] XATO: Noma'lum subsistema: {subsystem_name}")
             return
         
-        subsystem = self._subsystems[subsystem_name]
         # Haqiqiy subsistemani stop_all chaqirish uchun olish
-        real_sys = subsystem
-        while hasattr(real_sys, '_subsystem'):
-            real_sys = real_sys._subsystem
-        while hasattr(real_sys, '_real_subsystem'):
-            real_sys = real_sys._real_subsystem
+        real_sys = self._haqiqiy_subsistema(subsystem_name)
         
         if hasattr(real_sys, 'stop_all'):
             real_sys.stop_all()
+            self._ozgarishni_qayd_etish(subsystem_name)
+            self._taxtaga_elon(subsystem_name)
     
     def start_all_subsystems(self):
         """Barcha subsistemalarni ishga tushirish"""
@@ -206,7 +885,15 @@ class SmartCityController(Singleton):
             if hasattr(subsystem, 'shutdown'):
                 subsystem.shutdown()
         
+        if self._shard_pool is not None:
+            # Shard jarayonlari to'xtaydi - ularning subsistemalari endi ishlatilmaydi
+            self._shard_pool.close()
+            self._shard_pool = None
+            self._subsystems = {}
+            self._initialized = False
+        
         self._is_running = False
+        self._ozgarishni_qayd_etish()
         print("[KONTROLER] ✓ SmartCity Kontroleri o'chirildi\n")
     
     def display_menu(self):
@@ -221,5 +908,6 @@ class SmartCityController(Singleton):
         print("5. Muayyan Subsistemani Ishga Tushirish")
         print("6. Muayyan Subsistemani To'xtatish")
         print("7. Tizim Ma'lumotlari")
+        print("8. HTTP Status API ni Ishga Tushirish/To'xtatish")
         print("0. Chiqish")
         print("="*60)
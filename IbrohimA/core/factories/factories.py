@@ -3,15 +3,52 @@ Abstract Factory Naqshi Implementatsiyasi
 Foydalanish: Bog'langan ob'ektlar oilasini yaratish (turli subsistema implementatsiyalari)
 """
 
+import gc
+import importlib
 from abc import ABC, abstractmethod
-from typing import Protocol
+from typing import Dict, Iterable, List, Protocol, Union
+
+
+# Qurilma turlari registri: tur -> "modul.Klass" yo'li.
+# Klasslar birinchi so'rovda bir marta import qilinadi va keshlanadi,
+# shuning uchun create_device chaqiruvlari import mexanizmiga tegmaydi.
+_QURILMA_YOLLARI: Dict[str, str] = {
+    'lighting': 'modules.lighting.lighting_devices.SmartLight',
+    'security': 'modules.security.security_devices.SecurityCamera',
+    'transport': 'modules.transport.transport_devices.TrafficLight',
+    'energy': 'modules.energy.energy_devices.EnergyMonitor',
+}
+_qurilma_klasslari: Dict[str, type] = {}
+
+
+def qurilma_klassini_royxatga_olish(device_type: str, device_class: Union[type, str]):
+    """Qurilma turini klass yoki "modul.Klass" yo'li bilan ro'yxatga olish"""
+    _qurilma_klasslari.pop(device_type, None)
+    if isinstance(device_class, str):
+        _QURILMA_YOLLARI[device_type] = device_class
+    else:
+        _QURILMA_YOLLARI.pop(device_type, None)
+        _qurilma_klasslari[device_type] = device_class
+
+
+def qurilma_klassini_olish(device_type: str) -> type:
+    """Qurilma turiga mos klassni qaytarish (birinchi chaqiruvda import qilinadi)"""
+    device_class = _qurilma_klasslari.get(device_type)
+    if device_class is None:
+        if device_type not in _QURILMA_YOLLARI:
+            raise KeyError(f"Noma'lum qurilma turi: {device_type}")
+        module_path, _, class_name = _QURILMA_YOLLARI[device_type].rpartition('.')
+        device_class = getattr(importlib.import_module(module_path), class_name)
+        _qurilma_klasslari[device_type] = device_class
+    return device_class
 
 
 class IQurilma(Protocol):
     """Barcha aqlli qurilmalar uchun interfeys"""
     def start(self): ...
     def stop(self): ...
-    def status(self) -> dict: ...
+    def status(self, compact: bool = False) -> dict: ...
+    def clone(self, device_id: str, location: str) -> 'IQurilma': ...
 
 
 class ISubsistema(ABC):
@@ -30,7 +67,7 @@ class ISubsistema(ABC):
         pass
     
     @abstractmethod
-    def get_status(self) -> dict:
+    def get_status(self, compact: bool = False) -> dict:
         pass
 
 
@@ -40,10 +77,54 @@ class AqliQurilmaFabriki(ABC):
     Turli qurilma oilalarini yaratishning interfeysi.
     """
     
+    # Registrdagi qurilma turi (konkret fabrikalar belgilaydi)
+    qurilma_turi: str = ''
+    
     @abstractmethod
     def create_device(self, device_id: str, location: str) -> IQurilma:
         pass
     
+    def _qurilma_klassi(self) -> type:
+        """Fabrika yaratadigan qurilma klassi (registrdan)"""
+        return qurilma_klassini_olish(self.qurilma_turi)
+    
+    def _prototip(self) -> IQurilma:
+        """Ommaviy yaratish uchun tayyorlangan prototip qurilma"""
+        device_class = self._qurilma_klassi()
+        prototype = getattr(self, '_prototype', None)
+        if type(prototype) is not device_class:
+            prototype = device_class('__prototype__', '')
+            self._prototype = prototype
+        return prototype
+    
+    def create_many(self, device_ids: Iterable[str],
+                    locations: Union[str, Iterable[str]]) -> List[IQurilma]:
+        """
+        Prototype Naqshi - ko'p qurilmani bitta prototipdan nusxalab yaratadi.
+        To'liq konstruktor har safar ishlamaydi; `locations` bitta satr bo'lsa,
+        barcha qurilmalar shu joyga qo'yiladi.
+        """
+        device_ids = list(device_ids)
+        if isinstance(locations, str):
+            locations = [locations] * len(device_ids)
+        else:
+            locations = list(locations)
+            if len(locations) != len(device_ids):
+                raise ValueError(
+                    f"device_ids ({len(device_ids)}) va locations ({len(locations)}) "
+                    "uzunliklari mos emas"
+                )
+        clone = self._prototip().clone
+        # Ommaviy yaratishda tsiklik GC har necha ming ob'ektda ishga tushib,
+        # vaqtning yarmini oladi; nusxalar tsikl hosil qilmaydi.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return [clone(device_id, location) for device_id, location in zip(device_ids, locations)]
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    
     @abstractmethod
     def get_factory_name(self) -> str:
         pass
@@ -52,9 +133,10 @@ class AqliQurilmaFabriki(ABC):
 class YoritishQurilmaFabriki(AqliQurilmaFabriki):
     """Yoritish qurilmalarini yaratish uchun konkret fabric"""
     
+    qurilma_turi = 'lighting'
+    
     def create_device(self, device_id: str, location: str):
-        from modules.lighting.lighting_devices import SmartLight
-        return SmartLight(device_id, location)
+        return self._qurilma_klassi()(device_id, location)
     
     def get_factory_name(self) -> str:
         return "Yoritish Qurilma Fabriki"
@@ -63,9 +145,10 @@ class YoritishQurilmaFabriki(AqliQurilmaFabriki):
 class XavfsizlikQurilmaFabriki(AqliQurilmaFabriki):
     """Xavfsizlik qurilmalarini yaratish uchun konkret fabric"""
     
+    qurilma_turi = 'security'
+    
     def create_device(self, device_id: str, location: str):
-        from modules.security.security_devices import SecurityCamera
-        return SecurityCamera(device_id, location)
+        return self._qurilma_klassi()(device_id, location)
     
     def get_factory_name(self) -> str:
         return "Xavfsizlik Qurilma Fabriki"
@@ -74,9 +157,10 @@ class XavfsizlikQurilmaFabriki(AqliQurilmaFabriki):
 class TransportQurilmaFabriki(AqliQurilmaFabriki):
     """Transport qurilmalarini yaratish uchun konkret fabric"""
     
+    qurilma_turi = 'transport'
+    
     def create_device(self, device_id: str, location: str):
-        from modules.transport.transport_devices import TrafficLight
-        return TrafficLight(device_id, location)
+        return self._qurilma_klassi()(device_id, location)
     
     def get_factory_name(self) -> str:
         return "Transport Qurilma Fabriki"
@@ -85,9 +169,10 @@ class TransportQurilmaFabriki(AqliQurilmaFabriki):
 class EnergiyaQurilmaFabriki(AqliQurilmaFabriki):
     """Energiya qurilmalarini yaratish uchun konkret fabric"""
     
+    qurilma_turi = 'energy'
+    
     def create_device(self, device_id: str, location: str):
-        from modules.energy.energy_devices import EnergyMonitor
-        return EnergyMonitor(device_id, location)
+        return self._qurilma_klassi()(device_id, location)
     
     def get_factory_name(self) -> str:
         return "Energiya Qurilma Fabriki"
@@ -100,3 +185,5 @@ LightingDeviceFactory = YoritishQurilmaFabriki
 SecurityDeviceFactory = XavfsizlikQurilmaFabriki
 TransportDeviceFactory = TransportQurilmaFabriki
 EnergyDeviceFactory = EnergiyaQurilmaFabriki
+register_device_class = qurilma_klassini_royxatga_olish
+get_device_class = qurilma_klassini_olish
@@ -0,0 +1,65 @@
+"""
+Flyweight Naqshi Implementatsiyasi
+Foydalanish: Qurilmalar orasida takrorlanadigan satrlarni (joylashuv, zona,
+chorraha, rezolyutsiya) bitta umumiy jadvalda saqlash
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional
+
+# Ixcham statusda Flyweight handle ga aylantiriladigan maydonlar
+FLYWEIGHT_MAYDONLAR = ('location', 'intersection', 'zone', 'resolution')
+
+
+class AtributlarRegistri:
+    """
+    Flyweight Naqshi - Umumiy holatni ko'p ob'ektlar o'rtasida bo'lishadi.
+    Har bir satr jadvalda bir marta saqlanadi, qurilmalar esa unga butun son
+    (handle) orqali murojaat qiladi. Handle lar hech qachon o'zgarmaydi.
+    """
+
+    def __init__(self):
+        self._values: List[str] = []
+        self._handles: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def intern(self, value: str) -> int:
+        """Satrni jadvalga qo'shish (yoki mavjudini topish) va handle qaytarish"""
+        handle = self._handles.get(value)
+        if handle is None:
+            with self._lock:
+                handle = self._handles.get(value)
+                if handle is None:
+                    handle = len(self._values)
+                    self._values.append(value)
+                    self._handles[value] = handle
+        return handle
+
+    def handle(self, value: str) -> Optional[int]:
+        """Satrning handle i (jadvalda bo'lmasa None - yangi yozuv qo'shilmaydi)"""
+        return self._handles.get(value)
+    
+    def value(self, handle: int) -> str:
+        """Handle bo'yicha satrni qaytarish"""
+        return self._values[handle]
+
+    def table(self) -> List[str]:
+        """Jadval nusxasi: indeks = handle (ixcham statusni ochish uchun)"""
+        return list(self._values)
+
+    def subtable(self, handles: Iterable[int]) -> Dict[int, str]:
+        """Faqat berilgan handle lar uchun jadval qismi: handle -> satr"""
+        values = self._values
+        return {handle: values[handle] for handle in sorted(set(handles))}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+# Jarayon bo'yicha yagona umumiy registr
+atribut_registri = AtributlarRegistri()
+
+# Eski kod uchun - English aliases
+FLYWEIGHT_FIELDS = FLYWEIGHT_MAYDONLAR
+FlyweightRegistry = AtributlarRegistri
+attribute_registry = atribut_registri
@@ -0,0 +1,227 @@
+"""
+Tuman Ierarxiyasi - Composite naqshi: shahar -> tuman -> ko'cha/zona -> qurilma
+Foydalanish: "3-tumanda nechta chiroq yoniq", "Shimoliy zonada jami kWh" kabi
+savollarga barcha qurilmalarni ko'rib chiqmasdan javob berish
+
+Har bir tugun subsistema bo'yicha yig'indilarni saqlaydi (yoqilgan chiroqlar,
+yozayotgan kameralar, svetoforlar signallari taqsimoti, iste'mol kWh). Qurilma
+o'zgarganda uning avvalgi hissasi ayiriladi va yangisi qo'shiladi - faqat
+ko'cha, tuman va shahar tugunlari yangilanadi (O(chuqurlik)). Shuning uchun
+istalgan tugun xulosasi qurilmalar soniga bog'liq emas - O(1).
+
+Ko'cha/zona - qurilmaning joyi (location, intersection yoki zone). Ko'chalar
+tumanlarga assign() bilan biriktiriladi; biriktirilmaganlari BELGILANMAGAN
+tumanda turadi.
+"""
+
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+from core.builders.config_diff import JOY_ATRIBUTLARI
+
+BELGILANMAGAN = "Belgilanmagan"
+SIGNALLAR = ('red', 'yellow', 'green')
+
+Hissa = Tuple[Tuple[str, float], ...]
+
+
+def _yoritish_hissasi(device) -> Hissa:
+    return (('devices', 1), ('on', 1 if device.is_on else 0),
+            ('brightness_sum', device.brightness if device.is_on else 0))
+
+
+def _xavfsizlik_hissasi(device) -> Hissa:
+    return (('devices', 1), ('recording', 1 if device.is_recording else 0))
+
+
+def _transport_hissasi(device) -> Hissa:
+    return (('devices', 1), ('operational', 1 if device.is_operational else 0), (device.current_signal, 1))
+
+
+def _energiya_hissasi(device) -> Hissa:
+    return (('devices', 1), ('monitoring', 1 if device.is_monitoring else 0), ('kwh', device.power_consumption))
+
+
+def _farq(old: Hissa, new: Hissa) -> Hissa:
+    """Bir joydagi qurilma hissasining o'zgarishi - ota-tugunlar bo'ylab bir marta yuriladi"""
+    delta = []
+    for (key, value), (old_key, old_value) in zip(new, old):
+        if key == old_key:
+            if value != old_value:
+                delta.append((key, value - old_value))
+        else:
+            delta.append((key, value))
+            delta.append((old_key, -old_value))
+    return tuple(delta)
+
+
+# Subsistema -> qurilmaning tugun yig'indilariga hissasi
+HISSALAR: Dict[str, Callable[[object], Hissa]] = {
+    'lighting': _yoritish_hissasi,
+    'security': _xavfsizlik_hissasi,
+    'transport': _transport_hissasi,
+    'energy': _energiya_hissasi,
+}
+
+
+class IerarxiyaTuguni:
+    """
+    Composite tuguni (shahar, tuman yoki ko'cha). Ko'cha tugunlari barglar -
+    qurilmalarni (subsistema, device_id) juftlari sifatida saqlaydi.
+    """
+
+    __slots__ = ('name', 'kind', 'parent', 'children', 'totals', 'devices')
+
+    def __init__(self, name: str, kind: str, parent: Optional['IerarxiyaTuguni'] = None):
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.children: Dict[str, 'IerarxiyaTuguni'] = {}
+        self.totals: Dict[str, Dict[str, float]] = {name: {} for name in HISSALAR}
+        self.devices: Set[Tuple[str, str]] = set()
+
+    def _qoshish(self, subsystem_name: str, contribution: Hissa, sign: int):
+        """Hissani shu tugun va barcha ota-tugunlar yig'indisiga qo'shish/ayirish"""
+        node = self
+        while node is not None:
+            totals = node.totals[subsystem_name]
+            for key, value in contribution:
+                totals[key] = totals.get(key, 0) + sign * value
+            node = node.parent
+
+    def _yigindini_kochirish(self, sign: int):
+        """Butun tugun yig'indisini ota-tugunlarga qo'shish/ayirish (ko'cha tuman almashtirganda)"""
+        node = self.parent
+        while node is not None:
+            for subsystem_name, totals in self.totals.items():
+                target = node.totals[subsystem_name]
+                for key, value in totals.items():
+                    target[key] = target.get(key, 0) + sign * value
+            node = node.parent
+
+    @property
+    def path(self) -> Tuple[str, ...]:
+        names = []
+        node = self
+        while node is not None:
+            names.append(node.name)
+            node = node.parent
+        return tuple(reversed(names))
+
+    def summary(self) -> dict:
+        """Tugun xulosasi - yig'indilardan, qurilmalar ko'rib chiqilmaydi"""
+        lighting = self.totals['lighting']
+        transport = self.totals['transport']
+        energy = self.totals['energy']
+        security = self.totals['security']
+        on = lighting.get('on', 0)
+        return {
+            'name': self.name, 'kind': self.kind, 'children': len(self.children),
+            'lighting': {'devices': lighting.get('devices', 0), 'on': on,
+                         'avg_brightness_on': lighting.get('brightness_sum', 0) / on if on else 0.0},
+            'security': {'devices': security.get('devices', 0), 'recording': security.get('recording', 0)},
+            'transport': {'devices': transport.get('devices', 0), 'operational': transport.get('operational', 0),
+                          'signals': {signal: transport.get(signal, 0) for signal in SIGNALLAR}},
+            'energy': {'devices': energy.get('devices', 0), 'monitoring': energy.get('monitoring', 0),
+                       'kwh': energy.get('kwh', 0.0)},
+        }
+
+
+class ShaharIerarxiyasi:
+    """Shahar -> tuman -> ko'cha daraxti va qurilmalar hissalari"""
+
+    def __init__(self, city_name: str = "Shahar"):
+        self.root = IerarxiyaTuguni(city_name, 'city')
+        self._kochalar: Dict[str, IerarxiyaTuguni] = {}
+        self._tumani: Dict[str, str] = {}
+        # (subsistema, device_id) -> (ko'cha tuguni, hissa)
+        self._qurilmalar: Dict[Tuple[str, str], Tuple[IerarxiyaTuguni, Hissa]] = {}
+
+    def _tuman(self, name: str) -> IerarxiyaTuguni:
+        district = self.root.children.get(name)
+        if district is None:
+            district = self.root.children[name] = IerarxiyaTuguni(name, 'district', self.root)
+        return district
+
+    def _kocha(self, name: str) -> IerarxiyaTuguni:
+        street = self._kochalar.get(name)
+        if street is None:
+            district = self._tuman(self._tumani.get(name, BELGILANMAGAN))
+            street = district.children[name] = IerarxiyaTuguni(name, 'street', district)
+            self._kochalar[name] = street
+        return street
+
+    def assign(self, district_name: str, streets: Iterable[str]):
+        """Ko'chalarni (zonalarni, chorrahalarni) tumanga biriktirish; mavjudlari ko'chiriladi"""
+        district = self._tuman(district_name)
+        for street_name in streets:
+            self._tumani[street_name] = district_name
+            street = self._kochalar.get(street_name)
+            if street is None or street.parent is district:
+                continue
+            street._yigindini_kochirish(-1)
+            del street.parent.children[street_name]
+            street.parent = district
+            district.children[street_name] = street
+            street._yigindini_kochirish(+1)
+
+    def refresh(self, subsystem_name: str, devices: Iterable[Tuple[str, object]]) -> int:
+        """(device_id, qurilma) juftlari o'zgargan: hissalarni yangilash; o'zgarganlar soni"""
+        contribute = HISSALAR[subsystem_name]
+        attribute = JOY_ATRIBUTLARI[subsystem_name]
+        records = self._qurilmalar
+        changed = 0
+        for device_id, device in devices:
+            key = (subsystem_name, device_id)
+            contribution = contribute(device)
+            street_name = getattr(device, attribute)
+            previous = records.get(key)
+            if previous is not None:
+                old_street, old_contribution = previous
+                if old_street.name == street_name:
+                    if old_contribution == contribution:
+                        continue
+                    old_street._qoshish(subsystem_name, _farq(old_contribution, contribution), +1)
+                    records[key] = (old_street, contribution)
+                    changed += 1
+                    continue
+                old_street._qoshish(subsystem_name, old_contribution, -1)
+                old_street.devices.discard(key)
+            street = self._kocha(street_name)
+            street._qoshish(subsystem_name, contribution, +1)
+            street.devices.add(key)
+            records[key] = (street, contribution)
+            changed += 1
+        return changed
+
+    def forget(self, subsystem_name: str, device_ids: Iterable[str]) -> int:
+        """Olib tashlangan qurilmalar hissasini ayirish"""
+        forgotten = 0
+        for device_id in device_ids:
+            key = (subsystem_name, device_id)
+            previous = self._qurilmalar.pop(key, None)
+            if previous is not None:
+                street, contribution = previous
+                street._qoshish(subsystem_name, contribution, -1)
+                street.devices.discard(key)
+                forgotten += 1
+        return forgotten
+
+    def node(self, name: str = None) -> Optional[IerarxiyaTuguni]:
+        """Tugun nomi bo'yicha: None/shahar - ildiz, keyin tumanlar, keyin ko'chalar"""
+        if name is None or name == self.root.name:
+            return self.root
+        return self.root.children.get(name) or self._kochalar.get(name)
+
+    def summary(self, name: str = None) -> dict:
+        """Tugun xulosasi (O(1)); tugun topilmasa - bo'sh lug'at"""
+        node = self.node(name)
+        return node.summary() if node is not None else {}
+
+    def __len__(self) -> int:
+        return len(self._qurilmalar)
+
+
+# Eski kod uchun - English aliases
+UNASSIGNED = BELGILANMAGAN
+HierarchyNode = IerarxiyaTuguni
+CityHierarchy = ShaharIerarxiyasi
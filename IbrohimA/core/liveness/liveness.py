@@ -0,0 +1,125 @@
+"""
+Qurilma Jonliligi - Yurak urishi (heartbeat) muddatlarini kuzatish
+Foydalanish: qurilma belgilangan vaqt ichida signal bermasa, u "eskirgan"
+(stale) deb belgilanadi - status() esa oxirgi o'rnatilgan qiymatlarni
+ko'rsatishda davom etadi
+
+Har bir kuzatilayotgan qurilmaning muddati taymer g'ildiragida turadi:
+    heartbeat  muddatni ko'chirish - O(1)
+    sweep      faqat muddati o'tgan qurilmalar bilan ishlaydi - O(eskirganlar)
+    summary    hisoblagichlar har o'zgarishda yangilanadi - O(1)
+Vaqt chegarasi subsistema bo'yicha (timeouts) yoki umumiy (timeout) beriladi.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from core.timing.timing import TaymerGildiragi
+
+
+class JonlilikKuzatuvchisi:
+    """Subsistema va qurilma bo'yicha yurak urishi muddatlari"""
+
+    def __init__(self, timeout: float = 60.0, timeouts: Dict[str, float] = None, tick: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if timeout <= 0 or any(value <= 0 for value in (timeouts or {}).values()):
+            raise ValueError("timeout musbat bo'lishi kerak")
+        self.timeout = timeout
+        self.timeouts = dict(timeouts or {})
+        self._clock = clock
+        self._gildirak = TaymerGildiragi(tick)
+        self._kuzatilgan: Dict[str, int] = {}
+        self._eskirgan: Dict[str, Set[str]] = {}
+        self._eskirgan_soni = 0
+        self._lock = threading.Lock()
+
+    def timeout_for(self, subsystem_name: str) -> float:
+        return self.timeouts.get(subsystem_name, self.timeout)
+
+    def _urish(self, subsystem_name: str, device_id: str, deadline: float) -> bool:
+        """Muddatni yangilash (qulf ushlangan holda); eskirgan qurilma qaytsa - True"""
+        key = (subsystem_name, device_id)
+        revived = False
+        if key not in self._gildirak:
+            stale = self._eskirgan.get(subsystem_name)
+            if stale is not None and device_id in stale:
+                stale.discard(device_id)
+                self._eskirgan_soni -= 1
+                revived = True
+            else:
+                self._kuzatilgan[subsystem_name] = self._kuzatilgan.get(subsystem_name, 0) + 1
+        self._gildirak.schedule(key, deadline)
+        return revived
+
+    def heartbeat(self, subsystem_name: str, device_id: str, now: float = None,
+                  timeout: float = None) -> bool:
+        """Qurilma tirik: muddat `timeout` (yoki subsistema chegarasi) ga suriladi; qaytgan bo'lsa - True"""
+        now = self._clock() if now is None else now
+        deadline = now + (timeout or self.timeout_for(subsystem_name))
+        with self._lock:
+            return self._urish(subsystem_name, device_id, deadline)
+
+    def heartbeats(self, subsystem_name: str, device_ids: Iterable[str], now: float = None) -> List[str]:
+        """Ko'p qurilma uchun bitta qulf ostida; eskirgan holatdan qaytganlar ro'yxati"""
+        now = self._clock() if now is None else now
+        deadline = now + self.timeout_for(subsystem_name)
+        urish = self._urish
+        with self._lock:
+            return [device_id for device_id in device_ids if urish(subsystem_name, device_id, deadline)]
+
+    def forget(self, subsystem_name: str, device_id: str) -> bool:
+        """Qurilmani kuzatishdan chiqarish"""
+        with self._lock:
+            if self._gildirak.cancel((subsystem_name, device_id)):
+                self._kuzatilgan[subsystem_name] -= 1
+                return True
+            stale = self._eskirgan.get(subsystem_name)
+            if stale is not None and device_id in stale:
+                stale.discard(device_id)
+                self._eskirgan_soni -= 1
+                self._kuzatilgan[subsystem_name] -= 1
+                return True
+            return False
+
+    def sweep(self, now: float = None) -> Dict[str, List[str]]:
+        """Muddati o'tgan qurilmalarni eskirgan deb belgilash: subsistema -> yangi eskirganlar"""
+        now = self._clock() if now is None else now
+        expired: Dict[str, List[str]] = {}
+        with self._lock:
+            for (subsystem_name, device_id), _ in self._gildirak.pop_due(now):
+                expired.setdefault(subsystem_name, []).append(device_id)
+                self._eskirgan.setdefault(subsystem_name, set()).add(device_id)
+                self._eskirgan_soni += 1
+        return expired
+
+    def is_alive(self, subsystem_name: str, device_id: str) -> Optional[bool]:
+        """True/False, qurilma kuzatilmasa - None"""
+        if (subsystem_name, device_id) in self._gildirak:
+            return True
+        if device_id in self._eskirgan.get(subsystem_name, ()):
+            return False
+        return None
+
+    def stale(self, subsystem_name: str = None):
+        """Eskirgan qurilmalar: subsistema berilsa - to'plam, aks holda subsistema -> ro'yxat"""
+        with self._lock:
+            if subsystem_name is not None:
+                return set(self._eskirgan.get(subsystem_name, ()))
+            return {name: sorted(ids) for name, ids in self._eskirgan.items() if ids}
+
+    def summary(self) -> dict:
+        """Umumiy va subsistema bo'yicha hisoblagichlar (qurilmalar soniga bog'liq emas)"""
+        with self._lock:
+            tracked = sum(self._kuzatilgan.values())
+            by_subsystem = {
+                name: {'tracked': count, 'stale': len(self._eskirgan.get(name, ())),
+                       'alive': count - len(self._eskirgan.get(name, ()))}
+                for name, count in self._kuzatilgan.items()
+            }
+            return {'tracked': tracked, 'alive': tracked - self._eskirgan_soni,
+                    'stale': self._eskirgan_soni, 'subsystems': by_subsystem}
+
+
+# Eski kod uchun - English alias
+LivenessTracker = JonlilikKuzatuvchisi
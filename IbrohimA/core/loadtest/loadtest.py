@@ -0,0 +1,318 @@
+"""
+Yuklama Sinovi - Kontrolerga sintetik ish yuklamasi berish
+Foydalanish: joriy etishdan oldin apparat hajmini aniqlash - berilgan amallar
+aralashmasi va tezlikda erishilgan o'tkazuvchanlik, kechikish va xatolar
+
+    python -m core.loadtest.loadtest --devices 10000 --threads 8 --rate 20000 \\
+        --duration 10 --mix status=80,command=15,provision=5
+
+Amallar:
+    status            bitta qurilma statusi (get_device_status)
+    subsystem_status  butun subsistema statusi
+    query             filtrlangan so'rov
+    command           qurilma buyrug'i (device_command) - yuklama chekloviga bo'ysunadi
+    telemetry         bitta o'qish (apply_telemetry)
+    provision         yangi qurilma yaratish va qo'shish
+Tezlik berilsa - ochiq tsikl: har bir oqim amallarni rejalashtirilgan vaqtda
+boshlaydi va kechikish shu vaqtdan o'lchanadi, shuning uchun tizim orqada
+qolganda navbatda kutish ham kechikishga kiradi (coordinated omission yo'q).
+Tezlik berilmasa - yopiq tsikl, har bir oqim imkon qadar tez ishlaydi.
+Har bir amal API va menyu kabi kontroler qulfi ostida bajariladi, shuning
+uchun qulfni kutish ham kechikishga kiradi.
+"""
+
+import argparse
+import bisect
+import contextlib
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from core.proxy.proxy import YuklamaRadEtildi
+
+SUBSISTEMALAR = ('lighting', 'security', 'transport', 'energy')
+AMALLAR = ('status', 'subsystem_status', 'query', 'command', 'telemetry', 'provision')
+ODATIY_ARALASHMA = {'status': 80, 'command': 15, 'provision': 5}
+FOIZLAR = (('p50', 0.50), ('p90', 0.90), ('p99', 0.99), ('p999', 0.999))
+_SIGNALLAR = ('red', 'yellow', 'green')
+
+
+def aralashmani_tahlil(text: str) -> Dict[str, float]:
+    """'status=80,command=15,provision=5' -> {'status': 80.0, ...}"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def _foizlar(latencies: List[float]) -> Dict[str, float]:
+    """Saralangan kechikishlar (soniya) -> millisekundlarda p50..p999, max, o'rtacha"""
+    if not latencies:
+        return {}
+    last = len(latencies) - 1
+    summary = {name: latencies[int(q * last)] * 1000 for name, q in FOIZLAR}
+    summary['max'] = latencies[-1] * 1000
+    summary['mean'] = sum(latencies) / len(latencies) * 1000
+    return summary
+
+
+class YuklamaHisoboti:
+    """Yuklama sinovi natijasi: o'tkazuvchanlik, kechikish foizlari, xatolar - amal bo'yicha"""
+
+    def __init__(self, mix: Dict[str, float], threads: int, target_rate: Optional[float]):
+        self.mix = mix
+        self.threads = threads
+        self.target_rate = target_rate
+        self.seconds = 0.0
+        self.latencies: Dict[str, List[float]] = {op: [] for op in mix}
+        self.errors: Dict[str, int] = {op: 0 for op in mix}
+        self.rejected: Dict[str, int] = {op: 0 for op in mix}
+        self.error_samples: List[str] = []
+
+    @property
+    def operations(self) -> int:
+        return sum(len(values) for values in self.latencies.values())
+
+    @property
+    def throughput(self) -> float:
+        return self.operations / self.seconds if self.seconds else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        total = self.operations
+        return (sum(self.errors.values()) + sum(self.rejected.values())) / total if total else 0.0
+
+    def as_dict(self) -> dict:
+        every = sorted(value for values in self.latencies.values() for value in values)
+        return {
+            'threads': self.threads, 'target_rate': self.target_rate, 'seconds': self.seconds,
+            'operations': self.operations, 'throughput': self.throughput, 'error_rate': self.error_rate,
+            'latency_ms': _foizlar(every),
+            'operations_by_type': {
+                op: {'count': len(values), 'errors': self.errors[op], 'rejected': self.rejected[op],
+                     'latency_ms': _foizlar(values)}
+                for op, values in self.latencies.items()
+            },
+            'error_samples': list(self.error_samples),
+        }
+
+    def __str__(self):
+        data = self.as_dict()
+        target = f"{self.target_rate:,.0f}/s" if self.target_rate else "cheklanmagan"
+        lines = [f"{data['operations']:,} amal, {self.seconds:.2f}s, {self.threads} oqim - "
+                 f"{data['throughput']:,.0f} amal/s (maqsad: {target}), xatolar: {data['error_rate']:.2%}",
+                 f"  {'amal':<18}{'soni':>10}{'xato':>8}{'rad':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for op, stats in data['operations_by_type'].items():
+            latency = stats['latency_ms'] or {'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+            lines.append(f"  {op:<18}{stats['count']:>10,}{stats['errors']:>8}{stats['rejected']:>8}"
+                         f"{latency['p50']:>10.3f}{latency['p99']:>10.3f}{latency['max']:>10.3f}")
+        return "\n".join(lines)
+
+
+class YuklamaGeneratori:
+    """
+    Amallar aralashmasini bir nechta oqimdan kontrolerga berish.
+    mix: amal -> og'irlik; rate: umumiy maqsad (amal/s, None - cheklanmagan);
+    duration yoki operations (qaysi biri avval tugasa) sinov uzunligini belgilaydi.
+    """
+
+    def __init__(self, controller, mix: Dict[str, float] = None, threads: int = 4,
+                 rate: float = None, duration: float = 10.0, operations: int = None,
+                 seed: int = None, quiet: bool = True, clock: Callable[[], float] = time.perf_counter):
+        mix = dict(mix or ODATIY_ARALASHMA)
+        unknown = set(mix) - set(AMALLAR)
+        if unknown:
+            raise ValueError(f"Noma'lum amal(lar): {', '.join(sorted(unknown))} ({', '.join(AMALLAR)})")
+        if not mix or any(weight < 0 for weight in mix.values()) or sum(mix.values()) <= 0:
+            raise ValueError("Aralashma og'irliklari musbat bo'lishi kerak")
+        if threads < 1 or (rate is not None and rate <= 0):
+            raise ValueError("threads va rate musbat bo'lishi kerak")
+        self.controller = controller
+        self.mix = mix
+        self.threads = threads
+        self.rate = rate
+        self.duration = duration
+        self.operations = operations
+        self.seed = seed
+        self.quiet = quiet
+        self._clock = clock
+        self._ops = list(mix)
+        self._cumulative = []
+        total = 0.0
+        for op in self._ops:
+            total += mix[op]
+            self._cumulative.append(total)
+        self._ids: Dict[str, List[str]] = {}
+        self._names: List[str] = []
+
+    def _qurilmalar(self) -> Dict[str, List[str]]:
+        """Sinovdan oldin subsistema bo'yicha qurilma id lari (tasodifiy tanlash uchun)"""
+        ids = {}
+        for name in SUBSISTEMALAR:
+            subsystem = self.controller._haqiqiy_subsistema(name)
+            devices = getattr(subsystem, 'devices', None)
+            if not isinstance(devices, dict):
+                devices = subsystem.get_status()['devices']
+            if devices:
+                ids[name] = list(devices)
+        if not ids:
+            raise ValueError("Kontrolerda qurilmalar yo'q - avval qurilmalarni qo'shing")
+        return ids
+
+    def _bajarish(self, op: str, rng: random.Random, thread_index: int, counter: int):
+        controller = self.controller
+        name = rng.choice(self._names)
+        if op == 'provision':
+            device_id = f"LOAD-{thread_index}-{counter}"
+            device = controller.create_device(name, device_id, f"Load zone {counter % 50}")
+            controller.add_device_to_subsystem(name, device_id, device)
+            return
+        device_id = rng.choice(self._ids[name])
+        if op == 'status':
+            controller.get_device_status(name, device_id)
+        elif op == 'subsystem_status':
+            controller.get_subsystem_status(name)
+        elif op == 'query':
+            controller.query(name, {'device_id': device_id})
+        elif op == 'telemetry':
+            attribute, value = self._oqish(name, rng)
+            controller.apply_telemetry(name, [(device_id, attribute, value)])
+        elif name == 'lighting':
+            controller.device_command(name, device_id, 'set_brightness', rng.randrange(101),
+                                      client_id=f"load-{thread_index}")
+        elif name == 'transport':
+            controller.device_command(name, device_id, 'set_signal', rng.choice(_SIGNALLAR),
+                                      client_id=f"load-{thread_index}")
+        elif name == 'energy':
+            controller.device_command(name, device_id, 'update_consumption', rng.uniform(0, 50),
+                                      client_id=f"load-{thread_index}")
+        else:
+            controller.device_command(name, device_id, 'start', client_id=f"load-{thread_index}")
+
+    @staticmethod
+    def _oqish(name: str, rng: random.Random):
+        if name == 'lighting':
+            return 'brightness', rng.randrange(101)
+        if name == 'transport':
+            return 'current_signal', rng.choice(_SIGNALLAR)
+        if name == 'energy':
+            return 'power_consumption', rng.uniform(0, 50)
+        return 'is_recording', rng.random() < 0.5
+
+    def _ishchi(self, thread_index: int, started: float, report: YuklamaHisoboti, lock: threading.Lock):
+        rng = random.Random(None if self.seed is None else self.seed + thread_index)
+        clock, ops, cumulative = self._clock, self._ops, self._cumulative
+        controller_lock = self.controller.lock
+        total_weight = cumulative[-1]
+        interval = self.threads / self.rate if self.rate else None
+        deadline = started + self.duration if self.duration else None
+        limit = None
+        if self.operations is not None:
+            # Amallar oqimlar orasida teng bo'linadi (qoldiq birinchi oqimlarga)
+            limit = self.operations // self.threads + (thread_index < self.operations % self.threads)
+        latencies = {op: [] for op in ops}
+        errors = dict.fromkeys(ops, 0)
+        rejected = dict.fromkeys(ops, 0)
+        samples = []
+        counter = 0
+        # Oqimlar bir vaqtda boshlamasligi uchun rejalar siljitiladi
+        intended = started + (interval * thread_index / self.threads if interval else 0.0)
+        while limit is None or counter < limit:
+            now = clock()
+            if deadline is not None and now >= deadline:
+                break
+            if interval is not None:
+                if intended > now:
+                    time.sleep(intended - now)
+                begin = intended
+                intended += interval
+            else:
+                begin = now
+            op = ops[bisect.bisect_left(cumulative, rng.random() * total_weight)]
+            try:
+                with controller_lock:
+                    self._bajarish(op, rng, thread_index, counter)
+            except YuklamaRadEtildi:
+                rejected[op] += 1
+            except Exception as error:
+                errors[op] += 1
+                if len(samples) < 5:
+                    samples.append(f"{op}: {type(error).__name__}: {error}")
+            latencies[op].append(clock() - begin)
+            counter += 1
+        with lock:
+            for op in ops:
+                report.latencies[op].extend(latencies[op])
+                report.errors[op] += errors[op]
+                report.rejected[op] += rejected[op]
+            report.error_samples.extend(samples[:max(0, 20 - len(report.error_samples))])
+
+    def run(self) -> YuklamaHisoboti:
+        """Sinovni bajarish (chaqiruvchi oqim barcha ishchilar tugashini kutadi)"""
+        self._ids = self._qurilmalar()
+        self._names = list(self._ids)
+        report = YuklamaHisoboti(self.mix, self.threads, self.rate)
+        lock = threading.Lock()
+        stdout = open(os.devnull, 'w') if self.quiet else None
+        try:
+            with contextlib.redirect_stdout(stdout) if stdout else contextlib.nullcontext():
+                started = self._clock()
+                workers = [threading.Thread(target=self._ishchi, args=(index, started, report, lock),
+                                            name=f"load-{index}", daemon=True)
+                           for index in range(self.threads)]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                report.seconds = self._clock() - started
+        finally:
+            if stdout:
+                stdout.close()
+        for values in report.latencies.values():
+            values.sort()
+        return report
+
+
+def main(argv=None) -> int:
+    """Buyruq qatori: yangi shahar yaratib, unga yuklama berish va hisobotni chiqarish"""
+    import json
+    from core.registry.registry import CityRegistry
+    parser = argparse.ArgumentParser(description="SmartCity controller load test")
+    parser.add_argument('--devices', type=int, default=10_000, help="devices per subsystem")
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=None, help="target operations/s (default: unlimited)")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds")
+    parser.add_argument('--operations', type=int, default=None, help="stop after this many operations")
+    parser.add_argument('--mix', default='status=80,command=15,provision=5')
+    parser.add_argument('--shards', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args(argv)
+    registry = CityRegistry()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        controller = registry.create("loadtest", shards=args.shards)
+        for name in SUBSISTEMALAR:
+            ids = [f"{name.upper()}-{i}" for i in range(args.devices)]
+            devices = controller.create_devices(name, ids, [f"{name} area {i % 100}" for i in range(args.devices)])
+            controller.add_devices_to_subsystem(name, dict(zip(ids, devices)))
+    try:
+        report = YuklamaGeneratori(controller, aralashmani_tahlil(args.mix), args.threads, args.rate,
+                                   args.duration, args.operations, args.seed).run()
+    finally:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            registry.shutdown_all()
+    print(json.dumps(report.as_dict(), indent=2) if args.json else report)
+    return 0
+
+
+# Eski kod uchun - English aliases
+LoadReport = YuklamaHisoboti
+WorkloadGenerator = YuklamaGeneratori
+parse_mix = aralashmani_tahlil
+DEFAULT_MIX = ODATIY_ARALASHMA
+
+if __name__ == '__main__':
+    raise SystemExit(main())
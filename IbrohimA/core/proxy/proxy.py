@@ -1,10 +1,99 @@
 """
 Proxy Naqshi Implementatsiyasi
 Foydalanish: Subsistemamalarga kirish huquqini boshqarish va kechiktirilgan initsializatsiya
+
+Yuklamani cheklash (admission control) ham shu yerda: mijoz va subsistema
+bo'yicha token chelaklari hamda barcha proksilar uchun umumiy parallellik
+chegarasi. Cheklovlar sozlanmagan bo'lsa, tekshiruv bitta shartdan iborat.
 """
 
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from core.tracing.tracing import oraliq
+
+# Mijoz chelaklari lug'atining maksimal hajmi (eng uzoq ishlatilmaganlari chiqarib tashlanadi)
+MAX_CLIENT_BUCKETS = 10_000
+
+
+class YuklamaRadEtildi(RuntimeError):
+    """
+    Chaqiruv yuklama cheklovi tufayli qabul qilinmadi.
+    reason: 'client' / 'subsystem' (tezlik chegarasi) yoki 'concurrency' (band)
+    retry_after: qayta urinishdan oldin kutish kerak bo'lgan soniyalar
+    """
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Yuklama cheklovi ({reason}): {retry_after:.3f}s dan keyin qayta urining")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenChelagi:
+    """
+    Token chelagi: soniyasiga `rate` token to'ladi, ko'pi bilan `capacity` (portlash)
+    capacity berilmasa - max(rate, 1): soniyasiga 1 dan kam tezlikda ham bitta chaqiruv o'tadi
+    """
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float = None):
+        if rate <= 0:
+            raise ValueError("rate musbat bo'lishi kerak")
+        if capacity is None:
+            capacity = max(rate, 1.0)
+        elif capacity < 1:
+            raise ValueError("capacity kamida 1 bo'lishi kerak")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self, now: float) -> float:
+        """Bitta token olish: 0.0 - qabul qilindi, aks holda kutish vaqti (soniya)"""
+        tokens = self.tokens
+        if now > self.updated:
+            tokens += (now - self.updated) * self.rate
+            if tokens > self.capacity:
+                tokens = self.capacity
+            self.updated = now
+        if tokens >= 1.0:
+            self.tokens = tokens - 1.0
+            return 0.0
+        self.tokens = tokens
+        return (1.0 - tokens) / self.rate
+
+    def refund(self):
+        self.tokens = min(self.tokens + 1.0, self.capacity)
+
+
+class ParallellikChegarasi:
+    """
+    Bir vaqtda bajarilayotgan chaqiruvlar soni chegarasi.
+    Bitta nusxa barcha proksilarga beriladi - chegara global bo'ladi.
+    """
+
+    def __init__(self, max_concurrent: int, retry_after: float = 0.05):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent kamida 1 bo'lishi kerak")
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self.in_flight >= self.max_concurrent:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
 
 
 class ISubsistemProxy(ABC):
@@ -15,7 +104,7 @@ class ISubsistemProxy(ABC):
         pass
     
     @abstractmethod
-    def get_status(self) -> dict:
+    def get_status(self, compact: bool = False, client_id: str = None) -> dict:
         pass
     
     @abstractmethod
@@ -33,6 +122,82 @@ class SubsistemProxy(ISubsistemProxy):
         self._real_subsystem = real_subsystem
         self._initialized = False
         self._access_count = 0
+        self._limits_enabled = False
+        self._client_limit: Optional[Tuple[float, float]] = None
+        self._client_buckets: 'OrderedDict[str, TokenChelagi]' = OrderedDict()
+        self._subsystem_bucket: Optional[TokenChelagi] = None
+        self._concurrency: Optional[ParallellikChegarasi] = None
+        self._admission_lock = threading.Lock()
+        self._admission_counts = {'admitted': 0, 'throttled': 0, 'rejected': 0}
+    
+    def set_limits(self, client_rate: float = None, client_burst: float = None,
+                   subsystem_rate: float = None, subsystem_burst: float = None,
+                   concurrency: ParallellikChegarasi = None):
+        """
+        Yuklama cheklovlarini sozlash (hammasi None - cheklovlar o'chiriladi)
+        client_*: har bir mijoz uchun alohida chelak, subsystem_*: umumiy chelak
+        """
+        if client_rate:
+            # Mijoz chelaklari kechiktirib yaratiladi - noto'g'ri sozlama shu yerda rad etilsin
+            TokenChelagi(client_rate, client_burst)
+        with self._admission_lock:
+            self._client_limit = (client_rate, client_burst) if client_rate else None
+            self._client_buckets = OrderedDict()
+            self._subsystem_bucket = TokenChelagi(subsystem_rate, subsystem_burst) if subsystem_rate else None
+            self._concurrency = concurrency
+            self._limits_enabled = bool(self._client_limit or self._subsystem_bucket or concurrency)
+    
+    def admit(self, client_id: str = 'local'):
+        """
+        Chaqiruvni qabul qilish yoki YuklamaRadEtildi ko'tarish.
+        Parallellik chegarasi bo'lsa, chaqiruv tugagach `release()` chaqirilishi shart.
+        """
+        if not self._limits_enabled:
+            self._admission_counts['admitted'] += 1
+            return
+        now = time.monotonic()
+        with self._admission_lock:
+            client_bucket = None
+            if self._client_limit is not None:
+                buckets = self._client_buckets
+                client_bucket = buckets.get(client_id)
+                if client_bucket is None:
+                    # LRU: faol (masalan, to'xtatilgan) mijoz chelagi yangi id lar bilan siqib chiqarilmaydi
+                    if len(buckets) >= MAX_CLIENT_BUCKETS:
+                        buckets.popitem(last=False)
+                    client_bucket = buckets[client_id] = TokenChelagi(*self._client_limit)
+                else:
+                    buckets.move_to_end(client_id)
+                wait = client_bucket.take(now)
+                if wait:
+                    self._admission_counts['throttled'] += 1
+                    raise YuklamaRadEtildi('client', wait)
+            if self._subsystem_bucket is not None:
+                wait = self._subsystem_bucket.take(now)
+                if wait:
+                    if client_bucket is not None:
+                        client_bucket.refund()
+                    self._admission_counts['throttled'] += 1
+                    raise YuklamaRadEtildi('subsystem', wait)
+            concurrency = self._concurrency
+            if concurrency is not None and not concurrency.acquire():
+                if client_bucket is not None:
+                    client_bucket.refund()
+                if self._subsystem_bucket is not None:
+                    self._subsystem_bucket.refund()
+                self._admission_counts['rejected'] += 1
+                raise YuklamaRadEtildi('concurrency', concurrency.retry_after)
+            self._admission_counts['admitted'] += 1
+    
+    def release(self):
+        """Qabul qilingan chaqiruv tugadi (parallellik o'rnini bo'shatish)"""
+        concurrency = self._concurrency
+        if concurrency is not None:
+            concurrency.release()
+    
+    def admission_stats(self) -> Dict[str, int]:
+        """Qabul qilingan / tezlik bo'yicha to'xtatilgan / band sababli rad etilgan chaqiruvlar"""
+        return dict(self._admission_counts)
     
     def initialize(self):
         """Kechiktirilgan initsializatsiya - faqat birinchi marta kirish vaqtida initsializatsiya"""
@@ -43,14 +208,24 @@ class SubsistemProxy(ISubsistemProxy):
         else:
             print(f"[PROXY] {self._real_subsystem.get_name()} allaqachon initsializatsiya qilingan")
     
-    def get_status(self) -> dict:
-        """Haqiqiy ob'ektga jurnallash bilan kirish"""
+    def get_status(self, compact: bool = False, client_id: str = None) -> dict:
+        """Haqiqiy ob'ektga jurnallash bilan kirish (client_id bo'yicha yuklama cheklovi)"""
         if not self._initialized:
             self.initialize()
         
-        self._access_count += 1
-        status = self._real_subsystem.get_status()
+        with oraliq('get_status', 'SubsistemProxy'):
+            with oraliq('admit', 'SubsistemProxy'):
+                self.admit('local' if client_id is None else client_id)
+            try:
+                self._access_count += 1
+                real = self._real_subsystem
+                with oraliq('get_status', type(real).__name__):
+                    status = real.get_status(compact=True) if compact else real.get_status()
+            finally:
+                self.release()
         status['access_count'] = self._access_count
+        if self._limits_enabled:
+            status['admission'] = self.admission_stats()
         return status
     
     def execute_command(self, command: str) -> bool:
@@ -64,6 +239,12 @@ class SubsistemProxy(ISubsistemProxy):
             print(f"[PROXY] Kirish Rad Qilindi: '{command}' buyruqiga ruhsat yo'q")
             return False
         
+        try:
+            self.admit()
+        except YuklamaRadEtildi as error:
+            print(f"[PROXY] {error}")
+            return False
+        self.release()
         print(f"[PROXY] Buyruq bajarilmoqda: {command}")
         return True
     
@@ -78,3 +259,6 @@ class SubsistemProxy(ISubsistemProxy):
 # Eski kod uchun
 ISubsystemProxy = ISubsistemProxy
 SubsystemProxy = SubsistemProxy
+AdmissionRejected = YuklamaRadEtildi
+TokenBucket = TokenChelagi
+ConcurrencyLimit = ParallellikChegarasi
@@ -0,0 +1,145 @@
+"""
+Status So'rovlari - Predikat va proyeksiyani subsistema ichida bajarish
+Foydalanish: "o'chiq chiroqlar", "yozmayotgan kameralar" kabi so'rovlar uchun
+butun statusni qurmasdan, faqat mos qurilmalar va kerakli maydonlarni olish
+
+Shart (where) - status kaliti -> qiymat yoki (operator, qiymat):
+    {'is_on': False}
+    {'brightness': ('<', 30), 'location': ('in', ['Main St', 'Oak Ave'])}
+Operatorlar: == != < <= > >= in
+
+So'rov qurilma klassi uchun bir marta Python funksiyasiga kompilyatsiya
+qilinadi va keshlanadi. Qurilma klassi STATUS_SLOTS (status kaliti -> slot)
+e'lon qilgan bo'lsa, shart to'g'ridan-to'g'ri slotlarda tekshiriladi;
+Flyweight maydonlari (slot nomi '_' bilan) uchun tenglik butun son handle
+lar orasida solishtiriladi. Aks holda har bir qurilmaning status() lug'ati
+ishlatiladi. Natija lug'atlari faqat mos qurilmalar uchun quriladi.
+"""
+
+from typing import Callable, Dict, Iterable, Optional
+
+from core.flyweight.flyweight import attribute_registry
+
+OPERATORS = ('==', '!=', '<', '<=', '>', '>=', 'in')
+
+_MAX_CACHED_PLANS = 256
+_rejalar: Dict[tuple, Callable] = {}
+
+
+def _normalize(where: Optional[dict]) -> tuple:
+    """Shartni (maydon, operator, qiymat) ko'rinishidagi xeshlanadigan kortejga keltirish"""
+    terms = []
+    for field, condition in (where or {}).items():
+        if isinstance(condition, tuple) and len(condition) == 2 and condition[0] in OPERATORS:
+            op, value = condition
+        else:
+            op, value = '==', condition
+        if op == 'in':
+            value = tuple(value)
+        terms.append((field, op, value))
+    return tuple(sorted(terms, key=lambda term: (term[0], term[1])))
+
+
+def _bosh_skan(items) -> dict:
+    """Hech qaysi qurilma mos kelmaydigan so'rov (masalan, noma'lum joylashuv)"""
+    return {}
+
+
+def _compile(device_class, terms: tuple, fields: Optional[tuple]):
+    """Shart va proyeksiyani o'z ichiga olgan skan funksiyasini yaratish: (funksiya, keshlanadimi)"""
+    slots = getattr(device_class, 'STATUS_SLOTS', None)
+    namespace = {'_lookup': attribute_registry.value}
+    cacheable = True
+
+    def access(field: str, decoded: bool) -> str:
+        if slots is None:
+            return f"s[{field!r}]"
+        if field not in slots:
+            raise ValueError(f"Noma'lum maydon: {field} ({', '.join(slots)})")
+        slot = slots[field]
+        if slot.startswith('_') and decoded:
+            return f"_lookup(d.{slot})"
+        return f"d.{slot}"
+
+    clauses = []
+    for index, (field, op, value) in enumerate(terms):
+        name = f"_v{index}"
+        flyweight = slots is not None and slots.get(field, '').startswith('_')
+        if flyweight and op in ('==', '!=', 'in'):
+            # Satr o'rniga handle solishtiriladi
+            handle = attribute_registry.handle
+            handles = [handle(item) for item in (value if op == 'in' else (value,))]
+            # Hali jadvalda yo'q satr keyinroq paydo bo'lishi mumkin - bunday reja keshlanmaydi
+            cacheable = cacheable and None not in handles
+            if op == 'in':
+                value = frozenset(h for h in handles if h is not None)
+                if not value:
+                    return _bosh_skan, cacheable
+            else:
+                value = -1 if handles[0] is None else handles[0]
+                if value == -1 and op == '==':
+                    return _bosh_skan, cacheable
+            subject = access(field, decoded=False)
+        else:
+            if op == 'in':
+                value = frozenset(value)
+            subject = access(field, decoded=True)
+        namespace[name] = value
+        clauses.append(f"{subject} {'in' if op == 'in' else op} {name}")
+
+    condition = ' and '.join(clauses) or 'True'
+    if fields is not None:
+        items = ', '.join(f"{field!r}: {access(field, decoded=True)}" for field in fields)
+        row = f"{{{items}}}"
+    else:
+        row = 'd.status()' if slots is not None else 's'
+    if slots is not None:
+        # Butun tsikl bitta lug'at ifodasi - qurilma boshiga funksiya chaqiruvi yo'q
+        source = f"def _scan(items):\n    return {{k: {row} for k, d in items if {condition}}}\n"
+    else:
+        source = (f"def _scan(items):\n    result = {{}}\n    for k, d in items:\n"
+                  f"        s = d.status()\n        if {condition}:\n            result[k] = {row}\n"
+                  f"    return result\n")
+    exec(source, namespace)
+    return namespace['_scan'], cacheable
+
+
+def plan(device_class, where: Optional[dict] = None, fields: Optional[Iterable[str]] = None) -> Callable:
+    """Qurilma klassi uchun kompilyatsiya qilingan skan funksiyasi (keshdan yoki yangi)"""
+    terms = _normalize(where)
+    fields_key = tuple(fields) if fields is not None else None
+    key = (device_class, terms, fields_key)
+    scan = _rejalar.get(key)
+    if scan is None:
+        scan, cacheable = _compile(device_class, terms, fields_key)
+        if cacheable:
+            if len(_rejalar) >= _MAX_CACHED_PLANS:
+                _rejalar.clear()
+            _rejalar[key] = scan
+    return scan
+
+
+def run_query(devices: Dict[str, object], where: Optional[dict] = None,
+              fields: Optional[Iterable[str]] = None) -> Dict[str, dict]:
+    """
+    Qurilmalar lug'ati bo'yicha so'rov: device_id -> (proyeksiya qilingan) status.
+    fields berilmasa - mos qurilmalarning to'liq statusi.
+    """
+    if not devices:
+        return {}
+    device_classes = {device.__class__ for device in devices.values()} if len(devices) < 64 else None
+    if device_classes is None:
+        # Katta subsistemalar bir turdagi qurilmalardan iborat - avval birinchisining rejasi sinaladi
+        first_class = next(iter(devices.values())).__class__
+        try:
+            return plan(first_class, where, fields)(devices.items())
+        except (AttributeError, KeyError):
+            device_classes = {device.__class__ for device in devices.values()}
+    if len(device_classes) == 1:
+        return plan(device_classes.pop(), where, fields)(devices.items())
+    result = {}
+    for device_class in device_classes:
+        result.update(plan(device_class, where, fields)(
+            (device_id, device) for device_id, device in devices.items() if device.__class__ is device_class
+        ))
+    return {device_id: result[device_id] for device_id in devices if device_id in result}
@@ -0,0 +1,97 @@
+"""
+Shaharlar Reestri - Bir jarayonda bir nechta shahar (tenant) kontrolerlari
+Foydalanish: ko'p kichik shaharlarni bitta jarayonda birlashtirish - importlar,
+fabrikalar va Flyweight qatorlar registri umumiy, subsistemalar esa alohida
+
+Asosiy shahar (ASOSIY_SHAHAR) - bu SmartCityController() singletoni; reestr
+uni shu nom bilan qaytaradi, shuning uchun eski kod o'zgarishsiz ishlaydi.
+Boshqa nomlar uchun alohida kontroler yaratiladi va initsializatsiya qilinadi.
+"""
+
+import threading
+from typing import Dict, Iterator, List, Optional
+
+from core.controller import ASOSIY_SHAHAR, SmartCityController
+
+
+class ShaharlarReestri:
+    """Shahar nomi -> SmartCityController"""
+
+    def __init__(self):
+        self._shaharlar: Dict[str, SmartCityController] = {}
+        self._lock = threading.Lock()
+
+    def get(self, city_name: str) -> Optional[SmartCityController]:
+        """Shahar kontroleri (asosiy shahar - singleton); ro'yxatda bo'lmasa - None"""
+        with self._lock:
+            controller = self._shaharlar.get(city_name)
+            if controller is None and city_name == ASOSIY_SHAHAR:
+                controller = self._shaharlar[city_name] = SmartCityController()
+            return controller
+
+    def create(self, city_name: str, shards: int = 0) -> SmartCityController:
+        """Yangi shahar kontrolerini yaratish va initsializatsiya qilish"""
+        with self._lock:
+            if city_name in self._shaharlar or city_name == ASOSIY_SHAHAR:
+                raise ValueError(f"Shahar allaqachon mavjud: {city_name}")
+            controller = SmartCityController.new_city(city_name)
+            self._shaharlar[city_name] = controller
+        controller.initialize(shards=shards)
+        return controller
+
+    def get_or_create(self, city_name: str, shards: int = 0) -> SmartCityController:
+        controller = self.get(city_name)
+        if controller is None:
+            controller = self.create(city_name, shards)
+        return controller
+
+    def remove(self, city_name: str) -> bool:
+        """Shaharni o'chirish va reestrdan chiqarish"""
+        with self._lock:
+            controller = self._shaharlar.pop(city_name, None)
+        if controller is None:
+            return False
+        if controller._initialized:
+            controller.shutdown()
+        return True
+
+    def shutdown_all(self):
+        """Barcha shaharlarni o'chirish va reestrni tozalash"""
+        for city_name in self.names():
+            self.remove(city_name)
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return list(self._shaharlar)
+
+    def summary(self) -> Dict[str, dict]:
+        """Shahar -> subsistema bo'yicha qurilmalar soni (statuslar yig'ilmaydi)"""
+        summary = {}
+        for city_name in self.names():
+            controller = self._shaharlar.get(city_name)
+            if controller is None or not controller._initialized:
+                continue
+            counts = {}
+            for name in controller._subsystems:
+                subsystem = controller._haqiqiy_subsistema(name)
+                devices = getattr(subsystem, 'devices', None)
+                counts[name] = len(devices) if isinstance(devices, dict) else subsystem.get_status()['device_count']
+            summary[city_name] = counts
+        return summary
+
+    def __contains__(self, city_name: str) -> bool:
+        return city_name in self._shaharlar
+
+    def __len__(self) -> int:
+        return len(self._shaharlar)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names())
+
+
+# Jarayon bo'yicha umumiy reestr
+shahar_reestri = ShaharlarReestri()
+
+# Eski kod uchun - English aliases
+CityRegistry = ShaharlarReestri
+city_registry = shahar_reestri
@@ -0,0 +1,285 @@
+"""
+Sharding - Qurilmalar parkini bir nechta jarayonlarga taqsimlash
+Foydalanish: Katta parklarda ommaviy operatsiyalarni GIL cheklovisiz,
+barcha CPU yadrolarida parallel bajarish
+
+Har bir shard - alohida ishchi jarayon bo'lib, o'zining haqiqiy subsistemalari
+(LightingSystem va h.k.) nusxasini saqlaydi. Qurilma `device_id` xeshi
+bo'yicha aynan bitta shardga tegishli bo'ladi. ShardlanganSubsistema odatiy
+subsistema interfeysini amalga oshiradi, shuning uchun u Proxy va Decorator
+qatlamlari ostida oddiy subsistema o'rnida ishlaydi.
+"""
+
+import importlib
+import multiprocessing
+import os
+import sys
+import threading
+import zlib
+from typing import Any, Dict, List
+
+from core.factories.factories import ISubsystem
+from core.flyweight.flyweight import FLYWEIGHT_MAYDONLAR, attribute_registry
+from core.tracing.tracing import oraliq
+
+# Subsistema nomi -> "modul.Klass" yo'li (ishchi jarayonlarda yaratiladi)
+_SUBSISTEMA_YOLLARI = {
+    'lighting': 'modules.lighting.lighting_system.LightingSystem',
+    'security': 'modules.security.security_system.SecuritySystem',
+    'transport': 'modules.transport.transport_system.TransportSystem',
+    'energy': 'modules.energy.energy_system.EnergySystem',
+}
+
+# Shardlar statuslarini birlashtirishda yig'iladigan maydonlar
+_YIGILADIGAN_MAYDONLAR = ('device_count', 'total_consumption_kwh')
+
+# Barcha shardlarga tarqatiladigan subsistemaga xos metodlar (natija - birinchi sharddan).
+# Boshqa nomlar AttributeError beradi, shuning uchun hasattr/getattr(..., None)
+# tekshiruvlari shardlangan rejimda ham to'g'ri ishlaydi.
+_TARQATILADIGAN_METODLAR = {
+    'lighting': frozenset(),
+    'security': frozenset({'set_alert_level'}),
+    'transport': frozenset(),
+    'energy': frozenset({'enable_efficiency_mode', 'disable_efficiency_mode'}),
+}
+
+
+def shard_for(device_id: str, num_shards: int) -> int:
+    """Qurilma egasi bo'lgan shard raqami (jarayonlar orasida barqaror xesh)"""
+    return zlib.crc32(device_id.encode('utf-8')) % num_shards
+
+
+def _subsistema_yaratish(name: str):
+    module_path, _, class_name = _SUBSISTEMA_YOLLARI[name].rpartition('.')
+    return getattr(importlib.import_module(module_path), class_name)()
+
+
+def _shard_worker(conn, subsystem_names: List[str]):
+    """
+    Ishchi jarayon tsikli: (operatsiya, subsistema, argumentlar) xabarlarini
+    qabul qiladi va ('ok', natija) yoki ('error', xabar) qaytaradi.
+    Shardlar konsolsiz ishlaydi - qurilmalar chiqishi /dev/null ga yo'naltiriladi.
+    """
+    sys.stdout = open(os.devnull, 'w')
+    systems = {name: _subsistema_yaratish(name) for name in subsystem_names}
+    while True:
+        try:
+            op, name, args = conn.recv()
+        except EOFError:
+            break
+        if op == 'close':
+            conn.send(('ok', None))
+            break
+        try:
+            system = systems[name]
+            if op == 'device_call':
+                device_id, method, method_args = args
+                result = getattr(system.devices[device_id], method)(*method_args)
+            elif op == 'statuses':
+                devices = system.devices
+                result = [devices[device_id].status() for device_id in args[0] if device_id in devices]
+            else:
+                result = getattr(system, op)(*args)
+            conn.send(('ok', result))
+        except Exception as error:
+            conn.send(('error', f"{type(error).__name__}: {error}"))
+
+
+class ShardlarHovuzi:
+    """
+    Shard ishchi jarayonlari hovuzi.
+    `broadcast` xabarni avval barcha shardlarga yuboradi, keyin javoblarni
+    yig'adi - shuning uchun shardlar bir vaqtda parallel ishlaydi.
+    """
+
+    def __init__(self, num_shards: int, subsystem_names: List[str] = None):
+        if num_shards < 1:
+            raise ValueError("num_shards kamida 1 bo'lishi kerak")
+        self.num_shards = num_shards
+        self._subsystem_names = list(subsystem_names or _SUBSISTEMA_YOLLARI)
+        self._lock = threading.Lock()
+        self._connections = []
+        self._processes = []
+        for _ in range(num_shards):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_shard_worker, args=(child_conn, self._subsystem_names), daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+
+    @staticmethod
+    def _javob(reply):
+        status, result = reply
+        if status != 'ok':
+            raise RuntimeError(f"Shard xatosi: {result}")
+        return result
+
+    def _ochiqligini_tekshirish(self):
+        if not self._connections:
+            raise RuntimeError("Shardlar hovuzi yopilgan")
+
+    def call(self, shard: int, op: str, subsystem: str, *args) -> Any:
+        """Bitta shardda operatsiyani bajarish"""
+        with self._lock:
+            self._ochiqligini_tekshirish()
+            conn = self._connections[shard]
+            conn.send((op, subsystem, args))
+            return self._javob(conn.recv())
+
+    def scatter(self, op: str, subsystem: str, per_shard_args: Dict[int, tuple]) -> Dict[int, Any]:
+        """Har bir shardga o'z argumentlarini parallel yuborish"""
+        with self._lock:
+            self._ochiqligini_tekshirish()
+            for shard, args in per_shard_args.items():
+                self._connections[shard].send((op, subsystem, args))
+            replies = {shard: self._connections[shard].recv() for shard in per_shard_args}
+        return {shard: self._javob(reply) for shard, reply in replies.items()}
+
+    def broadcast(self, op: str, subsystem: str, *args) -> List[Any]:
+        """Operatsiyani barcha shardlarda parallel bajarish"""
+        results = self.scatter(op, subsystem, {shard: args for shard in range(self.num_shards)})
+        return [results[shard] for shard in range(self.num_shards)]
+
+    def close(self):
+        """Ishchi jarayonlarni to'xtatish"""
+        with self._lock:
+            for conn in self._connections:
+                try:
+                    conn.send(('close', None, ()))
+                    conn.recv()
+                except (EOFError, OSError):
+                    pass
+                conn.close()
+            for process in self._processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            self._connections = []
+            self._processes = []
+
+
+class ShardlanganSubsistema(ISubsystem):
+    """
+    Bitta subsistemaning shardlarga bo'lingan ko'rinishi.
+    Qurilma qo'shish va qurilma buyruqlari egasi bo'lgan shardga yo'naltiriladi,
+    ommaviy operatsiyalar barcha shardlarga tarqatiladi va natijalar birlashtiriladi.
+    """
+
+    def __init__(self, subsystem_name: str, pool: ShardlarHovuzi):
+        self._subsystem_name = subsystem_name
+        self._pool = pool
+        self._name = None
+
+    def get_name(self) -> str:
+        if self._name is None:
+            self._name = self._pool.call(0, 'get_name', self._subsystem_name)
+        return self._name
+
+    def initialize(self):
+        self._pool.broadcast('initialize', self._subsystem_name)
+        print(f"✓ {self.get_name()} initialized ({self._pool.num_shards} shards)")
+
+    def shutdown(self):
+        self._pool.broadcast('shutdown', self._subsystem_name)
+        print(f"✗ {self.get_name()} shut down ({self._pool.num_shards} shards)")
+
+    def shard_for(self, device_id: str) -> int:
+        return shard_for(device_id, self._pool.num_shards)
+
+    def add_device(self, device_id: str, device):
+        """Qurilmani egasi bo'lgan shardga qo'shish (qurilma shardga ko'chiriladi)"""
+        self._pool.call(self.shard_for(device_id), 'add_device', self._subsystem_name, device_id, device)
+
+    def add_devices(self, devices: Dict[str, Any]):
+        """Qurilmalarni shardlar bo'yicha guruhlab, har bir shardga bitta xabar bilan yuborish"""
+        per_shard: Dict[int, dict] = {}
+        for device_id, device in devices.items():
+            per_shard.setdefault(self.shard_for(device_id), {})[device_id] = device
+        self._pool.scatter('add_devices', self._subsystem_name,
+                           {shard: (batch,) for shard, batch in per_shard.items()})
+
+    def remove_devices(self, device_ids) -> int:
+        """Qurilmalarni egasi bo'lgan shardlardan olib tashlash (har bir shardga bitta xabar)"""
+        per_shard: Dict[int, list] = {}
+        for device_id in device_ids:
+            per_shard.setdefault(self.shard_for(device_id), []).append(device_id)
+        results = self._pool.scatter('remove_devices', self._subsystem_name,
+                                     {shard: (batch,) for shard, batch in per_shard.items()})
+        return sum(results.values())
+
+    def apply_readings(self, updates) -> int:
+        """Telemetriya yangilanishlarini egasi bo'lgan shardlarga partiyalab yuborish"""
+        per_shard: Dict[int, list] = {}
+        for update in updates:
+            per_shard.setdefault(self.shard_for(update[0]), []).append(update)
+        results = self._pool.scatter('apply_readings', self._subsystem_name,
+                                     {shard: (batch,) for shard, batch in per_shard.items()})
+        return sum(results.values())
+
+    def device_call(self, device_id: str, method: str, *args) -> Any:
+        """Qurilma metodini uning shardida chaqirish"""
+        return self._pool.call(self.shard_for(device_id), 'device_call', self._subsystem_name,
+                               device_id, method, args)
+
+    def statuses(self, device_ids) -> List[dict]:
+        """Qurilmalar statuslari - har bir shardga bitta xabar (topilmaganlari tashlab ketiladi)"""
+        per_shard: Dict[int, list] = {}
+        for device_id in device_ids:
+            per_shard.setdefault(self.shard_for(device_id), []).append(device_id)
+        results = self._pool.scatter('statuses', self._subsystem_name,
+                                     {shard: (batch,) for shard, batch in per_shard.items()})
+        return [status for batch in results.values() for status in batch]
+
+    def query(self, where: dict = None, fields=None) -> dict:
+        """So'rov har bir shardda bajariladi - jarayonlar orasida faqat mos qurilmalar uzatiladi"""
+        matches = {}
+        for shard_matches in self._pool.broadcast('query', self._subsystem_name, where, fields):
+            matches.update(shard_matches)
+        return matches
+    
+    def start_all(self):
+        self._pool.broadcast('start_all', self._subsystem_name)
+
+    def stop_all(self):
+        self._pool.broadcast('stop_all', self._subsystem_name)
+
+    def get_status(self, compact: bool = False) -> dict:
+        """Barcha shardlar statusini birlashtirish"""
+        with oraliq('broadcast', 'ShardedSubsystem', shards=self._pool.num_shards):
+            statuses = self._pool.broadcast('get_status', self._subsystem_name)
+        merged = dict(statuses[0])
+        devices = {}
+        for status in statuses:
+            devices.update(status['devices'])
+        for field in _YIGILADIGAN_MAYDONLAR:
+            if field in merged:
+                merged[field] = sum(status[field] for status in statuses)
+        if compact:
+            # Shard handle lari boshqa jarayonga tegishli - mahalliy registrda qayta kodlash
+            intern = attribute_registry.intern
+            for device_status in devices.values():
+                for field in FLYWEIGHT_MAYDONLAR:
+                    if field in device_status:
+                        device_status[field] = intern(device_status[field])
+        merged['devices'] = devices
+        merged['shard_count'] = self._pool.num_shards
+        return merged
+
+    def __getattr__(self, name: str):
+        """Ruxsat etilgan subsistemaga xos metodlarni (set_alert_level va h.k.) barcha shardlarga tarqatish"""
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name not in _TARQATILADIGAN_METODLAR.get(self._subsystem_name, ()):
+            raise AttributeError(f"{type(self).__name__} ({self._subsystem_name}) da '{name}' yo'q")
+
+        def broadcast_method(*args):
+            return self._pool.broadcast(name, self._subsystem_name, *args)[0]
+        return broadcast_method
+
+
+# Eski kod uchun - English aliases
+ShardPool = ShardlarHovuzi
+ShardedSubsystem = ShardlanganSubsistema
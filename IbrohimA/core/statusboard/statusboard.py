@@ -0,0 +1,333 @@
+"""
+Holat Taxtasi - Qurilmalar holatini umumiy xotirada (shared memory) e'lon qilish
+Foydalanish: Dashboard va API jarayonlari barcha qurilmalar holatini
+kontrolerga murojaat qilmasdan, nusxa olmasdan va qulfsiz o'qiydi
+
+Xotira tuzilishi (little-endian):
+
+    sarlavha (64 bayt)   magic, layout versiyasi, sig'im, band slotlar soni,
+                         satrlar hududi sig'imi, satrlar seq, satrlar uzunligi
+    yozuvlar (64 bayt)   har bir qurilma uchun bitta slot:
+                         seq u32, tur u8, bayroq u8, yorqinlik u8, signal u8,
+                         joylashuv handle u32, iste'mol f64, device_id 32s
+    satrlar hududi       Flyweight jadvali (JSON), o'zining seq hisoblagichi bilan
+
+Seqlock: yozuvchi slot seq ini toq qiladi, maydonlarni yozadi, so'ng juft qiladi.
+O'quvchi seq ni yozuvdan oldin va keyin o'qiydi; ular teng va juft bo'lsa,
+yozuv butun. Yozuvchi o'quvchilarni hech qachon kutmaydi.
+
+Olib tashlangan qurilma sloti "qabr toshi" (tur = KIND_REMOVED) bilan
+belgilanadi va keyingi yangi qurilmaga qayta beriladi.
+"""
+
+import json
+import struct
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core.flyweight.flyweight import attribute_registry
+
+MAGIC = b'SCSB'
+LAYOUT_VERSION = 1
+
+_HEADER = struct.Struct('<4sIIIIII36x')
+_RECORD = struct.Struct('<IBBBBId32s12x')
+_SEQ = struct.Struct('<I')
+HEADER_SIZE = _HEADER.size
+RECORD_SIZE = _RECORD.size
+
+# Qurilma turlari kodlari
+KIND_LIGHT, KIND_CAMERA, KIND_TRAFFIC, KIND_ENERGY = 0, 1, 2, 3
+SUBSYSTEM_KINDS = {
+    'lighting': KIND_LIGHT,
+    'security': KIND_CAMERA,
+    'transport': KIND_TRAFFIC,
+    'energy': KIND_ENERGY,
+}
+KIND_NAMES = {kind: name for name, kind in SUBSYSTEM_KINDS.items()}
+KIND_REMOVED = 0xFF  # bo'shatilgan slot
+
+SIGNALS = ('off', 'red', 'yellow', 'green')
+_SIGNAL_CODES = {signal: code for code, signal in enumerate(SIGNALS)}
+
+FLAG_ACTIVE = 0x01  # yoqilgan / yozmoqda / ishlamoqda / monitoring
+
+# Satrlar hududi zaxirasi: har bir slot bitta yangi joylashuv nomi olib kelishi mumkin
+STRINGS_PER_SLOT = 64
+
+
+def satrlar_sigimi(capacity: int) -> int:
+    """Satrlar hududi o'lchami: joriy Flyweight jadvalining ikki barobari va slotlar zaxirasi"""
+    current = len(json.dumps(attribute_registry.table(), ensure_ascii=False).encode('utf-8'))
+    return max(1 << 16, 2 * current + capacity * STRINGS_PER_SLOT)
+
+
+class HolatTaxtasi:
+    """
+    Yozuvchi tomon: kontroler jarayonida yashaydi.
+    Har bir qurilmaga birinchi e'lon qilinganida doimiy slot beriladi.
+    strings_capacity berilmasa - satrlar_sigimi(capacity) (jadval butun
+    jarayon uchun umumiy, shuning uchun u taxta yaratilgan paytdan o'lchanadi).
+    """
+
+    def __init__(self, capacity: int, name: Optional[str] = None, strings_capacity: Optional[int] = None):
+        if strings_capacity is None:
+            strings_capacity = satrlar_sigimi(capacity)
+        self.capacity = capacity
+        self.strings_capacity = strings_capacity
+        size = HEADER_SIZE + capacity * RECORD_SIZE + strings_capacity
+        self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = self._shm.name
+        self._buf = self._shm.buf
+        self._strings_offset = HEADER_SIZE + capacity * RECORD_SIZE
+        self._slots: Dict[Tuple[str, str], int] = {}
+        self._free: List[int] = []
+        self._used = 0
+        self._seqs: List[int] = [0] * capacity
+        self._strings_seq = 0
+        self._published_strings = 0
+        self._lock = threading.Lock()  # faqat yozuvchi iplar orasida; o'quvchilar qulfsiz
+        _HEADER.pack_into(self._buf, 0, MAGIC, LAYOUT_VERSION, capacity, 0, strings_capacity, 0, 0)
+
+    def _slot(self, subsystem: str, device_id: str) -> int:
+        key = (subsystem, device_id)
+        slot = self._slots.get(key)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = self._used
+                if slot >= self.capacity:
+                    raise OverflowError(f"Holat taxtasi to'lgan ({self.capacity} slot)")
+                self._used = slot + 1
+                _HEADER.pack_into(self._buf, 0, MAGIC, LAYOUT_VERSION, self.capacity, slot + 1,
+                                  self.strings_capacity, self._strings_seq, self._published_len())
+            self._slots[key] = slot
+        return slot
+
+    def _published_len(self) -> int:
+        return _SEQ.unpack_from(self._buf, 24)[0]
+
+    def _write(self, subsystem: str, device_id: str, kind: int, flags: int, brightness: int,
+               signal: int, location: str, consumption: float):
+        with self._lock:
+            self._write_slot(self._slot(subsystem, device_id), kind, flags, brightness, signal,
+                             attribute_registry.intern(location), consumption, device_id.encode('utf-8')[:32])
+
+    def _write_slot(self, slot: int, *fields):
+        """Seqlock ostida slotni yozish (qulf chaqiruvchida)"""
+        offset = HEADER_SIZE + slot * RECORD_SIZE
+        seq = self._seqs[slot] + 1
+        _SEQ.pack_into(self._buf, offset, seq)
+        _RECORD.pack_into(self._buf, offset, seq, *fields)
+        self._seqs[slot] = seq + 1
+        _SEQ.pack_into(self._buf, offset, seq + 1)
+
+    def unpublish(self, subsystem: str, device_ids) -> int:
+        """Olib tashlangan qurilmalar slotlarini bo'shatish; bo'shatilganlar soni"""
+        released = 0
+        with self._lock:
+            for device_id in device_ids:
+                slot = self._slots.pop((subsystem, device_id), None)
+                if slot is None:
+                    continue
+                self._write_slot(slot, KIND_REMOVED, 0, 0, 0, 0, 0.0, b'')
+                self._free.append(slot)
+                released += 1
+        return released
+
+    def publish_device(self, subsystem: str, device_id: str, device):
+        """Bitta qurilma holatini e'lon qilish (device_id 32 baytdan uzun bo'lsa qisqartiriladi)"""
+        kind = SUBSYSTEM_KINDS[subsystem]
+        flags = brightness = signal = 0
+        consumption = 0.0
+        if kind == KIND_LIGHT:
+            flags = FLAG_ACTIVE if device.is_on else 0
+            brightness = device.brightness
+            location = device.location
+        elif kind == KIND_CAMERA:
+            flags = FLAG_ACTIVE if device.is_recording else 0
+            location = device.location
+        elif kind == KIND_TRAFFIC:
+            flags = FLAG_ACTIVE if device.is_operational else 0
+            signal = _SIGNAL_CODES.get(device.current_signal, 0)
+            location = device.intersection
+        else:
+            flags = FLAG_ACTIVE if device.is_monitoring else 0
+            consumption = float(device.power_consumption)
+            location = device.zone
+        self._write(subsystem, device_id, kind, flags, brightness, signal, location, consumption)
+
+    def publish_status(self, subsystem: str, device_status: dict):
+        """status() lug'atidan e'lon qilish (qurilma ob'ekti boshqa jarayonda bo'lganda)"""
+        kind = SUBSYSTEM_KINDS[subsystem]
+        flags = brightness = signal = 0
+        consumption = 0.0
+        if kind == KIND_LIGHT:
+            flags = FLAG_ACTIVE if device_status['is_on'] else 0
+            brightness = device_status['brightness']
+            location = device_status['location']
+        elif kind == KIND_CAMERA:
+            flags = FLAG_ACTIVE if device_status['is_recording'] else 0
+            location = device_status['location']
+        elif kind == KIND_TRAFFIC:
+            flags = FLAG_ACTIVE if device_status['is_operational'] else 0
+            signal = _SIGNAL_CODES.get(device_status['current_signal'], 0)
+            location = device_status['intersection']
+        else:
+            flags = FLAG_ACTIVE if device_status['is_monitoring'] else 0
+            consumption = float(device_status['power_consumption_kwh'])
+            location = device_status['zone']
+        device_id = device_status['device_id']
+        self._write(subsystem, device_id, kind, flags, brightness, signal, location, consumption)
+
+    def publish_devices(self, subsystem: str, devices: Dict[str, object]):
+        """Subsistema qurilmalarini e'lon qilish va satrlar jadvalini yangilash"""
+        publish = self.publish_device
+        for device_id, device in devices.items():
+            publish(subsystem, device_id, device)
+        self.publish_strings()
+
+    def publish_strings(self):
+        """Flyweight jadvali o'sgan bo'lsa, satrlar hududini qayta yozish"""
+        if len(attribute_registry) == self._published_strings:
+            return
+        with self._lock:
+            self._write_strings()
+
+    def _write_strings(self):
+        table = attribute_registry.table()
+        payload = json.dumps(table, ensure_ascii=False).encode('utf-8')
+        if len(payload) > self.strings_capacity:
+            raise OverflowError("Satrlar hududi yetarli emas")
+        count = _SEQ.unpack_from(self._buf, 12)[0]
+        self._strings_seq += 1
+        _HEADER.pack_into(self._buf, 0, MAGIC, LAYOUT_VERSION, self.capacity, count,
+                          self.strings_capacity, self._strings_seq, self._published_len())
+        self._buf[self._strings_offset:self._strings_offset + len(payload)] = payload
+        self._strings_seq += 1
+        _HEADER.pack_into(self._buf, 0, MAGIC, LAYOUT_VERSION, self.capacity, count,
+                          self.strings_capacity, self._strings_seq, len(payload))
+        self._published_strings = len(table)
+
+    def close(self, unlink: bool = True):
+        """Segmentni yopish (va yozuvchi sifatida o'chirish)"""
+        self._buf = None
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+
+def _kuzatuvsiz_ulanish(name: str) -> shared_memory.SharedMemory:
+    """
+    Segmentga resource_tracker ro'yxatisiz ulanish: o'quvchi segment egasi emas,
+    jarayon tugaganda segmentni o'chirib yubormasligi kerak
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    register = resource_tracker.register
+    resource_tracker.register = lambda resource, rtype: (
+        None if rtype == 'shared_memory' else register(resource, rtype)
+    )
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class HolatTaxtasiOquvchi:
+    """
+    O'quvchi tomon: istalgan jarayonda nom bo'yicha ulanadi.
+    Hech qanday qulf ishlatmaydi va yozuvchiga ta'sir qilmaydi.
+    """
+
+    def __init__(self, name: str, retries: int = 100):
+        self._shm = _kuzatuvsiz_ulanish(name)
+        self._buf = self._shm.buf
+        self._retries = retries
+        magic, version, self.capacity, _, self.strings_capacity, _, _ = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION:
+            raise ValueError("Holat taxtasi emas yoki layout versiyasi mos emas")
+        self._strings_offset = HEADER_SIZE + self.capacity * RECORD_SIZE
+
+    def count(self) -> int:
+        """Band slotlar soni"""
+        return _SEQ.unpack_from(self._buf, 12)[0]
+
+    def read(self, slot: int) -> Optional[tuple]:
+        """
+        Bitta slotni izchil o'qish:
+        (tur, bayroq, yorqinlik, signal, joylashuv handle, iste'mol, device_id)
+        """
+        offset = HEADER_SIZE + slot * RECORD_SIZE
+        buf = self._buf
+        for _ in range(self._retries):
+            record = _RECORD.unpack_from(buf, offset)
+            seq = record[0]
+            if seq & 1 == 0 and _SEQ.unpack_from(buf, offset)[0] == seq:
+                if seq == 0 or record[1] == KIND_REMOVED:
+                    return None
+                return record[1:6] + (record[6], record[7].rstrip(b'\0').decode('utf-8', 'replace'))
+        return None
+
+    def scan(self) -> Iterator[tuple]:
+        """Barcha band slotlarni o'qish"""
+        read = self.read
+        for slot in range(self.count()):
+            record = read(slot)
+            if record is not None:
+                yield record
+
+    def strings(self) -> List[str]:
+        """Flyweight satrlar jadvalini izchil o'qish"""
+        for _ in range(self._retries):
+            _, _, _, _, _, seq, length = _HEADER.unpack_from(self._buf, 0)
+            if seq & 1:
+                continue
+            payload = bytes(self._buf[self._strings_offset:self._strings_offset + length])
+            if _HEADER.unpack_from(self._buf, 0)[5] == seq:
+                return json.loads(payload) if length else []
+        return []
+
+    def snapshot(self) -> Dict[str, Dict[str, dict]]:
+        """Taxtani subsistema -> device_id -> holat lug'atiga ochish"""
+        table = self.strings()
+        result: Dict[str, Dict[str, dict]] = {name: {} for name in SUBSYSTEM_KINDS}
+        for kind, flags, brightness, signal, location, consumption, device_id in self.scan():
+            result[KIND_NAMES[kind]][device_id] = {
+                'active': bool(flags & FLAG_ACTIVE),
+                'brightness': brightness,
+                'signal': SIGNALS[signal],
+                'location': table[location] if location < len(table) else None,
+                'consumption_kwh': consumption,
+            }
+        return result
+
+    def as_array(self):
+        """
+        Yozuvlarni NumPy strukturaviy massivi sifatida (nusxasiz) ko'rish.
+        Massiv umumiy xotiraga bevosita qaraydi: izchillik uchun `seq` maydonini
+        tekshiring (toq yoki o'zgargan bo'lsa - yozuv yangilanayotgan);
+        kind == KIND_REMOVED bo'lgan yozuvlar - bo'shatilgan slotlar.
+        """
+        import numpy as np
+        dtype = np.dtype({
+            'names': ['seq', 'kind', 'flags', 'brightness', 'signal', 'location', 'consumption', 'device_id'],
+            'formats': ['<u4', 'u1', 'u1', 'u1', 'u1', '<u4', '<f8', 'S32'],
+            'offsets': [0, 4, 5, 6, 7, 8, 12, 20],
+            'itemsize': RECORD_SIZE,
+        })
+        return np.ndarray((self.count(),), dtype=dtype, buffer=self._buf, offset=HEADER_SIZE)
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
+
+
+# Eski kod uchun - English aliases
+StatusBoard = HolatTaxtasi
+StatusBoardReader = HolatTaxtasiOquvchi
+default_strings_capacity = satrlar_sigimi
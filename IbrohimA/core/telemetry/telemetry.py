@@ -0,0 +1,297 @@
+"""
+Telemetriya Quvuri - Qurilma o'qishlarini oqim sifatida qabul qilish
+Foydalanish: Socket yoki pipe dan kelayotgan o'qishlarni partiyalab tahlil
+qilish, tekshirish va qurilmalarga ommaviy qo'llash
+
+Bosqichlar:
+    o'quvchi   oqimdan kadrlarni ajratadi (NDJSON yoki uzunlik-prefiksli),
+               ularni partiyalarga yig'ib chegaralangan navbatga qo'yadi
+    navbat     `maxsize` partiya; to'lganda siyosat qo'llanadi:
+               'block' (orqa bosim - o'quvchi kutadi, oqim buferi to'ladi),
+               'drop_newest' (yangi partiya tashlanadi),
+               'drop_oldest' (eng eski partiya tashlanadi)
+    qo'llovchi partiyani bitta json.loads bilan tahlil qiladi, tekshiradi,
+               bir qurilmaga bir nechta o'qishni birlashtiradi (oxirgisi
+               yutadi) va subsistema bo'yicha bitta chaqiruv bilan qo'llaydi
+
+Yozuv formati (JSON ob'ekt):
+    {"subsystem": "energy", "device_id": "E-1", "metric": "kwh", "value": 12.5}
+"""
+
+import json
+import queue
+import struct
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_LENGTH = struct.Struct('>I')
+_STOP = object()
+
+
+def _son(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _manfiy_emas(value):
+    if _son(value) and value >= 0:
+        return float(value)
+    raise ValueError
+
+
+def _yorqinlik(value):
+    if _son(value) and 0 <= value <= 100:
+        return int(value)
+    raise ValueError
+
+
+def _mantiqiy(value):
+    if isinstance(value, bool):
+        return value
+    raise ValueError
+
+
+def _signal(value):
+    if value in ('red', 'yellow', 'green', 'off'):
+        return value
+    raise ValueError
+
+
+# (subsistema, metrika) -> (qurilma atributi, tekshiruvchi)
+METRIKALAR = {
+    ('lighting', 'brightness'): ('brightness', _yorqinlik),
+    ('lighting', 'on'): ('is_on', _mantiqiy),
+    ('security', 'recording'): ('is_recording', _mantiqiy),
+    ('transport', 'signal'): ('current_signal', _signal),
+    ('transport', 'operational'): ('is_operational', _mantiqiy),
+    ('energy', 'kwh'): ('power_consumption', _manfiy_emas),
+    ('energy', 'monitoring'): ('is_monitoring', _mantiqiy),
+}
+
+POLICIES = ('block', 'drop_newest', 'drop_oldest')
+
+
+def encode_readings(readings: Iterable[Tuple[str, str, str, object]], framing: str = 'ndjson') -> bytes:
+    """(subsistema, device_id, metrika, qiymat) o'qishlarini oqim baytlariga kodlash"""
+    chunks = []
+    for subsystem, device_id, metric, value in readings:
+        payload = json.dumps({'subsystem': subsystem, 'device_id': device_id,
+                              'metric': metric, 'value': value},
+                             separators=(',', ':')).encode('utf-8')
+        if framing == 'ndjson':
+            chunks.append(payload + b'\n')
+        else:
+            chunks.append(_LENGTH.pack(len(payload)) + payload)
+    return b''.join(chunks)
+
+
+class TelemetriyaQuvuri:
+    """
+    Chegaralangan navbatli telemetriya qabul qilish quvuri.
+    O'qishlar kontrolerning `apply_telemetry` fasadi orqali qo'llanadi,
+    shuning uchun shardlangan rejim va holat taxtasi bilan ham ishlaydi.
+    """
+
+    def __init__(self, controller, batch_size: int = 2048, max_batches: int = 64,
+                 policy: str = 'block', read_size: int = 1 << 16):
+        if policy not in POLICIES:
+            raise ValueError(f"Noma'lum siyosat: {policy} ({', '.join(POLICIES)})")
+        self._controller = controller
+        self.batch_size = batch_size
+        self.policy = policy
+        self._read_size = read_size
+        self._queue: queue.Queue = queue.Queue(maxsize=max_batches)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'received': 0,        # ajratilgan kadrlar
+            'applied': 0,         # qurilmaga qo'llangan (birlashtirishdan keyin)
+            'coalesced': 0,       # bir partiyada ustiga yozilgan o'qishlar
+            'invalid': 0,         # tahlil yoki tekshiruvdan o'tmagan
+            'unknown_device': 0,  # subsistemada bunday qurilma yo'q
+            'dropped': 0,         # navbat to'lganda tashlangan o'qishlar
+            'failed': 0,          # qo'llashda xato bergan partiyalardagi kadrlar
+            'batches': 0,
+        }
+        self._worker = None
+        self.last_error: Optional[str] = None
+
+    # ---------- boshqaruv ----------
+
+    def start(self):
+        """Qo'llovchi ipni ishga tushirish"""
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._apply_loop, name='telemetry-apply', daemon=True)
+            self._worker.start()
+        return self
+
+    def stop(self):
+        """Navbatdagi barcha partiyalarni qo'llab, ipni to'xtatish"""
+        if self._worker is not None:
+            self._queue.put(_STOP)
+            self._worker.join()
+            self._worker = None
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['queued_batches'] = self._queue.qsize()
+        return stats
+
+    def _count(self, key: str, amount: int):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    # ---------- o'quvchi bosqichi ----------
+
+    def feed_stream(self, stream, framing: str = 'ndjson'):
+        """
+        Oqimni (pipe, socket.makefile('rb'), fayl) EOF gacha o'qish.
+        Bloklovchi - odatda alohida ipda chaqiriladi.
+        """
+        if framing not in ('ndjson', 'length'):
+            raise ValueError(f"Noma'lum kadrlash: {framing}")
+        split = self._split_lines if framing == 'ndjson' else self._split_frames
+        read = getattr(stream, 'read1', stream.read)
+        pending = b''
+        batch: List[bytes] = []
+        while True:
+            chunk = read(self._read_size)
+            if not chunk:
+                break
+            frames, pending = split(pending + chunk)
+            batch.extend(frames)
+            if len(batch) >= self.batch_size:
+                self._enqueue(batch)
+                batch = []
+        if batch:
+            self._enqueue(batch)
+        if pending.strip():
+            self._count('invalid', 1)
+
+    def feed_socket(self, sock, framing: str = 'ndjson'):
+        """Ulangan socketdan o'qish (ulanish yopilguncha)"""
+        with sock.makefile('rb') as stream:
+            self.feed_stream(stream, framing)
+
+    @staticmethod
+    def _split_lines(data: bytes):
+        end = data.rfind(b'\n')
+        if end < 0:
+            return [], data
+        return [line for line in data[:end].split(b'\n') if line], data[end + 1:]
+
+    @staticmethod
+    def _split_frames(data: bytes):
+        frames = []
+        offset = 0
+        total = len(data)
+        while total - offset >= 4:
+            (length,) = _LENGTH.unpack_from(data, offset)
+            if total - offset - 4 < length:
+                break
+            frames.append(data[offset + 4:offset + 4 + length])
+            offset += 4 + length
+        return frames, data[offset:]
+
+    def _enqueue(self, batch: List[bytes]):
+        self._count('received', len(batch))
+        if self.policy == 'block':
+            self._queue.put(batch)
+            return
+        try:
+            self._queue.put_nowait(batch)
+            return
+        except queue.Full:
+            pass
+        if self.policy == 'drop_newest':
+            self._count('dropped', len(batch))
+            return
+        while True:
+            try:
+                oldest = self._queue.get_nowait()
+            except queue.Empty:
+                oldest = None
+            if oldest is _STOP:
+                self._queue.put(_STOP)
+                self._count('dropped', len(batch))
+                return
+            if oldest is not None:
+                self._count('dropped', len(oldest))
+            try:
+                self._queue.put_nowait(batch)
+                return
+            except queue.Full:
+                continue
+
+    # ---------- qo'llovchi bosqichi ----------
+
+    def _apply_loop(self):
+        while True:
+            batch = self._queue.get()
+            if batch is _STOP:
+                break
+            # Bitta partiyadagi xato ipni o'ldirmasin - aks holda 'block' siyosati abadiy kutadi
+            try:
+                self.process_batch(batch)
+            except Exception as error:
+                self._count('failed', len(batch))
+                self.last_error = f"{type(error).__name__}: {error}"
+
+    @staticmethod
+    def _parse(batch: List[bytes]) -> Tuple[list, int]:
+        """Partiyani bitta json.loads bilan tahlil qilish; xato bo'lsa - qatorma-qator"""
+        try:
+            return json.loads(b'[' + b','.join(batch) + b']'), 0
+        except ValueError:
+            records = []
+            invalid = 0
+            for frame in batch:
+                try:
+                    records.append(json.loads(frame))
+                except ValueError:
+                    invalid += 1
+            return records, invalid
+
+    def process_batch(self, batch: List[bytes]) -> int:
+        """Kadrlar partiyasini tahlil qilish, tekshirish va qo'llash"""
+        records, unparsed = self._parse(batch)
+        invalid = 0
+        updates: Dict[str, Dict[Tuple[str, str], object]] = {}
+        metrics = METRIKALAR
+        for record in records:
+            try:
+                subsystem = record['subsystem']
+                attribute, check = metrics[(subsystem, record['metric'])]
+                device_id = record['device_id']
+                if not isinstance(device_id, str):
+                    raise ValueError
+                value = check(record['value'])
+            except (KeyError, TypeError, ValueError):
+                invalid += 1
+                continue
+            per_subsystem = updates.get(subsystem)
+            if per_subsystem is None:
+                per_subsystem = updates[subsystem] = {}
+            per_subsystem[(device_id, attribute)] = value
+
+        valid = len(records) - invalid
+        applied = 0
+        controller = self._controller
+        for subsystem, per_subsystem in updates.items():
+            readings = [(device_id, attribute, value)
+                        for (device_id, attribute), value in per_subsystem.items()]
+            # Qo'llovchi ipi menyu/HTTP chaqiruvlari bilan bir xil kontroler qulfini oladi
+            with controller.lock:
+                applied += controller.apply_telemetry(subsystem, readings)
+        distinct = sum(len(per_subsystem) for per_subsystem in updates.values())
+        with self._stats_lock:
+            self._stats['batches'] += 1
+            self._stats['invalid'] += unparsed + invalid
+            self._stats['coalesced'] += valid - distinct
+            self._stats['applied'] += applied
+            self._stats['unknown_device'] += distinct - applied
+        return applied
+
+
+# Eski kod uchun - English aliases
+TelemetryPipeline = TelemetriyaQuvuri
+TELEMETRY_METRICS = METRIKALAR
@@ -0,0 +1,111 @@
+"""
+Taymer G'ildiragi - Ko'p sonli kechiktirilgan amallarni saqlash
+Foydalanish: millionlab jadval yozuvlari, qurilma yurak urishi muddatlari
+
+Vaqt `tick` soniyalik kataklarga bo'linadi. Har bir katak - kalit -> yuk
+lug'ati, bo'sh bo'lmagan kataklar raqamlari esa minimal uyumda (heap) turadi:
+    schedule   mavjud katakka qo'shish O(1), yangi katak O(log kataklar)
+    cancel     kalit bo'yicha O(1) (bo'shagan katak uyumdan keyinroq tashlanadi)
+    pop_due    muddati kelgan kataklar butunligicha, vaqt tartibida olinadi
+Yozuv hech qachon muddatidan oldin chiqmaydi (katak raqami yuqoriga yaxlitlanadi).
+Lug'at o'chirishda kichraymaydi: ko'p kalit ko'chib ketgan katak yangi lug'atga
+ko'chiriladi, aks holda uni chiqarish eski hajmiga mutanosib bo'lardi.
+Keyingi muddat `next_due()` orqali ma'lum - kutuvchi oqim shu vaqtgacha uxlaydi.
+"""
+
+import heapq
+import math
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class TaymerGildiragi:
+    """Kalit bo'yicha bekor qilinadigan, kataklarga guruhlangan taymerlar"""
+
+    def __init__(self, tick: float = 1.0):
+        if tick <= 0:
+            raise ValueError("tick musbat bo'lishi kerak")
+        self.tick = float(tick)
+        self._kataklar: Dict[int, Dict[Hashable, object]] = {}
+        self._uyum: List[int] = []
+        self._joyi: Dict[Hashable, int] = {}
+        self._eng_katta: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._joyi)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._joyi
+
+    def schedule(self, key: Hashable, when: float, payload=None):
+        """`key` ni `when` vaqtiga rejalashtirish (avvalgi rejasi bo'lsa - ko'chiriladi)"""
+        slot = math.ceil(when / self.tick)
+        previous = self._joyi.get(key)
+        if previous == slot:
+            self._kataklar[slot][key] = payload
+            return
+        if previous is not None:
+            self._olib_tashlash(key, previous)
+        bucket = self._kataklar.get(slot)
+        if bucket is None:
+            bucket = self._kataklar[slot] = {}
+            heapq.heappush(self._uyum, slot)
+        bucket[key] = payload
+        self._joyi[key] = slot
+        if len(bucket) > self._eng_katta.get(slot, 0):
+            self._eng_katta[slot] = len(bucket)
+
+    def _olib_tashlash(self, key: Hashable, slot: int):
+        bucket = self._kataklar[slot]
+        del bucket[key]
+        if not bucket:
+            del self._kataklar[slot]
+            del self._eng_katta[slot]
+        elif len(bucket) * 8 < self._eng_katta[slot] and self._eng_katta[slot] >= 64:
+            # Siyrak katakni ixchamlash - ko'chirish narxi o'chirilganlar hisobiga
+            self._kataklar[slot] = dict(bucket)
+            self._eng_katta[slot] = len(bucket)
+
+    def cancel(self, key: Hashable) -> bool:
+        """Rejani bekor qilish; kalit rejalashtirilmagan bo'lsa - False"""
+        slot = self._joyi.pop(key, None)
+        if slot is None:
+            return False
+        self._olib_tashlash(key, slot)
+        return True
+
+    def due_time(self, key: Hashable) -> Optional[float]:
+        """Kalit chiqadigan vaqt (katak chegarasi) yoki None"""
+        slot = self._joyi.get(key)
+        return None if slot is None else slot * self.tick
+
+    def next_due(self) -> Optional[float]:
+        """Eng yaqin bo'sh bo'lmagan katak vaqti (taymer yo'q bo'lsa - None)"""
+        heap = self._uyum
+        while heap and heap[0] not in self._kataklar:
+            heapq.heappop(heap)
+        return heap[0] * self.tick if heap else None
+
+    def pop_due(self, now: float) -> List[Tuple[Hashable, object]]:
+        """Muddati `now` gacha kelgan barcha (kalit, yuk) juftlari, vaqt tartibida"""
+        heap, buckets, where = self._uyum, self._kataklar, self._joyi
+        limit = math.floor(now / self.tick)
+        due = []
+        while heap and heap[0] <= limit:
+            slot = heapq.heappop(heap)
+            bucket = buckets.pop(slot, None)
+            if bucket:
+                del self._eng_katta[slot]
+                for key in bucket:
+                    del where[key]
+                due.extend(bucket.items())
+        return due
+
+    def clear(self):
+        self._kataklar.clear()
+        self._uyum.clear()
+        self._joyi.clear()
+        self._eng_katta.clear()
+
+
+# Eski kod uchun - English alias
+TimerWheel = TaymerGildiragi
@@ -0,0 +1,196 @@
+"""
+Iz Yozish (Tracing) - Proxy va Decorator qatlamlari bo'ylab oraliqlar (span)
+Foydalanish: sekin chaqiruv qaysi qatlamda (dekorator, proksi, subsistema,
+qurilmalar) vaqt yo'qotayotganini ko'rish
+
+    with oraliq('get_status', layer='SubsistemProxy'):
+        ...
+
+Har bir oraliq - nom, id, ota id, iz (trace) id va monoton vaqt belgilari
+(time.perf_counter_ns). Ota oraliq contextvars orqali aniqlanadi, shuning
+uchun oqimlar (HTTP server) izlari aralashmaydi. Tanlash (sampling) ildiz
+oraliqda bir marta hal qilinadi: tanlanmagan izning butun daraxti yozilmaydi.
+Oraliqlar chegaralangan buferda yig'iladi va Chrome trace-event JSON
+(chrome://tracing, Perfetto) faylga yoziladi.
+
+O'chirilgan holatda oraliq() umumiy bo'sh kontekst menejerini qaytaradi -
+ajratish ham, vaqt o'lchash ham yo'q.
+"""
+
+import contextvars
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+_joriy_oraliq = contextvars.ContextVar('joriy_oraliq', default=None)
+# Tanlanmagan iz ichidagi oraliqlar uchun belgi
+_TANLANMAGAN = object()
+
+
+class _BoshOraliq:
+    """Kuzatuv o'chirilgan yoki iz tanlanmagan - hech narsa qilmaydi"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_BOSH = _BoshOraliq()
+
+
+class _TanlanmaganIldiz:
+    """Tanlanmagan iz ildizi: ichki oraliqlar ham yozilmasligi uchun belgi qo'yadi"""
+
+    __slots__ = ('_token',)
+
+    def __enter__(self):
+        self._token = _joriy_oraliq.set(_TANLANMAGAN)
+        return self
+
+    def __exit__(self, *exc):
+        _joriy_oraliq.reset(self._token)
+        return False
+
+
+class Oraliq:
+    """Bitta o'lchangan qatlam chaqiruvi"""
+
+    __slots__ = ('_yozuvchi', 'name', 'span_id', 'parent_id', 'trace_id', 'args', 'start', 'end',
+                 'thread_id', '_token')
+
+    def __init__(self, yozuvchi: 'IzlarYozuvchisi', name: str, parent: Optional['Oraliq'], args: dict):
+        self._yozuvchi = yozuvchi
+        self.name = name
+        self.span_id = next(yozuvchi._idlar)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.trace_id = parent.trace_id if parent is not None else self.span_id
+        self.args = args
+        self.start = self.end = 0
+
+    def __enter__(self):
+        self._token = _joriy_oraliq.set(self)
+        self.thread_id = threading.get_ident()
+        self.start = self._yozuvchi._clock()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.end = self._yozuvchi._clock()
+        _joriy_oraliq.reset(self._token)
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self._yozuvchi._yozish(self)
+        return False
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end - self.start) / 1e6
+
+    def as_event(self, pid: int) -> dict:
+        """Chrome trace-event "X" (to'liq hodisa) - vaqtlar mikrosekundlarda"""
+        args = dict(self.args, span_id=self.span_id, trace_id=self.trace_id)
+        if self.parent_id is not None:
+            args['parent_id'] = self.parent_id
+        return {'name': self.name, 'cat': 'smartcity', 'ph': 'X', 'ts': self.start / 1000,
+                'dur': (self.end - self.start) / 1000, 'pid': pid, 'tid': self.thread_id, 'args': args}
+
+
+class IzlarYozuvchisi:
+    """
+    Oraliqlarni tanlab yig'ish va Chrome trace JSON ga eksport qilish.
+    sample_rate: ildiz oraliqlarning yoziladigan ulushi (0..1)
+    max_spans: buferda saqlanadigan oxirgi oraliqlar soni
+    """
+
+    def __init__(self, path: str = None, sample_rate: float = 1.0, max_spans: int = 100_000,
+                 clock: Callable[[], int] = time.perf_counter_ns):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate 0 va 1 oralig'ida bo'lishi kerak")
+        self.path = path
+        self.sample_rate = sample_rate
+        self._clock = clock
+        self._idlar = itertools.count(1)
+        self._oraliqlar = deque(maxlen=max_spans)
+        self._random = random.random
+        self.recorded = 0
+        self.dropped = 0
+
+    def span(self, name: str, layer: str = None, args: dict = None):
+        parent = _joriy_oraliq.get()
+        if parent is _TANLANMAGAN:
+            return _BOSH
+        if parent is None and self.sample_rate < 1.0 and self._random() >= self.sample_rate:
+            return _TanlanmaganIldiz()
+        return Oraliq(self, f"{layer}.{name}" if layer else name, parent, args or {})
+
+    def _yozish(self, span: Oraliq):
+        if len(self._oraliqlar) == self._oraliqlar.maxlen:
+            self.dropped += 1
+        self._oraliqlar.append(span)
+        self.recorded += 1
+
+    def spans(self) -> list:
+        """Buferdagi oraliqlar (tugash tartibida)"""
+        return list(self._oraliqlar)
+
+    def export(self, path: str = None) -> int:
+        """Buferni Chrome trace-event JSON faylga yozish; yozilgan oraliqlar soni"""
+        path = path or self.path
+        if path is None:
+            raise ValueError("Eksport uchun fayl yo'li berilmagan")
+        pid = os.getpid()
+        spans = self.spans()
+        with open(path, 'w', encoding='utf-8') as stream:
+            json.dump({'traceEvents': [span.as_event(pid) for span in spans], 'displayTimeUnit': 'ms'},
+                      stream, separators=(',', ':'))
+        return len(spans)
+
+    def stats(self) -> dict:
+        return {'recorded': self.recorded, 'buffered': len(self._oraliqlar), 'dropped': self.dropped,
+                'sample_rate': self.sample_rate, 'path': self.path}
+
+
+# Faol yozuvchi (None - kuzatuv o'chirilgan)
+_faol: Optional[IzlarYozuvchisi] = None
+
+
+def oraliq(name: str, layer: str = None, **args):
+    """Oraliq kontekst menejeri; kuzatuv o'chirilgan bo'lsa - umumiy bo'sh menejer"""
+    if _faol is None:
+        return _BOSH
+    return _faol.span(name, layer, args)
+
+
+def yoqish(path: str = None, sample_rate: float = 1.0, **options) -> IzlarYozuvchisi:
+    """Jarayon bo'yicha kuzatuvni yoqish (oldingi yozuvchi almashtiriladi)"""
+    global _faol
+    _faol = IzlarYozuvchisi(path, sample_rate, **options)
+    return _faol
+
+
+def ochirish() -> Optional[IzlarYozuvchisi]:
+    """Kuzatuvni o'chirish; yozuvchi (yig'ilgan oraliqlari bilan) qaytariladi"""
+    global _faol
+    tracer, _faol = _faol, None
+    return tracer
+
+
+def faol_yozuvchi() -> Optional[IzlarYozuvchisi]:
+    return _faol
+
+
+# Eski kod uchun - English aliases
+Span = Oraliq
+Tracer = IzlarYozuvchisi
+span = oraliq
+enable = yoqish
+disable = ochirish
+active_tracer = faol_yozuvchi
@@ -5,6 +5,7 @@ Shows all patterns in action without interactive input
 """
 
 from core.controller import SmartCityController
+from core.registry.registry import CityRegistry
 from core.builders.builders import SmartCityBuilder
 from modules.lighting.lighting_devices import SmartLight
 import time
@@ -80,10 +81,8 @@ def demo_full_system():
     print_section("3️⃣  SYSTEM INITIALIZATION")
     print("\nInitializing SmartCity Controller and all subsystems...")
     
-    controller = controller1  # Use the singleton instance
-    controller._initialized = False  # Reset for demo
-    controller._is_running = False
-    controller.initialize()
+    # A fresh city from the registry, so the demo never has to reset the singleton
+    controller = CityRegistry().create(config.city_name)
     
     # ==================== FACTORY PATTERN ====================
     print_section("4️⃣  FACTORY PATTERN - Device Creation")
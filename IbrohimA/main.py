@@ -11,6 +11,11 @@ with multiple design patterns implemented:
 5. PROXY - Subsystem access control & lazy initialization
 6. DECORATOR - Enhanced functionality (monitoring, security, logging)
 7. FACADE - Unified interface to all subsystems
+
+Headless batch mode (no banners, demos or menu; JSON lines on stdout):
+    python main.py --headless --script commands.txt
+    generate_commands | python main.py --headless
+See core/batch/batch.py for the command language.
 """
 
 from core.controller import SmartCityController
@@ -19,7 +24,11 @@ from modules.lighting.lighting_devices import SmartLight
 from modules.security.security_devices import SecurityCamera
 from modules.transport.transport_devices import TrafficLight
 from modules.energy.energy_devices import EnergyMonitor
+import argparse
+import contextlib
 import json
+import os
+import sys
 
 
 def display_welcome():
@@ -155,26 +164,32 @@ def interactive_menu(controller):
     print("🎮 INTERACTIVE CONTROL PANEL")
     print("="*70)
     
+    http_server = None
     while True:
         controller.display_menu()
         
-        choice = input("\nEnter your choice (0-7): ").strip()
+        choice = input("\nEnter your choice (0-8): ").strip()
         
         if choice == '0':
             print("\nExiting system...")
+            if http_server is not None:
+                http_server.stop()
             break
         
         elif choice == '1':
             print("\n📊 SYSTEM STATUS:")
             print("-"*70)
-            status = controller.get_all_status()
+            with controller.lock:
+                status = controller.get_all_status()
             print(json.dumps(status, indent=2))
         
         elif choice == '2':
-            controller.start_all_subsystems()
+            with controller.lock:
+                controller.start_all_subsystems()
         
         elif choice == '3':
-            controller.stop_all_subsystems()
+            with controller.lock:
+                controller.stop_all_subsystems()
         
         elif choice == '4':
             print("\n[Create and Add Device]")
@@ -182,17 +197,21 @@ def interactive_menu(controller):
             device_id = input("Device ID: ").strip()
             location = input("Location: ").strip()
             
-            device = controller.create_device(subsystem, device_id, location)
-            if device:
-                controller.add_device_to_subsystem(subsystem, device_id, device)
+            # The HTTP API thread may be reading the controller; input() stays outside the lock
+            with controller.lock:
+                device = controller.create_device(subsystem, device_id, location)
+                if device:
+                    controller.add_device_to_subsystem(subsystem, device_id, device)
         
         elif choice == '5':
             subsystem = input("Subsystem (lighting/security/transport/energy): ").strip()
-            controller.start_subsystem(subsystem)
+            with controller.lock:
+                controller.start_subsystem(subsystem)
         
         elif choice == '6':
             subsystem = input("Subsystem (lighting/security/transport/energy): ").strip()
-            controller.stop_subsystem(subsystem)
+            with controller.lock:
+                controller.stop_subsystem(subsystem)
         
         elif choice == '7':
             print("\n" + "="*70)
@@ -213,12 +232,69 @@ def interactive_menu(controller):
             print("  - Extensible architecture")
             print("\n" + "="*70 + "\n")
         
+        elif choice == '8':
+            if http_server is None:
+                from core.api.api import StatusServer
+                port = input("Port (default 8080): ").strip()
+                http_server = StatusServer(controller, port=int(port) if port.isdigit() else 8080)
+                http_server.start_in_thread()
+            else:
+                http_server.stop()
+                http_server = None
+                print("\n✓ HTTP Status API stopped")
+        
         else:
             print("\n❌ Invalid choice. Please try again.")
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="SmartCity management system")
+    parser.add_argument('--headless', action='store_true',
+                        help="skip demos and the menu; run a command script in batches")
+    parser.add_argument('--script', default='-', help="command script path ('-' = stdin)")
+    parser.add_argument('--output', default='-', help="JSON lines result path ('-' = stdout)")
+    parser.add_argument('--batch-size', type=int, default=10_000,
+                        help="max consecutive add/remove/set/heartbeat commands per bulk call")
+    parser.add_argument('--shards', type=int, default=0, help="shard worker processes (0 = local)")
+    parser.add_argument('--no-results', action='store_true',
+                        help="omit status/query payloads from the results")
+    parser.add_argument('--verbose', action='store_true',
+                        help="send controller log lines to stderr instead of discarding them")
+    return parser.parse_args(argv)
+
+
+def run_headless(args) -> int:
+    """
+    Execute a command script against a fresh controller.
+    Exit code 1 if any command failed, 2 if the run itself failed
+    (script or output could not be opened, controller error).
+    """
+    from core.batch.batch import BatchRunner
+    with contextlib.ExitStack() as streams:
+        try:
+            script = sys.stdin if args.script == '-' else streams.enter_context(open(args.script, encoding='utf-8'))
+            output = sys.stdout if args.output == '-' else streams.enter_context(open(args.output, 'w', encoding='utf-8'))
+            log = sys.stderr if args.verbose else streams.enter_context(open(os.devnull, 'w'))
+            # Controller and device log lines must not mix with the JSON results
+            with contextlib.redirect_stdout(log):
+                controller = SmartCityController()
+                controller.initialize(shards=args.shards)
+                try:
+                    runner = BatchRunner(controller, output, args.batch_size, not args.no_results)
+                    summary = runner.run(script)
+                finally:
+                    controller.shutdown()
+        except Exception as error:
+            print(f"Headless run failed: {type(error).__name__}: {error}", file=sys.stderr)
+            return 2
+    return 1 if summary['errors'] else 0
+
+
+def main(argv=None):
     """Main application entry point"""
+    args = parse_args(argv)
+    if args.headless:
+        return run_headless(args)
     display_welcome()
     display_patterns_info()
     
@@ -258,4 +334,4 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
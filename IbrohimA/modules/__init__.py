@@ -1,11 +1,18 @@
 """
 SmartCity Modules Package
+
+Subsystems are resolved lazily, so importing one subsystem (or just its
+devices) does not pull in the other three.
 """
 
-from modules.lighting.lighting_system import LightingSystem
-from modules.security import SecuritySystem
-from modules.transport import TransportSystem
-from modules.energy import EnergySystem
+from core._lazy import lazy_exports
+
+_EXPORTS = {
+    'LightingSystem': 'modules.lighting.lighting_system',
+    'SecuritySystem': 'modules.security.security_system',
+    'TransportSystem': 'modules.transport.transport_system',
+    'EnergySystem': 'modules.energy.energy_system',
+}
 
 __all__ = [
     'LightingSystem',
@@ -13,3 +20,5 @@ __all__ = [
     'TransportSystem',
     'EnergySystem'
 ]
+
+lazy_exports(globals(), _EXPORTS)
@@ -2,16 +2,35 @@
 Energy subsystem devices
 """
 
+from core.flyweight.flyweight import attribute_registry
+
+_intern = attribute_registry.intern
+_lookup = attribute_registry.value
+
 
 class EnergyMonitor:
     """Energy monitoring device"""
     
+    __slots__ = ('device_id', '_zone', 'is_monitoring', 'power_consumption')
+    # Status key -> slot; the kWh reading is stored as power_consumption
+    STATUS_SLOTS = {'device_id': 'device_id', 'zone': '_zone', 'is_monitoring': 'is_monitoring',
+                    'power_consumption_kwh': 'power_consumption'}
+    
     def __init__(self, device_id: str, zone: str):
         self.device_id = device_id
-        self.zone = zone
+        self._zone = _intern(zone)
         self.is_monitoring = False
         self.power_consumption = 0  # kWh
     
+    @property
+    def zone(self) -> str:
+        """Zone name (stored as a shared flyweight handle)"""
+        return _lookup(self._zone)
+    
+    @zone.setter
+    def zone(self, value: str):
+        self._zone = _intern(value)
+    
     def start(self):
         """Start monitoring"""
         self.is_monitoring = True
@@ -22,11 +41,27 @@ class EnergyMonitor:
         self.is_monitoring = False
         print(f"[ENERGY] {self.device_id} at {self.zone}: MONITORING STOP")
     
-    def status(self) -> dict:
-        """Get energy monitor status"""
+    def clone(self, device_id: str, zone: str) -> 'EnergyMonitor':
+        """Prototype: copy this monitor's state under a new id and zone"""
+        twin = self.__class__.__new__(self.__class__)
+        twin.device_id = device_id
+        twin._zone = _intern(zone)
+        twin.is_monitoring = self.is_monitoring
+        twin.power_consumption = self.power_consumption
+        return twin
+    
+    def __getstate__(self):
+        """Pickle the monitor with its zone string (handles are per-process)"""
+        return (self.device_id, self.zone, self.is_monitoring, self.power_consumption)
+    
+    def __setstate__(self, state):
+        self.device_id, self.zone, self.is_monitoring, self.power_consumption = state
+    
+    def status(self, compact: bool = False) -> dict:
+        """Get energy monitor status (compact: strings as flyweight handles)"""
         return {
             'device_id': self.device_id,
-            'zone': self.zone,
+            'zone': self._zone if compact else _lookup(self._zone),
             'is_monitoring': self.is_monitoring,
             'power_consumption_kwh': self.power_consumption
         }
@@ -0,0 +1,213 @@
+"""
+Energy subsystem - Demand forecasting
+Seasonal exponential smoothing over every meter at once (NumPy), aggregated
+per zone, driving the efficiency mode automatically.
+Requires NumPy.
+"""
+
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+
+class DemandForecaster:
+    """
+    Additive seasonal exponential smoothing (Holt-Winters without trend) for
+    many consumption series at once.
+
+    State is one level per series and one seasonal profile of `season_length`
+    slots per series, kept as (series,) and (season_length, series) arrays so
+    that the slot updated each interval is one contiguous row. Each update is
+    a handful of array operations over all series, with no loop over meters.
+    """
+
+    def __init__(self, season_length: int = 24, alpha: float = 0.3, gamma: float = 0.1):
+        if season_length < 1:
+            raise ValueError("season_length must be >= 1")
+        if not (0.0 < alpha <= 1.0 and 0.0 <= gamma <= 1.0):
+            raise ValueError("alpha must be in (0, 1] and gamma in [0, 1]")
+        self.season_length = season_length
+        self.alpha = alpha
+        self.gamma = gamma
+        self.level = np.zeros(0)
+        self.seasonal = np.zeros((season_length, 0))
+        self.steps = 0
+
+    @property
+    def series(self) -> int:
+        return self.level.shape[0]
+
+    def fit(self, history) -> 'DemandForecaster':
+        """
+        Initialise from a (series, steps) history whose first column is slot 0.
+        The seasonal profile starts as the mean deviation of each slot over
+        the full seasons, then the whole history is smoothed in.
+        """
+        history = np.asarray(history, dtype=np.float64)
+        if history.ndim != 2:
+            raise ValueError("history must be a (series, steps) array")
+        length = self.season_length
+        seasons = history.shape[1] // length
+        if seasons == 0:
+            raise ValueError(f"history needs at least one season ({length} steps)")
+        cycles = history[:, :seasons * length].reshape(history.shape[0], seasons, length)
+        means = cycles.mean(axis=2, keepdims=True)
+        self.seasonal = np.ascontiguousarray((cycles - means).mean(axis=1).T)
+        self.level = means[:, 0, 0].copy()
+        self.steps = 0
+        for column in np.ascontiguousarray(history.T):
+            self.update(column)
+        return self
+
+    def _grow(self, readings: np.ndarray):
+        """New series (meters added later) start at their first reading with a flat profile"""
+        extra = readings.shape[0] - self.series
+        self.level = np.concatenate([self.level, readings[self.series:]])
+        self.seasonal = np.hstack([self.seasonal, np.zeros((self.season_length, extra))])
+
+    def keep_series(self, rows: np.ndarray):
+        """Drop every series not listed in `rows` (meters that were removed)"""
+        rows = rows[rows < self.series]
+        self.level = self.level[rows]
+        self.seasonal = np.ascontiguousarray(self.seasonal[:, rows])
+
+    def update(self, readings):
+        """Fold one interval of readings (one value per series) into the state"""
+        readings = np.asarray(readings, dtype=np.float64)
+        if readings.shape[0] > self.series:
+            self._grow(readings)
+        slot = self.steps % self.season_length
+        seasonal = self.seasonal[slot]
+        self.level = self.alpha * (readings - seasonal) + (1.0 - self.alpha) * self.level
+        self.seasonal[slot] = self.gamma * (readings - self.level) + (1.0 - self.gamma) * seasonal
+        self.steps += 1
+
+    def forecast(self, horizon: int = 1) -> np.ndarray:
+        """(series, horizon) array of expected readings for the next intervals"""
+        slots = (self.steps + np.arange(horizon)) % self.season_length
+        return np.maximum(self.level[:, None] + self.seasonal[slots].T, 0.0)
+
+
+class EnergyDemandForecast:
+    """
+    Per-zone demand forecast for an EnergySystem.
+
+    Meters are mapped to rows once (in device order; new meters are appended),
+    and their zones to integer indices, so sampling, smoothing and per-zone
+    totals (np.bincount) are all whole-array operations. When the forecast
+    peak of the city total crosses `enable_above` the efficiency mode is
+    switched on; it is switched off again once the peak falls below
+    `disable_below` (hysteresis, default 90% of enable_above).
+    """
+
+    def __init__(self, energy_system, enable_above: float, disable_below: float = None,
+                 horizon: int = 6, season_length: int = 24, alpha: float = 0.3, gamma: float = 0.1,
+                 on_mode_change: Callable[[bool], None] = None):
+        if disable_below is None:
+            disable_below = enable_above * 0.9
+        if disable_below > enable_above:
+            raise ValueError("disable_below must not exceed enable_above")
+        self._system = energy_system
+        self.enable_above = enable_above
+        self.disable_below = disable_below
+        self.horizon = horizon
+        self.forecaster = DemandForecaster(season_length, alpha, gamma)
+        self._on_mode_change = on_mode_change
+        self._meter_ids: list = []
+        self._zone_index = np.zeros(0, dtype=np.intp)
+        self._zones: Dict[str, int] = {}
+        self._layout_version = energy_system.layout_version
+        self.last_peak: Optional[float] = None
+
+    def _sync_layout(self):
+        """Give rows to meters added since the last interval (and drop or re-zone changed ones)"""
+        devices = self._system.devices
+        if self._system.layout_version != self._layout_version:
+            self._relayout()
+        if len(devices) == len(self._meter_ids):
+            return
+        new_ids = list(devices)[len(self._meter_ids):]
+        zones = self._zones
+        indices = [zones.setdefault(devices[device_id].zone, len(zones)) for device_id in new_ids]
+        self._meter_ids.extend(new_ids)
+        self._zone_index = np.concatenate([self._zone_index, np.array(indices, dtype=np.intp)])
+
+    def _relayout(self):
+        """Meters were removed, replaced or moved between zones: keep surviving rows, re-read every zone"""
+        devices = self._system.devices
+        self._layout_version = self._system.layout_version
+        keep = [row for row, device_id in enumerate(self._meter_ids) if device_id in devices]
+        if len(keep) < len(self._meter_ids):
+            self.forecaster.keep_series(np.array(keep, dtype=np.intp))
+            self._meter_ids = [self._meter_ids[row] for row in keep]
+        # Zones are renumbered from the surviving meters, so zones left empty are dropped
+        zones = self._zones = {}
+        self._zone_index = np.fromiter((zones.setdefault(devices[device_id].zone, len(zones))
+                                        for device_id in self._meter_ids),
+                                       dtype=np.intp, count=len(self._meter_ids))
+
+    def sample(self) -> np.ndarray:
+        """Current kWh reading of every meter, in row order"""
+        self._sync_layout()
+        devices = self._system.devices
+        return np.fromiter((devices[device_id].power_consumption for device_id in self._meter_ids),
+                           dtype=np.float64, count=len(self._meter_ids))
+
+    def fit(self, history) -> 'EnergyDemandForecast':
+        """Initialise from a (meters, steps) history in device order"""
+        self._sync_layout()
+        self.forecaster.fit(history)
+        return self
+
+    def record_interval(self, readings=None) -> dict:
+        """Fold one interval (the meters' current readings by default, else one per meter in row order) and re-evaluate"""
+        if readings is None:
+            readings = self.sample()
+        else:
+            self._sync_layout()
+            readings = np.asarray(readings, dtype=np.float64)
+            if readings.shape != (len(self._meter_ids),):
+                raise ValueError(f"Expected {len(self._meter_ids)} readings (one per meter), got {readings.shape}")
+        self.forecaster.update(readings)
+        return self.evaluate()
+
+    def zone_forecast(self, horizon: int = None) -> Dict[str, np.ndarray]:
+        """Zone -> forecast kWh for each of the next `horizon` intervals"""
+        horizon = horizon or self.horizon
+        self._sync_layout()
+        predicted = self.forecaster.forecast(horizon)
+        rows = min(predicted.shape[0], self._zone_index.shape[0])
+        zone_index, predicted = self._zone_index[:rows], predicted[:rows]
+        count = len(self._zones)
+        totals = np.stack([np.bincount(zone_index, weights=predicted[:, step], minlength=count)
+                           for step in range(horizon)], axis=1) if rows else np.zeros((count, horizon))
+        return {zone: totals[index] for zone, index in self._zones.items()}
+
+    def evaluate(self) -> dict:
+        """Switch the efficiency mode if the forecast peak crossed a threshold"""
+        if not self.forecaster.series:
+            return self.summary()
+        peak = float(self.forecaster.forecast(self.horizon).sum(axis=0).max())
+        self.last_peak = peak
+        system = self._system
+        switch = None
+        if not system.efficiency_mode and peak >= self.enable_above:
+            system.enable_efficiency_mode()
+            switch = True
+        elif system.efficiency_mode and peak < self.disable_below:
+            system.disable_efficiency_mode()
+            switch = False
+        if switch is not None and self._on_mode_change is not None:
+            self._on_mode_change(switch)
+        return self.summary()
+
+    def summary(self) -> dict:
+        return {
+            'meters': self.forecaster.series,
+            'zones': len(self._zones),
+            'intervals': self.forecaster.steps,
+            'horizon': self.horizon,
+            'peak_forecast_kwh': self.last_peak,
+            'enable_above_kwh': self.enable_above,
+            'disable_below_kwh': self.disable_below,
+        }
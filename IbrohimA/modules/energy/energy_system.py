@@ -0,0 +1,154 @@
+"""
+Energy subsystem - Main subsystem manager
+"""
+
+from core.factories.factories import ISubsystem
+from core.query.query import run_query
+from core.tracing.tracing import oraliq
+from typing import Dict
+
+
+class EnergySystem(ISubsystem):
+    """
+    Energy Subsystem - Manages energy monitoring and optimization
+    """
+    
+    def __init__(self):
+        self.name = "Energy System"
+        self.devices: Dict[str, any] = {}
+        # Bumped when devices are removed, replaced or change zone (additions show in len(devices))
+        self.layout_version = 0
+        self.is_running = False
+        self.total_consumption = 0.0  # kWh
+        self.efficiency_mode = False
+        self.forecast = None
+    
+    def get_name(self) -> str:
+        return self.name
+    
+    def initialize(self):
+        """Initialize energy system"""
+        self.is_running = True
+        print(f"✓ {self.name} initialized")
+    
+    def shutdown(self):
+        """Shutdown energy system"""
+        for device in self.devices.values():
+            if hasattr(device, 'stop'):
+                device.stop()
+        self.is_running = False
+        print(f"✗ {self.name} shut down")
+    
+    def add_device(self, device_id: str, device):
+        """Add an energy device (replacing one with the same id)"""
+        if device_id in self.devices:
+            self.layout_version += 1
+        self.devices[device_id] = device
+        print(f"[ENERGY] Added device: {device_id}")
+    
+    def add_devices(self, devices: Dict[str, any]):
+        """Add many energy devices at once (one log line for the batch)"""
+        if not self.devices.keys().isdisjoint(devices):
+            self.layout_version += 1
+        self.devices.update(devices)
+        print(f"[ENERGY] Added {len(devices)} devices")
+    
+    def remove_devices(self, device_ids) -> int:
+        """Remove many energy devices at once (one log line); returns the number removed"""
+        devices = self.devices
+        removed = 0
+        for device_id in device_ids:
+            if devices.pop(device_id, None) is not None:
+                removed += 1
+        if removed:
+            self.layout_version += 1
+        print(f"[ENERGY] Removed {removed} devices")
+        return removed
+    
+    def apply_readings(self, updates) -> int:
+        """Apply validated (device_id, attribute, value) telemetry in bulk, without logging"""
+        devices = self.devices
+        applied = 0
+        for device_id, attribute, value in updates:
+            device = devices.get(device_id)
+            if device is not None:
+                setattr(device, attribute, value)
+                applied += 1
+                if attribute == 'zone':
+                    self.layout_version += 1
+        return applied
+    
+    def query(self, where: dict = None, fields=None) -> dict:
+        """Status of the energy monitors matching `where`, limited to `fields` (see core.query)"""
+        return run_query(self.devices, where, fields)
+    
+    def get_status(self, compact: bool = False) -> dict:
+        """Get status of all energy devices (compact: strings as flyweight handles)"""
+        devices_status = {}
+        with oraliq('devices', 'EnergySystem', count=len(self.devices)):
+            for device_id, device in self.devices.items():
+                if hasattr(device, 'status'):
+                    devices_status[device_id] = device.status(compact=True) if compact else device.status()
+        
+        status = {
+            'system_name': self.name,
+            'is_running': self.is_running,
+            'efficiency_mode': self.efficiency_mode,
+            'total_consumption_kwh': self.total_consumption,
+            'device_count': len(self.devices),
+            'devices': devices_status
+        }
+        if self.forecast is not None:
+            status['forecast'] = self.forecast.summary()
+        return status
+    
+    def start_all(self):
+        """Start monitoring on all devices"""
+        for device in self.devices.values():
+            if hasattr(device, 'start'):
+                device.start()
+    
+    def stop_all(self):
+        """Stop monitoring on all devices"""
+        for device in self.devices.values():
+            if hasattr(device, 'stop'):
+                device.stop()
+    
+    def enable_efficiency_mode(self):
+        """Enable energy efficiency mode"""
+        self.efficiency_mode = True
+        print(f"[ENERGY] Efficiency mode ENABLED")
+    
+    def disable_efficiency_mode(self):
+        """Disable energy efficiency mode"""
+        self.efficiency_mode = False
+        print(f"[ENERGY] Efficiency mode DISABLED")
+    
+    def start_forecasting(self, enable_above: float, **options):
+        """
+        Forecast demand per zone and switch the efficiency mode automatically
+        (options: see EnergyDemandForecast; requires NumPy)
+        """
+        from modules.energy.energy_forecast import EnergyDemandForecast
+        self.forecast = EnergyDemandForecast(self, enable_above, **options)
+        print(f"[ENERGY] Demand forecasting started (efficiency mode above {enable_above} kWh)")
+        return self.forecast
+    
+    def stop_forecasting(self):
+        """Stop forecasting; the efficiency mode keeps its current value"""
+        self.forecast = None
+    
+    def record_interval(self, readings=None):
+        """Feed one metering interval to the forecaster (no-op without one)"""
+        if self.forecast is None:
+            return None
+        return self.forecast.record_interval(readings)
+    
+    def calculate_total_consumption(self) -> float:
+        """Calculate total consumption from all devices"""
+        total = 0.0
+        for device in self.devices.values():
+            if hasattr(device, 'power_consumption'):
+                total += device.power_consumption
+        self.total_consumption = total
+        return total
@@ -2,7 +2,14 @@
 Lighting Module Package
 """
 
-from modules.lighting.lighting_system import LightingSystem
-from modules.lighting.lighting_devices import SmartLight
+from core._lazy import lazy_exports
 
-__all__ = ['LightingSystem', 'SmartLight']
+_EXPORTS = {
+    'LightingSystem': 'modules.lighting.lighting_system',
+    'SmartLight': 'modules.lighting.lighting_devices',
+    'LightingScheduler': 'modules.lighting.lighting_schedule',
+}
+
+__all__ = ['LightingSystem', 'SmartLight', 'LightingScheduler']
+
+lazy_exports(globals(), _EXPORTS)
@@ -0,0 +1,212 @@
+"""
+Lighting subsystem - Adaptive lighting
+Brightness driven by per-street ambient-light and motion readings, computed
+for every light at once (NumPy) and applied to the lights that changed.
+Requires NumPy.
+"""
+
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from core.flyweight.flyweight import attribute_registry
+
+_intern = attribute_registry.intern
+
+
+class AdaptiveLightingEngine:
+    """
+    Adaptive brightness for a LightingSystem.
+
+    Sensors report per street: ambient light (lux) and motion. Each tick the
+    street's wanted level is worked out from a small per-street array:
+    lights switch on below `on_lux` and off above `off_lux` (hysteresis),
+    dim from `night_level` towards `dusk_level` as it gets lighter, and go to
+    `motion_level` for `motion_hold` seconds after motion. A street's level
+    only moves when the new value differs by at least `deadband`, so sensor
+    noise does not flicker the lights.
+
+    Lights are mapped to rows once (in device order; new lights are
+    appended, removals or moves rebuild), with one street index and one
+    int16 level per row. A tick gathers the street levels to the rows,
+    ramps each row towards its target by at most `ramp_up` / `ramp_down`
+    percent per second and applies only the rows whose level changed, in
+    one set_levels call. At most `max_updates` lights are written per tick
+    (writing a light object costs far more than its share of the array
+    pass): when more are due, a rotating cursor picks which ones, and the
+    rest follow on the next ticks. The ramp limit counts from the later of
+    the light's last write and the tick before its street's level moved,
+    so deferred lights catch up with a larger step. Lights on streets
+    without an ambient reading are left alone. Levels the engine did not set
+    (schedules, commands) are picked up again by resync().
+    """
+
+    def __init__(self, lighting_system, on_lux: float = 30.0, off_lux: float = 50.0,
+                 night_lux: float = 2.0, night_level: int = 70, dusk_level: int = 40,
+                 motion_level: int = 100, motion_hold: float = 60.0, ramp_up: float = 20.0,
+                 ramp_down: float = 5.0, deadband: int = 3, max_updates: Optional[int] = 20_000, clock: Callable[[], float] = time.time):
+        if not 0 <= night_lux < on_lux <= off_lux:
+            raise ValueError("Need 0 <= night_lux < on_lux <= off_lux")
+        if not all(0 <= level <= 100 for level in (night_level, dusk_level, motion_level)):
+            raise ValueError("Levels must be 0-100")
+        if ramp_up <= 0 or ramp_down <= 0:
+            raise ValueError("Ramp rates must be positive")
+        if max_updates is not None and max_updates < 1:
+            raise ValueError("max_updates must be >= 1 (or None for no limit)")
+        self._system = lighting_system
+        self.on_lux = on_lux
+        self.off_lux = off_lux
+        self.night_lux = night_lux
+        self.night_level = night_level
+        self.dusk_level = dusk_level
+        self.motion_level = motion_level
+        self.motion_hold = motion_hold
+        self.ramp_up = ramp_up
+        self.ramp_down = ramp_down
+        self.deadband = deadband
+        self.max_updates = max_updates
+        self._cursor = 0
+        self._clock = clock
+        self._started: Optional[float] = None
+        self._previous = -1.0   # seconds since the first tick, of the previous tick
+        self._stats = {'ticks': 0, 'changed': 0, 'deferred': 0}
+
+        # Per street (index by location handle)
+        self._streets: Dict[int, int] = {}
+        self._lux = np.zeros(0)
+        self._sensed = np.zeros(0, dtype=bool)
+        self._lit = np.zeros(0, dtype=bool)
+        self._last_motion = np.zeros(0)
+        self._street_level = np.zeros(0, dtype=np.int16)
+        self._moved_at = np.zeros(0, dtype=np.float32)
+        # Per light row
+        self._ids: List[str] = []
+        self._light_street = np.zeros(0, dtype=np.int32)
+        self._level = np.zeros(0, dtype=np.int16)
+        self._written = np.zeros(0, dtype=np.float32)
+        self._layout_version = lighting_system.layout_version
+        self._sync_layout()
+
+    # ---- layout ----
+
+    def _street(self, handle: int) -> int:
+        """Street index of a location handle (new streets get arrays in _grow_streets)"""
+        streets = self._streets
+        index = streets.get(handle)
+        if index is None:
+            index = streets[handle] = len(streets)
+        return index
+
+    def _grow_streets(self):
+        extra = len(self._streets) - self._lux.shape[0]
+        if extra > 0:
+            self._lux = np.concatenate([self._lux, np.zeros(extra)])
+            self._sensed = np.concatenate([self._sensed, np.zeros(extra, dtype=bool)])
+            self._lit = np.concatenate([self._lit, np.zeros(extra, dtype=bool)])
+            self._last_motion = np.concatenate([self._last_motion, np.full(extra, -np.inf)])
+            self._street_level = np.concatenate([self._street_level, np.zeros(extra, dtype=np.int16)])
+            self._moved_at = np.concatenate([self._moved_at, np.full(extra, self._previous, dtype=np.float32)])
+
+    def _sync_layout(self, elapsed: float = 0.0):
+        """Give rows to lights added since the last tick (rebuild after removals or moves)"""
+        devices = self._system.devices
+        if self._system.layout_version != self._layout_version:
+            self._layout_version = self._system.layout_version
+            self._ids = []
+            self._light_street = np.zeros(0, dtype=np.int32)
+            self._level = np.zeros(0, dtype=np.int16)
+            self._written = np.zeros(0, dtype=np.float32)
+        if len(devices) == len(self._ids):
+            return
+        new_ids = list(devices)[len(self._ids):]
+        lights = [devices[device_id] for device_id in new_ids]
+        streets = np.fromiter((self._street(light._location) for light in lights), dtype=np.int32, count=len(lights))
+        self._grow_streets()
+        levels = np.fromiter((light.brightness if light.is_on else 0 for light in lights),
+                             dtype=np.int16, count=len(lights))
+        self._ids.extend(new_ids)
+        self._light_street = np.concatenate([self._light_street, streets])
+        self._level = np.concatenate([self._level, levels])
+        # Row write times are seconds since the first tick; new rows may take one ramp step right away
+        self._written = np.concatenate([self._written, np.full(len(lights), elapsed - 1.0, dtype=np.float32)])
+
+    def resync(self):
+        """Re-read every light's level (after schedules or commands changed them)"""
+        self._ids = []
+        self._light_street = np.zeros(0, dtype=np.int32)
+        self._level = np.zeros(0, dtype=np.int16)
+        self._written = np.zeros(0, dtype=np.float32)
+        self._sync_layout(0.0 if self._started is None else self._clock() - self._started)
+
+    # ---- sensor input ----
+
+    def ambient(self, readings: Dict[str, float]):
+        """Ambient light per street (lux)"""
+        rows = [self._street(_intern(street)) for street in readings]
+        self._grow_streets()
+        self._lux[rows] = list(readings.values())
+        # Newly sensed streets start ramping from the last tick
+        self._moved_at[rows] = np.where(self._sensed[rows], self._moved_at[rows], self._previous)
+        self._sensed[rows] = True
+
+    def motion(self, streets: Iterable[str], now: float = None):
+        """Motion seen on `streets` at `now`"""
+        now = self._clock() if now is None else now
+        rows = [self._street(_intern(street)) for street in streets]
+        self._grow_streets()
+        self._last_motion[rows] = now
+
+    # ---- tick ----
+
+    def _street_targets(self, now: float) -> np.ndarray:
+        """Wanted level per street (-1: not managed), with switching hysteresis and a deadband"""
+        lux = self._lux
+        self._lit = np.where(self._lit, lux < self.off_lux, lux < self.on_lux)
+        darkness = np.clip((self.off_lux - lux) / (self.off_lux - self.night_lux), 0.0, 1.0)
+        level = self.dusk_level + (self.night_level - self.dusk_level) * darkness
+        level = np.where(now - self._last_motion <= self.motion_hold, self.motion_level, level)
+        wanted = np.where(self._lit, np.rint(level), 0).astype(np.int16)
+        current = self._street_level
+        move = (np.abs(wanted - current) >= self.deadband) | ((wanted == 0) != (current == 0))
+        self._street_level = np.where(move, wanted, current).astype(np.int16)
+        self._moved_at[move] = self._previous
+        return np.where(self._sensed, self._street_level, -1).astype(np.int16)
+
+    def tick(self, now: float = None) -> List[str]:
+        """One pass over every light; returns the ids whose level changed"""
+        now = self._clock() if now is None else now
+        if self._started is None:
+            self._started = now
+        elapsed = now - self._started
+        self._sync_layout(elapsed)
+        street_target = self._street_targets(now)
+        self._previous = elapsed
+        target = street_target[self._light_street]
+        level = self._level
+        changed = np.flatnonzero((target != level) & (target >= 0))
+        self._stats['ticks'] += 1
+        if not changed.size:
+            return []
+        if self.max_updates is not None and changed.size > self.max_updates:
+            self._stats['deferred'] += changed.size - self.max_updates
+            first = np.searchsorted(changed, self._cursor)
+            changed = np.roll(changed, -first)[:self.max_updates]
+            self._cursor = int(changed[-1]) + 1
+        # Ramp limit from the row's last write or its street's move (one to a hundred percent,
+        # clamped before the int16 cast so long gaps between ticks cannot wrap)
+        since = elapsed - np.maximum(self._written[changed], self._moved_at[self._light_street[changed]])
+        step = target[changed] - level[changed]
+        step = np.where(step > 0, np.minimum(step, np.clip(since * self.ramp_up, 1.0, 100.0).astype(np.int16)),
+                        np.maximum(step, -np.clip(since * self.ramp_down, 1.0, 100.0).astype(np.int16)))
+        level[changed] += step.astype(np.int16)
+        self._written[changed] = elapsed
+        ids = self._ids
+        device_ids = [ids[row] for row in changed.tolist()]
+        self._system.set_levels(device_ids, level[changed].tolist())
+        self._stats['changed'] += len(device_ids)
+        return device_ids
+
+    def summary(self) -> dict:
+        return dict(self._stats, lights=len(self._ids), streets=len(self._streets),
+                    sensed_streets=int(self._sensed.sum()), lit_streets=int(self._lit.sum()))
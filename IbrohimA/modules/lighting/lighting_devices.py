@@ -3,16 +3,35 @@ Lighting subsystem module
 Smart lighting device implementation
 """
 
+from core.flyweight.flyweight import attribute_registry
+
+_intern = attribute_registry.intern
+_lookup = attribute_registry.value
+
 
 class SmartLight:
     """Smart light device for streetlights"""
     
+    __slots__ = ('device_id', '_location', 'is_on', 'brightness')
+    # Status key -> slot holding it (underscored slots hold flyweight handles)
+    STATUS_SLOTS = {'device_id': 'device_id', 'location': '_location', 'is_on': 'is_on',
+                    'brightness': 'brightness'}
+    
     def __init__(self, device_id: str, location: str):
         self.device_id = device_id
-        self.location = location
+        self._location = _intern(location)
         self.is_on = False
         self.brightness = 0  # 0-100%
     
+    @property
+    def location(self) -> str:
+        """Location name (stored as a shared flyweight handle)"""
+        return _lookup(self._location)
+    
+    @location.setter
+    def location(self, value: str):
+        self._location = _intern(value)
+    
     def start(self):
         """Turn on the light"""
         self.is_on = True
@@ -25,11 +44,27 @@ class SmartLight:
         self.brightness = 0
         print(f"[LIGHT] {self.device_id} at {self.location}: OFF")
     
-    def status(self) -> dict:
-        """Get light status"""
+    def clone(self, device_id: str, location: str) -> 'SmartLight':
+        """Prototype: copy this light's state under a new id and location"""
+        twin = self.__class__.__new__(self.__class__)
+        twin.device_id = device_id
+        twin._location = _intern(location)
+        twin.is_on = self.is_on
+        twin.brightness = self.brightness
+        return twin
+    
+    def __getstate__(self):
+        """Pickle the light with its location string (handles are per-process)"""
+        return (self.device_id, self.location, self.is_on, self.brightness)
+    
+    def __setstate__(self, state):
+        self.device_id, self.location, self.is_on, self.brightness = state
+    
+    def status(self, compact: bool = False) -> dict:
+        """Get light status (compact: strings as flyweight handles)"""
         return {
             'device_id': self.device_id,
-            'location': self.location,
+            'location': self._location if compact else _lookup(self._location),
             'is_on': self.is_on,
             'brightness': self.brightness
         }
@@ -0,0 +1,276 @@
+"""
+Lighting subsystem - Switching schedules
+One-off, daily and dusk/dawn actions for single lights, streets or zones,
+kept in a timer wheel and fired in batches through the bulk lighting API.
+"""
+
+import math
+import threading
+from contextlib import nullcontext
+import time
+from datetime import date, datetime, timedelta, timezone
+from itertools import count
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.flyweight.flyweight import attribute_registry
+from core.timing.timing import TimerWheel
+
+ACTIONS = ('on', 'off', 'dim')
+TARGET_KINDS = ('device', 'street', 'zone')
+
+_J2000 = 2451545.0
+_J2000_ORDINAL = date(2000, 1, 1).toordinal()
+_UNIX_EPOCH_JD = 2440587.5
+
+
+def solar_times(day: date, latitude: float, longitude: float) -> Tuple[float, float]:
+    """
+    (sunrise, sunset) of `day` as Unix timestamps, from the sunrise equation.
+    During polar day/night the sun never crosses the horizon: the two times
+    collapse to solar noon (night) or span the whole day (day).
+    """
+    days = day.toordinal() - _J2000_ORDINAL
+    mean_noon = days - longitude / 360.0
+    anomaly = math.radians((357.5291 + 0.98560028 * mean_noon) % 360.0)
+    center = 1.9148 * math.sin(anomaly) + 0.02 * math.sin(2 * anomaly) + 0.0003 * math.sin(3 * anomaly)
+    ecliptic = math.radians((math.degrees(anomaly) + center + 180.0 + 102.9372) % 360.0)
+    transit = _J2000 + mean_noon + 0.0053 * math.sin(anomaly) - 0.0069 * math.sin(2 * ecliptic)
+    declination = math.asin(math.sin(ecliptic) * math.sin(math.radians(23.4397)))
+    phi = math.radians(latitude)
+    cos_hour = ((math.sin(math.radians(-0.833)) - math.sin(phi) * math.sin(declination))
+                / (math.cos(phi) * math.cos(declination)))
+    hour_angle = math.degrees(math.acos(max(-1.0, min(1.0, cos_hour))))
+    rise = transit - hour_angle / 360.0
+    return (rise - _UNIX_EPOCH_JD) * 86400.0, (transit + hour_angle / 360.0 - _UNIX_EPOCH_JD) * 86400.0
+
+
+class ScheduledAction:
+    """One switching action for a light, street or zone; `repeat` re-arms it after firing"""
+
+    __slots__ = ('action_id', 'kind', 'target', 'action', 'brightness', 'repeat', 'offset')
+
+    def __init__(self, action_id: int, kind: str, target: str, action: str, brightness: Optional[int],
+                 repeat: Optional[str] = None, offset=0.0):
+        self.action_id = action_id
+        self.kind = kind
+        self.target = target
+        self.action = action
+        self.brightness = brightness
+        self.repeat = repeat    # None, 'daily' (offset = seconds after local midnight), 'dusk', 'dawn'
+        self.offset = offset
+
+    def state(self) -> Tuple[bool, int]:
+        """(is_on, brightness) the targeted lights end up in"""
+        if self.action == 'off':
+            return False, 0
+        if self.action == 'dim':
+            return True, self.brightness
+        return True, 100 if self.brightness is None else self.brightness
+
+
+class LightingScheduler:
+    """
+    Switching schedules for a LightingSystem.
+
+    Actions target one light, a street (the lights' location) or a zone (a
+    named set of streets), so a city-wide dusk schedule is a single entry,
+    while per-light schedules can still run into the millions. Entries live
+    in a TimerWheel: adding one and cancelling one are O(1). When entries fall
+    due they are popped together, resolved to light ids (a street index is
+    kept per location handle), folded into one final state per light and
+    applied with one switch_many call per state. Repeating actions are
+    re-armed for their next occurrence. The worker thread sleeps until the
+    earliest entry is due, so an idle schedule costs no CPU.
+
+    `lock` (e.g. the controller lock) is held while due actions are applied
+    and `on_fire` runs, so the worker does not race other threads that
+    change the same lights.
+    """
+
+    def __init__(self, lighting_system, latitude: float = 41.31, longitude: float = 69.28,
+                 tick: float = 1.0, clock: Callable[[], float] = time.time,
+                 on_fire: Callable[[List[str]], None] = None, lock=None):
+        self._system = lighting_system
+        self.latitude = latitude
+        self.longitude = longitude
+        self._clock = clock
+        self._on_fire = on_fire
+        self._apply_lock = lock if lock is not None else nullcontext()
+        self._wheel = TimerWheel(tick)
+        self._ids = count(1)
+        self._zones: Dict[str, frozenset] = {}
+        self._streets: Dict[int, List[str]] = {}
+        self._indexed = None
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._stats = {'fired': 0, 'switched': 0, 'batches': 0}
+
+    # ---- targets ----
+
+    def define_zone(self, name: str, streets: Iterable[str]):
+        """Name a set of streets so actions can target all their lights at once"""
+        self._zones[name] = frozenset(streets)
+
+    def _street_index(self) -> Dict[int, List[str]]:
+        """Location handle -> light ids, rebuilt when lights were added, removed or moved since the last firing"""
+        devices = self._system.devices
+        layout = (len(devices), self._system.layout_version)
+        if layout != self._indexed:
+            streets: Dict[int, List[str]] = {}
+            for device_id, device in devices.items():
+                streets.setdefault(device._location, []).append(device_id)
+            self._streets = streets
+            self._indexed = layout
+        return self._streets
+
+    def _resolve(self, entry: ScheduledAction, streets: Dict[int, List[str]]) -> List[str]:
+        if entry.kind == 'device':
+            return [entry.target]
+        handle = attribute_registry.handle
+        names = (entry.target,) if entry.kind == 'street' else self._zones.get(entry.target, ())
+        ids = []
+        for name in names:
+            ids.extend(streets.get(handle(name), ()))
+        return ids
+
+    # ---- scheduling ----
+
+    def _add(self, when: float, action: str, brightness: Optional[int], target: Dict[str, str],
+             repeat: str = None, offset=0.0) -> int:
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action: {action} ({', '.join(ACTIONS)})")
+        if action == 'dim' and brightness is None:
+            raise ValueError("'dim' needs a brightness")
+        if brightness is not None and not 0 <= brightness <= 100:
+            raise ValueError("brightness must be 0-100")
+        chosen = [(kind, name) for kind, name in target.items() if name is not None]
+        if len(chosen) != 1 or chosen[0][0] not in TARGET_KINDS:
+            raise ValueError(f"Give exactly one target: {', '.join(TARGET_KINDS)}")
+        kind, name = chosen[0]
+        entry = ScheduledAction(next(self._ids), kind, name, action, brightness, repeat, offset)
+        with self._lock:
+            earliest = self._wheel.next_due()
+            self._wheel.schedule(entry.action_id, when, entry)
+            if earliest is None or when < earliest:
+                self._wake.notify()
+        return entry.action_id
+
+    def at(self, when: float, action: str = 'on', brightness: int = None, *,
+           device: str = None, street: str = None, zone: str = None) -> int:
+        """One-off action at Unix time `when`; returns an id for cancel()"""
+        return self._add(when, action, brightness, {'device': device, 'street': street, 'zone': zone})
+
+    def daily(self, time_of_day: str, action: str = 'on', brightness: int = None, *,
+              device: str = None, street: str = None, zone: str = None) -> int:
+        """Action every day at local 'HH:MM'"""
+        hours, minutes = (int(part) for part in time_of_day.split(':'))
+        offset = hours * 3600 + minutes * 60
+        return self._add(self._next_occurrence('daily', offset, self._clock()), action, brightness,
+                         {'device': device, 'street': street, 'zone': zone}, 'daily', offset)
+
+    def at_dusk(self, action: str = 'on', brightness: int = None, offset: float = 0.0, *,
+                device: str = None, street: str = None, zone: str = None) -> int:
+        """Action every day at sunset (+ offset seconds, negative = before)"""
+        return self._add(self._next_occurrence('dusk', offset, self._clock()), action, brightness,
+                         {'device': device, 'street': street, 'zone': zone}, 'dusk', offset)
+
+    def at_dawn(self, action: str = 'off', brightness: int = None, offset: float = 0.0, *,
+                device: str = None, street: str = None, zone: str = None) -> int:
+        """Action every day at sunrise (+ offset seconds)"""
+        return self._add(self._next_occurrence('dawn', offset, self._clock()), action, brightness,
+                         {'device': device, 'street': street, 'zone': zone}, 'dawn', offset)
+
+    def _next_occurrence(self, repeat: str, offset: float, after: float) -> float:
+        """First time of a repeating action strictly after `after`"""
+        if repeat == 'daily':
+            midnight = datetime.fromtimestamp(after).replace(hour=0, minute=0, second=0, microsecond=0)
+            when = (midnight + timedelta(seconds=offset)).timestamp()
+            return when if when > after else (midnight + timedelta(days=1, seconds=offset)).timestamp()
+        day = datetime.fromtimestamp(after + self.longitude / 360.0 * 86400.0, timezone.utc).date() - timedelta(days=1)
+        for _ in range(4):
+            sunrise, sunset = solar_times(day, self.latitude, self.longitude)
+            when = (sunset if repeat == 'dusk' else sunrise) + offset
+            if when > after:
+                return when
+            day += timedelta(days=1)
+        return after + 86400.0
+
+    def cancel(self, action_id: int) -> bool:
+        """Cancel a scheduled (or repeating) action"""
+        with self._lock:
+            return self._wheel.cancel(action_id)
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            return self._wheel.next_due()
+
+    def __len__(self) -> int:
+        return len(self._wheel)
+
+    # ---- firing ----
+
+    def run_due(self, now: float = None) -> int:
+        """Fire every action due by `now`; returns the number of lights switched"""
+        now = self._clock() if now is None else now
+        with self._lock:
+            due = self._wheel.pop_due(now)
+            for _, entry in due:
+                if entry.repeat is not None:
+                    self._wheel.schedule(entry.action_id, self._next_occurrence(entry.repeat, entry.offset, now),
+                                         entry)
+        if not due:
+            return 0
+        with self._apply_lock:
+            streets = self._street_index()
+            final: Dict[str, Tuple[bool, int]] = {}
+            # Popped in time order - a later action for the same light wins
+            for _, entry in due:
+                state = entry.state()
+                for device_id in self._resolve(entry, streets):
+                    final[device_id] = state
+            groups: Dict[Tuple[bool, int], List[str]] = {}
+            for device_id, state in final.items():
+                groups.setdefault(state, []).append(device_id)
+            switched = 0
+            for (is_on, brightness), device_ids in groups.items():
+                switched += self._system.switch_many(device_ids, is_on, brightness)
+            self._stats['fired'] += len(due)
+            self._stats['switched'] += switched
+            self._stats['batches'] += 1
+            if self._on_fire is not None and final:
+                self._on_fire(list(final))
+        return switched
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                while not self._stopping:
+                    earliest = self._wheel.next_due()
+                    delay = None if earliest is None else earliest - self._clock()
+                    if delay is not None and delay <= 0:
+                        break
+                    self._wake.wait(delay)
+                if self._stopping:
+                    return
+            self.run_due()
+
+    def start(self):
+        """Fire actions from a background thread until stop()"""
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._worker, name="lighting-schedule", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            self._stopping = True
+            self._wake.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict:
+        return dict(self._stats, scheduled=len(self._wheel), zones=len(self._zones),
+                    running=self._thread is not None)
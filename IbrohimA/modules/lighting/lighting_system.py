@@ -3,6 +3,9 @@ Lighting subsystem - Main subsystem manager
 """
 
 from core.factories.factories import ISubsystem
+from core.query.query import run_query
+from core.tracing.tracing import oraliq
+from modules.lighting.lighting_schedule import LightingScheduler
 from typing import Dict
 
 
@@ -14,7 +17,11 @@ class LightingSystem(ISubsystem):
     def __init__(self):
         self.name = "Lighting System"
         self.devices: Dict[str, any] = {}
+        # Bumped when devices are removed or change location (additions show in len(devices))
+        self.layout_version = 0
         self.is_running = False
+        self.scheduler = None
+        self.adaptive = None
     
     def get_name(self) -> str:
         return self.name
@@ -26,6 +33,7 @@ class LightingSystem(ISubsystem):
     
     def shutdown(self):
         """Shutdown lighting system"""
+        self.stop_scheduler()
         for device in self.devices.values():
             if hasattr(device, 'stop'):
                 device.stop()
@@ -33,23 +41,91 @@ class LightingSystem(ISubsystem):
         print(f"✗ {self.name} shut down")
     
     def add_device(self, device_id: str, device):
-        """Add a lighting device"""
+        """Add a lighting device (replacing one with the same id)"""
+        if device_id in self.devices:
+            self.layout_version += 1
         self.devices[device_id] = device
         print(f"[LIGHTING] Added device: {device_id}")
     
-    def get_status(self) -> dict:
-        """Get status of all lighting devices"""
+    def add_devices(self, devices: Dict[str, any]):
+        """Add many lighting devices at once (one log line for the batch)"""
+        if not self.devices.keys().isdisjoint(devices):
+            self.layout_version += 1
+        self.devices.update(devices)
+        print(f"[LIGHTING] Added {len(devices)} devices")
+    
+    def remove_devices(self, device_ids) -> int:
+        """Remove many lighting devices at once (one log line); returns the number removed"""
+        devices = self.devices
+        removed = 0
+        for device_id in device_ids:
+            if devices.pop(device_id, None) is not None:
+                removed += 1
+        if removed:
+            self.layout_version += 1
+        print(f"[LIGHTING] Removed {removed} devices")
+        return removed
+    
+    def apply_readings(self, updates) -> int:
+        """Apply validated (device_id, attribute, value) telemetry in bulk, without logging"""
+        devices = self.devices
+        applied = 0
+        for device_id, attribute, value in updates:
+            device = devices.get(device_id)
+            if device is not None:
+                setattr(device, attribute, value)
+                applied += 1
+                if attribute == 'location':
+                    self.layout_version += 1
+        return applied
+    
+    def switch_many(self, device_ids, is_on: bool, brightness: int) -> int:
+        """Set many lights to one state in bulk, without logging; returns the number switched"""
+        devices = self.devices
+        switched = 0
+        for device_id in device_ids:
+            device = devices.get(device_id)
+            if device is not None:
+                device.is_on = is_on
+                device.brightness = brightness
+                switched += 1
+        return switched
+    
+    def set_levels(self, device_ids, levels) -> int:
+        """Set per-light brightness in bulk (0 = off), without logging; returns the number set"""
+        devices = self.devices
+        applied = 0
+        for device_id, level in zip(device_ids, levels):
+            device = devices.get(device_id)
+            if device is not None:
+                device.is_on = level > 0
+                device.brightness = level
+                applied += 1
+        return applied
+    
+    def query(self, where: dict = None, fields=None) -> dict:
+        """Status of the lights matching `where`, limited to `fields` (see core.query)"""
+        return run_query(self.devices, where, fields)
+    
+    def get_status(self, compact: bool = False) -> dict:
+        """Get status of all lighting devices (compact: strings as flyweight handles)"""
         devices_status = {}
-        for device_id, device in self.devices.items():
-            if hasattr(device, 'status'):
-                devices_status[device_id] = device.status()
+        with oraliq('devices', 'LightingSystem', count=len(self.devices)):
+            for device_id, device in self.devices.items():
+                if hasattr(device, 'status'):
+                    devices_status[device_id] = device.status(compact=True) if compact else device.status()
         
-        return {
+        status = {
             'system_name': self.name,
             'is_running': self.is_running,
             'device_count': len(self.devices),
             'devices': devices_status
         }
+        if self.scheduler is not None:
+            status['schedule'] = self.scheduler.stats()
+        if self.adaptive is not None:
+            status['adaptive'] = self.adaptive.summary()
+        return status
     
     def start_all(self):
         """Start all lighting devices"""
@@ -62,3 +138,28 @@ class LightingSystem(ISubsystem):
         for device in self.devices.values():
             if hasattr(device, 'stop'):
                 device.stop()
+    
+    def start_scheduler(self, **options):
+        """Start firing switching schedules (options: see LightingScheduler)"""
+        if self.scheduler is None:
+            self.scheduler = LightingScheduler(self, **options)
+            self.scheduler.start()
+        return self.scheduler
+    
+    def stop_scheduler(self):
+        """Stop the schedule thread (scheduled actions are discarded)"""
+        if self.scheduler is not None:
+            self.scheduler.stop()
+            self.scheduler = None
+    
+    def start_adaptive(self, **options):
+        """Drive brightness from ambient-light and motion sensors (options: see AdaptiveLightingEngine; requires NumPy)"""
+        if self.adaptive is None:
+            from modules.lighting.adaptive_lighting import AdaptiveLightingEngine
+            self.adaptive = AdaptiveLightingEngine(self, **options)
+            print(f"[LIGHTING] Adaptive lighting started ({len(self.devices)} lights)")
+        return self.adaptive
+    
+    def stop_adaptive(self):
+        """Stop adaptive lighting; lights keep their current levels"""
+        self.adaptive = None
@@ -2,15 +2,44 @@
 Security subsystem devices
 """
 
+from core.flyweight.flyweight import attribute_registry
+
+_intern = attribute_registry.intern
+_lookup = attribute_registry.value
+_DEFAULT_RESOLUTION = _intern("1080p")
+
 
 class SecurityCamera:
     """Security camera device"""
     
+    __slots__ = ('device_id', '_location', 'is_recording', '_resolution')
+    # Status key -> slot; location and resolution are flyweight handles
+    STATUS_SLOTS = {'device_id': 'device_id', 'location': '_location', 'is_recording': 'is_recording',
+                    'resolution': '_resolution'}
+    
     def __init__(self, device_id: str, location: str):
         self.device_id = device_id
-        self.location = location
+        self._location = _intern(location)
         self.is_recording = False
-        self.resolution = "1080p"
+        self._resolution = _DEFAULT_RESOLUTION
+    
+    @property
+    def location(self) -> str:
+        """Location name (stored as a shared flyweight handle)"""
+        return _lookup(self._location)
+    
+    @location.setter
+    def location(self, value: str):
+        self._location = _intern(value)
+    
+    @property
+    def resolution(self) -> str:
+        """Video resolution (shared flyweight, e.g. "1080p")"""
+        return _lookup(self._resolution)
+    
+    @resolution.setter
+    def resolution(self, value: str):
+        self._resolution = _intern(value)
     
     def start(self):
         """Start recording"""
@@ -22,11 +51,27 @@ class SecurityCamera:
         self.is_recording = False
         print(f"[CAMERA] {self.device_id} at {self.location}: RECORDING STOP")
     
-    def status(self) -> dict:
-        """Get camera status"""
+    def clone(self, device_id: str, location: str) -> 'SecurityCamera':
+        """Prototype: copy this camera's state under a new id and location"""
+        twin = self.__class__.__new__(self.__class__)
+        twin.device_id = device_id
+        twin._location = _intern(location)
+        twin.is_recording = self.is_recording
+        twin._resolution = self._resolution
+        return twin
+    
+    def __getstate__(self):
+        """Pickle the camera with its location string (handles are per-process)"""
+        return (self.device_id, self.location, self.is_recording, self.resolution)
+    
+    def __setstate__(self, state):
+        self.device_id, self.location, self.is_recording, self.resolution = state
+    
+    def status(self, compact: bool = False) -> dict:
+        """Get camera status (compact: strings as flyweight handles)"""
         return {
             'device_id': self.device_id,
-            'location': self.location,
+            'location': self._location if compact else _lookup(self._location),
             'is_recording': self.is_recording,
-            'resolution': self.resolution
+            'resolution': self._resolution if compact else _lookup(self._resolution)
         }
@@ -0,0 +1,282 @@
+"""
+Security subsystem - Camera event pipeline
+Detections (motion, tamper, offline) flow from cameras into bounded per-camera
+queues; a worker pool drains them in batches and drives the alert level.
+Events are counted at their own timestamps, so a backlog drained late does
+not look like a burst; timestamps ahead of the clock (a skewed camera) count
+as received now.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+EVENT_KINDS = ('motion', 'tamper', 'offline')
+ALERT_LEVELS = ('normal', 'elevated', 'high')
+
+
+class CameraEvent:
+    """One detection reported by a camera"""
+
+    __slots__ = ('camera_id', 'kind', 'timestamp', 'metadata')
+
+    def __init__(self, camera_id: str, kind: str, timestamp: float, metadata: Optional[dict] = None):
+        self.camera_id = camera_id
+        self.kind = kind
+        self.timestamp = timestamp
+        self.metadata = metadata
+
+    def as_dict(self) -> dict:
+        return {'camera_id': self.camera_id, 'kind': self.kind,
+                'timestamp': self.timestamp, 'metadata': self.metadata}
+
+
+class EventRateWindow:
+    """Per-kind event counts over a sliding window of one-second buckets"""
+
+    def __init__(self, window_seconds: int = 10, clock: Callable[[], float] = time.time):
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._counts = {kind: [0] * window_seconds for kind in EVENT_KINDS}
+        self._current = int(clock())
+
+    def _advance(self, second: int):
+        """Zero the buckets that fell out of the window since the last update"""
+        if second <= self._current:
+            return
+        stale = min(second - self._current, self.window_seconds)
+        for counts in self._counts.values():
+            for offset in range(1, stale + 1):
+                counts[(self._current + offset) % self.window_seconds] = 0
+        self._current = second
+
+    def add(self, kind_counts: Dict[str, int], second: int = None):
+        """
+        Count events in the bucket of `second` (their timestamp, default now).
+        Older than the window - ignored; in the future - counted now, so the
+        window never runs ahead of the clock.
+        """
+        self._advance(int(self._clock()))
+        if second is None or second > self._current:
+            second = self._current
+        elif second <= self._current - self.window_seconds:
+            return
+        bucket = second % self.window_seconds
+        for kind, count in kind_counts.items():
+            self._counts[kind][bucket] += count
+
+    def rates(self) -> Dict[str, float]:
+        """Events per second for each kind, averaged over the window"""
+        self._advance(int(self._clock()))
+        return {kind: sum(counts) / self.window_seconds for kind, counts in self._counts.items()}
+
+
+class CameraEventPipeline:
+    """
+    Bounded event pipeline for camera detections.
+
+    Each camera gets a deque of at most `queue_size` events; when a burst
+    overflows it, the oldest events are dropped and counted. Cameras with
+    pending events are scheduled once on a ready queue, so memory is
+    bounded by cameras x queue_size no matter how bursty the input is.
+    Every camera is pinned to one worker (by a hash of its id), so a camera's
+    events are always processed in order. Workers take up to `batch_size`
+    events per wake-up, round-robin over their ready cameras, fold them into
+    the rate window and the escalation rules at the events' timestamps and
+    re-evaluate the alert level. Timestamps and `clock` share one time base
+    (wall-clock seconds by default).
+    """
+
+    def __init__(self, security_system, workers: int = 4, queue_size: int = 64, batch_size: int = 32,
+                 window_seconds: int = 10, weights: Dict[str, float] = None,
+                 thresholds: Dict[str, float] = None, hysteresis: float = 0.5,
+                 on_alert_change: Callable[[str], None] = None,
+                 clock: Callable[[], float] = time.time):
+        self._system = security_system
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        # Score = weighted events/s; tamper is rarer and more serious than motion
+        self.weights = weights or {'motion': 1.0, 'tamper': 5.0, 'offline': 2.0}
+        self.thresholds = thresholds or {'elevated': 50.0, 'high': 200.0}
+        self.hysteresis = hysteresis
+        self._on_alert_change = on_alert_change
+        self._clock = clock
+        self._window = EventRateWindow(window_seconds, clock)
+        self._queues: Dict[str, deque] = {}
+        # One ready queue per worker (at least one, so workers=0 can be driven by hand)
+        lanes = max(workers, 1)
+        self._ready: List[deque] = [deque() for _ in range(lanes)]
+        self._lane: Dict[str, int] = {}
+        self._scheduled = set()
+        self._lock = threading.Lock()
+        self._work = [threading.Condition(self._lock) for _ in range(lanes)]
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._peak_pending = 0
+        self._waiting = [0] * lanes
+        self._stopping = False
+        self._last_events: Dict[str, CameraEvent] = {}
+        self._stats = {'received': 0, 'dropped': 0, 'clamped': 0, 'processed': 0, 'batches': 0}
+        self._workers = [threading.Thread(target=self._worker, args=(index,), name=f"camera-events-{index}",
+                                          daemon=True)
+                         for index in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def push(self, camera_id: str, kind: str, timestamp: float = None, metadata: dict = None) -> bool:
+        """
+        Queue one detection; returns False when it displaced an older event of
+        that camera. A timestamp ahead of the clock is clamped to now.
+        """
+        if kind not in EVENT_KINDS:
+            raise ValueError(f"Unknown event kind: {kind} ({', '.join(EVENT_KINDS)})")
+        now = self._clock()
+        clamped = timestamp is not None and timestamp > now
+        event = CameraEvent(camera_id, kind, now if timestamp is None or clamped else timestamp, metadata)
+        with self._lock:
+            if clamped:
+                self._stats['clamped'] += 1
+            queue = self._queues.get(camera_id)
+            if queue is None:
+                queue = self._queues[camera_id] = deque(maxlen=self.queue_size)
+                self._lane[camera_id] = hash(camera_id) % len(self._ready)
+            self._stats['received'] += 1
+            overflow = len(queue) == self.queue_size
+            if overflow:
+                self._stats['dropped'] += 1
+            else:
+                self._pending += 1
+                if self._pending > self._peak_pending:
+                    self._peak_pending = self._pending
+            queue.append(event)
+            if camera_id not in self._scheduled:
+                self._scheduled.add(camera_id)
+                lane = self._lane[camera_id]
+                self._ready[lane].append(camera_id)
+                if self._waiting[lane]:
+                    self._work[lane].notify()
+        return not overflow
+
+    def _take_batch(self, lane: int = 0):
+        """
+        Up to batch_size events from the lane's ready cameras in round-robin
+        order (called with the lock held). A camera with events left goes to the back.
+        """
+        batch = []
+        ready, queues, room = self._ready[lane], self._queues, self.batch_size
+        while ready and room > 0:
+            camera_id = ready.popleft()
+            queue = queues[camera_id]
+            take = min(room, len(queue))
+            batch.extend(queue.popleft() for _ in range(take))
+            room -= take
+            if queue:
+                ready.append(camera_id)
+            else:
+                self._scheduled.discard(camera_id)
+        return batch
+
+    def _worker(self, lane: int):
+        ready, work = self._ready[lane], self._work[lane]
+        while True:
+            with self._lock:
+                while not ready and not self._stopping:
+                    # Wake up periodically so the level can decay while cameras are quiet
+                    self._waiting[lane] += 1
+                    notified = work.wait(timeout=0.5)
+                    self._waiting[lane] -= 1
+                    if not notified:
+                        break
+                if self._stopping and not ready:
+                    return
+                batch = self._take_batch(lane) if ready else []
+            if batch:
+                self._process(batch)
+            else:
+                self.evaluate()
+
+    def _process(self, batch):
+        # Per second of event time: kind -> count
+        counts: Dict[int, Dict[str, int]] = {}
+        last_events = {}
+        for event in batch:
+            per_kind = counts.get(int(event.timestamp))
+            if per_kind is None:
+                per_kind = counts[int(event.timestamp)] = {}
+            per_kind[event.kind] = per_kind.get(event.kind, 0) + 1
+            last_events[event.camera_id] = event
+        engine = self._system.rule_engine
+        if engine is not None:
+            devices = self._system.devices
+            located = [(event.kind, event.camera_id, getattr(devices.get(event.camera_id), 'location', None),
+                        event.timestamp)
+                       for event in batch]
+        with self._lock:
+            if engine is not None:
+                engine.observe(located, self._clock())
+            for second, per_kind in counts.items():
+                self._window.add(per_kind, second)
+            self._last_events.update(last_events)
+            self._stats['processed'] += len(batch)
+            self._stats['batches'] += 1
+            self._pending -= len(batch)
+            if not self._pending:
+                self._idle.notify_all()
+        self.evaluate()
+
+    def score(self) -> float:
+        with self._lock:
+            rates = self._window.rates()
+        return sum(self.weights.get(kind, 0.0) * rate for kind, rate in rates.items())
+
+    def evaluate(self) -> str:
+        """
+        Raise the alert level as soon as the score or an escalation rule crosses
+        its threshold; lower it with hysteresis once both have calmed down
+        """
+        score = self.score()
+        target = 'normal'
+        for level in ('elevated', 'high'):
+            if score >= self.thresholds[level]:
+                target = level
+        engine = self._system.rule_engine
+        with self._lock:
+            if engine is not None:
+                rule_level = engine.level(self._clock())
+                if ALERT_LEVELS.index(rule_level) > ALERT_LEVELS.index(target):
+                    target = rule_level
+            current = self._system.alert_level
+            if current not in ALERT_LEVELS or target == current:
+                return current
+            if ALERT_LEVELS.index(target) < ALERT_LEVELS.index(current):
+                if score >= self.thresholds[current] * self.hysteresis:
+                    return current
+            self._system.set_alert_level(target)
+        if self._on_alert_change is not None:
+            self._on_alert_change(target)
+        return target
+
+    def drain(self, timeout: float = None) -> bool:
+        """Wait until every accepted event has been processed"""
+        with self._lock:
+            return self._idle.wait_for(lambda: not self._pending, timeout)
+
+    def last_event(self, camera_id: str) -> Optional[CameraEvent]:
+        return self._last_events.get(camera_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats, pending=self._pending, peak_pending=self._peak_pending,
+                         cameras=len(self._queues))
+            stats['rates'] = self._window.rates()
+        return stats
+
+    def stop(self):
+        """Finish queued events and stop the workers"""
+        with self._lock:
+            self._stopping = True
+            for work in self._work:
+                work.notify_all()
+        for worker in self._workers:
+            worker.join()
@@ -0,0 +1,212 @@
+"""
+Security subsystem - Alert escalation rules
+Declarative rules such as "motion > 5 in 10s per location -> high" are
+compiled once into shared sliding-window counters.
+"""
+
+import heapq
+import re
+from bisect import bisect_left, insort
+from collections import deque
+from itertools import count
+from typing import Dict, Iterable, List, Tuple
+
+from modules.security.security_events import ALERT_LEVELS, EVENT_KINDS
+
+SCOPES = ('location', 'camera', 'city')
+
+_RULE = re.compile(
+    r"^\s*(?P<kind>\w+)\s*>\s*(?P<threshold>\d+)\s+in\s+(?P<window>\d+(?:\.\d+)?)\s*s"
+    r"(?:\s+(?:per\s+(?P<scope>location|camera)|(?P<city>citywide)))?"
+    r"\s*->\s*(?P<level>\w+)\s*$"
+)
+
+
+class EscalationRule:
+    """More than `threshold` `kind` events within `window` seconds in one scope -> `level`"""
+
+    __slots__ = ('kind', 'threshold', 'window', 'scope', 'level')
+
+    def __init__(self, kind: str, threshold: int, window: float, level: str, scope: str = 'location'):
+        if kind != 'any' and kind not in EVENT_KINDS:
+            raise ValueError(f"Unknown event kind: {kind}")
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown scope: {scope} ({', '.join(SCOPES)})")
+        if level not in ALERT_LEVELS:
+            raise ValueError(f"Unknown alert level: {level} ({', '.join(ALERT_LEVELS)})")
+        if threshold < 0 or window <= 0:
+            raise ValueError("threshold must be >= 0 and window > 0")
+        self.kind = kind
+        self.threshold = int(threshold)
+        self.window = float(window)
+        self.level = level
+        self.scope = scope
+
+    @classmethod
+    def parse(cls, text: str) -> 'EscalationRule':
+        """Parse "motion > 5 in 10s per location -> high" (scope: per camera / citywide)"""
+        match = _RULE.match(text)
+        if match is None:
+            raise ValueError(f"Cannot parse rule: {text!r}")
+        scope = 'city' if match['city'] else (match['scope'] or 'location')
+        return cls(match['kind'], int(match['threshold']), float(match['window']), match['level'], scope)
+
+    def __repr__(self):
+        scope = 'citywide' if self.scope == 'city' else f"per {self.scope}"
+        return f"EscalationRule('{self.kind} > {self.threshold} in {self.window:g}s {scope} -> {self.level}')"
+
+
+class _CounterGroup:
+    """
+    Every rule with the same (kind, window, scope) shares one sliding-window
+    counter per scope key. A key keeps at most max(threshold) + 1 event times,
+    so memory stays bounded however bursty the input is. Thresholds are sorted
+    and a prefix maximum of levels lets one bisect find the highest level.
+    """
+
+    __slots__ = ('kind', 'window', 'scope', 'thresholds', 'levels', 'capacity', 'counters')
+
+    def __init__(self, kind: str, window: float, scope: str, rules: List[EscalationRule]):
+        self.kind = kind
+        self.window = window
+        self.scope = scope
+        rules = sorted(rules, key=lambda rule: rule.threshold)
+        self.thresholds = [rule.threshold for rule in rules]
+        self.levels = []
+        best = 0
+        for rule in rules:
+            best = max(best, ALERT_LEVELS.index(rule.level))
+            self.levels.append(best)
+        self.capacity = self.thresholds[-1] + 1
+        self.counters: Dict[object, deque] = {}
+
+    def add(self, key, time: float, count: int, now: float) -> int:
+        """Record `count` events seen at `time` for `key`; returns the triggered level rank (0 = none)"""
+        times = self.counters.get(key)
+        if times is None:
+            times = self.counters[key] = deque(maxlen=self.capacity)
+        capacity = self.capacity
+        if not times or time >= times[-1]:
+            times.extend([time] * min(count, capacity))
+        else:
+            # Late event (a camera of the same location on another worker): keep the times sorted
+            for _ in range(min(count, capacity)):
+                if len(times) == capacity:
+                    if time <= times[0]:
+                        break
+                    times.popleft()
+                insort(times, time)
+        return self.level(key, now)
+
+    def level(self, key, now: float) -> int:
+        times = self.counters.get(key)
+        if times is None:
+            return 0
+        # Same expression as the engine's expiry times, so float rounding cannot disagree
+        window = self.window
+        while times and times[0] + window <= now:
+            times.popleft()
+        if not times:
+            del self.counters[key]
+            return 0
+        passed = bisect_left(self.thresholds, len(times))
+        return self.levels[passed - 1] if passed else 0
+
+
+class RuleEngine:
+    """
+    Compiled escalation rules.
+    Events are grouped once per batch by (kind, scope key); each group of
+    rules is then updated with one counter operation, so the cost per event
+    depends on the number of distinct (kind, window, scope) groups, not on
+    the number of rules. Triggered keys are re-checked only when their oldest
+    event leaves the window (an expiry heap), and the current level comes
+    from per-level trigger counts.
+    """
+
+    def __init__(self, rules: Iterable):
+        self.rules = [rule if isinstance(rule, EscalationRule) else EscalationRule.parse(rule)
+                      for rule in rules]
+        grouped: Dict[Tuple[str, float, str], List[EscalationRule]] = {}
+        for rule in self.rules:
+            grouped.setdefault((rule.kind, rule.window, rule.scope), []).append(rule)
+        self._groups = [_CounterGroup(kind, window, scope, members)
+                        for (kind, window, scope), members in grouped.items()]
+        # Event kind -> (index, group) of the groups that count it ('any' counts every kind)
+        self._by_kind = {kind: [(index, group) for index, group in enumerate(self._groups)
+                                if group.kind in (kind, 'any')]
+                         for kind in EVENT_KINDS}
+        self._active: Dict[Tuple[int, object], int] = {}
+        self._rank_counts = [0] * len(ALERT_LEVELS)
+        self._expiry_heap: List[tuple] = []
+        self._scheduled = set()
+        self._sequence = count()
+
+    @staticmethod
+    def _key(scope: str, camera_id: str, location):
+        if scope == 'location':
+            return location
+        if scope == 'camera':
+            return camera_id
+        return None
+
+    def _set_rank(self, trigger: Tuple[int, object], rank: int):
+        previous = self._active.get(trigger, 0)
+        if rank != previous:
+            self._rank_counts[previous] -= 1
+            self._rank_counts[rank] += 1
+            if rank:
+                self._active[trigger] = rank
+            else:
+                del self._active[trigger]
+        if rank and trigger not in self._scheduled:
+            index, key = trigger
+            expiry = self._groups[index].counters[key][0] + self._groups[index].window
+            heapq.heappush(self._expiry_heap, (expiry, next(self._sequence), trigger))
+            self._scheduled.add(trigger)
+
+    def observe(self, events: Iterable[tuple], now: float) -> str:
+        """
+        Feed (kind, camera_id, location[, timestamp]) events; events without a
+        timestamp, or stamped after `now`, count at `now`. Returns the current
+        rule level.
+        """
+        tally: Dict[tuple, int] = {}
+        for event in events:
+            tally[event] = tally.get(event, 0) + 1
+        # (group index, scope key, event time) -> count
+        per_group: Dict[Tuple[int, object, float], int] = {}
+        stamped = False
+        for event, amount in tally.items():
+            if len(event) == 3:
+                kind, camera_id, location = event
+                time = now
+            else:
+                kind, camera_id, location, time = event
+                if time > now:
+                    time = now
+                stamped = True
+            for index, group in self._by_kind[kind]:
+                trigger = (index, self._key(group.scope, camera_id, location), time)
+                per_group[trigger] = per_group.get(trigger, 0) + amount
+        groups = self._groups
+        items = sorted(per_group.items(), key=lambda item: item[0][2]) if stamped else per_group.items()
+        for (index, key, time), amount in items:
+            self._set_rank((index, key), groups[index].add(key, time, amount, now))
+        return self.level(now)
+
+    def level(self, now: float) -> str:
+        """Highest level of the rules currently exceeded (expired triggers are re-checked first)"""
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            trigger = heapq.heappop(heap)[2]
+            self._scheduled.discard(trigger)
+            index, key = trigger
+            self._set_rank(trigger, self._groups[index].level(key, now))
+        for rank in range(len(ALERT_LEVELS) - 1, 0, -1):
+            if self._rank_counts[rank]:
+                return ALERT_LEVELS[rank]
+        return ALERT_LEVELS[0]
+
+    def active_triggers(self) -> int:
+        return len(self._active)
@@ -1,7 +1,142 @@
 """
-Security system init
+Security subsystem - Main subsystem manager
 """
 
-from .security_system import SecuritySystem
+from core.factories.factories import ISubsystem
+from core.query.query import run_query
+from core.tracing.tracing import oraliq
+from modules.security.security_events import CameraEventPipeline
+from modules.security.security_rules import RuleEngine
+from typing import Dict
 
-__all__ = ['SecuritySystem']
+
+class SecuritySystem(ISubsystem):
+    """
+    Security Subsystem - Manages all security devices in the city
+    """
+    
+    def __init__(self):
+        self.name = "Security System"
+        self.devices: Dict[str, any] = {}
+        self.is_running = False
+        self.alert_level = "normal"
+        self.event_pipeline = None
+        self.rule_engine = None
+    
+    def get_name(self) -> str:
+        return self.name
+    
+    def initialize(self):
+        """Initialize security system"""
+        self.is_running = True
+        print(f"✓ {self.name} initialized")
+    
+    def shutdown(self):
+        """Shutdown security system"""
+        self.stop_event_pipeline()
+        for device in self.devices.values():
+            if hasattr(device, 'stop'):
+                device.stop()
+        self.is_running = False
+        print(f"✗ {self.name} shut down")
+    
+    def add_device(self, device_id: str, device):
+        """Add a security device"""
+        self.devices[device_id] = device
+        print(f"[SECURITY] Added device: {device_id}")
+    
+    def add_devices(self, devices: Dict[str, any]):
+        """Add many security devices at once (one log line for the batch)"""
+        self.devices.update(devices)
+        print(f"[SECURITY] Added {len(devices)} devices")
+    
+    def remove_devices(self, device_ids) -> int:
+        """Remove many security devices at once (one log line); returns the number removed"""
+        devices = self.devices
+        removed = 0
+        for device_id in device_ids:
+            if devices.pop(device_id, None) is not None:
+                removed += 1
+        print(f"[SECURITY] Removed {removed} devices")
+        return removed
+    
+    def apply_readings(self, updates) -> int:
+        """Apply validated (device_id, attribute, value) telemetry in bulk, without logging"""
+        devices = self.devices
+        applied = 0
+        for device_id, attribute, value in updates:
+            device = devices.get(device_id)
+            if device is not None:
+                setattr(device, attribute, value)
+                applied += 1
+        return applied
+    
+    def query(self, where: dict = None, fields=None) -> dict:
+        """Status of the cameras matching `where`, limited to `fields` (see core.query)"""
+        return run_query(self.devices, where, fields)
+    
+    def get_status(self, compact: bool = False) -> dict:
+        """Get status of all security devices (compact: strings as flyweight handles)"""
+        devices_status = {}
+        with oraliq('devices', 'SecuritySystem', count=len(self.devices)):
+            for device_id, device in self.devices.items():
+                if hasattr(device, 'status'):
+                    devices_status[device_id] = device.status(compact=True) if compact else device.status()
+        
+        status = {
+            'system_name': self.name,
+            'is_running': self.is_running,
+            'alert_level': self.alert_level,
+            'device_count': len(self.devices),
+            'devices': devices_status
+        }
+        if self.event_pipeline is not None:
+            status['event_pipeline'] = self.event_pipeline.stats()
+        if self.rule_engine is not None:
+            status['escalation_rules'] = len(self.rule_engine.rules)
+            status['active_triggers'] = self.rule_engine.active_triggers()
+        return status
+    
+    def start_all(self):
+        """Start recording on all cameras"""
+        for device in self.devices.values():
+            if hasattr(device, 'start'):
+                device.start()
+    
+    def stop_all(self):
+        """Stop recording on all cameras"""
+        for device in self.devices.values():
+            if hasattr(device, 'stop'):
+                device.stop()
+    
+    def start_event_pipeline(self, **options):
+        """Start the camera event pipeline (options: see CameraEventPipeline)"""
+        if self.event_pipeline is None:
+            self.event_pipeline = CameraEventPipeline(self, **options)
+        return self.event_pipeline
+    
+    def stop_event_pipeline(self):
+        """Process queued events and stop the pipeline workers"""
+        if self.event_pipeline is not None:
+            self.event_pipeline.stop()
+            self.event_pipeline = None
+    
+    def set_escalation_rules(self, rules):
+        """
+        Compile escalation rules, e.g. "motion > 5 in 10s per location -> high"
+        (strings or EscalationRule objects; an empty list removes them)
+        """
+        self.rule_engine = RuleEngine(rules) if rules else None
+        print(f"[SECURITY] {len(rules)} escalation rules compiled")
+        return self.rule_engine
+    
+    def report_event(self, camera_id: str, kind: str, timestamp: float = None, metadata: dict = None) -> bool:
+        """Push a camera detection into the pipeline (False if unknown camera or queue overflow)"""
+        if self.event_pipeline is None or camera_id not in self.devices:
+            return False
+        return self.event_pipeline.push(camera_id, kind, timestamp, metadata)
+    
+    def set_alert_level(self, level: str):
+        """Set security alert level"""
+        self.alert_level = level
+        print(f"[SECURITY] Alert level set to: {level}")
@@ -0,0 +1,202 @@
+"""
+Transport subsystem - Signal timing
+Webster cycle lengths and green splits for every intersection at once, and
+green-wave offsets along corridors (NumPy). The resulting plan says when each
+traffic light is green within its intersection's cycle.
+Requires NumPy.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core.flyweight.flyweight import attribute_registry
+
+# Signal codes used by SignalPlan.signals_at
+SIGNALS = ('red', 'yellow', 'green')
+RED, YELLOW, GREEN = range(3)
+
+Corridor = Sequence[Union[str, Tuple[str, float]]]
+
+
+class SignalPlan:
+    """
+    Fixed-time plan for a set of traffic lights, as arrays indexed by light.
+
+    Every light is one phase of its intersection; the phases of an
+    intersection run one after another in device order, each followed by
+    its lost time (yellow + all-red). A light is green from `start` for
+    `green` seconds of its intersection's cycle, yellow for `yellow` seconds
+    after that and red otherwise; the cycle is shifted by the intersection's
+    offset so corridors form green waves.
+    """
+
+    def __init__(self, device_ids: List[str], intersections: List[str], light_intersection: np.ndarray,
+                 cycle: np.ndarray, offset: np.ndarray, start: np.ndarray, green: np.ndarray,
+                 yellow: float, flow_ratio: np.ndarray):
+        self.device_ids = device_ids
+        self.intersections = intersections
+        self.light_intersection = light_intersection
+        self.cycle = cycle
+        self.offset = offset
+        self.start = start
+        self.green = green
+        self.yellow = yellow
+        self.flow_ratio = flow_ratio
+        self._rows = None
+
+    def __len__(self) -> int:
+        return len(self.device_ids)
+
+    def signals_at(self, t: float) -> np.ndarray:
+        """Signal code (RED, YELLOW, GREEN) of every light at time `t` (seconds)"""
+        inter = self.light_intersection
+        position = np.mod(t - self.offset[inter], self.cycle[inter]) - self.start
+        signals = np.full(len(self.device_ids), RED, dtype=np.int8)
+        signals[(position >= 0) & (position < self.green)] = GREEN
+        signals[(position >= self.green) & (position < self.green + self.yellow)] = YELLOW
+        return signals
+
+    def timing(self, device_id: str) -> Optional[dict]:
+        """Timing of one light, or None if it is not in the plan"""
+        if self._rows is None:
+            self._rows = {device_id: row for row, device_id in enumerate(self.device_ids)}
+        row = self._rows.get(device_id)
+        if row is None:
+            return None
+        inter = self.light_intersection[row]
+        return {'intersection': self.intersections[inter], 'cycle': float(self.cycle[inter]),
+                'offset': float(self.offset[inter]), 'green_start': float(self.start[row]),
+                'green': float(self.green[row]), 'yellow': self.yellow}
+
+    def summary(self) -> dict:
+        cycles = self.cycle
+        return {
+            'lights': len(self.device_ids),
+            'intersections': len(self.intersections),
+            'cycle_min': float(cycles.min()) if cycles.size else 0.0,
+            'cycle_mean': float(cycles.mean()) if cycles.size else 0.0,
+            'cycle_max': float(cycles.max()) if cycles.size else 0.0,
+            'oversaturated': int((self.flow_ratio >= 1.0).sum()),
+        }
+
+
+class SignalTimingOptimizer:
+    """
+    Webster's method for all intersections in one batch of array operations.
+
+    With flow ratios y = flow / saturation_flow per phase, Y = sum(y) and lost
+    time L = phases * lost_time, the optimum cycle is (1.5 L + 5) / (1 - Y),
+    clipped to [min_cycle, max_cycle] (max_cycle when Y approaches 1). The
+    green time left after L is split in proportion to y, on top of a minimum
+    green per phase. Intersections on a corridor share its longest cycle and
+    are offset by the travel time from the corridor's first intersection at
+    `speed_kmh`, so a platoon meets consecutive greens.
+    """
+
+    def __init__(self, saturation_flow: float = 1800.0, lost_time: float = 4.0, yellow: float = 3.0,
+                 min_green: float = 7.0, min_cycle: float = 30.0, max_cycle: float = 150.0,
+                 speed_kmh: float = 50.0, spacing_m: float = 300.0, max_flow_ratio: float = 0.95):
+        if not 0.0 < yellow <= lost_time:
+            raise ValueError("yellow must be in (0, lost_time]")
+        if not 0.0 < min_cycle <= max_cycle:
+            raise ValueError("min_cycle must be in (0, max_cycle]")
+        if saturation_flow <= 0 or speed_kmh <= 0:
+            raise ValueError("saturation_flow and speed_kmh must be positive")
+        self.saturation_flow = saturation_flow
+        self.lost_time = lost_time
+        self.yellow = yellow
+        self.min_green = min_green
+        self.min_cycle = min_cycle
+        self.max_cycle = max_cycle
+        self.speed = speed_kmh / 3.6
+        self.spacing = spacing_m
+        self.max_flow_ratio = max_flow_ratio
+
+    def plan(self, lights: Dict[str, object], flows: Dict[str, float] = None,
+             corridors: Dict[str, Corridor] = None) -> SignalPlan:
+        """
+        Plan for every light in `lights` (device_id -> TrafficLight) from the
+        observed `flows` (device_id -> vehicles/hour on that approach; missing
+        approaches count as 0). A corridor lists intersection names in driving
+        order, or (name, metres from the previous one) pairs.
+        """
+        device_ids = list(lights)
+        count = len(device_ids)
+        handles = np.fromiter((device._intersection for device in lights.values()), dtype=np.int64, count=count)
+        flows = flows or {}
+        flow = np.fromiter((flows.get(device_id, 0.0) for device_id in device_ids), dtype=np.float64, count=count)
+
+        # Group lights by intersection: sorted order, group starts, phase count per group
+        order = np.argsort(handles, kind='stable')
+        sorted_handles = handles[order]
+        first = np.ones(count, dtype=bool)
+        first[1:] = sorted_handles[1:] != sorted_handles[:-1]
+        starts = np.flatnonzero(first)
+        group_handles = sorted_handles[starts]
+        light_intersection = np.empty(count, dtype=np.intp)
+        light_intersection[order] = np.cumsum(first) - 1
+        phases = np.diff(np.append(starts, count)).astype(np.float64)
+        intersections = [attribute_registry.value(int(handle)) for handle in group_handles]
+        if not count:
+            empty = np.zeros(0)
+            return SignalPlan(device_ids, intersections, light_intersection, empty, empty, empty, empty,
+                              self.yellow, empty)
+
+        ratio = flow / self.saturation_flow
+        flow_ratio = np.add.reduceat(ratio[order], starts)
+        lost = phases * self.lost_time
+        webster = (1.5 * lost + 5.0) / np.maximum(1.0 - flow_ratio, 1e-9)
+        cycle = np.where(flow_ratio < self.max_flow_ratio, webster, self.max_cycle)
+        cycle = np.maximum(np.clip(cycle, self.min_cycle, self.max_cycle), lost + phases * self.min_green)
+        offset = np.zeros_like(cycle)
+        if corridors:
+            cycle, offset = self._coordinate(corridors, group_handles, cycle)
+
+        # Green: minimum per phase plus the spare time split by flow ratio (evenly without flow)
+        inter = light_intersection
+        spare = cycle - lost - phases * self.min_green
+        total = flow_ratio[inter]
+        share = np.where(total > 0, ratio / np.where(total > 0, total, 1.0), 1.0 / phases[inter])
+        green = self.min_green + spare[inter] * share
+        # Phases follow one another in device order within each intersection
+        step = (green + self.lost_time)[order]
+        ends = np.cumsum(step)
+        before = np.repeat(ends[starts] - step[starts], np.diff(np.append(starts, count)))
+        start = np.empty(count)
+        start[order] = ends - step - before
+        return SignalPlan(device_ids, intersections, light_intersection, cycle, offset, start, green,
+                          self.yellow, flow_ratio)
+
+    def _coordinate(self, corridors: Dict[str, Corridor], group_handles: np.ndarray,
+                    cycle: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Common cycle per corridor and travel-time offsets (first corridor listing an intersection wins)"""
+        members, corridor_of, distance = [], [], []
+        handle = attribute_registry.handle
+        for number, stops in enumerate(corridors.values()):
+            for position, stop in enumerate(stops):
+                name, metres = stop if isinstance(stop, tuple) else (stop, self.spacing)
+                members.append(-1 if handle(name) is None else handle(name))
+                corridor_of.append(number)
+                distance.append(0.0 if position == 0 else metres)
+        members = np.array(members, dtype=np.int64)
+        corridor_of = np.array(corridor_of, dtype=np.intp)
+        travel = np.array(distance) / self.speed
+        # Travel time from each corridor's first stop
+        arrival = np.cumsum(travel)
+        corridor_start = np.flatnonzero(np.diff(corridor_of, prepend=-1))
+        arrival -= np.repeat(arrival[corridor_start], np.diff(np.append(corridor_start, len(members))))
+        group = np.searchsorted(group_handles, members)
+        known = (members >= 0) & (group < len(group_handles))
+        known[known] = group_handles[group[known]] == members[known]
+        group, corridor_of, arrival = group[known], corridor_of[known], arrival[known]
+
+        common = np.zeros(len(corridors))
+        np.maximum.at(common, corridor_of, cycle[group])
+        coordinated = cycle.copy()
+        np.maximum.at(coordinated, group, common[corridor_of])
+        offset = np.zeros_like(cycle)
+        groups, first = np.unique(group, return_index=True)
+        offset[groups] = np.mod(arrival[first], coordinated[groups])
+        return coordinated, offset
+
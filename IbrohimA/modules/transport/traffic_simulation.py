@@ -0,0 +1,243 @@
+"""
+Transport subsystem - Traffic microsimulation
+Nagel-Schreckenberg cellular automaton over a road network whose nodes are
+the traffic-light intersections, advanced for every vehicle at once (NumPy).
+Measured flows per approach feed TransportSystem.observe_flows, and from
+there the signal-timing optimizer.
+Requires NumPy.
+"""
+
+import time
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from modules.transport.signal_timing import GREEN
+
+Road = Union[Tuple[str, str], Tuple[str, str, float]]
+
+# traffic_flow levels by mean speed as a share of the speed limit
+FLOW_LEVELS = ((0.75, 'free'), (0.4, 'normal'), (0.15, 'heavy'), (0.0, 'congested'))
+
+
+def grid_roads(intersections: Sequence[str], columns: int, length_m: float = 300.0) -> List[Road]:
+    """Two-way roads between horizontal and vertical neighbours of intersections laid out row by row"""
+    roads = []
+    for index, name in enumerate(intersections):
+        right, below = index + 1, index + columns
+        if right % columns and right < len(intersections):
+            roads += [(name, intersections[right], length_m), (intersections[right], name, length_m)]
+        if below < len(intersections):
+            roads += [(name, intersections[below], length_m), (intersections[below], name, length_m)]
+    return roads
+
+
+class TrafficSimulation:
+    """
+    Single-lane Nagel-Schreckenberg traffic on directed roads between
+    intersections.
+
+    Each road is a run of cells (`cell_m` metres) ending at a stop line
+    controlled by one traffic light of its destination intersection (the
+    intersection's lights take the incoming roads in turn). All roads are
+    concatenated into one cell space and vehicles are kept as parallel
+    arrays (road, cell, speed, next road) sorted by position, so the gap to
+    the vehicle ahead is a shifted subtraction. Each tick (one second):
+    accelerate, brake to the gap, randomly slow down with probability
+    `slowdown`, move. A road's front vehicle may cross a green stop line
+    into its next road (chosen at random among the roads leaving the
+    intersection); one vehicle enters a road per tick. The network is
+    closed, so the vehicle count is constant.
+
+    Signals come from the transport system's signal plan (lights without
+    a plan are always green).
+    """
+
+    def __init__(self, transport_system, roads: Iterable[Road], density: float = 0.2,
+                 max_speed: int = 5, slowdown: float = 0.25, cell_m: float = 7.5,
+                 start_time: float = 0.0, seed: int = None):
+        if not 0.0 <= density <= 1.0:
+            raise ValueError("density must be in [0, 1]")
+        if not 0.0 <= slowdown < 1.0:
+            raise ValueError("slowdown must be in [0, 1)")
+        self._system = transport_system
+        self.max_speed = max_speed
+        self.slowdown = slowdown
+        self.cell_m = cell_m
+        self.time = start_time
+        self.ticks = 0
+        self._rng = np.random.default_rng(seed)
+
+        # Intersections and their lights, in device order
+        lights: Dict[str, List[str]] = {}
+        for device_id, device in transport_system.devices.items():
+            lights.setdefault(device.intersection, []).append(device_id)
+        self.light_ids = [device_id for ids in lights.values() for device_id in ids]
+        light_row = {device_id: row for row, device_id in enumerate(self.light_ids)}
+        node_index = {name: index for index, name in enumerate(lights)}
+
+        sources, targets, lengths, road_light = [], [], [], []
+        turn = dict.fromkeys(lights, 0)
+        for road in roads:
+            source, target = road[0], road[1]
+            if source not in node_index or target not in node_index:
+                raise ValueError(f"Road {source} -> {target}: both ends must be traffic-light intersections")
+            length_m = road[2] if len(road) > 2 else 300.0
+            at_target = lights[target]
+            road_light.append(light_row[at_target[turn[target] % len(at_target)]])
+            turn[target] += 1
+            sources.append(node_index[source])
+            targets.append(node_index[target])
+            lengths.append(max(1, int(round(length_m / cell_m))))
+        if not lengths:
+            raise ValueError("The network needs at least one road")
+        self.road_source = np.array(sources, dtype=np.intp)
+        self.road_target = np.array(targets, dtype=np.intp)
+        self.road_length = np.array(lengths, dtype=np.int64)
+        self.road_light = np.array(road_light, dtype=np.intp)
+        self.road_offset = np.concatenate([[0], np.cumsum(self.road_length)[:-1]])
+        self.cells = int(self.road_length.sum())
+
+        # Roads leaving each intersection (CSR) for route choice
+        by_source = np.argsort(self.road_source, kind='stable')
+        self._out_roads = by_source
+        self._out_count = np.bincount(self.road_source, minlength=len(node_index))
+        self._out_start = np.concatenate([[0], np.cumsum(self._out_count)[:-1]])
+
+        occupied = np.sort(self._rng.choice(self.cells, int(self.cells * density), replace=False))
+        self.road = np.searchsorted(self.road_offset, occupied, side='right') - 1
+        self.position = occupied - self.road_offset[self.road]
+        self.speed = np.zeros(occupied.shape[0], dtype=np.int64)
+        self.next_road = self._choose(self.road)
+
+        self._crossings = np.zeros(len(self.light_ids), dtype=np.int64)
+        self._measured_ticks = 0
+        self._distance = 0
+        self._plan = None
+        self._plan_rows = None
+
+    @property
+    def vehicles(self) -> int:
+        return self.road.shape[0]
+
+    def _choose(self, roads: np.ndarray) -> np.ndarray:
+        """Random next road for vehicles on `roads` (-1 at a dead end)"""
+        node = self.road_target[roads]
+        count = self._out_count[node]
+        pick = (self._rng.random(roads.shape[0]) * count).astype(np.int64)
+        choice = self._out_roads[np.minimum(self._out_start[node] + pick, len(self._out_roads) - 1)]
+        return np.where(count > 0, choice, -1)
+
+    def _green_roads(self) -> np.ndarray:
+        """Whether each road's stop line is green at the current time"""
+        plan = self._system.signal_plan
+        if plan is None:
+            return np.ones(self.road_light.shape[0], dtype=bool)
+        if plan is not self._plan:
+            rows = {device_id: row for row, device_id in enumerate(plan.device_ids)}
+            self._plan_rows = np.array([rows.get(device_id, -1) for device_id in self.light_ids], dtype=np.intp)
+            self._plan = plan
+        signals = plan.signals_at(self.time)
+        rows = self._plan_rows[self.road_light]
+        return np.where(rows >= 0, signals[rows] == GREEN, True)
+
+    def step(self):
+        """Advance every vehicle by one tick (one second)"""
+        road, position, speed, next_road = self.road, self.position, self.speed, self.next_road
+        count = road.shape[0]
+        if not count:
+            self.time += 1.0
+            self.ticks += 1
+            return
+        length = self.road_length[road]
+        # Front vehicle of each road: the last one in sorted order on it
+        front = np.ones(count, dtype=bool)
+        front[:-1] = road[1:] != road[:-1]
+        gap = np.empty(count, dtype=np.int64)
+        gap[:-1] = position[1:] - position[:-1] - 1
+        stop_gap = length - position - 1
+        # Through a green stop line the gap extends to the last vehicle on the next road
+        tail = self.road_length.copy()
+        rear = np.ones(count, dtype=bool)
+        rear[1:] = road[1:] != road[:-1]
+        tail[road[rear]] = position[rear]
+        passing = front & (next_road >= 0) & self._green_roads()[road]
+        gap[front] = stop_gap[front]
+        gap[passing] += tail[next_road[passing]]
+
+        speed = np.minimum(np.minimum(speed + 1, self.max_speed), gap)
+        slow = self._rng.random(count) < self.slowdown
+        speed = np.where(slow & (speed > 0), speed - 1, speed)
+        position = position + speed
+        self._distance += int(speed.sum())
+
+        crossed = np.flatnonzero(position >= length)
+        if crossed.size:
+            # One vehicle enters a road per tick; the rest wait at the stop line
+            _, first = np.unique(next_road[crossed], return_index=True)
+            held = np.ones(crossed.size, dtype=bool)
+            held[first] = False
+            waiting = crossed[held]
+            position[waiting] = length[waiting] - 1
+            speed[waiting] = 0
+            crossed = crossed[~held]
+            np.add.at(self._crossings, self.road_light[road[crossed]], 1)
+            position[crossed] -= length[crossed]
+            road = road.copy()
+            road[crossed] = next_road[crossed]
+            next_road = next_road.copy()
+            next_road[crossed] = self._choose(road[crossed])
+            # Entering vehicles are behind everyone already on their road: restore the order
+            order = np.argsort(self.road_offset[road] + position, kind='stable')
+            road, position, speed, next_road = road[order], position[order], speed[order], next_road[order]
+        self.road, self.position, self.speed, self.next_road = road, position, speed, next_road
+        self.time += 1.0
+        self.ticks += 1
+        self._measured_ticks += 1
+
+    def run(self, ticks: int) -> dict:
+        """Advance `ticks` seconds; summary with the simulated/wall-clock speed-up"""
+        started = time.perf_counter()
+        for _ in range(ticks):
+            self.step()
+        seconds = time.perf_counter() - started
+        return dict(self.summary(), wall_seconds=seconds, speedup=ticks / seconds if seconds else 0.0)
+
+    def mean_speed(self) -> float:
+        """Mean vehicle speed (cells per tick) since the last reset"""
+        if not self._measured_ticks or not self.vehicles:
+            return 0.0
+        return self._distance / (self._measured_ticks * self.vehicles)
+
+    def flows(self) -> Dict[str, float]:
+        """Vehicles/hour through each light's stop line since the last reset"""
+        if not self._measured_ticks:
+            return {}
+        hourly = self._crossings * (3600.0 / self._measured_ticks)
+        return dict(zip(self.light_ids, hourly.tolist()))
+
+    def flow_level(self) -> str:
+        share = self.mean_speed() / self.max_speed
+        return next(level for threshold, level in FLOW_LEVELS if share >= threshold)
+
+    def reset_measurements(self):
+        self._crossings[:] = 0
+        self._measured_ticks = 0
+        self._distance = 0
+
+    def publish(self) -> Dict[str, float]:
+        """Feed the measured flows and flow level to the transport system"""
+        flows = self.flows()
+        self._system.observe_flows(flows)
+        self._system.traffic_flow = self.flow_level()
+        return flows
+
+    def summary(self) -> dict:
+        return {
+            'roads': int(self.road_length.shape[0]),
+            'cells': self.cells,
+            'vehicles': self.vehicles,
+            'ticks': self.ticks,
+            'mean_speed_kmh': round(self.mean_speed() * self.cell_m * 3.6, 2),
+            'flow_level': self.flow_level(),
+        }
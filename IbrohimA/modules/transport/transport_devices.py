@@ -2,16 +2,35 @@
 Transport subsystem devices
 """
 
+from core.flyweight.flyweight import attribute_registry
+
+_intern = attribute_registry.intern
+_lookup = attribute_registry.value
+
 
 class TrafficLight:
     """Traffic light device"""
     
+    __slots__ = ('device_id', '_intersection', 'current_signal', 'is_operational')
+    # Status key -> slot (used by status queries)
+    STATUS_SLOTS = {'device_id': 'device_id', 'intersection': '_intersection',
+                    'current_signal': 'current_signal', 'is_operational': 'is_operational'}
+    
     def __init__(self, device_id: str, intersection: str):
         self.device_id = device_id
-        self.intersection = intersection
+        self._intersection = _intern(intersection)
         self.current_signal = "red"
         self.is_operational = False
     
+    @property
+    def intersection(self) -> str:
+        """Intersection name (stored as a shared flyweight handle)"""
+        return _lookup(self._intersection)
+    
+    @intersection.setter
+    def intersection(self, value: str):
+        self._intersection = _intern(value)
+    
     def start(self):
         """Start traffic light operation"""
         self.is_operational = True
@@ -30,11 +49,27 @@ class TrafficLight:
             self.current_signal = signal
             print(f"[TRAFFIC] {self.device_id}: Signal changed to {signal.upper()}")
     
-    def status(self) -> dict:
-        """Get traffic light status"""
+    def clone(self, device_id: str, intersection: str) -> 'TrafficLight':
+        """Prototype: copy this traffic light's state under a new id and intersection"""
+        twin = self.__class__.__new__(self.__class__)
+        twin.device_id = device_id
+        twin._intersection = _intern(intersection)
+        twin.current_signal = self.current_signal
+        twin.is_operational = self.is_operational
+        return twin
+    
+    def __getstate__(self):
+        """Pickle the traffic light with its intersection string (handles are per-process)"""
+        return (self.device_id, self.intersection, self.current_signal, self.is_operational)
+    
+    def __setstate__(self, state):
+        self.device_id, self.intersection, self.current_signal, self.is_operational = state
+    
+    def status(self, compact: bool = False) -> dict:
+        """Get traffic light status (compact: strings as flyweight handles)"""
         return {
             'device_id': self.device_id,
-            'intersection': self.intersection,
+            'intersection': self._intersection if compact else _lookup(self._intersection),
             'current_signal': self.current_signal,
             'is_operational': self.is_operational
         }
@@ -0,0 +1,185 @@
+"""
+Transport subsystem - Main subsystem manager
+"""
+
+from core.factories.factories import ISubsystem
+from core.query.query import run_query
+from core.tracing.tracing import oraliq
+from typing import Dict
+import time
+
+
+class TransportSystem(ISubsystem):
+    """
+    Transport Subsystem - Manages traffic lights and transportation infrastructure
+    """
+    
+    def __init__(self):
+        self.name = "Transport System"
+        self.devices: Dict[str, any] = {}
+        self.is_running = False
+        self.traffic_flow = "normal"
+        self.observed_flows: Dict[str, float] = {}
+        self.signal_plan = None
+        self._plan_signals = None
+        self.simulation = None
+    
+    def get_name(self) -> str:
+        return self.name
+    
+    def initialize(self):
+        """Initialize transport system"""
+        self.is_running = True
+        print(f"✓ {self.name} initialized")
+    
+    def shutdown(self):
+        """Shutdown transport system"""
+        for device in self.devices.values():
+            if hasattr(device, 'stop'):
+                device.stop()
+        self.is_running = False
+        print(f"✗ {self.name} shut down")
+    
+    def add_device(self, device_id: str, device):
+        """Add a transport device"""
+        self.devices[device_id] = device
+        print(f"[TRANSPORT] Added device: {device_id}")
+    
+    def add_devices(self, devices: Dict[str, any]):
+        """Add many transport devices at once (one log line for the batch)"""
+        self.devices.update(devices)
+        print(f"[TRANSPORT] Added {len(devices)} devices")
+    
+    def remove_devices(self, device_ids) -> int:
+        """Remove many transport devices at once (one log line); returns the number removed"""
+        devices = self.devices
+        removed = 0
+        for device_id in device_ids:
+            if devices.pop(device_id, None) is not None:
+                removed += 1
+        print(f"[TRANSPORT] Removed {removed} devices")
+        return removed
+    
+    def apply_readings(self, updates) -> int:
+        """Apply validated (device_id, attribute, value) telemetry in bulk, without logging"""
+        devices = self.devices
+        applied = 0
+        for device_id, attribute, value in updates:
+            device = devices.get(device_id)
+            if device is not None:
+                setattr(device, attribute, value)
+                applied += 1
+        return applied
+    
+    def query(self, where: dict = None, fields=None) -> dict:
+        """Status of the traffic lights matching `where`, limited to `fields` (see core.query)"""
+        return run_query(self.devices, where, fields)
+    
+    def get_status(self, compact: bool = False) -> dict:
+        """Get status of all transport devices (compact: strings as flyweight handles)"""
+        devices_status = {}
+        with oraliq('devices', 'TransportSystem', count=len(self.devices)):
+            for device_id, device in self.devices.items():
+                if hasattr(device, 'status'):
+                    devices_status[device_id] = device.status(compact=True) if compact else device.status()
+        
+        status = {
+            'system_name': self.name,
+            'is_running': self.is_running,
+            'traffic_flow': self.traffic_flow,
+            'device_count': len(self.devices),
+            'devices': devices_status
+        }
+        if self.signal_plan is not None:
+            status['signal_plan'] = self.signal_plan.summary()
+        if self.simulation is not None:
+            status['simulation'] = self.simulation.summary()
+        return status
+    
+    def start_all(self):
+        """Start all traffic lights"""
+        for device in self.devices.values():
+            if hasattr(device, 'start'):
+                device.start()
+        # Lights restart on red: the next update_signals writes every planned signal again
+        self._plan_signals = None
+    
+    def stop_all(self):
+        """Stop all traffic lights"""
+        for device in self.devices.values():
+            if hasattr(device, 'stop'):
+                device.stop()
+    
+    def observe_flows(self, flows: Dict[str, float]):
+        """Record measured flows (device_id -> vehicles/hour on that light's approach)"""
+        self.observed_flows.update(flows)
+    
+    def optimize_traffic_flow(self, flows: Dict[str, float] = None, corridors: dict = None, **options):
+        """
+        Compute a signal plan for every traffic light from the observed flows
+        (Webster splits, green-wave offsets along `corridors`; options: see
+        SignalTimingOptimizer; requires NumPy). update_signals() then drives
+        the lights from the plan.
+        """
+        from modules.transport.signal_timing import SignalTimingOptimizer
+        self.signal_plan = SignalTimingOptimizer(**options).plan(
+            self.devices, self.observed_flows if flows is None else flows, corridors)
+        self._plan_signals = None
+        self.traffic_flow = "optimized"
+        summary = self.signal_plan.summary()
+        print(f"[TRANSPORT] Traffic flow optimized: {summary['intersections']} intersections, "
+              f"cycles {summary['cycle_min']:.0f}-{summary['cycle_max']:.0f}s")
+        return self.signal_plan
+    
+    def simulate_traffic(self, ticks: int, roads=None, **options) -> dict:
+        """
+        Run the traffic microsimulation for `ticks` seconds and feed its flows
+        to observe_flows / traffic_flow. `roads` builds a new simulation
+        (options: see TrafficSimulation; requires NumPy), otherwise the
+        current one continues under the current signal plan.
+        """
+        if roads is None and options:
+            raise ValueError(f"Simulation options ({', '.join(options)}) only apply with a new road network")
+        if roads is not None:
+            from modules.transport.traffic_simulation import TrafficSimulation
+            self.simulation = TrafficSimulation(self, roads, **options)
+        if self.simulation is None:
+            raise ValueError("No simulation yet: give the road network")
+        self.simulation.reset_measurements()
+        summary = self.simulation.run(ticks)
+        self.simulation.publish()
+        print(f"[TRANSPORT] Simulated {ticks}s: {summary['vehicles']} vehicles, "
+              f"{summary['mean_speed_kmh']} km/h, {summary['speedup']:.0f}x real time")
+        return summary
+    
+    def update_signals(self, now: float = None) -> list:
+        """
+        Set every operational light to the signal its plan gives at `now`
+        (Unix time by default), without logging. Only lights whose planned
+        signal changed since the last update are touched; returns their ids.
+        A light that was skipped (not operational) is written again as soon
+        as it is back in service.
+        """
+        plan = self.signal_plan
+        if plan is None:
+            return []
+        from modules.transport.signal_timing import SIGNALS
+        signals = plan.signals_at(time.time() if now is None else now)
+        # Signal last written per row; -1 - not written (new plan or light skipped)
+        written = self._plan_signals
+        if written is None:
+            written = self._plan_signals = signals.copy()
+            written[:] = -1
+        rows = (signals != written).nonzero()[0].tolist()
+        devices = self.devices
+        device_ids = plan.device_ids
+        changed = []
+        for row in rows:
+            device = devices.get(device_ids[row])
+            if device is not None and device.is_operational:
+                device.current_signal = SIGNALS[signals[row]]
+                written[row] = signals[row]
+                changed.append(device_ids[row])
+            else:
+                written[row] = -1
+        return changed
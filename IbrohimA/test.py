@@ -3,16 +3,22 @@ SmartCity Tizimi uchun Unit Testlar
 Barcha dizayn naqshlari va asosiy funksionallikni test qiladi
 """
 
+import importlib.util
+import json
 import unittest
+import subprocess
 import sys
 import os
 
 # Loyiha ildizini path ga qo'shish
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+HAS_NUMPY = importlib.util.find_spec('numpy') is not None
+
 from core.controller import SmartCityController
 from core.singelton.singleton import Singleton
 from core.builders.builders import SmartCityBuilder, SmartCityBiluvchi
+from core.builders.inventory import load_inventory
 from core.factories.factories import (
     YoritishQurilmaFabriki,
     XavfsizlikQurilmaFabriki,
@@ -21,9 +27,22 @@ from core.factories.factories import (
     LightingDeviceFactory,
     SecurityDeviceFactory,
     TransportDeviceFactory,
-    EnergyDeviceFactory
+    EnergyDeviceFactory,
+    get_device_class,
+    register_device_class
 )
-from core.proxy.proxy import SubsistemProxy, SubsystemProxy
+from core.proxy.proxy import SubsistemProxy, SubsystemProxy, AdmissionRejected, ConcurrencyLimit
+from core.flyweight.flyweight import FlyweightRegistry, attribute_registry
+from core.sharding.sharding import ShardPool, ShardedSubsystem, shard_for
+from core.statusboard.statusboard import StatusBoard, StatusBoardReader
+from core.telemetry.telemetry import TelemetryPipeline, encode_readings
+from core.api.api import StatusServer
+from core.timing.timing import TimerWheel
+from core.registry.registry import CityRegistry
+from core.tracing import tracing
+from core.batch.batch import BatchRunner, parse_command
+from core.loadtest.loadtest import WorkloadGenerator, parse_mix
+from core.liveness.liveness import LivenessTracker
 from core.adapters.adapters import (
     MonitoringDekorator,
     SecurityDekorator,
@@ -34,9 +53,20 @@ from core.adapters.adapters import (
 )
 from modules.lighting.lighting_system import LightingSystem
 from modules.lighting.lighting_devices import SmartLight
+from modules.lighting.lighting_schedule import LightingScheduler
 from modules.security.security_devices import SecurityCamera
+from modules.security.security_system import SecuritySystem
+from modules.security.security_rules import EscalationRule, RuleEngine
 from modules.transport.transport_devices import TrafficLight
 from modules.energy.energy_devices import EnergyMonitor
+from modules.energy.energy_system import EnergySystem
+
+
+def isolated_city(test_case, shards: int = 0) -> SmartCityController:
+    """Fresh controller outside the singleton, shut down when the test finishes"""
+    registry = CityRegistry()
+    test_case.addCleanup(registry.shutdown_all)
+    return registry.create(type(test_case).__name__, shards=shards)
 
 
 class TestSingletonPattern(unittest.TestCase):
@@ -92,6 +122,43 @@ class TestFactoryPattern(unittest.TestCase):
         device = factory.create_device("ENERGY-001", "Zone-1")
         self.assertIsInstance(device, EnergyMonitor)
         print("✓ Factory Pattern: Energy factory creates correct device")
+    
+    def test_create_many_clones_prototype(self):
+        """Test bulk creation from a prototype"""
+        factory = LightingDeviceFactory()
+        devices = factory.create_many(["L-1", "L-2", "L-3"], ["A", "B", "C"])
+        self.assertEqual([d.device_id for d in devices], ["L-1", "L-2", "L-3"])
+        self.assertEqual([d.location for d in devices], ["A", "B", "C"])
+        self.assertTrue(all(isinstance(d, SmartLight) for d in devices))
+        self.assertEqual(devices[0].status(), SmartLight("L-1", "A").status())
+        
+        devices[0].start()
+        self.assertFalse(devices[1].is_on)
+        
+        cameras = SecurityDeviceFactory().create_many(["C-1", "C-2"], "Downtown")
+        self.assertEqual({c.location for c in cameras}, {"Downtown"})
+        
+        with self.assertRaises(ValueError):
+            factory.create_many(["L-1", "L-2"], ["A"])
+        print("✓ Factory Pattern: Bulk creation clones prototype")
+    
+    def test_device_registry(self):
+        """Test factories resolve classes through the registry"""
+        class CustomLight(SmartLight):
+            pass
+        
+        factory = LightingDeviceFactory()
+        self.assertIs(get_device_class('lighting'), SmartLight)
+        register_device_class('lighting', CustomLight)
+        try:
+            self.assertIsInstance(factory.create_device("L-1", "A"), CustomLight)
+            self.assertIsInstance(factory.create_many(["L-2"], "A")[0], CustomLight)
+        finally:
+            register_device_class('lighting', 'modules.lighting.lighting_devices.SmartLight')
+        self.assertIs(type(factory.create_device("L-3", "A")), SmartLight)
+        with self.assertRaises(KeyError):
+            get_device_class('teleport')
+        print("✓ Factory Pattern: Device registry resolves classes")
 
 
 class TestBuilderPattern(unittest.TestCase):
@@ -132,6 +199,295 @@ class TestBuilderPattern(unittest.TestCase):
         print("✓ Builder Pattern: Custom locations configuration")
 
 
+class TestInventoryLoader(unittest.TestCase):
+    """Test streaming inventory loading"""
+    
+    def setUp(self):
+        import tempfile
+        self.directory = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.directory.cleanup()
+    
+    def _write(self, name, text):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(text)
+        return path
+    
+    def test_validation_and_duplicates(self):
+        """Test bad rows are reported with line numbers and repeats are skipped"""
+        path = self._write("city.csv", "subsystem,device_id,location\n"
+                                       "lighting,L-1,Main St\n"
+                                       "lighting,L-1,Oak Ave\n"
+                                       "security,C-1,\n"
+                                       "parking,P-1,Lot 4\n"
+                                       "energy,E-1,Zone A\n")
+        report = load_inventory(path)
+        self.assertEqual((report.rows, report.total_loaded, report.duplicates, report.invalid), (5, 2, 1, 2))
+        self.assertTrue(report.errors[0].startswith("4-qator"))
+        self.assertIn("parking", report.errors[1])
+        with self.assertRaises(ValueError):
+            load_inventory(self._write("city.xml", ""))
+        print("✓ Inventory: Validation and de-duplication working")
+    
+    def test_builder_provisions_in_chunks(self):
+        """Test from_inventory streams JSONL rows into the controller in chunks"""
+        lines = [json.dumps({'subsystem': 'transport', 'device_id': f"INV-T{i}", 'intersection': f"X-{i % 7}"})
+                 for i in range(25)]
+        lines += ['{"subsystem": "energy", "device_id": "INV-E1", "zone": "North"}', 'not json', '',
+                  '{"subsystem": "transport", "device_id": "INV-T3", "location": "X-3"}']
+        path = self._write("city.jsonl", "\n".join(lines) + "\n")
+        controller = isolated_city(self)
+        builder = SmartCityBuilder.from_inventory(path, "InventoryCity", chunk_size=10)
+        report = builder.provision(controller)
+        self.assertEqual(report.loaded['transport'], 25)
+        self.assertEqual((report.chunks, report.duplicates, report.invalid), (4, 1, 1))
+        self.assertGreater(report.rows_per_second, 0)
+        config = builder.build()
+        self.assertEqual((config.num_traffic_lights, config.num_energy_monitors), (25, 1))
+        self.assertEqual(controller.get_device_status('transport', 'INV-T9')['intersection'], 'X-2')
+        self.assertEqual(builder.provision(controller).duplicates, 27)
+        print("✓ Inventory: Chunked provisioning working")
+
+
+class TestConfigReconfiguration(unittest.TestCase):
+    """Test incremental apply_config"""
+
+    def setUp(self):
+        self.controller = isolated_city(self)
+
+    def test_diff_touches_only_changes(self):
+        """Test growing, shrinking and moving devices applies just the difference"""
+        controller = self.controller
+        streets = [f"Street-{i % 5}" for i in range(40)]
+        config = SmartCityBuilder("Diff").add_lighting_system(40, streets).add_transport_system(3).build()
+        result = controller.apply_config(config)
+        self.assertEqual(result['subsystems']['lighting']['added'], 40)
+        self.assertEqual(controller.apply_config(config)['totals'],
+                         {'added': 0, 'removed': 0, 'relocated': 0, 'started': 0})
+
+        moved = list(streets[:30])
+        moved[7] = "New Avenue"
+        config = SmartCityBuilder("Diff").add_lighting_system(30, moved).add_transport_system(3).build()
+        lighting = controller.apply_config(config)['subsystems']['lighting']
+        self.assertEqual((lighting['added'], lighting['removed'], lighting['relocated']), (0, 10, 1))
+        self.assertEqual(controller.get_subsystem_status('lighting')['device_count'], 30)
+        self.assertEqual(controller.get_device_status('lighting', 'LIGHT-008')['location'], "New Avenue")
+        self.assertIsNone(controller.get_device_status('lighting', 'LIGHT-031'))
+        print("✓ Reconfiguration: Minimal diff applied")
+
+    def test_auto_start_and_explicit_devices(self):
+        """Test the auto-start flag and explicit device mappings against a running city"""
+        controller = self.controller
+        lights = controller.create_devices('lighting', ['L-A', 'L-B'], ['North', 'South'])
+        controller.add_devices_to_subsystem('lighting', dict(zip(['L-A', 'L-B'], lights)))
+        controller.enable_liveness(timeout=60)
+        config = (SmartCityBuilder("Explicit").with_devices('lighting', {'L-A': 'North', 'L-C': 'East'})
+                  .add_energy_system(2, ["Zone A", "Zone B"]).build())
+        result = controller.apply_config(config)
+        self.assertEqual(result['totals'], {'added': 3, 'removed': 1, 'relocated': 0, 'started': 0})
+        self.assertEqual(controller.health_summary()['subsystems']['lighting']['tracked'], 2)
+        self.assertFalse(controller.get_device_status('lighting', 'L-C')['is_on'])
+
+        config.avtomatik_ishga_tushirish = True
+        self.assertEqual(controller.apply_config(config)['totals']['started'], 4)
+        self.assertTrue(controller.get_device_status('lighting', 'L-A')['is_on'])
+        self.assertTrue(controller.get_device_status('energy', 'ENERGY-002')['is_monitoring'])
+        config = (SmartCityBuilder("Explicit").with_devices('lighting', {'L-A': 'North', 'L-C': 'East', 'L-D': 'West'})
+                  .add_energy_system(2, ["Zone A", "Zone B"]).set_auto_start().build())
+        self.assertEqual(controller.apply_config(config)['totals']['started'], 1)
+        print("✓ Reconfiguration: Auto-start re-flagging working")
+
+
+class TestCityRegistry(unittest.TestCase):
+    """Test several cities in one process"""
+
+    def setUp(self):
+        self.registry = CityRegistry()
+
+    def tearDown(self):
+        for city_name in self.registry.names():
+            if city_name != 'default':
+                self.registry.remove(city_name)
+
+    def test_cities_are_isolated(self):
+        """Test each city has its own devices while factories are shared"""
+        north = self.registry.create("North")
+        south = self.registry.get_or_create("South")
+        north.add_device_to_subsystem('lighting', 'L-1', north.create_device('lighting', 'L-1', 'Main St'))
+        self.assertIsNot(north, south)
+        self.assertEqual(north.city_name, "North")
+        self.assertEqual(self.registry.summary()['North']['lighting'], 1)
+        self.assertEqual(self.registry.summary()['South']['lighting'], 0)
+        self.assertIs(north._factories['lighting'], south._factories['lighting'])
+        self.assertIs(self.registry.get_or_create("South"), south)
+        with self.assertRaises(ValueError):
+            self.registry.create("North")
+        print("✓ City Registry: Cities isolated")
+
+    def test_singleton_is_default_city(self):
+        """Test the singleton accessor stays the default city"""
+        self.assertIs(self.registry.get('default'), SmartCityController())
+        self.assertIsNone(self.registry.get("Nowhere"))
+        self.registry.create("Temporary")
+        self.assertTrue(self.registry.remove("Temporary"))
+        self.assertNotIn("Temporary", self.registry)
+        self.assertFalse(self.registry.remove("Temporary"))
+        print("✓ City Registry: Singleton accessor preserved")
+
+
+class TestTracing(unittest.TestCase):
+    """Test span instrumentation through the layer stack"""
+
+    def setUp(self):
+        import tempfile
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "trace.json")
+        self.controller = isolated_city(self)
+        cameras = self.controller.create_devices('security', ['CAM-1', 'CAM-2'], ['Gate', 'Yard'])
+        self.controller.add_devices_to_subsystem('security', dict(zip(['CAM-1', 'CAM-2'], cameras)))
+
+    def tearDown(self):
+        tracing.disable()
+        self.directory.cleanup()
+
+    def test_layers_nest_and_export(self):
+        """Test every layer records a child span and the file is Chrome trace JSON"""
+        self.controller.enable_tracing(self.path)
+        self.controller.get_subsystem_status('security')
+        self.assertEqual(self.controller.disable_tracing(), 6)
+        with open(self.path, encoding='utf-8') as stream:
+            events = {event['name']: event for event in json.load(stream)['traceEvents']}
+        chain = ['SmartCityController.subsystem_status', 'SecurityDekorator.get_status',
+                 'SubsistemProxy.get_status', 'SecuritySystem.get_status', 'SecuritySystem.devices']
+        for parent, child in zip(chain, chain[1:]):
+            self.assertEqual(events[child]['args']['parent_id'], events[parent]['args']['span_id'])
+            self.assertLessEqual(events[parent]['ts'], events[child]['ts'])
+        self.assertEqual(events['SecuritySystem.devices']['args']['count'], 2)
+        self.assertEqual({event['ph'] for event in events.values()}, {'X'})
+        print("✓ Tracing: Layer spans nested and exported")
+
+    def test_sampling_and_disabled(self):
+        """Test unsampled calls record nothing and the disabled path allocates nothing"""
+        self.assertIs(tracing.span('x'), tracing.span('y'))
+        tracer = tracing.enable(self.path, sample_rate=0.0)
+        for _ in range(5):
+            self.controller.get_subsystem_status('security')
+        self.assertEqual(tracer.stats()['recorded'], 0)
+        with self.assertRaises(ValueError):
+            tracing.Tracer(sample_rate=2)
+        print("✓ Tracing: Sampling working")
+
+
+class TestHeadlessMode(unittest.TestCase):
+    """Test scripted batch execution"""
+
+    def test_parse_commands(self):
+        """Test the command language and its errors"""
+        self.assertIsNone(parse_command("   # comment"))
+        self.assertEqual(parse_command("add lighting L-1 Main Street"), ('add', 'lighting', ('L-1', 'Main Street')))
+        self.assertEqual(parse_command("set energy E-1 power_consumption 4.5"),
+                         ('set', 'energy', ('E-1', 'power_consumption', 4.5)))
+        self.assertEqual(parse_command('query lighting {"is_on": true} device_id, location'),
+                         ('query', 'lighting', ({'is_on': True}, ['device_id', 'location'])))
+        self.assertEqual(parse_command("status"), ('status', 'all', ()))
+        self.assertEqual(parse_command("set lighting L-1 on true"), ('set', 'lighting', ('L-1', 'is_on', True)))
+        for bad in ("launch lighting", "add parking P-1 Lot", "add lighting L-1", "set lighting L-1 is_on",
+                    "set lighting L-1 brightness 500", "set lighting L-1 device_id L-2",
+                    "set lighting L-1 _location Elm", "set lighting L-1 colour red",
+                    "set energy E-1 brightness 5"):
+            with self.assertRaises(ValueError):
+                parse_command(bad)
+        print("✓ Headless: Command parsing working")
+
+    def test_consecutive_commands_are_batched(self):
+        """Test runs of the same command become one bulk call and results are JSON lines"""
+        import io
+        controller = isolated_city(self)
+        script = [f"add transport T-{i} Cross {i % 3}" for i in range(25)]
+        script += [f"set transport T-{i} is_operational true" for i in range(10)]
+        script += ["status transport T-4", "remove transport T-0", "remove transport T-1", "nonsense"]
+        output = io.StringIO()
+        summary = BatchRunner(controller, output, batch_size=10).run(script)
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([record.get('count') for record in records[:4]], [10, 10, 5, 10])
+        self.assertTrue(records[4]['result']['is_operational'])
+        self.assertEqual(records[5]['applied'], 2)
+        self.assertFalse(records[6]['ok'])
+        self.assertEqual(records[-1]['summary'], summary)
+        self.assertEqual((summary['operations'], summary['batches'], summary['errors']), (38, 6, 1))
+        print("✓ Headless: Batched execution working")
+
+    def test_main_headless_from_stdin(self):
+        """Test main.py --headless keeps stdout machine-readable"""
+        out = subprocess.run([sys.executable, 'main.py', '--headless'], input="add lighting L-1 Elm\nstatus lighting L-1\n",
+                             cwd=os.path.dirname(os.path.abspath(__file__)),
+                             capture_output=True, text=True, check=True)
+        records = [json.loads(line) for line in out.stdout.splitlines()]
+        self.assertEqual(records[1]['result']['location'], "Elm")
+        self.assertEqual(records[-1]['summary']['errors'], 0)
+        print("✓ Headless: main.py batch mode working")
+
+    def test_main_headless_missing_script(self):
+        """Test an unreadable script is reported with a non-zero exit code"""
+        out = subprocess.run([sys.executable, 'main.py', '--headless', '--script', 'no-such-script.txt'],
+                             cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+        self.assertEqual(out.returncode, 2)
+        self.assertIn("FileNotFoundError", out.stderr)
+        self.assertNotIn("NameError", out.stderr)
+        print("✓ Headless: Startup failures reported")
+
+
+class TestWorkloadGenerator(unittest.TestCase):
+    """Test the synthetic load-test harness"""
+
+    def setUp(self):
+        self.registry = CityRegistry()
+        self.controller = self.registry.create("Load")
+        for name in ('lighting', 'transport'):
+            ids = [f"{name}-{i}" for i in range(50)]
+            devices = self.controller.create_devices(name, ids, [f"Area {i % 5}" for i in range(50)])
+            self.controller.add_devices_to_subsystem(name, dict(zip(ids, devices)))
+
+    def tearDown(self):
+        self.registry.shutdown_all()
+
+    def test_mix_and_report(self):
+        """Test the operation mix is honoured and latencies are summarised"""
+        report = WorkloadGenerator(self.controller, parse_mix("status=80,command=15,provision=5"),
+                                   threads=3, duration=None, operations=600, seed=7).run()
+        data = report.as_dict()
+        self.assertEqual(data['operations'], 600)
+        self.assertEqual(data['error_rate'], 0.0)
+        counts = {op: stats['count'] for op, stats in data['operations_by_type'].items()}
+        self.assertGreater(counts['status'], counts['command'])
+        self.assertGreater(counts['command'], counts['provision'])
+        latency = data['latency_ms']
+        self.assertLessEqual(latency['p50'], latency['p99'])
+        self.assertLessEqual(latency['p99'], latency['max'])
+        self.assertIn("amal/s", str(report))
+        print("✓ Load Test: Mix and latency report working")
+
+    def test_target_rate_and_validation(self):
+        """Test open-loop pacing holds the target rate and bad settings are rejected"""
+        report = WorkloadGenerator(self.controller, {'status': 1, 'telemetry': 1}, threads=2, rate=1000,
+                                   duration=None, operations=60).run()
+        self.assertGreaterEqual(report.seconds, 0.05)
+        with self.assertRaises(ValueError):
+            WorkloadGenerator(self.controller, {'launch': 1})
+        with self.assertRaises(ValueError):
+            WorkloadGenerator(self.controller, {'status': 0})
+        print("✓ Load Test: Target rate pacing working")
+
+    def test_operations_take_controller_lock(self):
+        """Test status scans beside provisioning do not race (each operation holds the controller lock)"""
+        report = WorkloadGenerator(self.controller, parse_mix("subsystem_status=50,provision=50"),
+                                   threads=4, duration=None, operations=2000, seed=3).run()
+        self.assertEqual(report.as_dict()['error_rate'], 0.0, report.error_samples)
+        print("✓ Load Test: Operations run under the controller lock")
+
+
 class TestProxyPattern(unittest.TestCase):
     """Test Proxy Pattern"""
     
@@ -171,6 +527,83 @@ class TestProxyPattern(unittest.TestCase):
         status1 = proxy.get_status()
         self.assertEqual(status1['access_count'], 2)
         print("✓ Proxy Pattern: Access counting working")
+    
+    def test_proxy_rate_limits(self):
+        """Test per-client and per-subsystem token buckets"""
+        proxy = SubsystemProxy(LightingSystem())
+        proxy.set_limits(client_rate=0.001, client_burst=2, subsystem_rate=0.001, subsystem_burst=3)
+        proxy.admit('a')
+        proxy.admit('a')
+        with self.assertRaises(AdmissionRejected) as caught:
+            proxy.admit('a')
+        self.assertEqual(caught.exception.reason, 'client')
+        self.assertGreater(caught.exception.retry_after, 0)
+        proxy.admit('b')
+        with self.assertRaises(AdmissionRejected) as caught:
+            proxy.admit('c')
+        self.assertEqual(caught.exception.reason, 'subsystem')
+        self.assertEqual(proxy.admission_stats(), {'admitted': 3, 'throttled': 2, 'rejected': 0})
+        
+        proxy.set_limits()
+        proxy.admit('a')
+        print("✓ Proxy Pattern: Rate limiting working")
+
+    def test_fractional_rates(self):
+        """Test rates below one call per second still admit a call and refill"""
+        from core.proxy.proxy import TokenBucket
+        bucket = TokenBucket(0.5)
+        self.assertEqual(bucket.capacity, 1.0)
+        self.assertEqual(bucket.take(bucket.updated), 0.0)
+        self.assertAlmostEqual(bucket.take(bucket.updated), 2.0)
+        self.assertEqual(bucket.take(bucket.updated + 2.0), 0.0)
+        with self.assertRaises(ValueError):
+            TokenBucket(5, capacity=0.5)
+        proxy = SubsystemProxy(LightingSystem())
+        with self.assertRaises(ValueError):
+            proxy.set_limits(client_rate=0.5, client_burst=0.5)
+        proxy.set_limits(client_rate=0.5)
+        proxy.admit('a')
+        with self.assertRaises(AdmissionRejected):
+            proxy.admit('a')
+        print("✓ Proxy Pattern: Fractional rates admit calls")
+    
+    def test_proxy_status_admission_per_client(self):
+        """Test get_status admits per client and rotating ids cannot evict an active bucket"""
+        import core.proxy.proxy as proxy_module
+        proxy = SubsystemProxy(LightingSystem())
+        proxy.set_limits(client_rate=0.001, client_burst=1)
+        proxy.get_status(client_id='a')
+        proxy.get_status(client_id='b')
+        with self.assertRaises(AdmissionRejected):
+            proxy.get_status(client_id='a')
+        
+        original = proxy_module.MAX_CLIENT_BUCKETS
+        proxy_module.MAX_CLIENT_BUCKETS = 3
+        try:
+            for client in ('x', 'y'):
+                proxy.admit(client)
+                with self.assertRaises(AdmissionRejected):
+                    proxy.admit('a')
+        finally:
+            proxy_module.MAX_CLIENT_BUCKETS = original
+        print("✓ Proxy Pattern: Per-client status admission with LRU buckets")
+    
+    def test_proxy_concurrency_cap(self):
+        """Test the concurrency cap is shared between proxies"""
+        limit = ConcurrencyLimit(1)
+        first = SubsystemProxy(LightingSystem())
+        second = SubsystemProxy(LightingSystem())
+        first.set_limits(concurrency=limit)
+        second.set_limits(concurrency=limit)
+        first.admit()
+        with self.assertRaises(AdmissionRejected) as caught:
+            second.admit()
+        self.assertEqual(caught.exception.reason, 'concurrency')
+        first.release()
+        second.admit()
+        second.release()
+        self.assertEqual(second.admission_stats()['rejected'], 1)
+        print("✓ Proxy Pattern: Concurrency cap working")
 
 
 class TestDecoratorPattern(unittest.TestCase):
@@ -250,6 +683,36 @@ class TestControllerIntegration(unittest.TestCase):
         self.assertEqual(device.device_id, 'LIGHT-001')
         print("✓ Controller Integration: Device creation working")
     
+    def test_compact_all_status(self):
+        """Test compact status carries one shared string table"""
+        device = self.controller.create_device('security', 'CAM-COMPACT', 'Airport')
+        self.controller.add_device_to_subsystem('security', 'CAM-COMPACT', device)
+        # Interned but not in any subsystem: its string is not shipped
+        self.controller.create_device('security', 'CAM-LOOSE', 'Unlisted Yard')
+        status = self.controller.get_all_status(compact=True)
+        table = status['satrlar_jadvali']
+        camera = status['subsistemalar']['security']['devices']['CAM-COMPACT']
+        self.assertEqual(table[camera['location']], 'Airport')
+        self.assertNotIn('satrlar_jadvali', status['subsistemalar']['security'])
+        self.assertNotIn('Unlisted Yard', status['satrlar_jadvali'].values())
+        security = self.controller.get_subsystem_status('security', compact=True)
+        self.assertEqual(security['satrlar_jadvali'][camera['location']], 'Airport')
+        self.assertNotIn('Unlisted Yard', security['satrlar_jadvali'].values())
+        print("✓ Controller Integration: Compact status working")
+    
+    def test_create_devices_bulk(self):
+        """Test bulk device creation via controller"""
+        devices = self.controller.create_devices('energy', ['E-1', 'E-2'], ['Zone A', 'Zone B'])
+        self.assertEqual([d.zone for d in devices], ['Zone A', 'Zone B'])
+        self.assertEqual(self.controller.create_devices('unknown', ['X'], 'Y'), [])
+        
+        self.assertTrue(self.controller.add_devices_to_subsystem('energy', dict(zip(['E-1', 'E-2'], devices))))
+        self.controller.device_command('energy', 'E-2', 'update_consumption', 12.5)
+        status = self.controller.get_subsystem_status('energy')
+        self.assertEqual(status['devices']['E-2']['power_consumption_kwh'], 12.5)
+        self.assertIsNone(self.controller.device_command('energy', 'E-2', '__class__'))
+        print("✓ Controller Integration: Bulk device creation working")
+    
     def test_add_device_to_subsystem(self):
         """Test adding device to subsystem"""
         device = self.controller.create_device('lighting', 'LIGHT-002', 'Oak Ave')
@@ -284,6 +747,146 @@ class TestControllerIntegration(unittest.TestCase):
         self.controller.shutdown()
 
 
+class TestDeviceLiveness(unittest.TestCase):
+    """Test heartbeat expiry and stale device reporting"""
+    
+    def setUp(self):
+        self.now = [100.0]
+        self.controller = isolated_city(self)
+        for name, prefix in (('lighting', 'LV-L'), ('energy', 'LV-E')):
+            ids = [f"{prefix}{i}" for i in range(3)]
+            self.controller.add_devices_to_subsystem(name, dict(zip(ids, self.controller.create_devices(name, ids, "Yunusobod"))))
+    
+    def test_tracker_expiry(self):
+        """Test only expiring devices are swept and heartbeats revive them"""
+        tracker = LivenessTracker(timeout=10, timeouts={'energy': 30}, clock=lambda: self.now[0])
+        tracker.heartbeats('lighting', ['L1', 'L2'])
+        tracker.heartbeat('energy', 'E1')
+        self.now[0] += 5
+        tracker.heartbeat('lighting', 'L2')
+        self.assertEqual(tracker.sweep(self.now[0] + 6), {'lighting': ['L1']})
+        self.assertEqual(tracker.sweep(self.now[0] + 6), {})
+        self.assertEqual(tracker.summary()['stale'], 1)
+        self.assertEqual(tracker.sweep(self.now[0] + 31), {'lighting': ['L2'], 'energy': ['E1']})
+        self.assertFalse(tracker.is_alive('energy', 'E1'))
+        self.assertTrue(tracker.heartbeat('lighting', 'L1'))
+        self.assertTrue(tracker.forget('energy', 'E1'))
+        summary = tracker.summary()
+        self.assertEqual((summary['tracked'], summary['alive'], summary['stale']), (2, 1, 1))
+        print("✓ Liveness: Heartbeat expiry working")
+    
+    def test_stale_devices_in_status(self):
+        """Test stale devices are counted and flagged in controller status"""
+        controller = self.controller
+        controller.enable_liveness(timeout=60, timeouts={'energy': 20}, clock=lambda: self.now[0])
+        self.assertEqual(controller.health_summary()['alive'], 6)
+        self.now[0] += 15
+        controller.heartbeat('lighting', 'LV-L0')
+        controller.apply_telemetry('energy', [('LV-E1', 'power_consumption', 3.5)])
+        version = controller.state_version('energy')
+        self.assertEqual(controller.get_all_status()['eskirgan_qurilmalar_soni'], 0)
+        self.now[0] += 15
+        self.assertGreater(controller.state_version('energy'), version)
+        status = controller.get_all_status()
+        self.assertEqual(status['eskirgan_qurilmalar_soni'], 2)
+        energy = status['subsistemalar']['energy']['devices']
+        self.assertTrue(energy['LV-E0']['stale'])
+        self.assertNotIn('stale', energy['LV-E1'])
+        self.now[0] += 35
+        self.assertEqual(controller.get_all_status()['eskirgan_qurilmalar_soni'], 5)
+        self.assertTrue(controller.get_device_status('lighting', 'LV-L1')['stale'])
+        self.assertEqual(controller.heartbeat('lighting', 'LV-L1', 'LV-L0'), 1)
+        summary = controller.health_summary()
+        self.assertEqual(summary['subsystems']['lighting'], {'tracked': 3, 'stale': 1, 'alive': 2})
+        print("✓ Liveness: Stale devices reported in status")
+
+
+class TestDistrictHierarchy(unittest.TestCase):
+    """Test the city -> district -> street hierarchy and its incremental aggregates"""
+
+    def setUp(self):
+        self.controller = isolated_city(self)
+        for subsystem_name, ids, locations in (
+                ('lighting', ['L1', 'L2', 'L3'], ['Navoi', 'Navoi', 'Amir Temur']),
+                ('transport', ['T1', 'T2'], ['Navoi', 'Chilonzor']),
+                ('energy', ['E1'], ['Navoi'])):
+            devices = self.controller.create_devices(subsystem_name, ids, locations)
+            self.controller.add_devices_to_subsystem(subsystem_name, dict(zip(ids, devices)))
+        self.controller.start_all_subsystems()
+        self.controller.enable_districts({'Markaz': ['Navoi', 'Amir Temur']})
+
+    def _recount(self, subsystem_name, attribute, value, streets):
+        """Reference count by scanning every device"""
+        devices = self.controller._haqiqiy_subsistema(subsystem_name).devices.values()
+        location = {'transport': 'intersection', 'energy': 'zone'}.get(subsystem_name, 'location')
+        return sum(1 for device in devices
+                   if getattr(device, location) in streets and getattr(device, attribute) == value)
+
+    def test_aggregates_follow_state_changes(self):
+        """Test commands, telemetry and removals update every ancestor"""
+        controller = self.controller
+        markaz = controller.district_summary('Markaz')
+        self.assertEqual(markaz['lighting']['on'], 3)
+        self.assertEqual(markaz['transport']['signals']['red'], 1)
+        self.assertEqual(controller.district_summary()['transport']['devices'], 2)
+
+        controller.device_command('lighting', 'L1', 'stop')
+        controller.device_command('transport', 'T1', 'set_signal', 'green')
+        controller.device_command('energy', 'E1', 'update_consumption', 12.5)
+        controller.apply_telemetry('lighting', [('L3', 'location', 'Chilonzor')])
+        controller.remove_devices_from_subsystem('transport', ['T2'])
+        markaz = controller.district_summary('Markaz')
+        self.assertEqual(markaz['lighting']['on'], self._recount('lighting', 'is_on', True, {'Navoi', 'Amir Temur'}))
+        self.assertEqual(markaz['transport']['signals'], {'red': 0, 'yellow': 0, 'green': 1})
+        self.assertEqual(controller.district_summary('Navoi')['energy']['kwh'], 12.5)
+        city = controller.district_summary()
+        self.assertEqual(city['lighting'], {'devices': 3, 'on': 2, 'avg_brightness_on': 100.0})
+        self.assertEqual(city['transport']['devices'], 1)
+        self.assertEqual(controller.district_summary('Belgilanmagan')['lighting']['on'], 1)
+        print("✓ Districts: Aggregates maintained incrementally")
+
+    def test_reassigning_streets_moves_totals(self):
+        """Test moving a street to another district carries its totals"""
+        controller = self.controller
+        self.assertTrue(controller.define_district('Chilonzor tumani', ['Chilonzor', 'Amir Temur']))
+        self.assertEqual(controller.district_summary('Markaz')['lighting']['devices'], 2)
+        self.assertEqual(controller.district_summary('Chilonzor tumani')['lighting']['devices'], 1)
+        self.assertEqual(controller.district_summary('Chilonzor tumani')['transport']['devices'], 1)
+        self.assertEqual(controller.district_summary('Belgilanmagan')['transport']['devices'], 0)
+        self.assertEqual(controller.district_summary()['lighting']['devices'], 3)
+        self.assertEqual(controller._ierarxiya.node('Navoi').path, (controller.city_name, 'Markaz', 'Navoi'))
+        self.assertEqual(controller.district_summary('Nowhere'), {})
+        print("✓ Districts: Streets reassigned")
+
+    def test_telemetry_and_commands_concurrently(self):
+        """Test telemetry applied beside locked commands keeps aggregates exact"""
+        import io
+        import random
+        import threading
+        controller = self.controller
+        ids = [f"LC-{i}" for i in range(200)]
+        lights = controller.create_devices('lighting', ids, ['Navoi', 'Amir Temur'] * 100)
+        controller.add_devices_to_subsystem('lighting', dict(zip(ids, lights)))
+        pick = random.Random(7)
+        readings = [('lighting', pick.choice(ids), 'on', pick.random() < 0.5) for _ in range(30000)]
+        # Frequent thread switches make unlocked interleavings show up
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+        pipeline = TelemetryPipeline(controller, batch_size=20).start()
+        feeder = threading.Thread(target=pipeline.feed_stream, args=(io.BytesIO(encode_readings(readings)),))
+        feeder.start()
+        for _ in range(15000):
+            with controller.lock:
+                controller.device_command('lighting', pick.choice(ids), pick.choice(('start', 'stop')))
+        feeder.join()
+        pipeline.stop()
+        self.assertEqual(pipeline.stats()['failed'], 0)
+        self.assertEqual(controller.district_summary('Markaz')['lighting']['on'],
+                         self._recount('lighting', 'is_on', True, {'Navoi', 'Amir Temur'}))
+        print("✓ Districts: Telemetry and commands interleave safely")
+
+
 class TestLightingSystem(unittest.TestCase):
     """Test Lighting System Functionality"""
     
@@ -311,6 +914,188 @@ class TestLightingSystem(unittest.TestCase):
         print("✓ Lighting System: Brightness adjustment working")
 
 
+class TestLightingSchedule(unittest.TestCase):
+    """Test the timer wheel and lighting schedules"""
+    
+    def setUp(self):
+        self.now = [1_000_000.0]
+        self.system = LightingSystem()
+        streets = ["Main St", "Main St", "Oak Ave", "Elm St"]
+        ids = [f"L-{i}" for i in range(4)]
+        self.system.devices = dict(zip(ids, LightingDeviceFactory().create_many(ids, streets)))
+        self.scheduler = LightingScheduler(self.system, clock=lambda: self.now[0])
+    
+    def test_timer_wheel(self):
+        """Test keyed timers pop in time order, move and cancel"""
+        wheel = TimerWheel(tick=1.0)
+        wheel.schedule('a', 10.2)
+        wheel.schedule('b', 5.0, payload='B')
+        wheel.schedule('c', 30.0)
+        self.assertEqual(wheel.next_due(), 5.0)
+        wheel.schedule('b', 20.0, payload='B2')
+        self.assertTrue(wheel.cancel('c'))
+        self.assertFalse(wheel.cancel('c'))
+        self.assertEqual(wheel.pop_due(10.5), [])
+        self.assertEqual(wheel.pop_due(25.0), [('a', None), ('b', 'B2')])
+        self.assertEqual((len(wheel), wheel.next_due()), (0, None))
+        print("✓ Lighting Schedule: Timer wheel working")
+    
+    def test_batched_firing(self):
+        """Test street, zone and device actions fire together, latest wins"""
+        scheduler = self.scheduler
+        scheduler.define_zone("Center", ["Main St", "Oak Ave"])
+        scheduler.at(self.now[0] + 10, 'on', zone="Center")
+        scheduler.at(self.now[0] + 10.5, 'dim', 40, street="Oak Ave")
+        cancelled = scheduler.at(self.now[0] + 10.5, 'on', device="L-3")
+        scheduler.at(self.now[0] + 60, 'off', street="Main St")
+        self.assertTrue(scheduler.cancel(cancelled))
+        with self.assertRaises(ValueError):
+            scheduler.at(self.now[0], 'on', street="Main St", zone="Center")
+        self.assertEqual(scheduler.run_due(self.now[0] + 5), 0)
+        self.assertEqual(scheduler.run_due(self.now[0] + 11), 3)
+        states = {device_id: (light.is_on, light.brightness) for device_id, light in self.system.devices.items()}
+        self.assertEqual(states, {"L-0": (True, 100), "L-1": (True, 100), "L-2": (True, 40), "L-3": (False, 0)})
+        self.assertEqual(scheduler.run_due(self.now[0] + 61), 2)
+        self.assertFalse(self.system.devices["L-0"].is_on)
+        self.assertEqual(scheduler.stats()['batches'], 2)
+        print("✓ Lighting Schedule: Batched firing working")
+    
+    def test_repeating_actions(self):
+        """Test daily and dusk/dawn actions re-arm after firing"""
+        scheduler = self.scheduler
+        daily = scheduler.daily("23:30", 'dim', 30, street="Elm St")
+        dusk = scheduler.at_dusk(street="Main St")
+        first = scheduler._wheel.due_time(dusk)
+        self.assertTrue(0 < first - self.now[0] <= 86400 + 1)
+        scheduler.run_due(first)
+        self.assertTrue(self.system.devices["L-0"].is_on)
+        again = scheduler._wheel.due_time(dusk)
+        self.assertAlmostEqual(again - first, 86400, delta=600)
+        self.assertTrue(scheduler.cancel(daily))
+        self.assertEqual(len(scheduler), 1)
+        print("✓ Lighting Schedule: Repeating actions working")
+    
+    def test_scheduler_thread(self):
+        """Test the worker thread fires an action when it falls due"""
+        import time
+        scheduler = self.system.start_scheduler(tick=0.01)
+        try:
+            scheduler.at(time.time() + 0.05, 'on', device="L-2")
+            deadline = time.time() + 5
+            while not self.system.devices["L-2"].is_on and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertTrue(self.system.devices["L-2"].is_on)
+            self.assertEqual(self.system.get_status()['schedule']['fired'], 1)
+        finally:
+            self.system.stop_scheduler()
+        print("✓ Lighting Schedule: Scheduler thread working")
+    
+    def test_controller_schedule_takes_lock(self):
+        """Test scheduled switching waits for the controller lock"""
+        import time
+        controller = isolated_city(self)
+        light = controller.create_device('lighting', 'L-LOCK', 'Main St')
+        controller.add_device_to_subsystem('lighting', 'L-LOCK', light)
+        scheduler = controller.start_lighting_schedule(tick=0.01)
+        self.addCleanup(controller._haqiqiy_subsistema('lighting').stop_scheduler)
+        with controller.lock:
+            scheduler.at(time.time(), 'on', device="L-LOCK")
+            time.sleep(0.2)
+            self.assertFalse(light.is_on)
+        deadline = time.time() + 5
+        while not light.is_on and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(light.is_on)
+        print("✓ Lighting Schedule: Controller schedule holds the lock")
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class TestAdaptiveLighting(unittest.TestCase):
+    """Test sensor-driven brightness with hysteresis, deadband and ramp limits"""
+
+    def setUp(self):
+        self.controller = isolated_city(self)
+        ids = ['N1', 'N2', 'B1', 'C1']
+        lights = self.controller.create_devices('lighting', ids, ['Navoi', 'Navoi', 'Bobur', 'Chorsu'])
+        self.controller.add_devices_to_subsystem('lighting', dict(zip(ids, lights)))
+        self.controller.start_subsystem('lighting')
+        self.engine = self.controller.start_adaptive_lighting(ramp_up=50, ramp_down=10, max_updates=None)
+
+    def _level(self, device_id):
+        return self.controller.get_device_status('lighting', device_id)['brightness']
+
+    def test_ramps_and_hysteresis(self):
+        """Test lights ramp to the ambient target and switch with hysteresis"""
+        controller = self.controller
+        controller.report_light_sensors({'Navoi': 100.0, 'Bobur': 1.0})
+        self.assertEqual(controller.adaptive_lighting_tick(now=0.0), 3)
+        self.assertEqual((self._level('N1'), self._level('B1'), self._level('C1')), (90, 90, 100))
+        controller.adaptive_lighting_tick(now=10.0)
+        self.assertEqual((self._level('N2'), self._level('B1')), (0, 70))
+        self.assertFalse(controller.get_device_status('lighting', 'N1')['is_on'])
+
+        # Between on_lux and off_lux an unlit street stays off
+        controller.report_light_sensors({'Navoi': 40.0})
+        self.assertEqual(controller.adaptive_lighting_tick(now=11.0), 0)
+        controller.report_light_sensors({'Navoi': 25.0})
+        controller.adaptive_lighting_tick(now=11.5)
+        self.assertEqual(self._level('N1'), 25)
+        controller.adaptive_lighting_tick(now=12.5)
+        self.assertEqual(self._level('N1'), 56)
+        # Changes inside the deadband are ignored
+        controller.report_light_sensors({'Navoi': 23.0})
+        self.assertEqual(controller.adaptive_lighting_tick(now=13.5), 0)
+        print("✓ Adaptive lighting: Ramps and hysteresis")
+
+    def test_motion_and_update_budget(self):
+        """Test motion boosts a street and a per-tick budget defers the rest"""
+        controller = self.controller
+        controller.report_light_sensors({'Navoi': 1.0, 'Bobur': 1.0})
+        controller.adaptive_lighting_tick(now=0.0)
+        controller.adaptive_lighting_tick(now=5.0)
+        controller.report_light_sensors(motion=['Bobur'], now=5.0)
+        controller.adaptive_lighting_tick(now=6.0)
+        self.assertEqual((self._level('N1'), self._level('B1')), (70, 100))
+        controller.adaptive_lighting_tick(now=70.0)
+        self.assertEqual(self._level('B1'), 70)
+
+        self.engine.max_updates = 1
+        controller.report_light_sensors({'Navoi': 100.0, 'Bobur': 100.0})
+        changed = [self.engine.tick(now=80.0 + i) for i in range(4)]
+        self.assertEqual(changed, [['N1'], ['N2'], ['B1'], []])
+        # Deferred lights take the whole step they missed
+        self.assertEqual(self._level('B1'), 0)
+        self.assertEqual(self.engine.summary()['deferred'], 3)
+        print("✓ Adaptive lighting: Motion and update budget")
+
+    def test_replaced_light_rebuilds_rows(self):
+        """Test a light replaced under the same id is re-read with its new street"""
+        controller = self.controller
+        controller.report_light_sensors({'Navoi': 100.0, 'Bobur': 1.0})
+        controller.adaptive_lighting_tick(now=0.0)
+        controller.adaptive_lighting_tick(now=10.0)
+        light, = controller.create_devices('lighting', ['N1'], ['Bobur'])
+        controller.add_devices_to_subsystem('lighting', {'N1': light})
+        controller.adaptive_lighting_tick(now=20.0)
+        # The new light starts from its own level and takes one ramp step
+        self.assertEqual((self._level('N1'), self._level('B1')), (50, 70))
+        print("✓ Adaptive lighting: Replaced lights re-read")
+
+    def test_long_tick_gap(self):
+        """Test a long gap between ticks ramps to the target without overflowing"""
+        controller = self.controller
+        controller.report_light_sensors({'Navoi': 60.0})
+        controller.adaptive_lighting_tick(now=0.0)
+        controller.adaptive_lighting_tick(now=100.0)
+        self.assertEqual(self._level('N1'), 0)
+        # 800 s x ramp_up 50 is past the int16 range
+        controller.report_light_sensors({'Navoi': 1.0})
+        controller.adaptive_lighting_tick(now=900.0)
+        self.assertEqual((self._level('N1'), self._level('N2')), (70, 70))
+        self.assertTrue(controller.get_device_status('lighting', 'N1')['is_on'])
+        print("✓ Adaptive lighting: Long tick gaps ramp safely")
+
+
 class TestSecuritySystem(unittest.TestCase):
     """Test Security System Functionality"""
     
@@ -326,6 +1111,164 @@ class TestSecuritySystem(unittest.TestCase):
         print("✓ Security System: Camera on/off working")
 
 
+class TestCameraEvents(unittest.TestCase):
+    """Test the camera event pipeline"""
+    
+    def setUp(self):
+        self.now = [1000.0]
+        self.system = SecuritySystem()
+        ids = [f"CAM-{i}" for i in range(10)]
+        self.system.devices = dict(zip(ids, SecurityDeviceFactory().create_many(ids, "Harbor")))
+    
+    def tearDown(self):
+        self.system.stop_event_pipeline()
+    
+    def _start(self, **options):
+        options.setdefault('clock', lambda: self.now[0])
+        return self.system.start_event_pipeline(window_seconds=10, **options)
+    
+    def test_events_processed_in_batches(self):
+        """Test events are drained by the workers with metadata kept"""
+        pipeline = self._start(workers=2, batch_size=8)
+        for i in range(100):
+            self.assertTrue(self.system.report_event(f"CAM-{i % 10}", 'motion', metadata={'zone': i}))
+        self.assertFalse(self.system.report_event("CAM-UNKNOWN", 'motion'))
+        with self.assertRaises(ValueError):
+            self.system.report_event("CAM-1", 'smoke')
+        self.assertTrue(pipeline.drain(timeout=5))
+        stats = self.system.get_status()['event_pipeline']
+        self.assertEqual(stats['processed'], 100)
+        self.assertEqual(stats['dropped'], 0)
+        self.assertGreaterEqual(stats['batches'], 100 // 8)
+        self.assertEqual(pipeline.last_event("CAM-9").metadata, {'zone': 99})
+        print("✓ Camera Events: Batched processing working")
+    
+    def test_bounded_queues(self):
+        """Test a burst beyond the per-camera queue drops the oldest events"""
+        pipeline = self._start(workers=0, queue_size=4)
+        accepted = [self.system.report_event("CAM-1", 'tamper', metadata={'n': i}) for i in range(10)]
+        self.assertEqual(accepted, [True] * 4 + [False] * 6)
+        for i in range(3):
+            self.system.report_event("CAM-2", 'offline')
+        stats = pipeline.stats()
+        self.assertEqual((stats['received'], stats['dropped'], stats['pending']), (13, 6, 7))
+        self.assertEqual(len(pipeline._ready[0]), 2)
+        with pipeline._lock:
+            batch = pipeline._take_batch()
+        self.assertEqual([event.metadata['n'] for event in batch if event.camera_id == "CAM-1"], [6, 7, 8, 9])
+        self.assertEqual(len(batch), 7)
+        print("✓ Camera Events: Bounded queues working")
+    
+    def test_event_time_and_camera_lanes(self):
+        """Test events count at their own timestamps and each camera stays on one worker"""
+        pipeline = self._start(workers=3, batch_size=4)
+        for i in range(40):
+            self.system.report_event("CAM-1", 'motion', timestamp=self.now[0] - 60, metadata={'n': i})
+        for i in range(40):
+            self.system.report_event("CAM-1", 'motion', metadata={'n': 40 + i})
+        self.assertTrue(pipeline.drain(timeout=5))
+        self.assertEqual(pipeline.stats()['rates']['motion'], 4.0)
+        self.assertEqual(pipeline.last_event("CAM-1").metadata, {'n': 79})
+        self.assertEqual(len(set(pipeline._lane.values())), 1)
+        print("✓ Camera Events: Event-time windows and per-camera ordering working")
+    
+    def test_skewed_camera_clamped(self):
+        """Test timestamps ahead of the clock count now and expire with the window"""
+        pipeline = self._start(workers=1, thresholds={'elevated': 5.0, 'high': 20.0})
+        self.system.report_event("CAM-1", 'motion', timestamp=self.now[0] + 3600)
+        for i in range(250):
+            self.system.report_event(f"CAM-{i % 10}", 'motion')
+        self.assertTrue(pipeline.drain(timeout=5))
+        stats = pipeline.stats()
+        self.assertEqual(stats['clamped'], 1)
+        self.assertEqual(stats['rates']['motion'], 25.1)
+        self.assertEqual(pipeline.last_event("CAM-1").timestamp, self.now[0])
+        self.assertEqual(pipeline.evaluate(), 'high')
+        self.now[0] += 600
+        self.assertEqual(pipeline.stats()['rates']['motion'], 0.0)
+        self.assertEqual(pipeline.evaluate(), 'normal')
+        print("✓ Camera Events: Skewed camera timestamps clamped")
+    
+    def test_alert_level_follows_rates(self):
+        """Test the alert level rises with the event rate and decays with hysteresis"""
+        changes = []
+        pipeline = self._start(workers=1, thresholds={'elevated': 5.0, 'high': 20.0},
+                               on_alert_change=changes.append)
+        for i in range(60):
+            self.system.report_event(f"CAM-{i % 10}", 'motion')
+        pipeline.drain(timeout=5)
+        self.assertEqual(pipeline.evaluate(), 'elevated')
+        for i in range(30):
+            self.system.report_event("CAM-2", 'tamper')
+        pipeline.drain(timeout=5)
+        self.assertEqual(pipeline.evaluate(), 'high')
+        self.now[0] += 8
+        self.assertEqual(pipeline.evaluate(), 'high')
+        self.now[0] += 20
+        self.assertEqual(pipeline.evaluate(), 'normal')
+        self.assertEqual(self.system.alert_level, 'normal')
+        self.assertEqual(changes, ['elevated', 'high', 'normal'])
+        print("✓ Camera Events: Alert level follows event rates")
+
+
+class TestEscalationRules(unittest.TestCase):
+    """Test compiled alert escalation rules"""
+    
+    def test_rule_parsing(self):
+        """Test rule text parses into scope, window and level"""
+        rule = EscalationRule.parse("tamper > 2 in 30s per camera -> high")
+        self.assertEqual((rule.kind, rule.threshold, rule.window, rule.scope, rule.level),
+                         ('tamper', 2, 30.0, 'camera', 'high'))
+        self.assertEqual(EscalationRule.parse("any > 100 in 5s citywide -> elevated").scope, 'city')
+        self.assertEqual(EscalationRule.parse("motion > 5 in 10s -> high").scope, 'location')
+        for text in ("motion >> 5 in 10s -> high", "smoke > 1 in 1s -> high", "motion > 1 in 1s -> panic"):
+            with self.assertRaises(ValueError):
+                EscalationRule.parse(text)
+        print("✓ Escalation Rules: Parsing working")
+    
+    def test_sliding_windows_per_location(self):
+        """Test counters are kept per location and expire with the window"""
+        engine = RuleEngine(["motion > 5 in 10s per location -> high",
+                             "motion > 2 in 10s per location -> elevated",
+                             "offline > 3 in 60s citywide -> elevated"])
+        self.assertEqual(len(engine._groups), 2)
+        self.assertEqual(engine.observe([('motion', 'C-1', 'Harbor')] * 3, now=0.0), 'elevated')
+        self.assertEqual(engine.observe([('motion', 'C-9', 'Airport')] * 5, now=1.0), 'elevated')
+        self.assertEqual(engine.observe([('motion', 'C-2', 'Harbor')] * 3, now=2.0), 'high')
+        self.assertEqual(engine.level(now=10.5), 'elevated')
+        self.assertEqual(engine.level(now=12.5), 'normal')
+        self.assertEqual(engine.active_triggers(), 0)
+        self.assertEqual(engine.observe([('offline', f'C-{i}', f'L-{i}') for i in range(4)], now=20.0), 'elevated')
+        # Events carry their own time: a late backlog outside the window does not trigger
+        self.assertEqual(engine.observe([('motion', 'C-1', 'Yard', 5.0)] * 9, now=30.0), 'elevated')
+        self.assertEqual(engine.observe([('motion', 'C-1', 'Yard', 29.0)] * 3 + [('motion', 'C-2', 'Yard', 25.0)] * 3,
+                                        now=30.0), 'high')
+        # Times after `now` count at `now`, so they expire with the window (the offline rule is still on)
+        self.assertEqual(engine.observe([('motion', 'C-1', 'Dock', 3630.0)] * 6, now=40.0), 'high')
+        self.assertEqual(engine.level(now=50.5), 'elevated')
+        print("✓ Escalation Rules: Per-location sliding windows working")
+    
+    def test_pipeline_escalation(self):
+        """Test the event pipeline applies rule levels to the security system"""
+        now = [500.0]
+        system = SecuritySystem()
+        ids = ["C-1", "C-2", "C-3"]
+        system.devices = dict(zip(ids, SecurityDeviceFactory().create_many(ids, ["Harbor", "Harbor", "Airport"])))
+        system.set_escalation_rules(["motion > 5 in 10s per location -> high"])
+        pipeline = system.start_event_pipeline(workers=1, clock=lambda: now[0])
+        try:
+            for camera_id in ("C-1", "C-2", "C-3") * 3:
+                system.report_event(camera_id, 'motion')
+            pipeline.drain(timeout=5)
+            self.assertEqual(pipeline.evaluate(), 'high')
+            self.assertEqual(system.get_status()['active_triggers'], 1)
+            now[0] += 30
+            self.assertEqual(pipeline.evaluate(), 'normal')
+        finally:
+            system.stop_event_pipeline()
+        print("✓ Escalation Rules: Pipeline escalation working")
+
+
 class TestTransportSystem(unittest.TestCase):
     """Test Transport System Functionality"""
     
@@ -347,6 +1290,120 @@ class TestTransportSystem(unittest.TestCase):
         print("✓ Transport System: Traffic light signals working")
 
 
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class TestSignalTiming(unittest.TestCase):
+    """Test Webster signal plans and green-wave offsets"""
+
+    def setUp(self):
+        self.controller = isolated_city(self)
+        ids = ['A1', 'A2', 'B1', 'B2']
+        lights = self.controller.create_devices('transport', ids, ['Oqtepa', 'Oqtepa', 'Beruniy', 'Beruniy'])
+        self.controller.add_devices_to_subsystem('transport', dict(zip(ids, lights)))
+        self.controller.start_subsystem('transport')
+
+    def test_webster_cycle_and_splits(self):
+        """Test cycle length, green splits and phase order per intersection"""
+        plan = self.controller.optimize_traffic({'A1': 600, 'A2': 300})
+        a1, a2, b1 = plan.timing('A1'), plan.timing('A2'), plan.timing('B1')
+        # L = 8 s, Y = 0.5: (1.5 * 8 + 5) / 0.5 = 34 s, spare 12 s split 2:1
+        self.assertAlmostEqual(a1['cycle'], 34.0)
+        self.assertAlmostEqual(a1['green'], 15.0)
+        self.assertAlmostEqual(a2['green'], 11.0)
+        self.assertAlmostEqual(a2['green_start'], 19.0)
+        # No observed flow: minimum cycle, even split
+        self.assertAlmostEqual(b1['cycle'], 30.0)
+        self.assertAlmostEqual(b1['green'], 11.0)
+        self.assertEqual(list(plan.signals_at(0.0)[:2]), [2, 0])
+        self.assertEqual(list(plan.signals_at(16.0)[:2]), [1, 0])
+        self.assertEqual(list(plan.signals_at(20.0)[:2]), [0, 2])
+        print("✓ Signal timing: Webster cycle and splits")
+
+    def test_green_wave_and_signal_updates(self):
+        """Test corridor coordination and pushing the plan to the lights"""
+        controller = self.controller
+        plan = controller.optimize_traffic({'A1': 600, 'A2': 300},
+                                           corridors={'Main': ['Oqtepa', ('Beruniy', 500.0)]})
+        b1 = plan.timing('B1')
+        self.assertAlmostEqual(b1['cycle'], 34.0)
+        self.assertAlmostEqual(b1['offset'], 500.0 / (50 / 3.6) % 34.0)
+        self.assertEqual(controller.get_subsystem_status('transport')['traffic_flow'], 'optimized')
+
+        self.assertEqual(controller.update_traffic_signals(now=340.0), 4)
+        self.assertEqual(controller.get_device_status('transport', 'A1')['current_signal'], 'green')
+        self.assertEqual(controller.update_traffic_signals(now=340.5), 0)
+        self.assertGreaterEqual(controller.update_traffic_signals(now=340.0 + 19.0), 2)
+        self.assertEqual(controller.get_device_status('transport', 'A1')['current_signal'], 'red')
+        self.assertEqual(controller.get_device_status('transport', 'A2')['current_signal'], 'green')
+        print("✓ Signal timing: Green wave pushed to traffic lights")
+
+    def test_skipped_lights_resync(self):
+        """Test a light skipped while out of service gets its signal once it is back"""
+        controller = self.controller
+        plan = controller.optimize_traffic({'A1': 600, 'A2': 300})
+        controller.update_traffic_signals(now=0.0)
+        controller.device_command('transport', 'A1', 'stop')
+        # A1's planned signal changes while it is stopped
+        switch = next(t for t in range(1, 200) if plan.signals_at(t)[0] != plan.signals_at(0.0)[0])
+        controller.update_traffic_signals(now=float(switch))
+        self.assertEqual(controller.get_device_status('transport', 'A1')['current_signal'], 'off')
+        controller.device_command('transport', 'A1', 'start')
+        controller.update_traffic_signals(now=switch + 0.5)
+        expected = ('red', 'yellow', 'green')[plan.signals_at(switch + 0.5)[0]]
+        self.assertEqual(controller.get_device_status('transport', 'A1')['current_signal'], expected)
+        with self.assertRaises(ValueError):
+            controller.simulate_traffic(10, density=0.3)
+        print("✓ Signal timing: Skipped lights resynced")
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class TestTrafficSimulation(unittest.TestCase):
+    """Test the Nagel-Schreckenberg traffic microsimulation"""
+
+    def setUp(self):
+        self.controller = isolated_city(self)
+        self.names = [f"Junction {i}" for i in range(9)]
+        ids = [f"T{i}" for i in range(36)]
+        lights = self.controller.create_devices('transport', ids, [self.names[i // 4] for i in range(36)])
+        self.controller.add_devices_to_subsystem('transport', dict(zip(ids, lights)))
+        self.controller.start_subsystem('transport')
+
+    def test_free_flow_ring(self):
+        """Test a lone vehicle reaches the speed limit and its crossings become flows"""
+        from modules.transport.traffic_simulation import TrafficSimulation
+        transport = self.controller._haqiqiy_subsistema('transport')
+        roads = [('Junction 0', 'Junction 1', 75.0), ('Junction 1', 'Junction 0', 75.0)]
+        simulation = TrafficSimulation(transport, roads, density=0.05, slowdown=0.0, seed=3)
+        self.assertEqual(simulation.vehicles, 1)
+        simulation.run(100)
+        self.assertEqual(simulation.flow_level(), 'free')
+        flows = simulation.publish()
+        # 20 cells per lap at 5 cells/tick after one second of each acceleration step
+        self.assertGreaterEqual(sum(flows.values()) * 100 / 3600, 45)
+        self.assertEqual(transport.observed_flows, flows)
+        self.assertEqual(transport.traffic_flow, 'free')
+        print("✓ Traffic simulation: Free-flow ring")
+
+    def test_grid_under_signal_plan(self):
+        """Test vehicles are conserved and never share a cell, with and without a signal plan"""
+        import numpy as np
+        from modules.transport.traffic_simulation import grid_roads
+        controller = self.controller
+        summary = controller.simulate_traffic(300, grid_roads(self.names, 3), density=0.25, seed=7)
+        simulation = controller._haqiqiy_subsistema('transport').simulation
+        vehicles = summary['vehicles']
+        self.assertEqual(vehicles, int(summary['cells'] * 0.25))
+        plan = controller.optimize_traffic()
+        self.assertGreater(plan.summary()['cycle_max'], 30.0)
+        controller.simulate_traffic(300)
+        cells = simulation.road_offset[simulation.road] + simulation.position
+        self.assertEqual(simulation.vehicles, vehicles)
+        self.assertTrue((np.diff(cells) > 0).all())
+        self.assertTrue((simulation.position < simulation.road_length[simulation.road]).all())
+        self.assertIn(controller.get_subsystem_status('transport')['traffic_flow'],
+                      ('free', 'normal', 'heavy', 'congested'))
+        print("✓ Traffic simulation: Grid under a signal plan")
+
+
 class TestEnergySystem(unittest.TestCase):
     """Test Energy System Functionality"""
     
@@ -365,6 +1422,667 @@ class TestEnergySystem(unittest.TestCase):
         print("✓ Energy System: Energy monitoring working")
 
 
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class TestEnergyForecast(unittest.TestCase):
+    """Test vectorized demand forecasting"""
+    
+    def test_seasonal_profile(self):
+        """Test smoothing learns each meter's daily profile"""
+        import numpy as np
+        from modules.energy.energy_forecast import DemandForecaster
+        hours = np.arange(24 * 14)
+        base = np.array([[10.0], [40.0], [5.0]])
+        swing = np.array([[2.0], [15.0], [0.0]])
+        history = base + swing * np.sin(2 * np.pi * hours / 24)
+        forecaster = DemandForecaster(season_length=24).fit(history)
+        expected = base + swing * np.sin(2 * np.pi * np.arange(hours[-1] + 1, hours[-1] + 7) / 24)
+        np.testing.assert_allclose(forecaster.forecast(6), expected, atol=0.5)
+        with self.assertRaises(ValueError):
+            DemandForecaster(season_length=24).fit(history[:, :10])
+        print("✓ Energy Forecast: Seasonal profiles learned")
+    
+    def test_automatic_efficiency_mode(self):
+        """Test forecast peaks switch the efficiency mode on and off"""
+        import numpy as np
+        system = EnergySystem()
+        ids = [f"M-{i}" for i in range(6)]
+        system.devices = dict(zip(ids, EnergyDeviceFactory().create_many(ids, ["North", "South", "North"] * 2)))
+        changes = []
+        forecast = system.start_forecasting(enable_above=100.0, horizon=3, season_length=4, alpha=0.5,
+                                            on_mode_change=changes.append)
+        forecast.fit(np.full((6, 8), 10.0))
+        self.assertFalse(system.efficiency_mode)
+        for device in system.devices.values():
+            device.power_consumption = 30.0
+        for _ in range(4):
+            system.record_interval()
+        self.assertTrue(system.efficiency_mode)
+        zones = forecast.zone_forecast()
+        self.assertEqual(set(zones), {"North", "South"})
+        self.assertAlmostEqual(zones["North"][0] / zones["South"][0], 2.0, places=6)
+        system.add_devices({"M-6": EnergyMonitor("M-6", "Harbor")})
+        for _ in range(8):
+            system.record_interval(np.full(7, 5.0))
+        self.assertFalse(system.efficiency_mode)
+        self.assertEqual(changes, [True, False])
+        summary = system.get_status()['forecast']
+        self.assertEqual((summary['meters'], summary['zones']), (7, 3))
+        print("✓ Energy Forecast: Automatic efficiency mode working")
+    
+    def test_layout_changes(self):
+        """Test empty zones are pruned, replaced meters re-read and readings are length-checked"""
+        import numpy as np
+        system = EnergySystem()
+        system.add_devices({"M-1": EnergyMonitor("M-1", "North"), "M-2": EnergyMonitor("M-2", "South")})
+        forecast = system.start_forecasting(enable_above=1000.0, horizon=2, season_length=2)
+        system.record_interval(np.array([1.0, 2.0]))
+        with self.assertRaises(ValueError):
+            system.record_interval(np.array([1.0, 2.0, 3.0]))
+        
+        version = system.layout_version
+        system.add_device("M-2", EnergyMonitor("M-2", "Harbor"))
+        self.assertGreater(system.layout_version, version)
+        self.assertEqual(set(forecast.zone_forecast()), {"North", "Harbor"})
+        system.remove_devices(["M-1"])
+        self.assertEqual(set(forecast.zone_forecast()), {"Harbor"})
+        self.assertEqual(forecast.summary()['zones'], 1)
+        print("✓ Energy Forecast: Layout changes tracked")
+
+
+class TestDeviceLayout(unittest.TestCase):
+    """Test slotted device representations"""
+    
+    def test_devices_have_no_instance_dict(self):
+        """Test devices are slotted and status output is unchanged"""
+        expected = {
+            SmartLight: {'device_id': 'D-1', 'location': 'Loc', 'is_on': False, 'brightness': 0},
+            SecurityCamera: {'device_id': 'D-1', 'location': 'Loc', 'is_recording': False,
+                             'resolution': '1080p'},
+            TrafficLight: {'device_id': 'D-1', 'intersection': 'Loc', 'current_signal': 'red',
+                           'is_operational': False},
+            EnergyMonitor: {'device_id': 'D-1', 'zone': 'Loc', 'is_monitoring': False,
+                            'power_consumption_kwh': 0},
+        }
+        for device_class, status in expected.items():
+            device = device_class('D-1', 'Loc')
+            self.assertFalse(hasattr(device, '__dict__'), device_class.__name__)
+            self.assertEqual(device.status(), status)
+            with self.assertRaises(AttributeError):
+                device.unexpected_attribute = 1
+        print("✓ Device Layout: Slotted devices keep status output")
+
+
+class TestFlyweightPattern(unittest.TestCase):
+    """Test Flyweight interning of shared device attributes"""
+    
+    def test_registry_interning(self):
+        """Test equal strings share one handle"""
+        registry = FlyweightRegistry()
+        first = registry.intern("Downtown")
+        self.assertEqual(registry.intern("Down" + "town"), first)
+        self.assertNotEqual(registry.intern("Harbor"), first)
+        self.assertEqual(registry.value(first), "Downtown")
+        self.assertEqual(registry.table(), ["Downtown", "Harbor"])
+        print("✓ Flyweight Pattern: Registry interns strings")
+    
+    def test_devices_store_handles(self):
+        """Test devices keep handles and expose strings"""
+        camera1 = SecurityCamera("CAM-1", "Zone " + "A")
+        camera2 = SecurityCamera("CAM-2", "Zone A")
+        self.assertEqual(camera1._location, camera2._location)
+        self.assertEqual(camera1._resolution, camera2._resolution)
+        self.assertEqual(camera1.resolution, "1080p")
+        
+        camera2.location = "Harbor"
+        self.assertEqual(camera2.status()['location'], "Harbor")
+        self.assertEqual(camera1.location, "Zone A")
+        print("✓ Flyweight Pattern: Devices share attribute handles")
+    
+    def test_compact_status(self):
+        """Test compact status decodes to the full status"""
+        monitor = EnergyMonitor("E-1", "Zone B")
+        compact = monitor.status(compact=True)
+        table = attribute_registry.table()
+        self.assertIsInstance(compact['zone'], int)
+        self.assertEqual(dict(compact, zone=table[compact['zone']]), monitor.status())
+        
+        system = LightingSystem()
+        system.add_device("L-1", SmartLight("L-1", "Main St"))
+        devices = MonitoringDecorator(SubsystemProxy(system)).get_status(compact=True)['devices']
+        self.assertEqual(attribute_registry.value(devices["L-1"]['location']), "Main St")
+        print("✓ Flyweight Pattern: Compact status round-trips")
+
+
+class TestSharding(unittest.TestCase):
+    """Test multi-process sharding of device fleets"""
+    
+    def test_shard_for_is_stable(self):
+        """Test device ids map to a fixed shard in range"""
+        shards = [shard_for(f"LIGHT-{i}", 4) for i in range(200)]
+        self.assertTrue(all(0 <= shard < 4 for shard in shards))
+        self.assertEqual(len(set(shards)), 4)
+        self.assertEqual(shard_for("LIGHT-7", 4), shard_for("LIGHT-7", 4))
+        print("✓ Sharding: Stable device-to-shard mapping")
+    
+    def test_sharded_subsystem(self):
+        """Test routing, broadcast and status merge across shards"""
+        pool = ShardPool(2, ['lighting'])
+        try:
+            lighting = ShardedSubsystem('lighting', pool)
+            lighting.initialize()
+            ids = [f"L-{i}" for i in range(20)]
+            lighting.add_devices(dict(zip(ids, LightingDeviceFactory().create_many(ids, "Main St"))))
+            lighting.add_device("L-X", SmartLight("L-X", "Oak Ave"))
+            
+            lighting.start_all()
+            lighting.device_call("L-3", "set_brightness", 30)
+            status = lighting.get_status()
+            self.assertEqual(status['device_count'], 21)
+            self.assertEqual(status['shard_count'], 2)
+            self.assertEqual(status['devices']['L-3']['brightness'], 30)
+            self.assertEqual(status['devices']['L-X']['location'], "Oak Ave")
+            self.assertTrue(all(d['is_on'] for d in status['devices'].values()))
+            
+            compact = lighting.get_status(compact=True)
+            self.assertEqual(attribute_registry.value(compact['devices']['L-X']['location']), "Oak Ave")
+            self.assertEqual(lighting.query({'brightness': ('<', 100)}, ['location']), {'L-3': {'location': "Main St"}})
+            with self.assertRaises(RuntimeError):
+                lighting.device_call("MISSING", "start")
+            self.assertFalse(hasattr(lighting, 'devices'))
+            self.assertFalse(hasattr(lighting, 'set_alert_level'))
+            self.assertTrue(hasattr(ShardedSubsystem('security', pool), 'set_alert_level'))
+            statuses = lighting.statuses(["L-3", "L-X", "MISSING"])
+            self.assertEqual(sorted(status['device_id'] for status in statuses), ["L-3", "L-X"])
+        finally:
+            pool.close()
+        print("✓ Sharding: Routing and status merge working")
+    
+    def test_controller_sharded_mode(self):
+        """Test the controller in sharded mode"""
+        controller = isolated_city(self, shards=2)
+        try:
+            camera = controller.create_device('security', 'CAM-S1', 'Harbor')
+            controller.add_device_to_subsystem('security', 'CAM-S1', camera)
+            controller.start_subsystem('security')
+            self.assertIsNone(controller.device_command('security', 'CAM-S1', 'stop'))
+            status = controller.get_subsystem_status('security')
+            self.assertEqual(status['device_count'], 1)
+            self.assertFalse(status['devices']['CAM-S1']['is_recording'])
+            self.assertEqual(status['security_auth_level'], 'admin')
+        finally:
+            controller.shutdown()
+        self.assertFalse(controller._initialized)
+        print("✓ Sharding: Controller sharded mode working")
+
+
+class TestStatusQueries(unittest.TestCase):
+    """Test predicate and projection pushdown"""
+    
+    def setUp(self):
+        self.system = LightingSystem()
+        ids = [f"Q-{i}" for i in range(100)]
+        locations = ["Main St" if i % 2 else "Oak Ave" for i in range(100)]
+        self.system.devices = dict(zip(ids, LightingDeviceFactory().create_many(ids, locations)))
+        for i in range(0, 100, 10):
+            self.system.devices[f"Q-{i}"].is_on = True
+            self.system.devices[f"Q-{i}"].brightness = i
+    
+    def test_where_and_fields(self):
+        """Test filters run on device slots and only requested fields are built"""
+        matches = self.system.query({'is_on': True, 'brightness': ('>=', 50)}, ['device_id', 'location'])
+        self.assertEqual(list(matches), ["Q-50", "Q-60", "Q-70", "Q-80", "Q-90"])
+        self.assertEqual(matches["Q-50"], {'device_id': "Q-50", 'location': "Oak Ave"})
+        self.assertEqual(self.system.query({'is_on': True, 'location': "Main St"}), {})
+        self.assertEqual(len(self.system.query({'location': ('in', ["Main St", "Nowhere"])})), 50)
+        self.assertEqual(self.system.query({'location': "Nowhere"}), {})
+        self.assertEqual(self.system.query({'device_id': "Q-3"})["Q-3"], self.system.devices["Q-3"].status())
+        with self.assertRaises(ValueError):
+            self.system.query({'colour': "red"})
+        print("✓ Status Queries: Filters and projections working")
+    
+    def test_devices_without_slot_map(self):
+        """Test devices without STATUS_SLOTS are filtered on their status dicts"""
+        class PlainLight:
+            def __init__(self, device_id):
+                self.device_id = device_id
+            
+            def status(self):
+                return {'device_id': self.device_id, 'is_on': self.device_id.endswith('1')}
+        
+        self.system.devices["P-1"] = PlainLight("P-1")
+        self.system.devices["P-2"] = PlainLight("P-2")
+        matches = self.system.query({'is_on': True}, ['device_id'])
+        self.assertIn("P-1", matches)
+        self.assertNotIn("P-2", matches)
+        self.assertIn("Q-0", matches)
+        print("✓ Status Queries: Status-dict fallback working")
+    
+    def test_controller_query(self):
+        """Test the controller facade routes queries to the subsystem"""
+        controller = isolated_city(self)
+        try:
+            cameras = controller.create_devices('security', ["C-1", "C-2"], ["Harbor", "Airport"])
+            controller.add_devices_to_subsystem('security', {camera.device_id: camera for camera in cameras})
+            controller.device_command('security', "C-2", 'start')
+            self.assertEqual(controller.query('security', {'is_recording': False}, ['location']),
+                             {"C-1": {'location': "Harbor"}})
+            self.assertEqual(controller.query('nowhere'), {})
+        finally:
+            controller.shutdown()
+        print("✓ Status Queries: Controller query working")
+
+
+def _read_board_in_child(name, queue):
+    """Attach to a status board from another process and report its snapshot"""
+    reader = StatusBoardReader(name)
+    queue.put(reader.snapshot())
+    reader.close()
+
+
+class TestStatusBoard(unittest.TestCase):
+    """Test the shared-memory status board"""
+    
+    def setUp(self):
+        self.board = StatusBoard(capacity=16)
+    
+    def tearDown(self):
+        self.board.close()
+    
+    def test_publish_and_read(self):
+        """Test published device state is readable without the controller"""
+        light = SmartLight("L-1", "Main St")
+        light.start()
+        light.set_brightness(70)
+        monitor = EnergyMonitor("E-1", "Zone A")
+        monitor.update_consumption(12.5)
+        self.board.publish_devices('lighting', {"L-1": light})
+        self.board.publish_devices('energy', {"E-1": monitor})
+        self.board.publish_status('transport', TrafficLight("T-1", "Main-Oak").status())
+        
+        reader = StatusBoardReader(self.board.name)
+        try:
+            self.assertEqual(reader.count(), 3)
+            snapshot = reader.snapshot()
+            self.assertEqual(snapshot['lighting']["L-1"]['brightness'], 70)
+            self.assertTrue(snapshot['lighting']["L-1"]['active'])
+            self.assertEqual(snapshot['lighting']["L-1"]['location'], "Main St")
+            self.assertEqual(snapshot['energy']["E-1"]['consumption_kwh'], 12.5)
+            self.assertEqual(snapshot['transport']["T-1"]['signal'], "red")
+            
+            light.stop()
+            self.board.publish_devices('lighting', {"L-1": light})
+            self.assertEqual(reader.count(), 3)
+            self.assertFalse(reader.snapshot()['lighting']["L-1"]['active'])
+        finally:
+            reader.close()
+        print("✓ Status Board: Publish and read working")
+    
+    def test_reader_in_other_process(self):
+        """Test a separate process can scan the board"""
+        import multiprocessing
+        camera = SecurityCamera("CAM-1", "Harbor")
+        camera.start()
+        self.board.publish_devices('security', {"CAM-1": camera})
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_read_board_in_child, args=(self.board.name, queue))
+        process.start()
+        snapshot = queue.get(timeout=10)
+        process.join(timeout=10)
+        self.assertTrue(snapshot['security']["CAM-1"]['active'])
+        self.assertEqual(snapshot['security']["CAM-1"]['location'], "Harbor")
+        print("✓ Status Board: Cross-process reader working")
+    
+    def test_capacity_overflow(self):
+        """Test the board refuses devices beyond its capacity"""
+        lights = LightingDeviceFactory().create_many([f"L-{i}" for i in range(17)], "A")
+        with self.assertRaises(OverflowError):
+            self.board.publish_devices('lighting', {light.device_id: light for light in lights})
+        print("✓ Status Board: Capacity enforced")
+    
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_numpy_view(self):
+        """Test the zero-copy structured array view"""
+        light = SmartLight("L-9", "Oak Ave")
+        light.start()
+        self.board.publish_devices('lighting', {"L-9": light})
+        reader = StatusBoardReader(self.board.name)
+        array = reader.as_array()
+        self.assertEqual(array['brightness'][0], 100)
+        self.assertEqual(array['device_id'][0], b"L-9")
+        self.assertEqual(array['seq'][0] % 2, 0)
+        del array
+        reader.close()
+        print("✓ Status Board: NumPy view working")
+    
+    def test_controller_publishes(self):
+        """Test the controller keeps the board in sync with commands"""
+        controller = isolated_city(self)
+        try:
+            controller.attach_status_board(self.board)
+            light = controller.create_device('lighting', 'L-BOARD', 'Main St')
+            controller.add_device_to_subsystem('lighting', 'L-BOARD', light)
+            controller.start_subsystem('lighting')
+            controller.device_command('lighting', 'L-BOARD', 'set_brightness', 25)
+            reader = StatusBoardReader(self.board.name)
+            self.assertEqual(reader.snapshot()['lighting']['L-BOARD']['brightness'], 25)
+            reader.close()
+        finally:
+            controller.attach_status_board(None)
+            controller.shutdown()
+        print("✓ Status Board: Controller publishes on commands")
+    
+    def test_controller_unpublishes_removed(self):
+        """Test removed devices leave the board and their slots are reused"""
+        controller = isolated_city(self)
+        try:
+            controller.attach_status_board(self.board)
+            for device_id in ('L-GONE', 'L-STAY'):
+                light = controller.create_device('lighting', device_id, 'Main St')
+                controller.add_device_to_subsystem('lighting', device_id, light)
+            reader = StatusBoardReader(self.board.name)
+            used = reader.count()
+            controller.remove_devices_from_subsystem('lighting', ['L-GONE'])
+            snapshot = reader.snapshot()
+            self.assertNotIn('L-GONE', snapshot['lighting'])
+            self.assertIn('L-STAY', snapshot['lighting'])
+            self.assertNotIn('L-GONE', [record[-1] for record in reader.scan()])
+            
+            light = controller.create_device('lighting', 'L-NEW', 'Oak Ave')
+            controller.add_device_to_subsystem('lighting', 'L-NEW', light)
+            self.assertEqual(reader.count(), used)
+            self.assertIn('L-NEW', reader.snapshot()['lighting'])
+            reader.close()
+        finally:
+            controller.attach_status_board(None)
+            controller.shutdown()
+        print("✓ Status Board: Removed devices unpublished")
+    
+    def test_strings_region_sized_from_table(self):
+        """Test a large string table fits and a failed attach leaves no board behind"""
+        from core.flyweight.flyweight import attribute_registry
+        streets = [f"Street {i:05d}" for i in range(4000)]
+        for street in streets:
+            attribute_registry.intern(street)
+        board = StatusBoard(capacity=16)
+        self.addCleanup(board.close)
+        board.publish_strings()
+        reader = StatusBoardReader(board.name)
+        try:
+            self.assertEqual(reader.strings()[attribute_registry.intern(streets[-1])], streets[-1])
+        finally:
+            reader.close()
+        
+        controller = isolated_city(self)
+        light = controller.create_device('lighting', 'L-ATOMIC', 'Main St')
+        controller.add_device_to_subsystem('lighting', 'L-ATOMIC', light)
+        small = StatusBoard(capacity=16, strings_capacity=1024)
+        self.addCleanup(small.close)
+        with self.assertRaises(OverflowError):
+            controller.attach_status_board(small)
+        self.assertIsNone(controller._status_board)
+        controller.device_command('lighting', 'L-ATOMIC', 'start')
+        self.assertTrue(controller.get_device_status('lighting', 'L-ATOMIC')['is_on'])
+        print("✓ Status Board: Strings region sized from the table, attach is atomic")
+
+
+class TestTelemetryPipeline(unittest.TestCase):
+    """Test streaming telemetry ingestion"""
+    
+    def setUp(self):
+        self.controller = isolated_city(self)
+        for name, device_id in (('lighting', 'L-T'), ('energy', 'E-T'), ('transport', 'T-T')):
+            device = self.controller.create_device(name, device_id, 'Telemetry Rd')
+            self.controller.add_device_to_subsystem(name, device_id, device)
+    
+    def tearDown(self):
+        self.controller.shutdown()
+    
+    def _device(self, name, device_id):
+        return self.controller._haqiqiy_subsistema(name).devices[device_id]
+    
+    def _feed(self, pipeline, payload, framing):
+        """Write payload into an OS pipe in small chunks and ingest it"""
+        import threading
+        read_fd, write_fd = os.pipe()
+        
+        def produce():
+            with os.fdopen(write_fd, 'wb') as stream:
+                for offset in range(0, len(payload), 7):
+                    stream.write(payload[offset:offset + 7])
+                    stream.flush()
+        
+        producer = threading.Thread(target=produce)
+        producer.start()
+        with os.fdopen(read_fd, 'rb') as stream:
+            pipeline.feed_stream(stream, framing)
+        producer.join()
+    
+    def test_ndjson_and_length_framing(self):
+        """Test both framings split partial frames and apply readings"""
+        readings = [('lighting', 'L-T', 'brightness', 40), ('energy', 'E-T', 'kwh', 3.5),
+                    ('transport', 'T-T', 'signal', 'green'), ('lighting', 'L-T', 'brightness', 55)]
+        for framing in ('ndjson', 'length'):
+            pipeline = TelemetryPipeline(self.controller, batch_size=2).start()
+            self._feed(pipeline, encode_readings(readings, framing), framing)
+            pipeline.stop()
+            stats = pipeline.stats()
+            self.assertEqual(stats['received'], 4)
+            self.assertEqual(stats['invalid'], 0)
+            self.assertEqual(self._device('lighting', 'L-T').brightness, 55)
+            self.assertEqual(self._device('energy', 'E-T').power_consumption, 3.5)
+            self.assertEqual(self._device('transport', 'T-T').current_signal, 'green')
+        print("✓ Telemetry: NDJSON and length-prefixed framing working")
+    
+    def test_validation_and_coalescing(self):
+        """Test invalid records are counted and repeated readings coalesce"""
+        pipeline = TelemetryPipeline(self.controller)
+        batch = [b'{"subsystem":"lighting","device_id":"L-T","metric":"brightness","value":10}',
+                 b'{"subsystem":"lighting","device_id":"L-T","metric":"brightness","value":20}',
+                 b'{"subsystem":"lighting","device_id":"L-T","metric":"brightness","value":101}',
+                 b'{"subsystem":"energy","device_id":"E-T","metric":"kwh","value":true}',
+                 b'{"subsystem":"energy","device_id":"NOPE","metric":"kwh","value":1}',
+                 b'not json']
+        self.assertEqual(pipeline.process_batch(batch), 1)
+        stats = pipeline.stats()
+        self.assertEqual(stats['invalid'], 3)
+        self.assertEqual(stats['coalesced'], 1)
+        self.assertEqual(stats['unknown_device'], 1)
+        self.assertEqual(self._device('lighting', 'L-T').brightness, 20)
+        print("✓ Telemetry: Validation and coalescing working")
+    
+    def test_drop_policies(self):
+        """Test full queues drop the newest or oldest batches"""
+        frames = [encode_readings([('lighting', 'L-T', 'brightness', level)]).strip() for level in (1, 2, 3)]
+        with self.assertRaises(ValueError):
+            TelemetryPipeline(self.controller, policy='unbounded')
+        for policy, expected in (('drop_newest', 1), ('drop_oldest', 2)):
+            pipeline = TelemetryPipeline(self.controller, batch_size=1, max_batches=2, policy=policy)
+            for frame in frames:
+                pipeline._enqueue([frame])
+            self.assertEqual(pipeline.stats()['dropped'], 1)
+            pipeline.start()
+            pipeline.stop()
+            self.assertEqual(self._device('lighting', 'L-T').brightness, expected + 1)
+        print("✓ Telemetry: Drop policies working")
+    
+    def test_applier_survives_errors(self):
+        """Test a failing batch is counted and the applier keeps draining"""
+        frames = [encode_readings([('lighting', 'L-T', 'brightness', level)]).strip() for level in (30, 40)]
+        pipeline = TelemetryPipeline(self.controller, batch_size=1, max_batches=1).start()
+        original = self.controller.apply_telemetry
+        calls = []
+        
+        def flaky(*args):
+            calls.append(args)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            return original(*args)
+        
+        self.controller.apply_telemetry = flaky
+        try:
+            for frame in frames:
+                pipeline._enqueue([frame])
+            pipeline.stop()
+        finally:
+            del self.controller.apply_telemetry
+        stats = pipeline.stats()
+        self.assertEqual(stats['failed'], 1)
+        self.assertIn("boom", pipeline.last_error)
+        self.assertEqual(self._device('lighting', 'L-T').brightness, 40)
+        print("✓ Telemetry: Applier survives failing batches")
+
+
+class TestStatusApi(unittest.TestCase):
+    """Test the asyncio HTTP status and command API"""
+    
+    def setUp(self):
+        import http.client
+        self.controller = isolated_city(self)
+        lights = self.controller.create_devices('lighting', [f"L-{i}" for i in range(50)], "Main St")
+        self.controller.add_devices_to_subsystem('lighting', {light.device_id: light for light in lights})
+        self.server = StatusServer(self.controller, port=0).start_in_thread()
+        self.http = http.client.HTTPConnection('127.0.0.1', self.server.port, timeout=10)
+    
+    def tearDown(self):
+        self.http.close()
+        self.server.stop()
+        self.controller.shutdown()
+    
+    def _request(self, method, path, body=None, headers=None):
+        self.http.request(method, path, body=body, headers=headers or {})
+        response = self.http.getresponse()
+        return response, response.read()
+    
+    def test_status_routes(self):
+        """Test all, subsystem and device status over one keep-alive connection"""
+        import json
+        response, body = self._request('GET', '/status')
+        self.assertEqual(response.status, 200)
+        self.assertIn('lighting', json.loads(body)['subsistemalar'])
+        response, body = self._request('GET', '/status/lighting/L-3')
+        self.assertEqual(json.loads(body)['location'], "Main St")
+        response, body = self._request('GET', '/status/lighting?compact=1')
+        self.assertIn('satrlar_jadvali', json.loads(body))
+        response, body = self._request('GET', '/status/lighting/L-3?compact=1')
+        device = json.loads(body)
+        self.assertEqual(device['satrlar_jadvali'][str(device['location'])], "Main St")
+        response, _ = self._request('GET', '/status/lighting/NOPE')
+        self.assertEqual(response.status, 404)
+        self.assertEqual(self.server.stats()['connections'], 1)
+        print("✓ Status API: Status routes working")
+    
+    def test_etag_and_cache(self):
+        """Test ETag revalidation and cache invalidation on state changes"""
+        response, _ = self._request('GET', '/status/lighting')
+        etag = response.getheader('ETag')
+        response, body = self._request('GET', '/status/lighting', headers={'If-None-Match': etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b'')
+        self.assertEqual(self.server.stats()['cache_hits'], 1)
+        
+        self.controller.device_command('lighting', 'L-1', 'set_brightness', 10)
+        response, _ = self._request('GET', '/status/lighting', headers={'If-None-Match': etag})
+        self.assertEqual(response.status, 200)
+        self.assertNotEqual(response.getheader('ETag'), etag)
+        print("✓ Status API: ETag and cache invalidation working")
+    
+    def test_gzip(self):
+        """Test large payloads are gzip-encoded when accepted"""
+        import gzip
+        import json
+        response, body = self._request('GET', '/status', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.getheader('Content-Encoding'), 'gzip')
+        self.assertIn('subsistemalar', json.loads(gzip.decompress(body)))
+        print("✓ Status API: gzip encoding working")
+    
+    def test_command(self):
+        """Test device commands are applied and validated"""
+        import json
+        response, body = self._request('POST', '/command/lighting/L-2',
+                                       body=json.dumps({'command': 'set_brightness', 'args': [33]}))
+        self.assertEqual(response.status, 200)
+        light = self.controller._haqiqiy_subsistema('lighting').devices['L-2']
+        self.assertEqual(light.brightness, 33)
+        response, _ = self._request('POST', '/command/lighting/L-2', body=json.dumps({'command': '__class__'}))
+        self.assertEqual(response.status, 400)
+        response, _ = self._request('GET', '/command/lighting/L-2')
+        self.assertEqual(response.status, 405)
+        print("✓ Status API: Device commands working")
+    
+    def test_cache_is_bounded(self):
+        """Test the response cache keeps only the most recently used routes"""
+        import core.api.api as api_module
+        original = api_module.MAX_CACHED_ROUTES
+        api_module.MAX_CACHED_ROUTES = 2
+        try:
+            for path in ('/status/lighting/L-1', '/status/lighting/L-2', '/status/lighting/L-1',
+                         '/status/lighting/L-3'):
+                self._request('GET', path)
+            self.assertEqual(self.server.stats()['cached_routes'], 2)
+            self._request('GET', '/status/lighting/L-1')
+            self.assertEqual(self.server.stats()['cache_hits'], 2)
+        finally:
+            api_module.MAX_CACHED_ROUTES = original
+        print("✓ Status API: Response cache bounded (LRU)")
+    
+    def test_rate_limited_command(self):
+        """Test throttled commands get 429 with Retry-After"""
+        import json
+        self.controller.configure_admission(client_rate=0.001, client_burst=1)
+        try:
+            command = json.dumps({'command': 'set_brightness', 'args': [20]})
+            response, _ = self._request('POST', '/command/lighting/L-4', body=command)
+            self.assertEqual(response.status, 200)
+            response, _ = self._request('POST', '/command/lighting/L-4', body=command)
+            self.assertEqual(response.status, 429)
+            self.assertGreaterEqual(int(response.getheader('Retry-After')), 1)
+            self.assertEqual(self.controller.get_admission_stats()['lighting']['throttled'], 1)
+        finally:
+            self.controller.configure_admission()
+        print("✓ Status API: Rate-limited commands return 429")
+
+
+class TestLazyImports(unittest.TestCase):
+    """Test lazy package exports"""
+    
+    def _loaded_after(self, statement):
+        """Run a statement in a fresh interpreter and return project modules it loaded"""
+        code = (f"import sys\n{statement}\n"
+                "print(' '.join(m for m in sys.modules "
+                "if m.split('.')[0] in ('core', 'modules')))")
+        out = subprocess.run([sys.executable, '-c', code],
+                             cwd=os.path.dirname(os.path.abspath(__file__)),
+                             capture_output=True, text=True, check=True)
+        return set(out.stdout.split())
+    
+    def test_package_import_is_lazy(self):
+        """Test importing packages loads no submodules"""
+        # Only the shared lazy-export helper is loaded besides the packages
+        self.assertEqual(self._loaded_after("import core, modules"), {'core', 'core._lazy', 'modules'})
+        print("✓ Lazy Imports: Bare package import loads nothing else")
+    
+    def test_single_subsystem_import(self):
+        """Test importing one subsystem leaves the others unloaded"""
+        loaded = self._loaded_after("from modules.lighting import LightingSystem")
+        self.assertIn('modules.lighting.lighting_system', loaded)
+        self.assertNotIn('modules.security.security_system', loaded)
+        self.assertNotIn('core.controller', loaded)
+        print("✓ Lazy Imports: Single subsystem import stays isolated")
+    
+    def test_exports_resolve(self):
+        """Test lazy exports resolve to the defining classes"""
+        import core
+        import modules
+        from modules.security import SecuritySystem
+        self.assertIs(core.SmartCityController, SmartCityController)
+        self.assertIs(core.LightingDeviceFactory, LightingDeviceFactory)
+        self.assertIs(modules.SecuritySystem, SecuritySystem)
+        self.assertIs(modules.LightingSystem, LightingSystem)
+        with self.assertRaises(AttributeError):
+            core.NoSuchExport
+        print("✓ Lazy Imports: Exports resolve on first access")
+
+
 def run_tests():
     """Run all tests"""
     print("\n" + "="*60)
@@ -379,13 +2097,36 @@ def run_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestSingletonPattern))
     suite.addTests(loader.loadTestsFromTestCase(TestFactoryPattern))
     suite.addTests(loader.loadTestsFromTestCase(TestBuilderPattern))
+    suite.addTests(loader.loadTestsFromTestCase(TestInventoryLoader))
+    suite.addTests(loader.loadTestsFromTestCase(TestConfigReconfiguration))
+    suite.addTests(loader.loadTestsFromTestCase(TestCityRegistry))
+    suite.addTests(loader.loadTestsFromTestCase(TestTracing))
+    suite.addTests(loader.loadTestsFromTestCase(TestHeadlessMode))
+    suite.addTests(loader.loadTestsFromTestCase(TestWorkloadGenerator))
     suite.addTests(loader.loadTestsFromTestCase(TestProxyPattern))
     suite.addTests(loader.loadTestsFromTestCase(TestDecoratorPattern))
     suite.addTests(loader.loadTestsFromTestCase(TestControllerIntegration))
+    suite.addTests(loader.loadTestsFromTestCase(TestDeviceLiveness))
+    suite.addTests(loader.loadTestsFromTestCase(TestDistrictHierarchy))
     suite.addTests(loader.loadTestsFromTestCase(TestLightingSystem))
+    suite.addTests(loader.loadTestsFromTestCase(TestLightingSchedule))
+    suite.addTests(loader.loadTestsFromTestCase(TestAdaptiveLighting))
     suite.addTests(loader.loadTestsFromTestCase(TestSecuritySystem))
+    suite.addTests(loader.loadTestsFromTestCase(TestCameraEvents))
+    suite.addTests(loader.loadTestsFromTestCase(TestEscalationRules))
     suite.addTests(loader.loadTestsFromTestCase(TestTransportSystem))
+    suite.addTests(loader.loadTestsFromTestCase(TestSignalTiming))
+    suite.addTests(loader.loadTestsFromTestCase(TestTrafficSimulation))
     suite.addTests(loader.loadTestsFromTestCase(TestEnergySystem))
+    suite.addTests(loader.loadTestsFromTestCase(TestEnergyForecast))
+    suite.addTests(loader.loadTestsFromTestCase(TestDeviceLayout))
+    suite.addTests(loader.loadTestsFromTestCase(TestFlyweightPattern))
+    suite.addTests(loader.loadTestsFromTestCase(TestSharding))
+    suite.addTests(loader.loadTestsFromTestCase(TestStatusQueries))
+    suite.addTests(loader.loadTestsFromTestCase(TestStatusBoard))
+    suite.addTests(loader.loadTestsFromTestCase(TestTelemetryPipeline))
+    suite.addTests(loader.loadTestsFromTestCase(TestStatusApi))
+    suite.addTests(loader.loadTestsFromTestCase(TestLazyImports))
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)